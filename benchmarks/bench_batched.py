@@ -0,0 +1,50 @@
+"""
+Benchmark of the batched multi-transition evaluation: n SO transitions on
+a shared Tex map, in one call against a Python loop over the transitions.
+
+Run as: python benchmarks/bench_batched.py
+"""
+
+import timeit
+
+import numpy as np
+
+from molecular_columns import col_so
+
+map_shape = (512, 512)
+n_lines = 10
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    Tex = rng.uniform(5.0, 30.0, map_shape)
+    TdV = rng.uniform(0.1, 5.0, (n_lines,) + map_shape)
+    line_index = np.argsort(col_so.SO.A_ul)[::-1][:n_lines]
+    N_J_up = col_so.level_keys[col_so.lines["up"][line_index]]
+    N_J_low = col_so.level_keys[col_so.lines["low"][line_index]]
+
+    def loop(**kw):
+        return np.array(
+            [
+                col_so.SO_thin_np(up, low, Tex, TdV[i], **kw)
+                for i, (up, low) in enumerate(zip(N_J_up, N_J_low))
+            ]
+        )
+
+    print(f"{n_lines} lines, map of {map_shape[0]}x{map_shape[1]} pixels")
+    for tabulated in [False, True]:
+        t_loop = min(
+            timeit.repeat(lambda: loop(tabulated=tabulated), number=1, repeat=3)
+        )
+        t_batch = min(
+            timeit.repeat(
+                lambda: col_so.SO_thin_np(
+                    N_J_up, N_J_low, Tex, TdV, tabulated=tabulated
+                ),
+                number=1,
+                repeat=3,
+            )
+        )
+        print(
+            f"tabulated={tabulated!s:>5}: loop {t_loop:.3f} s,"
+            f" batched {t_batch:.3f} s, speedup {t_loop / t_batch:.1f}"
+        )
@@ -0,0 +1,73 @@
+"""
+Benchmark of the analytic gradients of the column density (Species.thin_grad
+and Species.thick_grad) against the column density alone, for maps of Tex
+and TdV, and of the linear error propagation (lte.propagate_errors) against
+the Monte Carlo one (monte_carlo.propagate).
+
+Run as: python benchmarks/bench_gradients.py
+"""
+
+import timeit
+
+import numpy as np
+
+from molecular_columns import col_c18o, lte, monte_carlo
+
+n_pixels = 1_000_000
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    Tex = rng.uniform(5.0, 30.0, n_pixels)
+    TdV = rng.uniform(0.1, 5.0, n_pixels)
+    tau = rng.uniform(0.1, 5.0, n_pixels)
+    species = col_c18o.C18O
+    cases = {
+        "thin": (
+            lambda tab: species.thin(2, Tex, TdV, tabulated=tab),
+            lambda tab: species.thin_grad(2, Tex, TdV, tabulated=tab),
+        ),
+        "thick (TdV, tau)": (
+            lambda tab: species.thick(2, Tex, tau, TdV=TdV, tabulated=tab),
+            lambda tab: species.thick_grad(2, Tex, tau, TdV=TdV, tabulated=tab),
+        ),
+    }
+    print(
+        f"{'kernel':>18} {'Q':>9} {'value (s)':>10} {'gradient (s)':>13} {'ratio':>6}"
+    )
+    for name, (value, gradient) in cases.items():
+        for tabulated in [False, True]:
+            t_value, t_gradient = (
+                min(timeit.repeat(lambda: f(tabulated), number=1, repeat=3))
+                for f in (value, gradient)
+            )
+            print(
+                f"{name:>18} {'table' if tabulated else 'exact':>9}"
+                f" {t_value:10.3f} {t_gradient:13.3f} {t_gradient / t_value:6.1f}"
+            )
+
+    # Ncol +- sigma for 10 % errors on TdV and 1 K errors on Tex
+    n_small = 10_000
+    errors = {"TdV": 0.1 * TdV[:n_small], "Tex": np.ones(n_small)}
+
+    def linear():
+        _, gradients = species.thin_grad(2, Tex[:n_small], TdV[:n_small])
+        return lte.propagate_errors(gradients, errors)
+
+    def sampled():
+        return monte_carlo.propagate(
+            col_c18o.C18O_thin_np,
+            {"Tex": Tex[:n_small], "TdV": TdV[:n_small]},
+            errors,
+            n_samples=1000,
+            J_up=2,
+            tabulated=True,
+        )["std"]
+
+    t_linear, t_sampled = (
+        min(timeit.repeat(f, number=1, repeat=3)) for f in (linear, sampled)
+    )
+    ratio = np.median(linear() / sampled())
+    print(
+        f"\n{n_small} pixels: linear {t_linear:.4f} s, Monte Carlo {t_sampled:.2f} s,"
+        f" median sigma ratio {ratio:.3f}"
+    )
@@ -0,0 +1,45 @@
+"""
+Benchmark of the import time of molecular_columns and of the first access
+to the species catalogs, each measured in a fresh interpreter.
+
+Run as: python benchmarks/bench_import.py
+"""
+
+import subprocess
+import sys
+
+# import-time budget, in seconds
+import_budget = 0.05
+n_repeat = 5
+
+statements = {
+    "import molecular_columns": "import molecular_columns",
+    'species["SO"]': 'import molecular_columns; molecular_columns.species["SO"]',
+    'species["p-H2CO"]': 'import molecular_columns; molecular_columns.species["p-H2CO"]',
+}
+
+
+def time_in_subprocess(statement: str) -> float:
+    """
+    Returns the time (in s) to run statement in a fresh interpreter,
+    excluding the start-up of the interpreter itself.
+    """
+    code = (
+        "import time; t0 = time.perf_counter();"
+        f" {statement}; print(time.perf_counter() - t0)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return float(output.stdout.split()[-1])
+
+
+if __name__ == "__main__":
+    timings = {}
+    for name, statement in statements.items():
+        timings[name] = min(time_in_subprocess(statement) for _ in range(n_repeat))
+        print(f"{name:>24}: {1e3 * timings[name]:8.1f} ms")
+    status = (
+        "OK" if timings["import molecular_columns"] <= import_budget else "OVER BUDGET"
+    )
+    print(f"import budget: {1e3 * import_budget:.0f} ms ({status})")
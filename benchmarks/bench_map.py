@@ -0,0 +1,39 @@
+"""
+Benchmark of the map mode of the unit-free API: time per pixel of SO and
+C18O column density maps with Tex and TdV maps of 1e5 to 1e7 pixels, and
+10% of invalid pixels (NaN, Tex <= 0 or Tex <= T_bg).
+
+Run as: python benchmarks/bench_map.py
+"""
+
+import timeit
+
+import numpy as np
+
+from molecular_columns import col_c18o, col_so
+
+map_sizes = [10**5, 10**6, 10**7]
+
+functions = {
+    "C18O 3-2": lambda Tex, TdV, **kw: col_c18o.C18O_thin_np(3, Tex, TdV, **kw),
+    "SO 2_3-1_2": lambda Tex, TdV, **kw: col_so.SO_thin_np(
+        "2_3", "1_2", Tex, TdV, **kw
+    ),
+}
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    print(f"{'line':>10} {'pixels':>9} {'exact (ns/px)':>14} {'table (ns/px)':>14}")
+    for name, function in functions.items():
+        for n_pixels in map_sizes:
+            Tex = rng.uniform(2.0, 30.0, n_pixels)
+            Tex[rng.random(n_pixels) < 0.05] = np.nan
+            TdV = rng.uniform(0.1, 5.0, n_pixels)
+            t_exact, t_table = (
+                min(timeit.repeat(f, number=1, repeat=3)) / n_pixels * 1e9
+                for f in (
+                    lambda: function(Tex, TdV),
+                    lambda: function(Tex, TdV, tabulated=True),
+                )
+            )
+            print(f"{name:>10} {n_pixels:9.0e} {t_exact:14.1f} {t_table:14.1f}")
@@ -0,0 +1,42 @@
+"""
+Benchmark of p-H2CO thermometry on a map: the non-LTE model grid is
+computed once (or read from the cache), and the 3_03-2_02/3_22-2_21 ratio
+of every pixel is inverted for T_kin.
+
+Run as: python benchmarks/bench_model_grid.py
+"""
+
+import time
+
+import numpy as np
+
+from molecular_columns import col_h2co, model_grid
+
+map_shape = (1000, 1000)
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    grid = model_grid.model_grid(
+        col_h2co.p_H2CO_non_lte,
+        col_h2co.p_H2CO_grid_axes,
+        col_h2co.p_H2CO_thermometer,
+        delta_v=1.0,
+    )
+    t_grid = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    T_kin = rng.uniform(20.0, 250.0, map_shape)
+    n_H2 = 10 ** rng.uniform(4.0, 7.0, map_shape)
+    lines = col_h2co.p_H2CO_thermometer
+    ratio = grid.ratio(*lines, n_H2=n_H2, T_kin=T_kin, N=1e13)
+
+    print(f"{grid}, ready in {t_grid:.2f} s")
+    print(f"map of {map_shape[0]}x{map_shape[1]} pixels")
+    for label, density in [("fixed n_H2", 1e5), ("n_H2 map", n_H2)]:
+        start = time.perf_counter()
+        result = col_h2co.p_H2CO_T_kin_np(ratio, n_H2=density, N=1e13, grid=grid)
+        t_invert = time.perf_counter() - start
+        print(
+            f"{label:>10}: T_kin in {t_invert:.2f} s,"
+            f" {np.isfinite(result).mean():.1%} of the pixels in range"
+        )
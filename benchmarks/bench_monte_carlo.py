@@ -0,0 +1,56 @@
+"""
+Benchmark of the Monte Carlo uncertainties of a C18O column density map:
+a Python loop over the draws calling C18O_thin, against the batched
+monte_carlo.propagate (serial and with all the CPU cores).
+
+Run as: python benchmarks/bench_monte_carlo.py
+"""
+
+import time
+
+import astropy.units as u
+import numpy as np
+
+from molecular_columns import col_c18o, monte_carlo
+
+map_shape = (100, 100)
+n_samples = 1000
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    Tex = rng.uniform(10.0, 30.0, map_shape)
+    TdV = rng.uniform(0.5, 5.0, map_shape)
+    Tex_err, TdV_err = 1.0, 0.1 * TdV
+
+    start = time.perf_counter()
+    draws = np.array(
+        [
+            col_c18o.C18O_thin(
+                J_up=2,
+                Tex=(Tex + Tex_err * rng.standard_normal(map_shape)) * u.K,
+                TdV=(TdV + TdV_err * rng.standard_normal(map_shape)) * u.K * u.km / u.s,
+            ).value
+            for _ in range(n_samples)
+        ]
+    )
+    np.std(draws, axis=0)
+    t_loop = time.perf_counter() - start
+
+    print(f"map of {map_shape[0]}x{map_shape[1]} pixels, {n_samples} draws")
+    print(f"loop over draws: {t_loop:.2f} s")
+    for n_workers in [1, None]:
+        start = time.perf_counter()
+        monte_carlo.propagate(
+            col_c18o.C18O_thin_np,
+            {"Tex": Tex, "TdV": TdV},
+            {"Tex": Tex_err, "TdV": TdV_err},
+            n_samples=n_samples,
+            n_workers=n_workers,
+            J_up=2,
+            tabulated=True,
+        )
+        t_batch = time.perf_counter() - start
+        print(
+            f"propagate (n_workers={n_workers}): {t_batch:.2f} s,"
+            f" speedup {t_loop / t_batch:.1f}"
+        )
@@ -0,0 +1,41 @@
+"""
+Benchmark of the non-LTE solver on a grid of (n_H2, T_kin, N) for p-H2CO:
+the whole grid solved at once against a Python loop over the grid points.
+
+Run as: python benchmarks/bench_non_lte.py
+"""
+
+import time
+
+import numpy as np
+
+from molecular_columns import col_h2co
+
+n_H2 = np.logspace(3, 8, 20)[:, np.newaxis, np.newaxis]
+T_kin = np.linspace(10.0, 200.0, 20)[np.newaxis, :, np.newaxis]
+N = np.logspace(12, 15, 5)
+delta_v = 1.0
+
+if __name__ == "__main__":
+    solver = col_h2co.p_H2CO_non_lte
+    shape = np.broadcast_shapes(n_H2.shape, T_kin.shape, N.shape)
+    n_grid, T_grid, N_grid = np.broadcast_arrays(n_H2, T_kin, N)
+
+    start = time.perf_counter()
+    result = solver.solve(n_H2, T_kin, N, delta_v)
+    t_batch = time.perf_counter() - start
+
+    # the loop is timed on a subset of the grid points
+    n_loop = 100
+    points = np.random.default_rng(0).choice(np.prod(shape), n_loop, replace=False)
+    start = time.perf_counter()
+    for i in points:
+        solver.solve(n_grid.flat[i], T_grid.flat[i], N_grid.flat[i], delta_v)
+    t_loop = (time.perf_counter() - start) / n_loop * np.prod(shape)
+
+    print(f"{solver}, grid of {np.prod(shape)} points")
+    print(
+        f"loop {t_loop:.2f} s (extrapolated), batched {t_batch:.2f} s,"
+        f" speedup {t_loop / t_batch:.1f},"
+        f" {result['converged'].mean():.1%} converged"
+    )
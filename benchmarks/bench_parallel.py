@@ -0,0 +1,95 @@
+"""
+Benchmark of parallel.map_tiles against a single call of the unit-free API
+(C18O_thin_np, SO_thin_np), with worker processes on a large map and with
+threads on a medium-size map, for several numbers of workers. The speedup
+is bounded by the number of CPU cores.
+
+Run as: python benchmarks/bench_parallel.py
+"""
+
+import os
+import timeit
+
+import numpy as np
+
+from molecular_columns import col_c18o, col_so, parallel
+
+shape = (4000, 2500)
+thread_shape = (1000, 1000)
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    Tex = rng.uniform(5.0, 30.0, shape)
+    TdV = rng.uniform(0.1, 5.0, shape)
+    functions = {
+        "C18O 2-1": (col_c18o.C18O_thin_np, {"J_up": 2}),
+        "SO 2_3-1_2": (col_so.SO_thin_np, {"N_J_up": "2_3", "N_J_low": "1_2"}),
+    }
+    n_cores = os.cpu_count() or 1
+    workers = sorted({1, 2, 4, n_cores})
+    print(f"{shape[0] * shape[1]} pixels, {n_cores} CPU cores")
+    print(
+        f"{'line':>10} {'single (s)':>11}"
+        + "".join(f" {n:>3} workers" for n in workers)
+    )
+    for name, (function, kwargs) in functions.items():
+        t_single = min(
+            timeit.repeat(
+                lambda: function(Tex=Tex, TdV=TdV, tabulated=True, **kwargs),
+                number=1,
+                repeat=3,
+            )
+        )
+        times = [
+            min(
+                timeit.repeat(
+                    lambda: parallel.map_tiles(
+                        function,
+                        {"Tex": Tex, "TdV": TdV},
+                        n_workers=n,
+                        tabulated=True,
+                        **kwargs,
+                    ),
+                    number=1,
+                    repeat=3,
+                )
+            )
+            for n in workers
+        ]
+        print(f"{name:>10} {t_single:11.3f}" + "".join(f" {t:11.3f}" for t in times))
+
+    print(f"\nthreads, {thread_shape[0] * thread_shape[1]} pixels")
+    Tex, TdV = (
+        Tex[: thread_shape[0], : thread_shape[1]],
+        TdV[: thread_shape[0], : thread_shape[1]],
+    )
+    for tabulated in [False, True]:
+        for name, (function, kwargs) in functions.items():
+            t_single = min(
+                timeit.repeat(
+                    lambda: function(Tex=Tex, TdV=TdV, tabulated=tabulated, **kwargs),
+                    number=1,
+                    repeat=3,
+                )
+            )
+            times = [
+                min(
+                    timeit.repeat(
+                        lambda: parallel.map_tiles(
+                            function,
+                            {"Tex": Tex, "TdV": TdV},
+                            n_workers=n,
+                            threads=True,
+                            tabulated=tabulated,
+                            **kwargs,
+                        ),
+                        number=1,
+                        repeat=3,
+                    )
+                )
+                for n in workers
+            ]
+            label = f"{name}{' (table)' if tabulated else ''}"
+            print(
+                f"{label:>18} {t_single:11.3f}" + "".join(f" {t:11.3f}" for t in times)
+            )
@@ -0,0 +1,51 @@
+"""
+Benchmark of the exact and tabulated partition functions on 1e6 Tex values.
+
+Run as: python benchmarks/bench_partition_function.py
+"""
+
+import timeit
+
+import numpy as np
+import astropy.units as u
+
+from molecular_columns import (
+    col_c18o,
+    col_cc3h2,
+    col_dcn,
+    col_dcop,
+    col_h13cop,
+    col_h2co,
+    col_nh2d,
+    col_so,
+)
+
+n_Tex = 1_000_000
+Q_functions = {
+    "C18O": (col_c18o.Q_C18O, col_c18o.Q_C18O_table),
+    "DCN": (col_dcn.Q_DCN, col_dcn.Q_DCN_table),
+    "DCO+": (col_dcop.Q_DCOp, col_dcop.Q_DCOp_table),
+    "H13CO+": (col_h13cop.Q_H13COp, col_h13cop.Q_H13COp_table),
+    "p-H2CO": (col_h2co.Q_p_H2CO, col_h2co.Q_p_H2CO_table),
+    "o-H2CO": (col_h2co.Q_o_H2CO, col_h2co.Q_o_H2CO_table),
+    "p-C3H2": (col_cc3h2.Q_p_C3H2, col_cc3h2.Q_p_C3H2_table),
+    "o-C3H2": (col_cc3h2.Q_o_C3H2, col_cc3h2.Q_o_C3H2_table),
+    "p-NH2D": (col_nh2d.Q_p_NH2D, col_nh2d.Q_p_NH2D_table),
+    "o-NH2D": (col_nh2d.Q_o_NH2D, col_nh2d.Q_o_NH2D_table),
+    "SO": (col_so.Q_SO, col_so.Q_SO_table),
+}
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    Tex = rng.uniform(3.0, 50.0, n_Tex) * u.K  # type: ignore
+    print(f"{'species':>8} {'exact (s)':>10} {'table (s)':>10} {'speedup':>8} {'max rel err':>12}")
+    for name, (Q_function, Q_table) in Q_functions.items():
+        Q_table.build()
+        t_exact = min(timeit.repeat(lambda: Q_function(Tex), number=1, repeat=3))
+        t_table = min(
+            timeit.repeat(lambda: Q_function(Tex, tabulated=True), number=1, repeat=3)
+        )
+        print(
+            f"{name:>8} {t_exact:10.4f} {t_table:10.4f} {t_exact / t_table:8.1f}"
+            f" {Q_table.max_rel_error:12.2e}"
+        )
@@ -0,0 +1,57 @@
+"""
+Benchmark of the SO rotation diagram on a stack of TdV maps: the batched
+closed-form fit against a per-pixel np.polyfit loop, and the iterated
+opacity-corrected population diagram.
+
+Run as: python benchmarks/bench_rotation_diagram.py
+"""
+
+import timeit
+
+import numpy as np
+
+from molecular_columns import col_so
+
+map_shape = (128, 128)
+N_J_up = ["2_3", "3_4", "4_5", "5_6", "6_5", "6_7"]
+N_J_low = ["1_2", "2_3", "3_4", "4_5", "5_4", "5_6"]
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    TdV = rng.uniform(0.5, 5.0, (len(N_J_up),) + map_shape)
+    TdV_err = 0.1 * TdV
+
+    def loop():
+        Nu_gu, E_up = col_so.SO_thin_Nu_Rot_np(N_J_up, N_J_low, TdV)
+        y = np.log(Nu_gu)
+        w = TdV / TdV_err
+        T_rot = np.empty(map_shape)
+        for j in range(map_shape[0]):
+            for i in range(map_shape[1]):
+                slope, _ = np.polyfit(E_up, y[:, j, i], 1, w=w[:, j, i])
+                T_rot[j, i] = -1 / slope
+        return T_rot
+
+    t_loop = min(timeit.repeat(loop, number=1, repeat=1))
+    t_batch = min(
+        timeit.repeat(
+            lambda: col_so.SO_rotation_diagram(N_J_up, N_J_low, TdV, TdV_err),
+            number=1,
+            repeat=3,
+        )
+    )
+    print(f"{len(N_J_up)} lines, map of {map_shape[0]}x{map_shape[1]} pixels")
+    print(
+        f"polyfit loop {t_loop:.3f} s, batched {t_batch:.4f} s,"
+        f" speedup {t_loop / t_batch:.0f}"
+    )
+
+    for sigma_v in (5.0, 0.5):
+        start = timeit.default_timer()
+        result = col_so.SO_population_diagram(N_J_up, N_J_low, TdV, sigma_v, TdV_err)
+        t_pop = timeit.default_timer() - start
+        print(
+            f"population diagram (sigma_v = {sigma_v} km/s) {t_pop:.4f} s,"
+            f" max tau {np.nanmax(result[4]):.2f},"
+            f" {result[5].mean():.1%} of the pixels converged"
+        )
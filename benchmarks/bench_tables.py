@@ -0,0 +1,55 @@
+"""
+Benchmark of the table API: column densities and their uncertainties for
+a table of line-fit results (C18O, DCN and SO lines), grouped by species
+and transition, against a Python loop over the rows.
+
+Run as: python benchmarks/bench_tables.py
+"""
+
+import timeit
+
+import numpy as np
+from astropy.table import Table
+
+from molecular_columns import species, tables
+
+n_rows = 300_000
+n_loop = 3_000
+lines = [("C18O", "1"), ("C18O", "2"), ("DCN", "3"), ("SO", "2_3-1_2")]
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    choice = rng.integers(len(lines), size=n_rows)
+    table = Table(
+        {
+            "species": np.array([name for name, _ in lines])[choice],
+            "transition": np.array([key for _, key in lines])[choice],
+            "TdV": rng.uniform(0.1, 5.0, n_rows),
+            "TdV_err": rng.uniform(0.01, 0.5, n_rows),
+            "Tex": rng.uniform(5.0, 30.0, n_rows),
+            "Tex_err": rng.uniform(0.5, 3.0, n_rows),
+        }
+    )
+    errors = {"TdV": "TdV_err", "Tex": "Tex_err"}
+
+    def loop(rows):
+        for row in rows:
+            molecule = species[row["species"]]
+            key = row["transition"]
+            key = key if molecule.keys.dtype.kind == "U" else int(key)
+            molecule.thin_grad(key, row["Tex"], row["TdV"], tabulated=True)
+
+    print(f"{n_rows} rows, {len(lines)} transitions")
+    t_loop = min(timeit.repeat(lambda: loop(table[:n_loop]), number=1, repeat=3))
+    t_loop *= n_rows / n_loop
+    t_table = min(
+        timeit.repeat(
+            lambda: tables.column_densities(table, errors=errors, tabulated=True),
+            number=1,
+            repeat=3,
+        )
+    )
+    print(
+        f"loop over the rows {t_loop:.2f} s (extrapolated),"
+        f" grouped {t_table:.3f} s, speedup {t_loop / t_table:.0f}"
+    )
@@ -0,0 +1,61 @@
+"""
+Benchmark of the Quantity API (C18O_thin, SO_thin) against the unit-free
+API (C18O_thin_np, SO_thin_np), for single values and for large arrays.
+
+Run as: python benchmarks/bench_thin.py
+"""
+
+import timeit
+
+import numpy as np
+import astropy.units as u
+
+from molecular_columns import col_c18o, col_so
+
+n_pixels = 1_000_000
+K_km_s = u.K * u.km / u.s  # type: ignore
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    cases = {
+        "scalar": (10.0, 1.0),
+        "TdV array": (10.0, rng.uniform(0.1, 5.0, n_pixels)),
+        "Tex, TdV arrays": (
+            rng.uniform(5.0, 30.0, n_pixels),
+            rng.uniform(0.1, 5.0, n_pixels),
+        ),
+    }
+    functions = {
+        "C18O 3-2": (
+            lambda Tex, TdV: col_c18o.C18O_thin(
+                J_up=3, Tex=Tex * u.K, TdV=TdV * K_km_s  # type: ignore
+            ),
+            lambda Tex, TdV, **kw: col_c18o.C18O_thin_np(3, Tex, TdV, **kw),
+        ),
+        "SO 2_3-1_2": (
+            lambda Tex, TdV: col_so.SO_thin(
+                "2_3", "1_2", Tex=Tex * u.K, TdV=TdV * K_km_s  # type: ignore
+            ),
+            lambda Tex, TdV, **kw: col_so.SO_thin_np("2_3", "1_2", Tex, TdV, **kw),
+        ),
+    }
+    print(
+        f"{'line':>10} {'input':>16} {'Quantity (s)':>13} {'NumPy (s)':>10}"
+        f" {'speedup':>8} {'tabulated':>10} {'speedup':>8}"
+    )
+    for name, (f_quantity, f_numpy) in functions.items():
+        for case, (Tex, TdV) in cases.items():
+            number = 200 if case == "scalar" else 1
+            t_quantity, t_numpy, t_table = (
+                min(timeit.repeat(f, number=number, repeat=3)) / number
+                for f in (
+                    lambda: f_quantity(Tex, TdV),
+                    lambda: f_numpy(Tex, TdV),
+                    lambda: f_numpy(Tex, TdV, tabulated=True),
+                )
+            )
+            print(
+                f"{name:>10} {case:>16} {t_quantity:13.2e} {t_numpy:10.2e}"
+                f" {t_quantity / t_numpy:8.1f} {t_table:10.2e}"
+                f" {t_quantity / t_table:8.1f}"
+            )
@@ -1,3 +1,37 @@
 #
-from . import col_nh2d
+from importlib import import_module
+
 from ._version import __version__
+from .registry import species
+
+# submodules are imported on first access, e.g. molecular_columns.col_nh2d
+submodules = [
+    "catalog",
+    "col_c18o",
+    "col_cc3h2",
+    "col_dcn",
+    "col_dcop",
+    "col_h13cop",
+    "col_h2co",
+    "col_nh2d",
+    "col_so",
+    "col_so2",
+    "common_functions",
+    "fits_pipeline",
+    "lazy",
+    "line_ratio",
+    "lte",
+    "model_grid",
+    "monte_carlo",
+    "non_lte",
+    "parallel",
+    "partition_function",
+    "rotation_diagram",
+    "tables",
+]
+
+
+def __getattr__(name: str):
+    if name in submodules:
+        return import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
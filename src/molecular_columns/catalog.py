@@ -0,0 +1,266 @@
+import json
+import os
+import tempfile
+import zlib
+from importlib.resources import files
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+from numpy.typing import NDArray
+
+# bump when the readers change, so that old cache files are not used
+cache_version = 1
+
+
+def cache_dir() -> Path:
+    """
+    Returns the directory where the binary catalog caches are stored.
+    It is given by the MOLECULAR_COLUMNS_CACHE environment variable, or
+    defaults to $XDG_CACHE_HOME/molecular_columns (~/.cache/molecular_columns).
+
+    Returns
+    -------
+    Path
+        The cache directory.
+    """
+    if "MOLECULAR_COLUMNS_CACHE" in os.environ:
+        return Path(os.environ["MOLECULAR_COLUMNS_CACHE"])
+    xdg_cache = os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+    return Path(xdg_cache) / "molecular_columns"
+
+
+def data_file(file_name: str | os.PathLike) -> Path:
+    """
+    Returns the path to a data file. Files that are not found directly are
+    looked for among the data files shipped with the package.
+
+    Parameters
+    ----------
+    file_name : str | os.PathLike
+        The name of the data file, or a path to it.
+
+    Returns
+    -------
+    Path
+        The path to the data file.
+    """
+    path = Path(file_name)
+    if path.is_file():
+        return path
+    return Path(str(files("molecular_columns").joinpath(str(file_name))))
+
+
+def read_splatalogue(file_name: str | os.PathLike) -> dict[str, NDArray]:
+    """
+    Reads a line list exported from Splatalogue (CDMS/JPL), with columns
+    freq, QNs, log10(A_ul), E_u/k_B (K), g_u, and catalog.
+    The file is parsed in a single pass.
+
+    Parameters
+    ----------
+    file_name : str | os.PathLike
+        The name of the data file, or a path to it.
+
+    Returns
+    -------
+    dict[str, NDArray]
+        The columns 'freq' (in the units of the file), 'label', 'log_A_ul',
+        'E_u' (K) and 'g_u'.
+    """
+    with open(data_file(file_name), "r") as f:
+        rows = [line.split()[:5] for line in f if line.strip() and line[0] != "#"]
+    table = np.array(rows, dtype=str).reshape(-1, 5)
+    return {
+        "freq": table[:, 0].astype(np.float64),
+        "label": table[:, 1],
+        "log_A_ul": table[:, 2].astype(np.float64),
+        "E_u": table[:, 3].astype(np.float64),
+        "g_u": table[:, 4].astype(np.float64),
+    }
+
+
+def read_lamda(file_name: str | os.PathLike) -> dict[str, NDArray]:
+    """
+    Reads a molecular data file in the LAMDA format
+    (https://home.strw.leidenuniv.nl/~moldata/), following the counts given
+    in the file for the energy levels, radiative transitions, and the
+    collision rates of each collision partner.
+
+    Parameters
+    ----------
+    file_name : str | os.PathLike
+        The name of the data file, or a path to it.
+
+    Returns
+    -------
+    dict[str, NDArray]
+        The level columns 'level_E_u' (cm^-1), 'level_g_u' and 'level_label';
+        the transition columns 'line_upper' and 'line_lower' (1-based level
+        numbers), 'line_A_ul' (s^-1), 'line_freq' (GHz) and 'line_E_u' (K);
+        'n_partners', and for each collision partner k the entries
+        'coll{k}_partner', 'coll{k}_temperatures' (K), 'coll{k}_upper',
+        'coll{k}_lower' and 'coll{k}_rates' (cm^3 s^-1, one row per
+        collisional transition and one column per temperature).
+    """
+    with open(data_file(file_name), "r") as f:
+        rows = (line.split() for line in f if line.strip() and line[0] != "!")
+        rows = iter(list(rows))
+
+    next(rows)  # molecule
+    next(rows)  # molecular weight
+    n_levels = int(next(rows)[0])
+    levels = [next(rows) for _ in range(n_levels)]
+    n_lines = int(next(rows)[0])
+    lines = [next(rows) for _ in range(n_lines)]
+
+    data = {
+        "level_E_u": np.array([level[1] for level in levels], dtype=np.float64),
+        "level_g_u": np.array([level[2] for level in levels], dtype=np.float64),
+        "level_label": np.array(["_".join(level[3:]) for level in levels]),
+        "line_upper": np.array([line[1] for line in lines], dtype=np.intp),
+        "line_lower": np.array([line[2] for line in lines], dtype=np.intp),
+        "line_A_ul": np.array([line[3] for line in lines], dtype=np.float64),
+        "line_freq": np.array([line[4] for line in lines], dtype=np.float64),
+        "line_E_u": np.array([line[5] for line in lines], dtype=np.float64),
+    }
+
+    n_partners = int(next(rows, ["0"])[0])
+    data["n_partners"] = np.array(n_partners)
+    for k in range(n_partners):
+        data[f"coll{k}_partner"] = np.array(" ".join(next(rows)))
+        n_coll = int(next(rows)[0])
+        n_temps = int(next(rows)[0])
+        temperatures = next(rows)[:n_temps]
+        data[f"coll{k}_temperatures"] = np.array(temperatures, dtype=np.float64)
+        coll = [next(rows)[: 3 + n_temps] for _ in range(n_coll)]
+        coll = np.array(coll, dtype=np.float64)
+        data[f"coll{k}_upper"] = coll[:, 1].astype(np.intp)
+        data[f"coll{k}_lower"] = coll[:, 2].astype(np.intp)
+        data[f"coll{k}_rates"] = coll[:, 3:]
+    return data
+
+
+cache_magic = b"MOLCOLS\x00"
+
+
+def write_cache(file_name: str | os.PathLike, data: dict[str, NDArray]) -> None:
+    """
+    Writes a dictionary of arrays into a single binary cache file: a short
+    JSON header with the name, dtype, shape and offset of every array,
+    followed by the raw array data (aligned to 64 bytes). The file is written
+    to a temporary file first and then renamed, so that concurrent readers
+    never see a partially written cache.
+
+    Parameters
+    ----------
+    file_name : str | os.PathLike
+        The cache file.
+    data : dict[str, NDArray]
+        The arrays to be stored.
+    """
+    arrays = {key: np.asarray(value, order="C") for key, value in data.items()}
+    entries = []
+    offset = 0
+    for key, value in arrays.items():
+        entries.append([key, value.dtype.str, list(value.shape), offset])
+        offset += -(-value.nbytes // 64) * 64
+    header = json.dumps(entries).encode()
+    data_start = -(-(len(cache_magic) + 8 + len(header)) // 64) * 64
+    path = Path(file_name)
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as f:
+        f.write(cache_magic + np.uint64(len(header)).tobytes() + header)
+        for (key, _, _, position), value in zip(entries, arrays.values()):
+            f.seek(data_start + position)
+            f.write(value.tobytes())
+        f.truncate(data_start + offset)
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, path)
+
+
+def read_cache(file_name: str | os.PathLike, mmap: bool = False) -> dict[str, NDArray]:
+    """
+    Reads a cache file written by write_cache.
+
+    Parameters
+    ----------
+    file_name : str | os.PathLike
+        The cache file.
+    mmap : bool
+        If True, the arrays are read-only views of a memory map of the file,
+        otherwise the file is read into memory.
+
+    Returns
+    -------
+    dict[str, NDArray]
+        The stored arrays.
+    """
+    if mmap:
+        buffer = np.memmap(file_name, dtype=np.uint8, mode="r")
+    else:
+        buffer = np.fromfile(file_name, dtype=np.uint8)
+    n_magic = len(cache_magic)
+    if buffer[:n_magic].tobytes() != cache_magic:
+        raise ValueError(f"{file_name} is not a catalog cache file")
+    n_header = int(buffer[n_magic : n_magic + 8].view(np.uint64)[0])
+    header = json.loads(buffer[n_magic + 8 : n_magic + 8 + n_header].tobytes())
+    data_start = -(-(n_magic + 8 + n_header) // 64) * 64
+    data = {}
+    for key, dtype, shape, offset in header:
+        dtype = np.dtype(dtype)
+        start = data_start + offset
+        n_bytes = dtype.itemsize * int(np.prod(shape))
+        data[key] = buffer[start : start + n_bytes].view(dtype).reshape(tuple(shape))
+    return data
+
+
+def load_catalog(
+    file_name: str | os.PathLike,
+    reader: Callable[[str | os.PathLike], dict[str, NDArray]],
+    use_cache: bool = True,
+    mmap: bool = False,
+) -> dict[str, NDArray]:
+    """
+    Returns the content of a data file as parsed by reader, using a binary
+    cache of the parsed arrays (see write_cache).
+    The cache file is keyed by the size and CRC-32 checksum of the content of
+    the data file, so it is rebuilt automatically when the data file changes. If the cache
+    directory is not writable, the data file is parsed every time.
+
+    Parameters
+    ----------
+    file_name : str | os.PathLike
+        The name of the data file, or a path to it.
+    reader : Callable
+        The parser of the data file, e.g., read_lamda or read_splatalogue.
+    use_cache : bool
+        If False, the data file is parsed without reading or writing the cache.
+    mmap : bool
+        If True, the cached arrays are memory-mapped instead of read into memory.
+
+    Returns
+    -------
+    dict[str, NDArray]
+        The arrays returned by reader.
+    """
+    path = data_file(file_name)
+    if not use_cache:
+        return reader(path)
+    content = path.read_bytes()
+    digest = f"{len(content):x}-{zlib.crc32(content):08x}"
+    prefix = f"{path.name}.{reader.__name__}.v{cache_version}."
+    cache_file = cache_dir() / f"{prefix}{digest}.cache"
+    try:
+        return read_cache(cache_file, mmap=mmap)
+    except (OSError, ValueError):
+        pass
+
+    data = reader(path)
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        for stale_file in cache_file.parent.glob(f"{prefix}*.cache"):
+            stale_file.unlink(missing_ok=True)
+        write_cache(cache_file, data)
+    except OSError:
+        pass
+    return data
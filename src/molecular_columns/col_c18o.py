@@ -1,20 +1,41 @@
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
 import astropy.units as u
 from astropy.constants import c, k_B, h  # type: ignore
 from importlib.resources import files
 
+from .catalog import load_catalog, read_splatalogue
 from .common_functions import J_nu
+from .line_ratio import two_line
+from .lte import Species, Tex_from_peak
+from .partition_function import level_sum
 
 # transition properties obtained from splatalogue:
 # c18o.dat (downloaded 2023 dec 19)
 file_mol = str(files("molecular_columns").joinpath("c18o.dat"))
+catalog = load_catalog(file_mol, read_splatalogue)
 
-gu_list = np.loadtxt(file_mol, usecols=4)
-E_u_list = np.loadtxt(file_mol, usecols=3) * u.K  # type: ignore
+gu_list = catalog["g_u"]
+E_u_list = catalog["E_u"] * u.K  # type: ignore
 full_index = np.arange(np.size(E_u_list))
-freq_list = np.loadtxt(file_mol, usecols=0) * 1e-3 * u.GHz  # type: ignore
-Aij_list = 10.0 ** (np.loadtxt(file_mol, usecols=2)) / u.s  # type: ignore
+freq_list = catalog["freq"] * 1e-3 * u.GHz  # type: ignore
+Aij_list = 10.0 ** catalog["log_A_ul"] / u.s  # type: ignore
+# the J_up -> J_up-1 transition uses the level at index J_up, as in C18O_thin
+C18O = Species(
+    "C18O",
+    gu_list,
+    E_u_list.to_value(u.K),  # type: ignore
+    freq=freq_list[:-1].to_value(u.GHz),  # type: ignore
+    A_ul=Aij_list[:-1].to_value(1 / u.s),  # type: ignore
+    upper=full_index[1:],
+    keys=full_index[1:],
+)
+Q_C18O_table = C18O.Q_table
+# frequencies (GHz) of the 12CO J_up -> J_up-1 transitions (CDMS), whose
+# peak temperatures give the excitation temperature of C18O
+freq_12CO = {1: 115.2712018, 2: 230.538, 3: 345.7959899}
+# number of pixels evaluated at once by C18O_thin_from_peak_np
+chunk_pixels = 2**16
 
 
 @u.quantity_input
@@ -45,6 +66,7 @@ def Q_C18O_i(
 @u.quantity_input
 def Q_C18O(
     Tex: u.K = 5 * u.K,  # type: ignore
+    tabulated: bool = False,
 ) -> float | NDArray[np.float64]:
     """
     Returns the partition function for C18O with an excitation temperature.
@@ -54,19 +76,20 @@ def Q_C18O(
     ----------
     Tex : astropy.units.Quantity
         The excitation temperature(s) (must have temperature units).
+    tabulated : bool
+        If True, the partition function is interpolated from Q_C18O_table
+        instead of summing over all levels.
 
     Returns
     -------
     float or ndarray
         The partition function value(s).
     """
-    if Tex.size == 1:
-        return np.sum(Q_C18O_i(full_index, Tex=Tex))
+    if tabulated:
+        Q = Q_C18O_table(Tex.to_value(u.K))  # type: ignore
     else:
-        Q_C18O_all = np.zeros_like(Tex.value)
-        for i in range(Tex.size):
-            Q_C18O_all[i] = np.sum(Q_C18O_i(full_index, Tex=Tex[i]))
-        return Q_C18O_all
+        Q = level_sum(gu_list, E_u_list.to_value(u.K), Tex.to_value(u.K))  # type: ignore
+    return Q * u.dimensionless_unscaled
 
 
 @u.quantity_input
@@ -117,6 +140,186 @@ def C18O_thin(
     return Ncol
 
 
+def C18O_thin_np(
+    J_up: int | ArrayLike = 1,
+    Tex: ArrayLike = 5.0,
+    TdV: ArrayLike = 1.0,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free version of C18O_thin, for float arrays in fixed units.
+    Gives the same values as C18O_thin, without the overhead of astropy
+    units. Unavailable transitions return NaN.
+    Tex, TdV and T_bg can be maps (arrays) of any broadcastable shapes
+    (map mode): pixels where Tex is NaN, Tex <= 0 or Tex <= T_bg return
+    NaN, without printing.
+
+    Parameters
+    ----------
+    J_up : int | ArrayLike
+        The upper level of the transition (1-based index), or an array of
+        upper levels to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    TdV : ArrayLike
+        The integrated intensity of the transition, in K km/s. For several
+        transitions, the stack of TdV maps with the transitions along the
+        first axis.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_C18O_table.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    return C18O.thin(J_up, Tex, TdV, T_bg, tabulated=tabulated)
+
+
+def C18O_thick_np(
+    J_up: int | ArrayLike = 1,
+    Tex: ArrayLike = 5.0,
+    tau: ArrayLike = 1.0,
+    sigma_v: ArrayLike | None = None,
+    TdV: ArrayLike | None = None,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free column density from the optically thick C18O J_up -> J_up-1 transition, in map mode.
+    Takes either (tau, sigma_v) or (TdV, tau), see lte.Species.thick.
+    Tex, tau, sigma_v, TdV and T_bg can be maps (arrays) of broadcastable
+    shapes, and pixels with an invalid Tex return NaN. Unavailable transitions return NaN.
+
+    Parameters
+    ----------
+    J_up : int | ArrayLike
+        The upper level of the transition (1-based index), or an array of
+        upper levels to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    tau : ArrayLike
+        The optical depth at the line peak.
+    sigma_v : ArrayLike, optional
+        The velocity dispersion of the line, in km/s.
+    TdV : ArrayLike, optional
+        The integrated intensity of the transition, in K km/s.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_C18O_table.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    return C18O.thick(J_up, Tex, tau, sigma_v, TdV, T_bg, tabulated=tabulated)
+
+
+def C18O_two_line_np(
+    J_up_a: int,
+    J_up_b: int,
+    TdV_a: ArrayLike,
+    TdV_b: ArrayLike,
+    T_bg: float = 2.73,
+    tabulated: bool = False,
+) -> dict[str, float | NDArray[np.float64] | NDArray[np.bool_]]:
+    """
+    Unit-free excitation temperature and column density from the ratio of
+    two optically thin C18O transitions in LTE, in map mode
+    (see line_ratio.two_line). The LTE ratio as a function of Tex is
+    tabulated once for each pair of transitions, and inverted per pixel.
+
+    Parameters
+    ----------
+    J_up_a, J_up_b : int
+        The upper levels of the two transitions (1-based index).
+    TdV_a, TdV_b : ArrayLike
+        The integrated intensities of the two transitions, in K km/s.
+    T_bg : float
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_C18O_table.
+
+    Returns
+    -------
+    dict[str, float | NDArray[np.float64] | NDArray[np.bool_]]
+        The maps of 'Tex' (K) and 'Ncol' (cm^-2), and the 'out_of_range'
+        flag of the ratios that no Tex can produce (where Tex and Ncol are
+        NaN).
+    """
+    index_a, index_b = C18O.transition(J_up_a), C18O.transition(J_up_b)
+    return two_line(C18O, index_a, index_b, TdV_a, TdV_b, T_bg, tabulated)
+
+
+def C18O_thin_from_peak_np(
+    J_up: int,
+    Tp: ArrayLike,
+    TdV: ArrayLike,
+    freq_peak: float | None = None,
+    T_bg: float = 2.73,
+    tabulated: bool = False,
+) -> dict[str, float | NDArray[np.float64]]:
+    """
+    Unit-free map workflow for the C18O J_up -> J_up-1 column density with
+    the excitation temperature of an optically thick line (usually 12CO)
+    from its peak temperature (see lte.Tex_from_peak). Both steps are
+    fused over chunks of ``chunk_pixels`` pixels, so that the intermediate
+    Tex and the temporaries stay small, without Quantity arrays.
+    Pixels with a non-physical Tp, or a Tex below T_bg, return NaN.
+
+    Parameters
+    ----------
+    J_up : int
+        The upper level of the C18O transition.
+    Tp : ArrayLike
+        The peak temperature of the optically thick line, in K.
+    TdV : ArrayLike
+        The integrated intensity of the C18O transition, in K km/s.
+    freq_peak : float, optional
+        The frequency of the optically thick line, in GHz. Defaults to the
+        12CO transition with the same J_up (see freq_12CO).
+    T_bg : float
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_C18O_table.
+
+    Returns
+    -------
+    dict[str, float | NDArray[np.float64]]
+        The maps of 'Tex' (K) and 'Ncol' (cm^-2), with the broadcast shape
+        of Tp and TdV.
+    """
+    if freq_peak is None:
+        if J_up not in freq_12CO:
+            raise ValueError(f"freq_peak must be given for J_up={J_up}")
+        freq_peak = freq_12CO[J_up]
+    index = C18O.transition(J_up)
+    Tp, TdV = np.broadcast_arrays(
+        np.asarray(Tp, dtype=np.float64), np.asarray(TdV, dtype=np.float64)
+    )
+    if Tp.ndim == 0:
+        Tex = Tex_from_peak(Tp, freq_peak, T_bg)
+        return {"Tex": Tex, "Ncol": C18O.thin_index(index, Tex, TdV, T_bg, tabulated)}
+
+    Tp_flat, TdV_flat = Tp.ravel(), TdV.ravel()
+    Tex = np.empty(Tp_flat.shape)
+    Ncol = np.empty(Tp_flat.shape)
+    for start in range(0, Tp_flat.size, chunk_pixels):
+        block = slice(start, start + chunk_pixels)
+        Tex[block] = Tex_from_peak(Tp_flat[block], freq_peak, T_bg)
+        Ncol[block] = C18O.thin_index(
+            index, Tex[block], TdV_flat[block], T_bg, tabulated
+        )
+    return {"Tex": Tex.reshape(Tp.shape), "Ncol": Ncol.reshape(Tp.shape)}
+
+
 @u.quantity_input
 def Ncol_C18O_3_2_Curtis2010(TdV: u.K * u.km / u.s, Tex: u.K = 10 * u.K) -> u.cm**-2:  # type: ignore
     """
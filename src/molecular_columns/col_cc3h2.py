@@ -1,66 +1,43 @@
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
 import astropy.units as u
 from astropy.constants import c, k_B, h  # type: ignore
+from .catalog import load_catalog, read_lamda
 from .common_functions import J_nu
-
-from importlib.resources import files
+from .lte import Species, match_errors
+from .partition_function import level_sum
 
 
 # g_u, E_u, and A_ul values obtained from LAMBDA database
 def extract_from_lambda(file_name):
-    # Read the content of the file
-    file_mol = files("molecular_columns").joinpath(file_name)
-    f = open(str(file_mol), "r")
-    # Read the content line by line
-    lines = f.readlines()
-    f.close()
-
-    # Make an empty dictionary for J_Kp_Ko, E_u (cm-1), and g_u values
-    level_dict = {"E_u": [], "g_u": []}
-    # Make an empty dictionary for frequency (GHz), A_ul, and E_u (K) values
-    trans_dict = {"freq": [], "A_ul": [], "E_u": [], "upper_level_no": []}
-
-    # Extract WEIGHT values
-    i = 0
-    n_levels = 0
-    n_lines_skip = 5  # number of lines to skip at the beginning
-    for line in lines:
-        if i == n_lines_skip:
-            n_levels = int(line.split()[0])  # number of energy levels
-        if line == "!NUMBER OF COLL PARTNERS":
-            break
-        parts = line.split()
-        if line[0] == "!":
-            pass
-        else:
-            if len(parts) == 6:  # LEVEL + ENERGIES(cm^-1) + WEIGHT + J + Kp + Ko
-                try:
-                    energy = float(parts[1])
-                    level_dict["E_u"].append(energy)
-                    weight = float(parts[2])
-                    level_dict["g_u"].append(weight)
-                except ValueError:
-                    pass  # Skip lines that don't contain valid numbers
-            if i > n_lines_skip:
-                if i > n_levels + n_lines_skip:  #
-                    if (
-                        len(parts) == 6
-                    ):  # TRANS + UP + LOW + EINSTEINA(s^-1) + FREQ(GHz) + E_u(K)
-                        try:
-                            upper_level_no = int(parts[1])
-                            trans_dict["upper_level_no"].append(upper_level_no)
-                            einsteinA = float(parts[3])
-                            trans_dict["A_ul"].append(einsteinA)
-                            freq = float(parts[4])
-                            trans_dict["freq"].append(freq)
-                            upper_level_energy = float(parts[5])
-                            trans_dict["E_u"].append(upper_level_energy)
-
-                        except ValueError:
-                            pass
-        i += 1
+    """
+    Returns the energy levels and radiative transitions of a LAMDA file.
+    The file is parsed once, and later calls use the binary catalog cache.
 
+    Parameters
+    ----------
+    file_name : str
+        The name of the LAMDA file.
+    Returns
+    -------
+    level_dict : dict
+        The 'J_Kp_Ko' labels, 'E_u' (cm^-1) and 'g_u' of the energy levels.
+    trans_dict : dict
+        The 'freq' (GHz), 'A_ul' (s^-1), 'E_u' (K) and 'upper_level_no' of
+        the radiative transitions.
+    """
+    catalog = load_catalog(file_name, read_lamda)
+    level_dict = {
+        "J_Kp_Ko": catalog["level_label"],
+        "E_u": catalog["level_E_u"],
+        "g_u": catalog["level_g_u"],
+    }
+    trans_dict = {
+        "freq": catalog["line_freq"],
+        "A_ul": catalog["line_A_ul"],
+        "E_u": catalog["line_E_u"],
+        "upper_level_no": catalog["line_upper"],
+    }
     return level_dict, trans_dict
 
 
@@ -74,6 +51,47 @@ E_u_o_list = (np.array(o_level_dict["E_u"]) * (h * c / k_B) / u.cm).to(u.K)  # t
 p_full_index = np.arange(np.size(E_u_p_list))
 o_full_index = np.arange(np.size(E_u_o_list))
 
+p_C3H2 = Species(
+    "p-C3H2",
+    gu_p_list,
+    E_u_p_list.to_value(u.K),  # type: ignore
+    freq=p_trans_dict["freq"],
+    A_ul=p_trans_dict["A_ul"],
+    upper=p_trans_dict["upper_level_no"] - 1,
+    keys=p_trans_dict["freq"],
+)
+o_C3H2 = Species(
+    "o-C3H2",
+    gu_o_list,
+    E_u_o_list.to_value(u.K),  # type: ignore
+    freq=o_trans_dict["freq"],
+    A_ul=o_trans_dict["A_ul"],
+    upper=o_trans_dict["upper_level_no"] - 1,
+    keys=o_trans_dict["freq"],
+)
+Q_p_C3H2_table = p_C3H2.Q_table
+Q_o_C3H2_table = o_C3H2.Q_table
+# level populations out of LTE, from the collision rates of the LAMDA files
+# (solvers built on first access, see __getattr__)
+non_lte_files = {
+    "p_C3H2_non_lte": ("p-c3h2.dat", "p-C3H2"),
+    "o_C3H2_non_lte": ("o-c3h2.dat", "o-C3H2"),
+}
+
+
+def __getattr__(name: str):
+    """
+    Builds the non-LTE solvers (see non_lte_files) when first requested, so
+    that importing the module does not read the LAMDA collision rates.
+    """
+    if name not in non_lte_files:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from .non_lte import StatisticalEquilibrium
+
+    value = StatisticalEquilibrium.from_lamda(*non_lte_files[name])
+    globals()[name] = value
+    return value
+
 
 @u.quantity_input
 def Q_p_C3H2_i(
@@ -102,6 +120,7 @@ def Q_p_C3H2_i(
 @u.quantity_input
 def Q_p_C3H2(
     Tex: u.K = 5 * u.K,  # type: ignore
+    tabulated: bool = False,
 ) -> float | NDArray[np.float64]:
     """
     It returns the partition function for para-C3H2 with an excitation
@@ -111,19 +130,20 @@ def Q_p_C3H2(
     ----------
     Tex : astropy.units.Quantity
         The excitation temperature(s) (must have temperature units).
+    tabulated : bool
+        If True, the partition function is interpolated from Q_p_C3H2_table
+        instead of summing over all levels.
 
     Returns
     -------
     float or ndarray
         The partition function value(s).
     """
-    if Tex.size == 1:
-        return np.sum(Q_p_C3H2_i(p_full_index, Tex=Tex))
+    if tabulated:
+        Q = Q_p_C3H2_table(Tex.to_value(u.K))  # type: ignore
     else:
-        Q_p_C3H2_all = np.zeros_like(Tex.value)
-        for i in range(Tex.size):
-            Q_p_C3H2_all[i] = np.sum(Q_p_C3H2_i(p_full_index, Tex=Tex[i]))
-        return Q_p_C3H2_all
+        Q = level_sum(gu_p_list, E_u_p_list.to_value(u.K), Tex.to_value(u.K))  # type: ignore
+    return Q * u.dimensionless_unscaled
 
 
 @u.quantity_input
@@ -153,6 +173,7 @@ def Q_o_C3H2_i(
 @u.quantity_input
 def Q_o_C3H2(
     Tex: u.K = 5 * u.K,  # type: ignore
+    tabulated: bool = False,
 ) -> float | NDArray[np.float64]:
     """
     It returns the partition function for ortho-C3H2 with an excitation
@@ -162,18 +183,19 @@ def Q_o_C3H2(
     ----------
     Tex : u.K
         The excitation temperature.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_o_C3H2_table
+        instead of summing over all levels.
     Returns
     -------
     Q_o_C3H2_all : float
         The partition function.
     """
-    if Tex.size == 1:
-        return np.sum(Q_o_C3H2_i(o_full_index, Tex=Tex))
+    if tabulated:
+        Q = Q_o_C3H2_table(Tex.to_value(u.K))  # type: ignore
     else:
-        Q_o_C3H2_all = np.zeros_like(Tex.value)
-        for i in range(Tex.size):
-            Q_o_C3H2_all[i] = np.sum(Q_o_C3H2_i(o_full_index, Tex=Tex[i]))
-        return Q_o_C3H2_all
+        Q = level_sum(gu_o_list, E_u_o_list.to_value(u.K), Tex.to_value(u.K))  # type: ignore
+    return Q * u.dimensionless_unscaled
 
 
 @u.quantity_input
@@ -203,7 +225,10 @@ def p_C3H2_thin(
     Ncol : u.cm**-2
         The column density.
     """
-    trans_index = np.where(p_trans_dict["freq"] == freq.value)[0][0]
+    trans_index = p_C3H2.find(freq.to_value(u.GHz))  # type: ignore
+    if trans_index < 0:
+        print("The frequency {0} {1}".format(freq, match_errors[trans_index]))
+        return np.nan * u.cm**-2  # type: ignore
     A_ul = p_trans_dict["A_ul"][trans_index] / u.s  # type: ignore
     upper_level_no = p_trans_dict["upper_level_no"][trans_index]  # new
     upper_level_index = upper_level_no - 1  # new
@@ -221,6 +246,104 @@ def p_C3H2_thin(
     return Ncol
 
 
+def p_C3H2_thin_np(
+    freq: float | ArrayLike = 218.222192,
+    Tex: ArrayLike = 5.0,
+    TdV: ArrayLike = 1.0,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+    tol_MHz: float = 0.5,
+    tol_kms: float | None = None,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free version of p_C3H2_thin, for float arrays in fixed units.
+    Gives the same values as p_C3H2_thin, without the overhead of astropy
+    units. The transitions are matched by frequency within tol_MHz (or
+    tol_kms), and frequencies without a unique match return NaN.
+    Tex, TdV and T_bg can be maps (arrays) of any broadcastable shapes
+    (map mode): pixels where Tex is NaN, Tex <= 0 or Tex <= T_bg return
+    NaN, without printing.
+
+    Parameters
+    ----------
+    freq : float | ArrayLike
+        The frequency of the transition, in GHz, or an array of frequencies
+        to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    TdV : ArrayLike
+        The integrated intensity of the transition, in K km/s. For several
+        transitions, the stack of TdV maps with the transitions along the
+        first axis.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_p_C3H2_table.
+    tol_MHz : float
+        The tolerance of the frequency match, in MHz.
+    tol_kms : float, optional
+        The tolerance of the frequency match, in km/s, used instead of tol_MHz.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    index = p_C3H2.find(freq, tol_MHz=tol_MHz, tol_kms=tol_kms)
+    return p_C3H2.thin_index(index, Tex, TdV, T_bg, tabulated=tabulated)
+
+
+def p_C3H2_thick_np(
+    freq: float | ArrayLike = 218.222192,
+    Tex: ArrayLike = 5.0,
+    tau: ArrayLike = 1.0,
+    sigma_v: ArrayLike | None = None,
+    TdV: ArrayLike | None = None,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+    tol_MHz: float = 0.5,
+    tol_kms: float | None = None,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free column density from the optically thick para-C3H2 transition, in map mode.
+    Takes either (tau, sigma_v) or (TdV, tau), see lte.Species.thick.
+    Tex, tau, sigma_v, TdV and T_bg can be maps (arrays) of broadcastable
+    shapes, and pixels with an invalid Tex return NaN. Frequencies without a unique transition (see
+    lte.Species.find) return NaN.
+
+    Parameters
+    ----------
+    freq : float | ArrayLike
+        The frequency of the transition, in GHz, or an array of frequencies
+        to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    tau : ArrayLike
+        The optical depth at the line peak.
+    sigma_v : ArrayLike, optional
+        The velocity dispersion of the line, in km/s.
+    TdV : ArrayLike, optional
+        The integrated intensity of the transition, in K km/s.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_p_C3H2_table.
+    tol_MHz : float
+        The tolerance of the frequency match, in MHz.
+    tol_kms : float, optional
+        The tolerance of the frequency match, in km/s, used instead of tol_MHz.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    index = p_C3H2.find(freq, tol_MHz=tol_MHz, tol_kms=tol_kms)
+    return p_C3H2.thick_index(index, Tex, tau, sigma_v, TdV, T_bg, tabulated=tabulated)
+
+
 @u.quantity_input
 def o_C3H2_thin(
     freq: u.GHz = 218.222192 * u.GHz,  # type: ignore
@@ -248,7 +371,10 @@ def o_C3H2_thin(
     Ncol : u.cm**-2
         The column density.
     """
-    trans_index = np.where(o_trans_dict["freq"] == freq.value)[0][0]
+    trans_index = o_C3H2.find(freq.to_value(u.GHz))  # type: ignore
+    if trans_index < 0:
+        print("The frequency {0} {1}".format(freq, match_errors[trans_index]))
+        return np.nan * u.cm**-2  # type: ignore
     A_ul = o_trans_dict["A_ul"][trans_index] / u.s  # type: ignore
     upper_level_no = o_trans_dict["upper_level_no"][trans_index]  # new
     upper_level_index = upper_level_no - 1  # new
@@ -266,3 +392,101 @@ def o_C3H2_thin(
         / (Jex - Jbg)
     )
     return Ncol
+
+
+def o_C3H2_thin_np(
+    freq: float | ArrayLike = 218.222192,
+    Tex: ArrayLike = 5.0,
+    TdV: ArrayLike = 1.0,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+    tol_MHz: float = 0.5,
+    tol_kms: float | None = None,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free version of o_C3H2_thin, for float arrays in fixed units.
+    Gives the same values as o_C3H2_thin, without the overhead of astropy
+    units. The transitions are matched by frequency within tol_MHz (or
+    tol_kms), and frequencies without a unique match return NaN.
+    Tex, TdV and T_bg can be maps (arrays) of any broadcastable shapes
+    (map mode): pixels where Tex is NaN, Tex <= 0 or Tex <= T_bg return
+    NaN, without printing.
+
+    Parameters
+    ----------
+    freq : float | ArrayLike
+        The frequency of the transition, in GHz, or an array of frequencies
+        to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    TdV : ArrayLike
+        The integrated intensity of the transition, in K km/s. For several
+        transitions, the stack of TdV maps with the transitions along the
+        first axis.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_o_C3H2_table.
+    tol_MHz : float
+        The tolerance of the frequency match, in MHz.
+    tol_kms : float, optional
+        The tolerance of the frequency match, in km/s, used instead of tol_MHz.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    index = o_C3H2.find(freq, tol_MHz=tol_MHz, tol_kms=tol_kms)
+    return o_C3H2.thin_index(index, Tex, TdV, T_bg, tabulated=tabulated)
+
+
+def o_C3H2_thick_np(
+    freq: float | ArrayLike = 218.222192,
+    Tex: ArrayLike = 5.0,
+    tau: ArrayLike = 1.0,
+    sigma_v: ArrayLike | None = None,
+    TdV: ArrayLike | None = None,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+    tol_MHz: float = 0.5,
+    tol_kms: float | None = None,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free column density from the optically thick ortho-C3H2 transition, in map mode.
+    Takes either (tau, sigma_v) or (TdV, tau), see lte.Species.thick.
+    Tex, tau, sigma_v, TdV and T_bg can be maps (arrays) of broadcastable
+    shapes, and pixels with an invalid Tex return NaN. Frequencies without a unique transition (see
+    lte.Species.find) return NaN.
+
+    Parameters
+    ----------
+    freq : float | ArrayLike
+        The frequency of the transition, in GHz, or an array of frequencies
+        to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    tau : ArrayLike
+        The optical depth at the line peak.
+    sigma_v : ArrayLike, optional
+        The velocity dispersion of the line, in km/s.
+    TdV : ArrayLike, optional
+        The integrated intensity of the transition, in K km/s.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_o_C3H2_table.
+    tol_MHz : float
+        The tolerance of the frequency match, in MHz.
+    tol_kms : float, optional
+        The tolerance of the frequency match, in km/s, used instead of tol_MHz.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    index = o_C3H2.find(freq, tol_MHz=tol_MHz, tol_kms=tol_kms)
+    return o_C3H2.thick_index(index, Tex, tau, sigma_v, TdV, T_bg, tabulated=tabulated)
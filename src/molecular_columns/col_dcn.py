@@ -1,20 +1,36 @@
 import numpy as np
 import astropy.units as u
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
 from importlib.resources import files
 
 from astropy.constants import c, k_B, h  # type: ignore
 
+from .catalog import load_catalog, read_splatalogue
 from .common_functions import J_nu
+from .line_ratio import two_line
+from .lte import Species
+from .partition_function import level_sum
 
 # transition properties obtained from splatalogue:
 # dcn.dat (downloaded 2023 nov 7)
 file_mol = str(files("molecular_columns").joinpath("dcn.dat"))
-gu_list = np.loadtxt(file_mol, usecols=4)
-E_u_list = np.loadtxt(file_mol, usecols=3, dtype=float) * u.K  # type: ignore
+catalog = load_catalog(file_mol, read_splatalogue)
+gu_list = catalog["g_u"]
+E_u_list = catalog["E_u"] * u.K  # type: ignore
 full_index = np.arange(np.size(E_u_list), dtype=int)
-freq_list = np.loadtxt(file_mol, usecols=0, dtype=float) * u.GHz  # type: ignore
-Aij_list = 10.0 ** (np.loadtxt(file_mol, usecols=2, dtype=float)) / u.s  # type: ignore
+freq_list = catalog["freq"] * u.GHz  # type: ignore
+Aij_list = 10.0 ** catalog["log_A_ul"] / u.s  # type: ignore
+# the J_up -> J_up-1 transition uses the level at index J_up, as in DCN_thin
+DCN = Species(
+    "DCN",
+    gu_list,
+    E_u_list.to_value(u.K),  # type: ignore
+    freq=freq_list[:-1].to_value(u.GHz),  # type: ignore
+    A_ul=Aij_list[:-1].to_value(1 / u.s),  # type: ignore
+    upper=full_index[1:],
+    keys=full_index[1:],
+)
+Q_DCN_table = DCN.Q_table
 
 
 @u.quantity_input
@@ -44,6 +60,7 @@ def Q_DCN_i(
 @u.quantity_input
 def Q_DCN(
     Tex: u.K = 5 * u.K,  # type: ignore
+    tabulated: bool = False,
 ) -> float | NDArray[np.float64]:
     """
     It returns the partition function for DCN with an excitation
@@ -53,18 +70,19 @@ def Q_DCN(
     ----------
     Tex : u.K
         The excitation temperature.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_DCN_table
+        instead of summing over all levels.
     Returns
     -------
     Q_DCN_all : float
         The partition function.
     """
-    if Tex.size == 1:
-        return np.sum(Q_DCN_i(full_index, Tex=Tex))
+    if tabulated:
+        Q = Q_DCN_table(Tex.to_value(u.K))  # type: ignore
     else:
-        Q_DCN_all = np.zeros_like(Tex.value)
-        for i in range(Tex.size):
-            Q_DCN_all[i] = np.sum(Q_DCN_i(full_index, Tex=Tex[i]))
-        return Q_DCN_all
+        Q = level_sum(gu_list, E_u_list.to_value(u.K), Tex.to_value(u.K))  # type: ignore
+    return Q * u.dimensionless_unscaled
 
 
 @u.quantity_input
@@ -113,3 +131,121 @@ def DCN_thin(
         / (Jex - Jbg)
     )
     return Ncol
+
+
+def DCN_thin_np(
+    J_up: int | ArrayLike = 1,
+    Tex: ArrayLike = 5.0,
+    TdV: ArrayLike = 1.0,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free version of DCN_thin, for float arrays in fixed units.
+    Gives the same values as DCN_thin, without the overhead of astropy
+    units. Unavailable transitions return NaN.
+    Tex, TdV and T_bg can be maps (arrays) of any broadcastable shapes
+    (map mode): pixels where Tex is NaN, Tex <= 0 or Tex <= T_bg return
+    NaN, without printing.
+
+    Parameters
+    ----------
+    J_up : int | ArrayLike
+        The upper level of the transition (1-based index), or an array of
+        upper levels to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    TdV : ArrayLike
+        The integrated intensity of the transition, in K km/s. For several
+        transitions, the stack of TdV maps with the transitions along the
+        first axis.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_DCN_table.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    return DCN.thin(J_up, Tex, TdV, T_bg, tabulated=tabulated)
+
+
+def DCN_thick_np(
+    J_up: int | ArrayLike = 1,
+    Tex: ArrayLike = 5.0,
+    tau: ArrayLike = 1.0,
+    sigma_v: ArrayLike | None = None,
+    TdV: ArrayLike | None = None,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free column density from the optically thick DCN J_up -> J_up-1 transition, in map mode.
+    Takes either (tau, sigma_v) or (TdV, tau), see lte.Species.thick.
+    Tex, tau, sigma_v, TdV and T_bg can be maps (arrays) of broadcastable
+    shapes, and pixels with an invalid Tex return NaN. Unavailable transitions return NaN.
+
+    Parameters
+    ----------
+    J_up : int | ArrayLike
+        The upper level of the transition (1-based index), or an array of
+        upper levels to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    tau : ArrayLike
+        The optical depth at the line peak.
+    sigma_v : ArrayLike, optional
+        The velocity dispersion of the line, in km/s.
+    TdV : ArrayLike, optional
+        The integrated intensity of the transition, in K km/s.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_DCN_table.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    return DCN.thick(J_up, Tex, tau, sigma_v, TdV, T_bg, tabulated=tabulated)
+
+
+def DCN_two_line_np(
+    J_up_a: int,
+    J_up_b: int,
+    TdV_a: ArrayLike,
+    TdV_b: ArrayLike,
+    T_bg: float = 2.73,
+    tabulated: bool = False,
+) -> dict[str, float | NDArray[np.float64] | NDArray[np.bool_]]:
+    """
+    Unit-free excitation temperature and column density from the ratio of
+    two optically thin DCN transitions in LTE, in map mode
+    (see line_ratio.two_line). The LTE ratio as a function of Tex is
+    tabulated once for each pair of transitions, and inverted per pixel.
+
+    Parameters
+    ----------
+    J_up_a, J_up_b : int
+        The upper levels of the two transitions (1-based index).
+    TdV_a, TdV_b : ArrayLike
+        The integrated intensities of the two transitions, in K km/s.
+    T_bg : float
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_DCN_table.
+
+    Returns
+    -------
+    dict[str, float | NDArray[np.float64] | NDArray[np.bool_]]
+        The maps of 'Tex' (K) and 'Ncol' (cm^-2), and the 'out_of_range'
+        flag of the ratios that no Tex can produce (where Tex and Ncol are
+        NaN).
+    """
+    index_a, index_b = DCN.transition(J_up_a), DCN.transition(J_up_b)
+    return two_line(DCN, index_a, index_b, TdV_a, TdV_b, T_bg, tabulated)
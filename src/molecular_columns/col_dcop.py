@@ -1,9 +1,12 @@
 import numpy as np
 import astropy.units as u
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
 from astropy.constants import c, k_B, h  # type: ignore
 
 from .common_functions import J_nu
+from .line_ratio import two_line
+from .lte import Species
+from .partition_function import level_sum
 
 # g_u and E_u values obtained from LAMDA database
 # https://home.strw.leidenuniv.nl/~moldata/datafiles/dco+@xpol.dat
@@ -161,6 +164,18 @@ Aij_list = (
     / u.s  # type: ignore
 )
 
+DCOp = Species(
+    "DCO+",
+    gu_list,
+    E_u_list.to_value(u.K),  # type: ignore
+    freq=freq_list.to_value(u.GHz),  # type: ignore
+    A_ul=Aij_list.to_value(1 / u.s),  # type: ignore
+    upper=full_index[1:],
+    keys=full_index[1:],
+    lower=full_index[:-1],
+)
+Q_DCOp_table = DCOp.Q_table
+
 
 @u.quantity_input
 def Q_DCOp_i(
@@ -190,6 +205,7 @@ def Q_DCOp_i(
 @u.quantity_input
 def Q_DCOp(
     Tex: u.K = 5 * u.K,  # type: ignore
+    tabulated: bool = False,
 ) -> float:
     """
     Returns the partition function for DCO+ with an excitation temperature.
@@ -199,19 +215,20 @@ def Q_DCOp(
     ----------
     Tex : astropy.units.Quantity
         The excitation temperature (must have temperature units).
+    tabulated : bool
+        If True, the partition function is interpolated from Q_DCOp_table
+        instead of summing over all levels.
 
     Returns
     -------
     float or ndarray
         The partition function value(s).
     """
-    if Tex.size == 1:
-        return np.sum(Q_DCOp_i(full_index, Tex=Tex))
+    if tabulated:
+        Q = Q_DCOp_table(Tex.to_value(u.K))  # type: ignore
     else:
-        Q_DCOp_all = np.zeros_like(Tex.value)
-        for i in range(Tex.size):
-            Q_DCOp_all[i] = np.sum(Q_DCOp_i(full_index, Tex=Tex[i]))
-        return Q_DCOp_all
+        Q = level_sum(gu_list, E_u_list.to_value(u.K), Tex.to_value(u.K))  # type: ignore
+    return Q * u.dimensionless_unscaled
 
 
 @u.quantity_input
@@ -261,13 +278,167 @@ def DCOp_thin(
     return Ncol
 
 
-# def DCOp_thick(J_up=1, Tex=5*u.K, sigma_v=0.2*u.km/u.s, tau=2.0):
-#     """
-#     Total column density determination from the HCO+ J_up -> J_up-1 transition.
-#     The A_ul, frequency and Einstein coefficient are obtained from LAMBDA database.
-#     """
-#     TdV = np.sqrt(2*np.pi) * tau * sigma_v# * (Jex - Jbg)
-#     return DCOp_thin(J_up=J_up, Tex=Tex, TdV=TdV)
+def DCOp_thin_np(
+    J_up: int | ArrayLike = 1,
+    Tex: ArrayLike = 5.0,
+    TdV: ArrayLike = 1.0,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free version of DCOp_thin, for float arrays in fixed units.
+    Gives the same values as DCOp_thin, without the overhead of astropy
+    units. Unavailable transitions return NaN.
+    Tex, TdV and T_bg can be maps (arrays) of any broadcastable shapes
+    (map mode): pixels where Tex is NaN, Tex <= 0 or Tex <= T_bg return
+    NaN, without printing.
+
+    Parameters
+    ----------
+    J_up : int | ArrayLike
+        The upper level of the transition (1-based index), or an array of
+        upper levels to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    TdV : ArrayLike
+        The integrated intensity of the transition, in K km/s. For several
+        transitions, the stack of TdV maps with the transitions along the
+        first axis.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_DCOp_table.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    return DCOp.thin(J_up, Tex, TdV, T_bg, tabulated=tabulated)
+
+
+def DCOp_thick_np(
+    J_up: int | ArrayLike = 1,
+    Tex: ArrayLike = 5.0,
+    tau: ArrayLike = 1.0,
+    sigma_v: ArrayLike | None = None,
+    TdV: ArrayLike | None = None,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free column density from the optically thick DCO+ J_up -> J_up-1 transition, in map mode.
+    Takes either (tau, sigma_v) or (TdV, tau), see lte.Species.thick.
+    Tex, tau, sigma_v, TdV and T_bg can be maps (arrays) of broadcastable
+    shapes, and pixels with an invalid Tex return NaN. Unavailable transitions return NaN.
+
+    Parameters
+    ----------
+    J_up : int | ArrayLike
+        The upper level of the transition (1-based index), or an array of
+        upper levels to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    tau : ArrayLike
+        The optical depth at the line peak.
+    sigma_v : ArrayLike, optional
+        The velocity dispersion of the line, in km/s.
+    TdV : ArrayLike, optional
+        The integrated intensity of the transition, in K km/s.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_DCOp_table.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    return DCOp.thick(J_up, Tex, tau, sigma_v, TdV, T_bg, tabulated=tabulated)
+
+
+def DCOp_two_line_np(
+    J_up_a: int,
+    J_up_b: int,
+    TdV_a: ArrayLike,
+    TdV_b: ArrayLike,
+    T_bg: float = 2.73,
+    tabulated: bool = False,
+) -> dict[str, float | NDArray[np.float64] | NDArray[np.bool_]]:
+    """
+    Unit-free excitation temperature and column density from the ratio of
+    two optically thin DCO+ transitions in LTE, in map mode
+    (see line_ratio.two_line). The LTE ratio as a function of Tex is
+    tabulated once for each pair of transitions, and inverted per pixel.
+
+    Parameters
+    ----------
+    J_up_a, J_up_b : int
+        The upper levels of the two transitions (1-based index).
+    TdV_a, TdV_b : ArrayLike
+        The integrated intensities of the two transitions, in K km/s.
+    T_bg : float
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_DCOp_table.
+
+    Returns
+    -------
+    dict[str, float | NDArray[np.float64] | NDArray[np.bool_]]
+        The maps of 'Tex' (K) and 'Ncol' (cm^-2), and the 'out_of_range'
+        flag of the ratios that no Tex can produce (where Tex and Ncol are
+        NaN).
+    """
+    index_a, index_b = DCOp.transition(J_up_a), DCOp.transition(J_up_b)
+    return two_line(DCOp, index_a, index_b, TdV_a, TdV_b, T_bg, tabulated)
 
-# def c_tau(tau):
-#     return tau / (1 - np.exp(-tau))
+
+@u.quantity_input
+def DCOp_thick(
+    J_up: int = 1,
+    Tex: u.K = 5 * u.K,  # type: ignore
+    sigma_v: u.km / u.s = 0.2 * u.km / u.s,  # type: ignore
+    tau: float | NDArray[np.float64] = 2.0,
+    T_bg: u.K = 2.73 * u.K,  # type: ignore
+) -> u.cm**-2:  # type: ignore
+    """
+    Total column density determination from the DCO+ J_up -> J_up-1 transition,
+    with the same expression as H13COp_thick, so that both can be used
+    for the deuterium fraction.
+    The integrated opacity sqrt(2 pi) tau sigma_v is evaluated with the same
+    expression as DCOp_thick_np (see lte.Species.thick).
+    The A_ul, frequency and Einstein coefficient are obtained from LAMBDA database.
+
+    Parameters
+    ----------
+    J_up : int
+        The upper level of the transition.
+    Tex : u.K
+        The excitation temperature.
+    sigma_v : u.km / u.s
+        The velocity dispersion.
+    tau : float
+        The optical depth.
+    T_bg : u.K
+        The background temperature.
+
+    Returns
+    -------
+    Ncol : u.cm**-2
+        The column density.
+    """
+    index = DCOp.transition(J_up)
+    if index < 0:
+        print("J_up is not available")
+        return np.nan * u.cm**-2  # type: ignore
+    Ncol = DCOp.thick_index(
+        index,
+        Tex.to_value(u.K),  # type: ignore
+        tau,
+        sigma_v=sigma_v.to_value(u.km / u.s),  # type: ignore
+        T_bg=T_bg.to_value(u.K),  # type: ignore
+    )
+    return Ncol * u.cm**-2  # type: ignore
@@ -1,9 +1,12 @@
 import numpy as np
 import astropy.units as u
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
 from astropy.constants import c, k_B, h  # type: ignore
 
 from .common_functions import J_nu, c_tau
+from .line_ratio import two_line
+from .lte import Species
+from .partition_function import level_sum
 
 # g_u and E_u values obtained from LAMDA database
 # https://home.strw.leidenuniv.nl/~moldata/datafiles/h13co+@xpol.dat
@@ -161,6 +164,18 @@ Aij_list = (
     / u.s  # type: ignore
 )
 
+H13COp = Species(
+    "H13CO+",
+    gu_list,
+    E_u_list.to_value(u.K),  # type: ignore
+    freq=freq_list.to_value(u.GHz),  # type: ignore
+    A_ul=Aij_list.to_value(1 / u.s),  # type: ignore
+    upper=full_index[1:],
+    keys=full_index[1:],
+    lower=full_index[:-1],
+)
+Q_H13COp_table = H13COp.Q_table
+
 
 @u.quantity_input
 def Q_H13COp_i(
@@ -189,6 +204,7 @@ def Q_H13COp_i(
 @u.quantity_input
 def Q_H13COp(
     Tex: u.K = 5 * u.K,  # type: ignore
+    tabulated: bool = False,
 ) -> float | NDArray[np.float64]:
     """
     It returns the partition function for H^{13}CO^+ with an excitation
@@ -199,18 +215,19 @@ def Q_H13COp(
     ----------
     Tex : u.K
         The excitation temperature(s).
+    tabulated : bool
+        If True, the partition function is interpolated from Q_H13COp_table
+        instead of summing over all levels.
     Returns
     -------
     Q_H13COp_all : float | NDArray[np.float64]
         The partition function(s).
     """
-    if Tex.size == 1:
-        return np.sum(Q_H13COp_i(full_index, Tex=Tex))
+    if tabulated:
+        Q = Q_H13COp_table(Tex.to_value(u.K))  # type: ignore
     else:
-        Q_H13COp_all = np.zeros_like(Tex.value)
-        for i in range(Tex.size):
-            Q_H13COp_all[i] = np.sum(Q_H13COp_i(full_index, Tex=Tex[i]))
-        return Q_H13COp_all
+        Q = level_sum(gu_list, E_u_list.to_value(u.K), Tex.to_value(u.K))  # type: ignore
+    return Q * u.dimensionless_unscaled
 
 
 @u.quantity_input
@@ -260,6 +277,124 @@ def H13COp_thin(
     return Ncol
 
 
+def H13COp_thin_np(
+    J_up: int | ArrayLike = 1,
+    Tex: ArrayLike = 5.0,
+    TdV: ArrayLike = 1.0,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free version of H13COp_thin, for float arrays in fixed units.
+    Gives the same values as H13COp_thin, without the overhead of astropy
+    units. Unavailable transitions return NaN.
+    Tex, TdV and T_bg can be maps (arrays) of any broadcastable shapes
+    (map mode): pixels where Tex is NaN, Tex <= 0 or Tex <= T_bg return
+    NaN, without printing.
+
+    Parameters
+    ----------
+    J_up : int | ArrayLike
+        The upper level of the transition (1-based index), or an array of
+        upper levels to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    TdV : ArrayLike
+        The integrated intensity of the transition, in K km/s. For several
+        transitions, the stack of TdV maps with the transitions along the
+        first axis.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_H13COp_table.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    return H13COp.thin(J_up, Tex, TdV, T_bg, tabulated=tabulated)
+
+
+def H13COp_thick_np(
+    J_up: int | ArrayLike = 1,
+    Tex: ArrayLike = 5.0,
+    tau: ArrayLike = 1.0,
+    sigma_v: ArrayLike | None = None,
+    TdV: ArrayLike | None = None,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free column density from the optically thick H13CO+ J_up -> J_up-1 transition, in map mode.
+    Takes either (tau, sigma_v) or (TdV, tau), see lte.Species.thick.
+    Tex, tau, sigma_v, TdV and T_bg can be maps (arrays) of broadcastable
+    shapes, and pixels with an invalid Tex return NaN. Unavailable transitions return NaN.
+
+    Parameters
+    ----------
+    J_up : int | ArrayLike
+        The upper level of the transition (1-based index), or an array of
+        upper levels to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    tau : ArrayLike
+        The optical depth at the line peak.
+    sigma_v : ArrayLike, optional
+        The velocity dispersion of the line, in km/s.
+    TdV : ArrayLike, optional
+        The integrated intensity of the transition, in K km/s.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_H13COp_table.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    return H13COp.thick(J_up, Tex, tau, sigma_v, TdV, T_bg, tabulated=tabulated)
+
+
+def H13COp_two_line_np(
+    J_up_a: int,
+    J_up_b: int,
+    TdV_a: ArrayLike,
+    TdV_b: ArrayLike,
+    T_bg: float = 2.73,
+    tabulated: bool = False,
+) -> dict[str, float | NDArray[np.float64] | NDArray[np.bool_]]:
+    """
+    Unit-free excitation temperature and column density from the ratio of
+    two optically thin H13CO+ transitions in LTE, in map mode
+    (see line_ratio.two_line). The LTE ratio as a function of Tex is
+    tabulated once for each pair of transitions, and inverted per pixel.
+
+    Parameters
+    ----------
+    J_up_a, J_up_b : int
+        The upper levels of the two transitions (1-based index).
+    TdV_a, TdV_b : ArrayLike
+        The integrated intensities of the two transitions, in K km/s.
+    T_bg : float
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_H13COp_table.
+
+    Returns
+    -------
+    dict[str, float | NDArray[np.float64] | NDArray[np.bool_]]
+        The maps of 'Tex' (K) and 'Ncol' (cm^-2), and the 'out_of_range'
+        flag of the ratios that no Tex can produce (where Tex and Ncol are
+        NaN).
+    """
+    index_a, index_b = H13COp.transition(J_up_a), H13COp.transition(J_up_b)
+    return two_line(H13COp, index_a, index_b, TdV_a, TdV_b, T_bg, tabulated)
+
+
 @u.quantity_input
 def H13COp_thick(
     J_up: int = 1,
@@ -270,6 +405,8 @@ def H13COp_thick(
 ) -> u.cm**-2:  # type: ignore
     """
     Total column density determination from the HCO+ J_up -> J_up-1 transition.
+    The integrated opacity sqrt(2 pi) tau sigma_v is evaluated with the same
+    expression as H13COp_thick_np (see lte.Species.thick).
     The A_ul, frequency and Einstein coefficient are obtained from LAMBDA database.
 
     Parameters
@@ -290,5 +427,15 @@ def H13COp_thick(
     Ncol : u.cm**-2
         The column density.
     """
-    TdV = np.sqrt(2 * np.pi) * tau * sigma_v * u.K  # type: ignore
-    return H13COp_thin(J_up=J_up, Tex=Tex, TdV=TdV, T_bg=T_bg)
+    index = H13COp.transition(J_up)
+    if index < 0:
+        print("J_up is not available")
+        return np.nan * u.cm**-2  # type: ignore
+    Ncol = H13COp.thick_index(
+        index,
+        Tex.to_value(u.K),  # type: ignore
+        tau,
+        sigma_v=sigma_v.to_value(u.km / u.s),  # type: ignore
+        T_bg=T_bg.to_value(u.K),  # type: ignore
+    )
+    return Ncol * u.cm**-2  # type: ignore
@@ -1,58 +1,49 @@
+import sys
+
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
 import astropy.units as u
 from astropy.constants import c, k_B, h  # type: ignore
+from .catalog import load_catalog, read_lamda
 from .common_functions import J_nu
-from importlib.resources import files
+from .lte import Species, match_errors
+from .partition_function import level_sum
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from .model_grid import ModelGrid
 
 
 # g_u, E_u, and A_ul values obtained from LAMBDA database
 def extract_from_lambda(file_name):
-    # Read the content of the file
-    file_mol = files("molecular_columns").joinpath(file_name)
-    f = open(str(file_mol), "r")
-    # Read the content line by line
-    lines = f.readlines()
-    f.close()
-
-    # Make an empty dictionary for J_Kp_Ko, E_u (cm-1), and g_u values
-    level_dict = {"J_Kp_Ko": [], "E_u": [], "g_u": []}
-    # Make an empty dictionary for frequency (GHz), A_ul, and E_u (K) values
-    trans_dict = {"freq": [], "A_ul": [], "E_u": [], "upper_level_no": []}
-
-    # Extract WEIGHT values
-    for line in lines:
-        if line == "!NUMBER OF COLL PARTNERS":
-            break
-        parts = line.split()
-        if line[0] == "!":
-            pass
-        else:
-            if len(parts) == 4:  # LEVEL + ENERGIES(cm^-1) + WEIGHT + J_Kp_Ko
-                try:
-                    energy = float(parts[1])
-                    level_dict["E_u"].append(energy)
-                    weight = float(parts[2])
-                    level_dict["g_u"].append(weight)
-                    level_dict["J_Kp_Ko"].append(parts[3])
-                except ValueError:
-                    pass  # Skip lines that don't contain valid numbers
-            if (
-                len(parts) == 6
-            ):  # TRANS + UP + LOW + EINSTEINA(s^-1) + FREQ(GHz) + E_u(K)
-                try:
-                    upper_level_no = int(parts[1])
-                    trans_dict["upper_level_no"].append(upper_level_no)
-                    einsteinA = float(parts[3])
-                    trans_dict["A_ul"].append(einsteinA)
-                    freq = float(parts[4])
-                    trans_dict["freq"].append(freq)
-                    upper_level_energy = float(parts[5])
-                    trans_dict["E_u"].append(upper_level_energy)
-
-                except ValueError:
-                    pass
+    """
+    Returns the energy levels and radiative transitions of a LAMDA file.
+    The file is parsed once, and later calls use the binary catalog cache.
 
+    Parameters
+    ----------
+    file_name : str
+        The name of the LAMDA file.
+    Returns
+    -------
+    level_dict : dict
+        The 'J_Kp_Ko' labels, 'E_u' (cm^-1) and 'g_u' of the energy levels.
+    trans_dict : dict
+        The 'freq' (GHz), 'A_ul' (s^-1), 'E_u' (K) and 'upper_level_no' of
+        the radiative transitions.
+    """
+    catalog = load_catalog(file_name, read_lamda)
+    level_dict = {
+        "J_Kp_Ko": catalog["level_label"],
+        "E_u": catalog["level_E_u"],
+        "g_u": catalog["level_g_u"],
+    }
+    trans_dict = {
+        "freq": catalog["line_freq"],
+        "A_ul": catalog["line_A_ul"],
+        "E_u": catalog["line_E_u"],
+        "upper_level_no": catalog["line_upper"],
+    }
     return level_dict, trans_dict
 
 
@@ -66,6 +57,55 @@ E_u_o_list = (np.array(o_level_dict["E_u"]) * (h * c / k_B) / u.cm).to(u.K)  # t
 p_full_index = np.arange(np.size(E_u_p_list))
 o_full_index = np.arange(np.size(E_u_o_list))
 
+p_H2CO = Species(
+    "p-H2CO",
+    gu_p_list,
+    E_u_p_list.to_value(u.K),  # type: ignore
+    freq=p_trans_dict["freq"],
+    A_ul=p_trans_dict["A_ul"],
+    upper=p_trans_dict["upper_level_no"] - 1,
+    keys=p_trans_dict["freq"],
+)
+o_H2CO = Species(
+    "o-H2CO",
+    gu_o_list,
+    E_u_o_list.to_value(u.K),  # type: ignore
+    freq=o_trans_dict["freq"],
+    A_ul=o_trans_dict["A_ul"],
+    upper=o_trans_dict["upper_level_no"] - 1,
+    keys=o_trans_dict["freq"],
+)
+Q_p_H2CO_table = p_H2CO.Q_table
+Q_o_H2CO_table = o_H2CO.Q_table
+# level populations out of LTE, from the collision rates of the LAMDA files
+# (solvers built on first access, see __getattr__)
+non_lte_files = {
+    "p_H2CO_non_lte": ("ph2co-h2.dat", "p-H2CO"),
+    "o_H2CO_non_lte": ("oh2co-h2.dat", "o-H2CO"),
+}
+# the 3_03-2_02 and 3_22-2_21 lines (GHz) of the p-H2CO thermometer, and the
+# default model grid used to invert their ratio
+p_H2CO_thermometer = (218.222192, 218.475632)
+p_H2CO_grid_axes = {
+    "n_H2": np.logspace(3.0, 8.0, 11),
+    "T_kin": np.linspace(10.0, 300.0, 59),
+    "N": np.logspace(11.0, 16.0, 11),
+}
+
+
+def __getattr__(name: str):
+    """
+    Builds the non-LTE solvers (see non_lte_files) when first requested, so
+    that importing the module does not read the LAMDA collision rates.
+    """
+    if name not in non_lte_files:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from .non_lte import StatisticalEquilibrium
+
+    value = StatisticalEquilibrium.from_lamda(*non_lte_files[name])
+    globals()[name] = value
+    return value
+
 
 @u.quantity_input
 def Q_p_H2CO_i(
@@ -94,6 +134,7 @@ def Q_p_H2CO_i(
 @u.quantity_input
 def Q_p_H2CO(
     Tex: u.K = 5 * u.K,  # type: ignore
+    tabulated: bool = False,
 ) -> float | NDArray[np.float64]:
     """
     It returns the partition function for para-H2CO with an excitation
@@ -103,18 +144,19 @@ def Q_p_H2CO(
     ----------
     Tex : u.K
         The excitation temperature.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_p_H2CO_table
+        instead of summing over all levels.
     Returns
     -------
     Q_p_H2CO_all : float
         The partition function.
     """
-    if Tex.size == 1:
-        return np.sum(Q_p_H2CO_i(p_full_index, Tex=Tex))
+    if tabulated:
+        Q = Q_p_H2CO_table(Tex.to_value(u.K))  # type: ignore
     else:
-        Q_p_H2CO_all = np.zeros_like(Tex.value)
-        for i in range(Tex.size):
-            Q_p_H2CO_all[i] = np.sum(Q_p_H2CO_i(p_full_index, Tex=Tex[i]))
-        return Q_p_H2CO_all
+        Q = level_sum(gu_p_list, E_u_p_list.to_value(u.K), Tex.to_value(u.K))  # type: ignore
+    return Q * u.dimensionless_unscaled
 
 
 @u.quantity_input
@@ -144,6 +186,7 @@ def Q_o_H2CO_i(
 @u.quantity_input
 def Q_o_H2CO(
     Tex: u.K = 5 * u.K,  # type: ignore
+    tabulated: bool = False,
 ) -> float | NDArray[np.float64]:
     """
     It returns the partition function for ortho-H2CO with an excitation
@@ -153,18 +196,19 @@ def Q_o_H2CO(
     ----------
     Tex : u.K
         The excitation temperature.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_o_H2CO_table
+        instead of summing over all levels.
     Returns
     -------
     Q_o_H2CO_all : float
         The partition function.
     """
-    if Tex.size == 1:
-        return np.sum(Q_o_H2CO_i(o_full_index, Tex=Tex))
+    if tabulated:
+        Q = Q_o_H2CO_table(Tex.to_value(u.K))  # type: ignore
     else:
-        Q_o_H2CO_all = np.zeros_like(Tex.value)
-        for i in range(Tex.size):
-            Q_o_H2CO_all[i] = np.sum(Q_o_H2CO_i(o_full_index, Tex=Tex[i]))
-        return Q_o_H2CO_all
+        Q = level_sum(gu_o_list, E_u_o_list.to_value(u.K), Tex.to_value(u.K))  # type: ignore
+    return Q * u.dimensionless_unscaled
 
 
 @u.quantity_input
@@ -194,7 +238,10 @@ def p_H2CO_thin(
     Ncol : u.cm**-2
         The column density.
     """
-    trans_index = np.where(p_trans_dict["freq"] == freq.value)[0][0]
+    trans_index = p_H2CO.find(freq.to_value(u.GHz))  # type: ignore
+    if trans_index < 0:
+        print("The frequency {0} {1}".format(freq, match_errors[trans_index]))
+        return np.nan * u.cm**-2  # type: ignore
     A_ul = p_trans_dict["A_ul"][trans_index] / u.s  # type: ignore
     upper_level_no = p_trans_dict["upper_level_no"][trans_index]  # new
     upper_level_index = upper_level_no - 1  # new
@@ -213,6 +260,104 @@ def p_H2CO_thin(
     return Ncol
 
 
+def p_H2CO_thin_np(
+    freq: float | ArrayLike = 218.222192,
+    Tex: ArrayLike = 5.0,
+    TdV: ArrayLike = 1.0,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+    tol_MHz: float = 0.5,
+    tol_kms: float | None = None,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free version of p_H2CO_thin, for float arrays in fixed units.
+    Gives the same values as p_H2CO_thin, without the overhead of astropy
+    units. The transitions are matched by frequency within tol_MHz (or
+    tol_kms), and frequencies without a unique match return NaN.
+    Tex, TdV and T_bg can be maps (arrays) of any broadcastable shapes
+    (map mode): pixels where Tex is NaN, Tex <= 0 or Tex <= T_bg return
+    NaN, without printing.
+
+    Parameters
+    ----------
+    freq : float | ArrayLike
+        The frequency of the transition, in GHz, or an array of frequencies
+        to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    TdV : ArrayLike
+        The integrated intensity of the transition, in K km/s. For several
+        transitions, the stack of TdV maps with the transitions along the
+        first axis.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_p_H2CO_table.
+    tol_MHz : float
+        The tolerance of the frequency match, in MHz.
+    tol_kms : float, optional
+        The tolerance of the frequency match, in km/s, used instead of tol_MHz.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    index = p_H2CO.find(freq, tol_MHz=tol_MHz, tol_kms=tol_kms)
+    return p_H2CO.thin_index(index, Tex, TdV, T_bg, tabulated=tabulated)
+
+
+def p_H2CO_thick_np(
+    freq: float | ArrayLike = 218.222192,
+    Tex: ArrayLike = 5.0,
+    tau: ArrayLike = 1.0,
+    sigma_v: ArrayLike | None = None,
+    TdV: ArrayLike | None = None,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+    tol_MHz: float = 0.5,
+    tol_kms: float | None = None,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free column density from the optically thick para-H2CO transition, in map mode.
+    Takes either (tau, sigma_v) or (TdV, tau), see lte.Species.thick.
+    Tex, tau, sigma_v, TdV and T_bg can be maps (arrays) of broadcastable
+    shapes, and pixels with an invalid Tex return NaN. Frequencies without a unique transition (see
+    lte.Species.find) return NaN.
+
+    Parameters
+    ----------
+    freq : float | ArrayLike
+        The frequency of the transition, in GHz, or an array of frequencies
+        to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    tau : ArrayLike
+        The optical depth at the line peak.
+    sigma_v : ArrayLike, optional
+        The velocity dispersion of the line, in km/s.
+    TdV : ArrayLike, optional
+        The integrated intensity of the transition, in K km/s.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_p_H2CO_table.
+    tol_MHz : float
+        The tolerance of the frequency match, in MHz.
+    tol_kms : float, optional
+        The tolerance of the frequency match, in km/s, used instead of tol_MHz.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    index = p_H2CO.find(freq, tol_MHz=tol_MHz, tol_kms=tol_kms)
+    return p_H2CO.thick_index(index, Tex, tau, sigma_v, TdV, T_bg, tabulated=tabulated)
+
+
 @u.quantity_input
 def o_H2CO_thin(
     freq: u.GHz = 218.222192 * u.GHz,  # type: ignore
@@ -240,7 +385,10 @@ def o_H2CO_thin(
     Ncol : u.cm**-2
         The column density.
     """
-    trans_index = np.where(o_trans_dict["freq"] == freq.value)[0][0]
+    trans_index = o_H2CO.find(freq.to_value(u.GHz))  # type: ignore
+    if trans_index < 0:
+        print("The frequency {0} {1}".format(freq, match_errors[trans_index]))
+        return np.nan * u.cm**-2  # type: ignore
     A_ul = o_trans_dict["A_ul"][trans_index] / u.s  # type: ignore
     upper_level_no = o_trans_dict["upper_level_no"][trans_index]  # new
     upper_level_index = upper_level_no - 1  # new
@@ -256,3 +404,142 @@ def o_H2CO_thin(
         / (Jex - Jbg)
     )
     return Ncol
+
+
+def o_H2CO_thin_np(
+    freq: float | ArrayLike = 218.222192,
+    Tex: ArrayLike = 5.0,
+    TdV: ArrayLike = 1.0,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+    tol_MHz: float = 0.5,
+    tol_kms: float | None = None,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free version of o_H2CO_thin, for float arrays in fixed units.
+    Gives the same values as o_H2CO_thin, without the overhead of astropy
+    units. The transitions are matched by frequency within tol_MHz (or
+    tol_kms), and frequencies without a unique match return NaN.
+    Tex, TdV and T_bg can be maps (arrays) of any broadcastable shapes
+    (map mode): pixels where Tex is NaN, Tex <= 0 or Tex <= T_bg return
+    NaN, without printing.
+
+    Parameters
+    ----------
+    freq : float | ArrayLike
+        The frequency of the transition, in GHz, or an array of frequencies
+        to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    TdV : ArrayLike
+        The integrated intensity of the transition, in K km/s. For several
+        transitions, the stack of TdV maps with the transitions along the
+        first axis.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_o_H2CO_table.
+    tol_MHz : float
+        The tolerance of the frequency match, in MHz.
+    tol_kms : float, optional
+        The tolerance of the frequency match, in km/s, used instead of tol_MHz.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    index = o_H2CO.find(freq, tol_MHz=tol_MHz, tol_kms=tol_kms)
+    return o_H2CO.thin_index(index, Tex, TdV, T_bg, tabulated=tabulated)
+
+
+def o_H2CO_thick_np(
+    freq: float | ArrayLike = 218.222192,
+    Tex: ArrayLike = 5.0,
+    tau: ArrayLike = 1.0,
+    sigma_v: ArrayLike | None = None,
+    TdV: ArrayLike | None = None,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+    tol_MHz: float = 0.5,
+    tol_kms: float | None = None,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free column density from the optically thick ortho-H2CO transition, in map mode.
+    Takes either (tau, sigma_v) or (TdV, tau), see lte.Species.thick.
+    Tex, tau, sigma_v, TdV and T_bg can be maps (arrays) of broadcastable
+    shapes, and pixels with an invalid Tex return NaN. Frequencies without a unique transition (see
+    lte.Species.find) return NaN.
+
+    Parameters
+    ----------
+    freq : float | ArrayLike
+        The frequency of the transition, in GHz, or an array of frequencies
+        to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    tau : ArrayLike
+        The optical depth at the line peak.
+    sigma_v : ArrayLike, optional
+        The velocity dispersion of the line, in km/s.
+    TdV : ArrayLike, optional
+        The integrated intensity of the transition, in K km/s.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_o_H2CO_table.
+    tol_MHz : float
+        The tolerance of the frequency match, in MHz.
+    tol_kms : float, optional
+        The tolerance of the frequency match, in km/s, used instead of tol_MHz.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    index = o_H2CO.find(freq, tol_MHz=tol_MHz, tol_kms=tol_kms)
+    return o_H2CO.thick_index(index, Tex, tau, sigma_v, TdV, T_bg, tabulated=tabulated)
+
+
+def p_H2CO_T_kin_np(
+    ratio: ArrayLike,
+    n_H2: ArrayLike = 1e5,
+    N: ArrayLike = 1e13,
+    delta_v: float = 1.0,
+    grid: "ModelGrid | None" = None,
+) -> NDArray[np.float64]:
+    """
+    Kinetic temperature from the ratio of the p-H2CO 3_03-2_02 (218.222 GHz)
+    and 3_22-2_21 (218.476 GHz) integrated intensities, inverted on a grid
+    of non-LTE models (see model_grid.ModelGrid.invert). The default grid
+    (p_H2CO_grid_axes) is computed on the first call and then read from the
+    cache directory.
+
+    Parameters
+    ----------
+    ratio : ArrayLike
+        The ratio TdV(3_03-2_02)/TdV(3_22-2_21), e.g., a map.
+    n_H2 : ArrayLike
+        The H2 density, in cm^-3, a scalar or a map.
+    N : ArrayLike
+        The p-H2CO column density, in cm^-2, a scalar or a map.
+    delta_v : float
+        The FWHM of the lines, in km/s, used for the default grid.
+    grid : ModelGrid, optional
+        A grid with the two lines and the axes n_H2, T_kin and N.
+
+    Returns
+    -------
+    NDArray[np.float64]
+        The kinetic temperature, in K, NaN where the ratio is outside the
+        range of the grid.
+    """
+    if grid is None:
+        from .model_grid import model_grid
+
+        solver = sys.modules[__name__].p_H2CO_non_lte
+        grid = model_grid(solver, p_H2CO_grid_axes, p_H2CO_thermometer, delta_v=delta_v)
+    return grid.invert(ratio, *p_H2CO_thermometer, n_H2=n_H2, N=N)
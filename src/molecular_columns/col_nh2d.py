@@ -1,9 +1,12 @@
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
 import astropy.units as u
 from astropy.constants import c, k_B, h  # type: ignore
 
 # from .common_functions import J_nu
+from .lte import Species
+from .partition_function import level_sum
+
 # g_u and E_u values obtained from LAMBDA database
 # https://home.strw.leidenuniv.nl/~moldata/datafiles/p-nh2d.dat
 gu_p_list = np.array(
@@ -81,6 +84,17 @@ E_u_p_list = (
     u.K  # type: ignore
 )
 p_full_index = np.arange(np.size(E_u_p_list))
+# para-NH2D (1_11-1_01) transition, as used in p_NH2D_thick
+p_NH2D = Species(
+    "p-NH2D",
+    gu_p_list,
+    E_u_p_list.to_value(u.K),  # type: ignore
+    freq=[110.153594],
+    A_ul=[0.165e-4],
+    upper=[2],
+    keys=[110.153594],
+)
+Q_p_NH2D_table = p_NH2D.Q_table
 
 # g_u and E_u values obtained from LAMBDA database
 # https://home.strw.leidenuniv.nl/~moldata/datafiles/o-nh2d.dat
@@ -159,6 +173,17 @@ E_u_o_list = (
     u.K  # type: ignore
 )
 o_full_index = np.arange(np.size(E_u_o_list))
+# ortho-NH2D (1_11-1_01) transition, as used in o_NH2D_thick
+o_NH2D = Species(
+    "o-NH2D",
+    gu_o_list,
+    E_u_o_list.to_value(u.K),  # type: ignore
+    freq=[85.92627],
+    A_ul=[0.782e-5],
+    upper=[2],
+    keys=[85.92627],
+)
+Q_o_NH2D_table = o_NH2D.Q_table
 
 
 @u.quantity_input
@@ -188,6 +213,7 @@ def Q_p_NH2D_i(
 @u.quantity_input
 def Q_p_NH2D(
     Tex: u.K = 5 * u.K,  # type: ignore
+    tabulated: bool = False,
 ) -> float | NDArray[np.float64]:
     """
     It returns the partition function for para-NH2D with an excitation
@@ -198,18 +224,19 @@ def Q_p_NH2D(
     ----------
     Tex : u.K
         The excitation temperature.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_p_NH2D_table
+        instead of summing over all levels.
     Returns
     -------
     Q_p_NH2D_all : float
         The partition function.
     """
-    if Tex.size == 1:
-        return np.sum(Q_p_NH2D_i(p_full_index, Tex=Tex))
+    if tabulated:
+        Q = Q_p_NH2D_table(Tex.to_value(u.K))  # type: ignore
     else:
-        Q_p_NH2D_all = np.zeros_like(Tex.value)
-        for i in range(Tex.size):
-            Q_p_NH2D_all[i] = np.sum(Q_p_NH2D_i(p_full_index, Tex=Tex[i]))
-        return Q_p_NH2D_all
+        Q = level_sum(gu_p_list, E_u_p_list.to_value(u.K), Tex.to_value(u.K))  # type: ignore
+    return Q * u.dimensionless_unscaled
 
 
 @u.quantity_input
@@ -239,6 +266,7 @@ def Q_o_NH2D_i(
 @u.quantity_input
 def Q_o_NH2D(
     Tex: u.K = 5 * u.K,  # type: ignore
+    tabulated: bool = False,
 ) -> float | NDArray[np.float64]:  # type: ignore
     """
     It returns the partition function for ortho-NH2D with an excitation
@@ -249,18 +277,19 @@ def Q_o_NH2D(
     ----------
     Tex : u.K
         The excitation temperature.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_o_NH2D_table
+        instead of summing over all levels.
     Returns
     -------
     Q_o_NH2D_all : float
         The partition function.
     """
-    if Tex.size == 1:
-        return np.sum(Q_o_NH2D_i(o_full_index, Tex=Tex))
+    if tabulated:
+        Q = Q_o_NH2D_table(Tex.to_value(u.K))  # type: ignore
     else:
-        Q_o_NH2D_all = np.zeros_like(Tex.value)
-        for i in range(Tex.size):
-            Q_o_NH2D_all[i] = np.sum(Q_o_NH2D_i(o_full_index, Tex=Tex[i]))
-        return Q_o_NH2D_all
+        Q = level_sum(gu_o_list, E_u_o_list.to_value(u.K), Tex.to_value(u.K))  # type: ignore
+    return Q * u.dimensionless_unscaled
 
 
 @u.quantity_input
@@ -302,6 +331,43 @@ def p_NH2D_thick(
     return Ncol
 
 
+def p_NH2D_thick_np(
+    Tex: ArrayLike = 5.0,
+    tau: ArrayLike = 1.0,
+    sigma_v: ArrayLike | None = None,
+    TdV: ArrayLike | None = None,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free column density from the optically thick para-NH2D (1_{11}-1_{01}) transition, in map mode.
+    Takes either (tau, sigma_v) or (TdV, tau), see lte.Species.thick.
+    Tex, tau, sigma_v, TdV and T_bg can be maps (arrays) of broadcastable
+    shapes, and pixels with an invalid Tex return NaN.
+
+    Parameters
+    ----------
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    tau : ArrayLike
+        The optical depth at the line peak.
+    sigma_v : ArrayLike, optional
+        The velocity dispersion of the line, in km/s.
+    TdV : ArrayLike, optional
+        The integrated intensity of the transition, in K km/s.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_p_NH2D_table.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs.
+    """
+    return p_NH2D.thick_index(0, Tex, tau, sigma_v, TdV, T_bg, tabulated=tabulated)
+
+
 @u.quantity_input
 def o_NH2D_thick(
     Tex: u.K = 5 * u.K,  # type: ignore
@@ -339,3 +405,40 @@ def o_NH2D_thick(
         * TdV
     )
     return Ncol  # .to(u.cm**-2)
+
+
+def o_NH2D_thick_np(
+    Tex: ArrayLike = 5.0,
+    tau: ArrayLike = 1.0,
+    sigma_v: ArrayLike | None = None,
+    TdV: ArrayLike | None = None,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free column density from the optically thick ortho-NH2D (1_{11}-1_{01}) transition, in map mode.
+    Takes either (tau, sigma_v) or (TdV, tau), see lte.Species.thick.
+    Tex, tau, sigma_v, TdV and T_bg can be maps (arrays) of broadcastable
+    shapes, and pixels with an invalid Tex return NaN.
+
+    Parameters
+    ----------
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    tau : ArrayLike
+        The optical depth at the line peak.
+    sigma_v : ArrayLike, optional
+        The velocity dispersion of the line, in km/s.
+    TdV : ArrayLike, optional
+        The integrated intensity of the transition, in K km/s.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_o_NH2D_table.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs.
+    """
+    return o_NH2D.thick_index(0, Tex, tau, sigma_v, TdV, T_bg, tabulated=tabulated)
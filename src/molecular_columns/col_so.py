@@ -1,1011 +1,493 @@
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
 import astropy.units as u
 from astropy.constants import c, k_B, h  # type: ignore
 
 from .common_functions import J_nu
+from .lte import Species
+from .partition_function import level_sum
+from .rotation_diagram import population_diagram, rotation_diagram, upper_columns
 
 cm2K = ((h * c / k_B) / u.cm).to(u.K)  # type: ignore
 # g_u and E_u values obtained from LAMDA database
 # https://home.strw.leidenuniv.nl/~moldata/datafiles/so@lique.dat
-#!LEVEL + ENERGIES(cm^-1) + WEIGHT  + N_J  -->  'N_J'  Eup  gu
-SO_levels = {
-    "1_0": {"Eup": 0.0000 * cm2K, "g_u": 1},
-    "0_1": {"Eup": 1.0007 * cm2K, "g_u": 3},
-    "1_2": {"Eup": 3.0999 * cm2K, "g_u": 5},
-    "2_3": {"Eup": 6.4122 * cm2K, "g_u": 7},
-    "1_1": {"Eup": 10.5520 * cm2K, "g_u": 3},
-    "2_1": {"Eup": 10.9871 * cm2K, "g_u": 3},
-    "3_4": {"Eup": 11.0213 * cm2K, "g_u": 9},
-    "2_2": {"Eup": 13.4238 * cm2K, "g_u": 5},
-    "3_2": {"Eup": 14.6314 * cm2K, "g_u": 5},
-    "4_5": {"Eup": 16.9790 * cm2K, "g_u": 11},
-    "3_3": {"Eup": 17.7314 * cm2K, "g_u": 7},
-    "4_3": {"Eup": 19.9341 * cm2K, "g_u": 7},
-    "4_4": {"Eup": 23.4748 * cm2K, "g_u": 9},
-    "5_6": {"Eup": 24.3157 * cm2K, "g_u": 13},
-    "5_4": {"Eup": 26.8114 * cm2K, "g_u": 9},
-    "5_5": {"Eup": 30.6538 * cm2K, "g_u": 11},
-    "6_7": {"Eup": 33.0499 * cm2K, "g_u": 15},
-    "6_5": {"Eup": 35.2114 * cm2K, "g_u": 11},
-    "6_6": {"Eup": 39.2682 * cm2K, "g_u": 13},
-    "7_8": {"Eup": 43.1928 * cm2K, "g_u": 17},
-    "7_6": {"Eup": 45.1032 * cm2K, "g_u": 13},
-    "7_7": {"Eup": 49.3181 * cm2K, "g_u": 15},
-    "8_9": {"Eup": 54.7518 * cm2K, "g_u": 19},
-    "8_7": {"Eup": 56.4683 * cm2K, "g_u": 15},
-    "8_8": {"Eup": 60.8030 * cm2K, "g_u": 17},
-    "9_10": {"Eup": 67.7314 * cm2K, "g_u": 21},
-    "9_8": {"Eup": 69.2947 * cm2K, "g_u": 17},
-    "9_9": {"Eup": 73.7229 * cm2K, "g_u": 19},
-    "10_11": {"Eup": 82.1350 * cm2K, "g_u": 23},
-    "10_9": {"Eup": 83.5749 * cm2K, "g_u": 19},
-    "10_10": {"Eup": 88.0775 * cm2K, "g_u": 21},
-    "11_12": {"Eup": 97.9646 * cm2K, "g_u": 25},
-    "11_10": {"Eup": 99.3037 * cm2K, "g_u": 21},
-    "11_11": {"Eup": 03.8665 * cm2K, "g_u": 23},
-    "12_13": {"Eup": 115.2217 * cm2K, "g_u": 27},
-    "12_11": {"Eup": 116.4774 * cm2K, "g_u": 23},
-    "12_12": {"Eup": 121.0896 * cm2K, "g_u": 25},
-    "13_14": {"Eup": 133.9073 * cm2K, "g_u": 29},
-    "13_12": {"Eup": 135.0932 * cm2K, "g_u": 25},
-    "13_13": {"Eup": 139.7465 * cm2K, "g_u": 27},
-    "14_15": {"Eup": 154.0219 * cm2K, "g_u": 31},
-    "14_13": {"Eup": 155.1490 * cm2K, "g_u": 27},
-    "14_14": {"Eup": 159.8369 * cm2K, "g_u": 29},
-    "15_16": {"Eup": 175.5660 * cm2K, "g_u": 33},
-    "15_14": {"Eup": 176.6432 * cm2K, "g_u": 29},
-    "15_15": {"Eup": 181.3602 * cm2K, "g_u": 31},
-    "16_17": {"Eup": 198.5397 * cm2K, "g_u": 35},
-    "16_15": {"Eup": 199.5743 * cm2K, "g_u": 31},
-    "16_16": {"Eup": 204.3163 * cm2K, "g_u": 33},
-    "17_18": {"Eup": 222.9432 * cm2K, "g_u": 37},
-    "17_16": {"Eup": 223.9412 * cm2K, "g_u": 33},
-    "17_17": {"Eup": 228.7045 * cm2K, "g_u": 35},
-    "18_19": {"Eup": 248.7762 * cm2K, "g_u": 39},
-    "18_17": {"Eup": 249.7428 * cm2K, "g_u": 35},
-    "18_18": {"Eup": 254.5245 * cm2K, "g_u": 37},
-    "19_20": {"Eup": 276.0386 * cm2K, "g_u": 41},
-    "19_18": {"Eup": 276.9782 * cm2K, "g_u": 37},
-    "19_19": {"Eup": 281.7758 * cm2K, "g_u": 39},
-    "20_21": {"Eup": 304.7302 * cm2K, "g_u": 43},
-    "20_19": {"Eup": 305.6464 * cm2K, "g_u": 39},
-    "20_20": {"Eup": 310.4578 * cm2K, "g_u": 41},
-    "21_22": {"Eup": 334.8506 * cm2K, "g_u": 45},
-    "21_20": {"Eup": 335.7466 * cm2K, "g_u": 41},
-    "21_21": {"Eup": 340.5700 * cm2K, "g_u": 43},
-    "22_23": {"Eup": 366.3994 * cm2K, "g_u": 47},
-    "22_21": {"Eup": 367.2780 * cm2K, "g_u": 43},
-    "22_22": {"Eup": 372.1119 * cm2K, "g_u": 45},
-    "23_24": {"Eup": 399.3762 * cm2K, "g_u": 49},
-    "23_22": {"Eup": 400.2398 * cm2K, "g_u": 45},
-    "23_23": {"Eup": 405.0827 * cm2K, "g_u": 47},
-    "24_25": {"Eup": 433.7804 * cm2K, "g_u": 51},
-    "24_23": {"Eup": 434.6312 * cm2K, "g_u": 47},
-    "24_24": {"Eup": 439.4820 * cm2K, "g_u": 49},
-    "25_26": {"Eup": 469.6115 * cm2K, "g_u": 53},
-    "25_24": {"Eup": 470.4514 * cm2K, "g_u": 49},
-    "25_25": {"Eup": 475.3091 * cm2K, "g_u": 51},
-    "26_27": {"Eup": 506.8689 * cm2K, "g_u": 55},
-    "26_25": {"Eup": 507.6996 * cm2K, "g_u": 51},
-    "26_26": {"Eup": 512.5632 * cm2K, "g_u": 53},
-    "27_28": {"Eup": 545.5520 * cm2K, "g_u": 57},
-    "27_26": {"Eup": 546.3750 * cm2K, "g_u": 53},
-    "27_27": {"Eup": 551.2437 * cm2K, "g_u": 55},
-    "28_29": {"Eup": 585.6602 * cm2K, "g_u": 59},
-    "28_27": {"Eup": 586.4767 * cm2K, "g_u": 55},
-    "28_28": {"Eup": 591.3499 * cm2K, "g_u": 57},
-    "29_30": {"Eup": 627.1926 * cm2K, "g_u": 61},
-    "29_28": {"Eup": 628.0040 * cm2K, "g_u": 57},
-    "29_29": {"Eup": 632.8809 * cm2K, "g_u": 59},
-    "30_31": {"Eup": 670.1486 * cm2K, "g_u": 63},
-    "30_29": {"Eup": 670.9559 * cm2K, "g_u": 59},
-    "30_30": {"Eup": 675.8360 * cm2K, "g_u": 61},
-}
-# full_index = np.arange(np.size(E_u_list))
-full_index = [key for key in SO_levels]
+#!LEVEL + ENERGIES(cm^-1) + WEIGHT  + N_J
+SO_level_table = [
+    (1, 0.0000, 1, "1_0"),
+    (2, 1.0007, 3, "0_1"),
+    (3, 3.0999, 5, "1_2"),
+    (4, 6.4122, 7, "2_3"),
+    (5, 10.5520, 3, "1_1"),
+    (6, 10.9871, 3, "2_1"),
+    (7, 11.0213, 9, "3_4"),
+    (8, 13.4238, 5, "2_2"),
+    (9, 14.6314, 5, "3_2"),
+    (10, 16.9790, 11, "4_5"),
+    (11, 17.7314, 7, "3_3"),
+    (12, 19.9341, 7, "4_3"),
+    (13, 23.4748, 9, "4_4"),
+    (14, 24.3157, 13, "5_6"),
+    (15, 26.8114, 9, "5_4"),
+    (16, 30.6538, 11, "5_5"),
+    (17, 33.0499, 15, "6_7"),
+    (18, 35.2114, 11, "6_5"),
+    (19, 39.2682, 13, "6_6"),
+    (20, 43.1928, 17, "7_8"),
+    (21, 45.1032, 13, "7_6"),
+    (22, 49.3181, 15, "7_7"),
+    (23, 54.7518, 19, "8_9"),
+    (24, 56.4683, 15, "8_7"),
+    (25, 60.8030, 17, "8_8"),
+    (26, 67.7314, 21, "9_10"),
+    (27, 69.2947, 17, "9_8"),
+    (28, 73.7229, 19, "9_9"),
+    (29, 82.1350, 23, "10_11"),
+    (30, 83.5749, 19, "10_9"),
+    (31, 88.0775, 21, "10_10"),
+    (32, 97.9646, 25, "11_12"),
+    (33, 99.3037, 21, "11_10"),
+    (34, 03.8665, 23, "11_11"),
+    (35, 115.2217, 27, "12_13"),
+    (36, 116.4774, 23, "12_11"),
+    (37, 121.0896, 25, "12_12"),
+    (38, 133.9073, 29, "13_14"),
+    (39, 135.0932, 25, "13_12"),
+    (40, 139.7465, 27, "13_13"),
+    (41, 154.0219, 31, "14_15"),
+    (42, 155.1490, 27, "14_13"),
+    (43, 159.8369, 29, "14_14"),
+    (44, 175.5660, 33, "15_16"),
+    (45, 176.6432, 29, "15_14"),
+    (46, 181.3602, 31, "15_15"),
+    (47, 198.5397, 35, "16_17"),
+    (48, 199.5743, 31, "16_15"),
+    (49, 204.3163, 33, "16_16"),
+    (50, 222.9432, 37, "17_18"),
+    (51, 223.9412, 33, "17_16"),
+    (52, 228.7045, 35, "17_17"),
+    (53, 248.7762, 39, "18_19"),
+    (54, 249.7428, 35, "18_17"),
+    (55, 254.5245, 37, "18_18"),
+    (56, 276.0386, 41, "19_20"),
+    (57, 276.9782, 37, "19_18"),
+    (58, 281.7758, 39, "19_19"),
+    (59, 304.7302, 43, "20_21"),
+    (60, 305.6464, 39, "20_19"),
+    (61, 310.4578, 41, "20_20"),
+    (62, 334.8506, 45, "21_22"),
+    (63, 335.7466, 41, "21_20"),
+    (64, 340.5700, 43, "21_21"),
+    (65, 366.3994, 47, "22_23"),
+    (66, 367.2780, 43, "22_21"),
+    (67, 372.1119, 45, "22_22"),
+    (68, 399.3762, 49, "23_24"),
+    (69, 400.2398, 45, "23_22"),
+    (70, 405.0827, 47, "23_23"),
+    (71, 433.7804, 51, "24_25"),
+    (72, 434.6312, 47, "24_23"),
+    (73, 439.4820, 49, "24_24"),
+    (74, 469.6115, 53, "25_26"),
+    (75, 470.4514, 49, "25_24"),
+    (76, 475.3091, 51, "25_25"),
+    (77, 506.8689, 55, "26_27"),
+    (78, 507.6996, 51, "26_25"),
+    (79, 512.5632, 53, "26_26"),
+    (80, 545.5520, 57, "27_28"),
+    (81, 546.3750, 53, "27_26"),
+    (82, 551.2437, 55, "27_27"),
+    (83, 585.6602, 59, "28_29"),
+    (84, 586.4767, 55, "28_27"),
+    (85, 591.3499, 57, "28_28"),
+    (86, 627.1926, 61, "29_30"),
+    (87, 628.0040, 57, "29_28"),
+    (88, 632.8809, 59, "29_29"),
+    (89, 670.1486, 63, "30_31"),
+    (90, 670.9559, 59, "30_29"),
+    (91, 675.8360, 61, "30_30"),
+]
+# level arrays, where the position in the array is the integer code of each N_J
+level_keys = np.array([level[3] for level in SO_level_table])
+level_code = {key: i for i, key in enumerate(level_keys.tolist())}
+gu_list = np.array([level[2] for level in SO_level_table], dtype=np.float64)
+E_u_list = np.array([level[1] for level in SO_level_table]) * cm2K.value
 
-line_list = {
-    full_index[2 - 1]
-    + "-"
-    + full_index[1 - 1]: {"A_ij": 2.361e-07, "freq": 30.0015800},
-    full_index[3 - 1]
-    + "-"
-    + full_index[2 - 1]: {"A_ij": 2.646e-06, "freq": 62.9318000},
-    full_index[4 - 1]
-    + "-"
-    + full_index[3 - 1]: {"A_ij": 1.125e-05, "freq": 99.2998700},
-    full_index[5 - 1]
-    + "-"
-    + full_index[1 - 1]: {"A_ij": 8.468e-08, "freq": 316.3416930},
-    full_index[5 - 1]
-    + "-"
-    + full_index[2 - 1]: {"A_ij": 1.403e-05, "freq": 286.3401520},
-    full_index[6 - 1]
-    + "-"
-    + full_index[1 - 1]: {"A_ij": 1.423e-05, "freq": 329.3854770},
-    full_index[6 - 1]
-    + "-"
-    + full_index[2 - 1]: {"A_ij": 1.203e-07, "freq": 299.3839573},
-    full_index[6 - 1]
-    + "-"
-    + full_index[3 - 1]: {"A_ij": 1.417e-06, "freq": 236.4522934},
-    full_index[6 - 1]
-    + "-"
-    + full_index[5 - 1]: {"A_ij": 2.911e-08, "freq": 13.0438070},
-    full_index[7 - 1]
-    + "-"
-    + full_index[4 - 1]: {"A_ij": 3.165e-05, "freq": 138.1786000},
-    full_index[8 - 1]
-    + "-"
-    + full_index[2 - 1]: {"A_ij": 8.575e-08, "freq": 372.4341073},
-    full_index[8 - 1]
-    + "-"
-    + full_index[3 - 1]: {"A_ij": 1.419e-05, "freq": 309.5024440},
-    full_index[8 - 1]
-    + "-"
-    + full_index[4 - 1]: {"A_ij": 2.843e-08, "freq": 210.2025571},
-    full_index[8 - 1]
-    + "-"
-    + full_index[5 - 1]: {"A_ij": 5.250e-06, "freq": 86.0939500},
-    full_index[9 - 1]
-    + "-"
-    + full_index[2 - 1]: {"A_ij": 1.583e-05, "freq": 408.6361383},
-    full_index[9 - 1]
-    + "-"
-    + full_index[3 - 1]: {"A_ij": 1.390e-07, "freq": 345.7044744},
-    full_index[9 - 1]
-    + "-"
-    + full_index[4 - 1]: {"A_ij": 1.007e-06, "freq": 246.4045881},
-    full_index[9 - 1]
-    + "-"
-    + full_index[6 - 1]: {"A_ij": 1.080e-05, "freq": 109.2522200},
-    full_index[9 - 1]
-    + "-"
-    + full_index[8 - 1]: {"A_ij": 1.942e-07, "freq": 36.2020220},
-    full_index[10 - 1]
-    + "-"
-    + full_index[7 - 1]: {"A_ij": 7.021e-05, "freq": 178.6054030},
-    full_index[11 - 1]
-    + "-"
-    + full_index[3 - 1]: {"A_ij": 8.999e-08, "freq": 438.6413448},
-    full_index[11 - 1]
-    + "-"
-    + full_index[4 - 1]: {"A_ij": 1.455e-05, "freq": 339.3414590},
-    full_index[11 - 1]
-    + "-"
-    + full_index[7 - 1]: {"A_ij": 2.751e-08, "freq": 201.1628047},
-    full_index[11 - 1]
-    + "-"
-    + full_index[8 - 1]: {"A_ij": 2.250e-05, "freq": 129.1389230},
-    full_index[12 - 1]
-    + "-"
-    + full_index[3 - 1]: {"A_ij": 1.595e-05, "freq": 504.6762856},
-    full_index[12 - 1]
-    + "-"
-    + full_index[4 - 1]: {"A_ij": 1.629e-07, "freq": 405.3763993},
-    full_index[12 - 1]
-    + "-"
-    + full_index[7 - 1]: {"A_ij": 7.117e-07, "freq": 267.1977455},
-    full_index[12 - 1]
-    + "-"
-    + full_index[9 - 1]: {"A_ij": 4.233e-05, "freq": 158.9718112},
-    full_index[12 - 1]
-    + "-"
-    + full_index[11 - 1]: {"A_ij": 5.509e-07, "freq": 66.0349400},
-    full_index[13 - 1]
-    + "-"
-    + full_index[4 - 1]: {"A_ij": 9.537e-08, "freq": 511.5228619},
-    full_index[13 - 1]
-    + "-"
-    + full_index[7 - 1]: {"A_ij": 1.508e-05, "freq": 373.3442081},
-    full_index[13 - 1]
-    + "-"
-    + full_index[10 - 1]: {"A_ij": 2.632e-08, "freq": 194.7388438},
-    full_index[13 - 1]
-    + "-"
-    + full_index[11 - 1]: {"A_ij": 5.833e-05, "freq": 172.1814034},
-    full_index[14 - 1]
-    + "-"
-    + full_index[10 - 1]: {"A_ij": 1.335e-04, "freq": 219.9494420},
-    full_index[15 - 1]
-    + "-"
-    + full_index[4 - 1]: {"A_ij": 1.507e-05, "freq": 611.5524120},
-    full_index[15 - 1]
-    + "-"
-    + full_index[7 - 1]: {"A_ij": 1.903e-07, "freq": 473.3737582},
-    full_index[15 - 1]
-    + "-"
-    + full_index[10 - 1]: {"A_ij": 5.326e-07, "freq": 294.7683939},
-    full_index[15 - 1]
-    + "-"
-    + full_index[12 - 1]: {"A_ij": 1.010e-04, "freq": 206.1760050},
-    full_index[15 - 1]
-    + "-"
-    + full_index[13 - 1]: {"A_ij": 1.083e-06, "freq": 100.0296400},
-    full_index[16 - 1]
-    + "-"
-    + full_index[7 - 1]: {"A_ij": 1.015e-07, "freq": 588.5648577},
-    full_index[16 - 1]
-    + "-"
-    + full_index[10 - 1]: {"A_ij": 1.575e-05, "freq": 409.9594934},
-    full_index[16 - 1]
-    + "-"
-    + full_index[13 - 1]: {"A_ij": 1.193e-04, "freq": 215.2206530},
-    full_index[16 - 1]
-    + "-"
-    + full_index[14 - 1]: {"A_ij": 2.524e-08, "freq": 190.0101048},
-    full_index[17 - 1]
-    + "-"
-    + full_index[14 - 1]: {"A_ij": 2.282e-04, "freq": 261.8437210},
-    full_index[18 - 1]
-    + "-"
-    + full_index[7 - 1]: {"A_ij": 1.384e-05, "freq": 725.1995176},
-    full_index[18 - 1]
-    + "-"
-    + full_index[10 - 1]: {"A_ij": 2.197e-07, "freq": 546.5941534},
-    full_index[18 - 1]
-    + "-"
-    + full_index[14 - 1]: {"A_ij": 4.200e-07, "freq": 326.6447648},
-    full_index[18 - 1]
-    + "-"
-    + full_index[15 - 1]: {"A_ij": 1.925e-04, "freq": 251.8257700},
-    full_index[18 - 1]
-    + "-"
-    + full_index[16 - 1]: {"A_ij": 1.749e-06, "freq": 136.6347990},
-    full_index[19 - 1]
-    + "-"
-    + full_index[10 - 1]: {"A_ij": 1.081e-07, "freq": 668.2153193},
-    full_index[19 - 1]
-    + "-"
-    + full_index[14 - 1]: {"A_ij": 1.651e-05, "freq": 448.2659307},
-    full_index[19 - 1]
-    + "-"
-    + full_index[16 - 1]: {"A_ij": 2.120e-04, "freq": 258.2558259},
-    full_index[19 - 1]
-    + "-"
-    + full_index[17 - 1]: {"A_ij": 2.433e-0, "freq": 186.4222261},
-    full_index[19 - 1]
-    + "-"
-    + full_index[18 - 1]: {"A_ij": 6.473e-09, "freq": 121.6211660},
-    full_index[20 - 1]
-    + "-"
-    + full_index[17 - 1]: {"A_ij": 3.609e-04, "freq": 304.0778440},
-    full_index[21 - 1]
-    + "-"
-    + full_index[10 - 1]: {"A_ij": 1.259e-05, "freq": 843.1442060},
-    full_index[21 - 1]
-    + "-"
-    + full_index[14 - 1]: {"A_ij": 2.505e-07, "freq": 623.1948174},
-    full_index[21 - 1]
-    + "-"
-    + full_index[17 - 1]: {"A_ij": 3.450e-07, "freq": 361.3511128},
-    full_index[21 - 1]
-    + "-"
-    + full_index[18 - 1]: {"A_ij": 3.229e-04, "freq": 296.5500640},
-    full_index[21 - 1]
-    + "-"
-    + full_index[19 - 1]: {"A_ij": 2.514e-06, "freq": 174.9288600},
-    full_index[22 - 1]
-    + "-"
-    + full_index[14 - 1]: {"A_ij": 1.152e-07, "freq": 749.5520491},
-    full_index[22 - 1]
-    + "-"
-    + full_index[17 - 1]: {"A_ij": 1.735e-05, "freq": 487.7083445},
-    full_index[22 - 1]
-    + "-"
-    + full_index[19 - 1]: {"A_ij": 3.429e-04, "freq": 301.2861240},
-    full_index[22 - 1]
-    + "-"
-    + full_index[20 - 1]: {"A_ij": 2.359e-08, "freq": 183.6304862},
-    full_index[22 - 1]
-    + "-"
-    + full_index[21 - 1]: {"A_ij": 7.465e-09, "freq": 126.3572317},
-    full_index[23 - 1]
-    + "-"
-    + full_index[20 - 1]: {"A_ij": 5.382e-04, "freq": 346.5284810},
-    full_index[24 - 1]
-    + "-"
-    + full_index[14 - 1]: {"A_ij": 1.143e-05, "freq": 963.9091039},
-    full_index[24 - 1]
-    + "-"
-    + full_index[17 - 1]: {"A_ij": 2.823e-07, "freq": 702.0653993},
-    full_index[24 - 1]
-    + "-"
-    + full_index[19 - 1]: {"A_ij": 2.521e-08, "freq": 515.6431731},
-    full_index[24 - 1]
-    + "-"
-    + full_index[20 - 1]: {"A_ij": 2.921e-07, "freq": 397.9875410},
-    full_index[24 - 1]
-    + "-"
-    + full_index[21 - 1]: {"A_ij": 4.985e-04, "freq": 340.7141550},
-    full_index[24 - 1]
-    + "-"
-    + full_index[22 - 1]: {"A_ij": 3.351e-06, "freq": 214.3570390},
-    full_index[25 - 1]
-    + "-"
-    + full_index[17 - 1]: {"A_ij": 1.226e-07, "freq": 832.0190575},
-    full_index[25 - 1]
-    + "-"
-    + full_index[20 - 1]: {"A_ij": 1.823e-05, "freq": 527.9411992},
-    full_index[25 - 1]
-    + "-"
-    + full_index[22 - 1]: {"A_ij": 5.186e-04, "freq": 344.3106120},
-    full_index[25 - 1]
-    + "-"
-    + full_index[23 - 1]: {"A_ij": 2.297e-08, "freq": 181.4126712},
-    full_index[25 - 1]
-    + "-"
-    + full_index[24 - 1]: {"A_ij": 8.274e-09, "freq": 129.9536582},
-    full_index[26 - 1]
-    + "-"
-    + full_index[23 - 1]: {"A_ij": 7.665e-04, "freq": 389.1209320},
-    full_index[27 - 1]
-    + "-"
-    + full_index[17 - 1]: {"A_ij": 1.042e-05, "freq": 1086.5926858},
-    full_index[27 - 1]
-    + "-"
-    + full_index[20 - 1]: {"A_ij": 3.146e-07, "freq": 782.5148275},
-    full_index[27 - 1]
-    + "-"
-    + full_index[22 - 1]: {"A_ij": 3.211e-08, "freq": 598.8843413},
-    full_index[27 - 1]
-    + "-"
-    + full_index[23 - 1]: {"A_ij": 2.532e-07, "freq": 435.9862996},
-    full_index[27 - 1]
-    + "-"
-    + full_index[24 - 1]: {"A_ij": 7.255e-04, "freq": 384.5272866},
-    full_index[27 - 1]
-    + "-"
-    + full_index[25 - 1]: {"A_ij": 4.239e-06, "freq": 254.5736284},
-    full_index[28 - 1]
-    + "-"
-    + full_index[20 - 1]: {"A_ij": 1.302e-07, "freq": 915.2699946},
-    full_index[28 - 1]
-    + "-"
-    + full_index[23 - 1]: {"A_ij": 1.916e-05, "freq": 568.7414667},
-    full_index[28 - 1]
-    + "-"
-    + full_index[25 - 1]: {"A_ij": 7.456e-04, "freq": 387.3287950},
-    full_index[28 - 1]
-    + "-"
-    + full_index[26 - 1]: {"A_ij": 2.246e-08, "freq": 179.6204980},
-    full_index[28 - 1]
-    + "-"
-    + full_index[27 - 1]: {"A_ij": 8.935e-09, "freq": 132.7551671},
-    full_index[29 - 1]
-    + "-"
-    + full_index[26 - 1]: {"A_ij": 1.053e-03, "freq": 431.8081960},
-    full_index[30 - 1]
-    + "-"
-    + full_index[20 - 1]: {"A_ij": 9.541e-06, "freq": 1210.6255742},
-    full_index[30 - 1]
-    + "-"
-    + full_index[23 - 1]: {"A_ij": 3.475e-07, "freq": 864.0970463},
-    full_index[30 - 1]
-    + "-"
-    + full_index[25 - 1]: {"A_ij": 3.934e-08, "freq": 682.6843751},
-    full_index[30 - 1]
-    + "-"
-    + full_index[26 - 1]: {"A_ij": 2.234e-07, "freq": 474.9760777},
-    full_index[30 - 1]
-    + "-"
-    + full_index[27 - 1]: {"A_ij": 1.011e-03, "freq": 428.1107467},
-    full_index[30 - 1]
-    + "-"
-    + full_index[28 - 1]: {"A_ij": 5.167e-06, "freq": 295.3556960},
-    full_index[31 - 1]
-    + "-"
-    + full_index[23 - 1]: {"A_ij": 1.380e-07, "freq": 999.0810184},
-    full_index[31 - 1]
-    + "-"
-    + full_index[26 - 1]: {"A_ij": 2.012e-05, "freq": 609.9600498},
-    full_index[31 - 1]
-    + "-"
-    + full_index[28 - 1]: {"A_ij": 1.030e-03, "freq": 430.3395440},
-    full_index[31 - 1]
-    + "-"
-    + full_index[29 - 1]: {"A_ij": 2.204e-08, "freq": 178.1518554},
-    full_index[31 - 1]
-    + "-"
-    + full_index[30 - 1]: {"A_ij": 9.482e-09, "freq": 134.9839721},
-    full_index[32 - 1]
-    + "-"
-    + full_index[29 - 1]: {"A_ij": 1.403e-03, "freq": 474.5596050},
-    full_index[33 - 1]
-    + "-"
-    + full_index[23 - 1]: {"A_ij": 8.777e-06, "freq": 1335.6348296},
-    full_index[33 - 1]
-    + "-"
-    + full_index[26 - 1]: {"A_ij": 3.806e-07, "freq": 946.5138609},
-    full_index[33 - 1]
-    + "-"
-    + full_index[28 - 1]: {"A_ij": 4.679e-08, "freq": 766.8933629},
-    full_index[33 - 1]
-    + "-"
-    + full_index[29 - 1]: {"A_ij": 1.999e-07, "freq": 514.7056665},
-    full_index[33 - 1]
-    + "-"
-    + full_index[30 - 1]: {"A_ij": 1.360e-03, "freq": 471.5378180},
-    full_index[33 - 1]
-    + "-"
-    + full_index[31 - 1]: {"A_ij": 6.125e-06, "freq": 336.5538112},
-    full_index[34 - 1]
-    + "-"
-    + full_index[26 - 1]: {"A_ij": 1.460e-07, "freq": 1083.3022174},
-    full_index[34 - 1]
-    + "-"
-    + full_index[29 - 1]: {"A_ij": 2.110e-05, "freq": 651.4940230},
-    full_index[34 - 1]
-    + "-"
-    + full_index[31 - 1]: {"A_ij": 1.379e-03, "freq": 473.3421677},
-    full_index[34 - 1]
-    + "-"
-    + full_index[32 - 1]: {"A_ij": 2.169e-08, "freq": 176.9344298},
-    full_index[34 - 1]
-    + "-"
-    + full_index[33 - 1]: {"A_ij": 9.935e-09, "freq": 136.7883565},
-    full_index[35 - 1]
-    + "-"
-    + full_index[32 - 1]: {"A_ij": 1.824e-03, "freq": 517.3545316},
-    full_index[36 - 1]
-    + "-"
-    + full_index[26 - 1]: {"A_ij": 8.114e-06, "freq": 1461.3676149},
-    full_index[36 - 1]
-    + "-"
-    + full_index[29 - 1]: {"A_ij": 4.140e-07, "freq": 1029.5594205},
-    full_index[36 - 1]
-    + "-"
-    + full_index[31 - 1]: {"A_ij": 5.444e-08, "freq": 851.4075651},
-    full_index[36 - 1]
-    + "-"
-    + full_index[32 - 1]: {"A_ij": 1.809e-07, "freq": 554.9998273},
-    full_index[36 - 1]
-    + "-"
-    + full_index[33 - 1]: {"A_ij": 1.780e-03, "freq": 514.8537539},
-    full_index[36 - 1]
-    + "-"
-    + full_index[34 - 1]: {"A_ij": 7.104e-06, "freq": 378.0653974},
-    full_index[37 - 1]
-    + "-"
-    + full_index[29 - 1]: {"A_ij": 1.540e-07, "freq": 1167.8298519},
-    full_index[37 - 1]
-    + "-"
-    + full_index[32 - 1]: {"A_ij": 2.209e-05, "freq": 693.2702588},
-    full_index[37 - 1]
-    + "-"
-    + full_index[34 - 1]: {"A_ij": 1.799e-03, "freq": 516.3358289},
-    full_index[37 - 1]
-    + "-"
-    + full_index[35 - 1]: {"A_ij": 2.139e-08, "freq": 175.9157271},
-    full_index[37 - 1]
-    + "-"
-    + full_index[36 - 1]: {"A_ij": 1.031e-08, "freq": 138.2704315},
-    full_index[38 - 1]
-    + "-"
-    + full_index[35 - 1]: {"A_ij": 2.323e-03, "freq": 560.1786500},
-    full_index[39 - 1]
-    + "-"
-    + full_index[29 - 1]: {"A_ij": 7.536e-06, "freq": 1587.6470627},
-    full_index[39 - 1]
-    + "-"
-    + full_index[32 - 1]: {"A_ij": 4.477e-07, "freq": 1113.0874695},
-    full_index[39 - 1]
-    + "-"
-    + full_index[34 - 1]: {"A_ij": 6.222e-08, "freq": 936.1530397},
-    full_index[39 - 1]
-    + "-"
-    + full_index[35 - 1]: {"A_ij": 1.651e-07, "freq": 595.7329379},
-    full_index[39 - 1]
-    + "-"
-    + full_index[36 - 1]: {"A_ij": 2.278e-03, "freq": 558.0876422},
-    full_index[39 - 1]
-    + "-"
-    + full_index[37 - 1]: {"A_ij": 8.102e-06, "freq": 419.8172108},
-    full_index[40 - 1]
-    + "-"
-    + full_index[32 - 1]: {"A_ij": 1.621e-07, "freq": 1252.5899799},
-    full_index[40 - 1]
-    + "-"
-    + full_index[35 - 1]: {"A_ij": 2.311e-05, "freq": 735.2354483},
-    full_index[40 - 1]
-    + "-"
-    + full_index[37 - 1]: {"A_ij": 2.297e-03, "freq": 559.3197212},
-    full_index[40 - 1]
-    + "-"
-    + full_index[38 - 1]: {"A_ij": 2.113e-08, "freq": 175.0567983},
-    full_index[40 - 1]
-    + "-"
-    + full_index[39 - 1]: {"A_ij": 1.064e-08, "freq": 139.5025104},
-    full_index[41 - 1]
-    + "-"
-    + full_index[38 - 1]: {"A_ij": 2.905e-03, "freq": 603.0216500},
-    full_index[42 - 1]
-    + "-"
-    + full_index[32 - 1]: {"A_ij": 7.030e-06, "freq": 1714.3459223},
-    full_index[42 - 1]
-    + "-"
-    + full_index[35 - 1]: {"A_ij": 4.815e-07, "freq": 1196.9913907},
-    full_index[42 - 1]
-    + "-"
-    + full_index[37 - 1]: {"A_ij": 7.012e-08, "freq": 1021.0756636},
-    full_index[42 - 1]
-    + "-"
-    + full_index[38 - 1]: {"A_ij": 1.520e-07, "freq": 636.8127407},
-    full_index[42 - 1]
-    + "-"
-    + full_index[39 - 1]: {"A_ij": 2.859e-03, "freq": 601.2584520},
-    full_index[42 - 1]
-    + "-"
-    + full_index[40 - 1]: {"A_ij": 9.113e-06, "freq": 461.7559424},
-    full_index[43 - 1]
-    + "-"
-    + full_index[35 - 1]: {"A_ij": 1.703e-07, "freq": 1337.5284784},
-    full_index[43 - 1]
-    + "-"
-    + full_index[38 - 1]: {"A_ij": 2.413e-05, "freq": 777.3498284},
-    full_index[43 - 1]
-    + "-"
-    + full_index[40 - 1]: {"A_ij": 2.878e-03, "freq": 602.2930210},
-    full_index[43 - 1]
-    + "-"
-    + full_index[41 - 1]: {"A_ij": 2.092e-08, "freq": 174.3281807},
-    full_index[43 - 1]
-    + "-"
-    + full_index[42 - 1]: {"A_ij": 1.091e-08, "freq": 140.5370877},
-    full_index[44 - 1]
-    + "-"
-    + full_index[41 - 1]: {"A_ij": 3.577e-03, "freq": 645.8759240},
-    full_index[45 - 1]
-    + "-"
-    + full_index[35 - 1]: {"A_ij": 6.583e-06, "freq": 1841.3703074},
-    full_index[45 - 1]
-    + "-"
-    + full_index[38 - 1]: {"A_ij": 5.154e-07, "freq": 1281.1916573},
-    full_index[45 - 1]
-    + "-"
-    + full_index[40 - 1]: {"A_ij": 7.811e-08, "freq": 1106.1348591},
-    full_index[45 - 1]
-    + "-"
-    + full_index[41 - 1]: {"A_ij": 1.407e-07, "freq": 678.1700097},
-    full_index[45 - 1]
-    + "-"
-    + full_index[42 - 1]: {"A_ij": 3.532e-03, "freq": 644.3789180},
-    full_index[45 - 1]
-    + "-"
-    + full_index[43 - 1]: {"A_ij": 1.013e-05, "freq": 503.8418290},
-    full_index[46 - 1]
-    + "-"
-    + full_index[38 - 1]: {"A_ij": 1.786e-07, "freq": 1422.6047695},
-    full_index[46 - 1]
-    + "-"
-    + full_index[41 - 1]: {"A_ij": 2.516e-05, "freq": 819.5831218},
-    full_index[46 - 1]
-    + "-"
-    + full_index[43 - 1]: {"A_ij": 3.550e-03, "freq": 645.2549330},
-    full_index[46 - 1]
-    + "-"
-    + full_index[44 - 1]: {"A_ij": 2.074e-08, "freq": 173.7072018},
-    full_index[46 - 1]
-    + "-"
-    + full_index[45 - 1]: {"A_ij": 1.115e-08, "freq": 141.4131122},
-    full_index[47 - 1]
-    + "-"
-    + full_index[44 - 1]: {"A_ij": 4.346e-03, "freq": 688.7357000},
-    full_index[48 - 1]
-    + "-"
-    + full_index[38 - 1]: {"A_ij": 6.186e-06, "freq": 1968.6493628},
-    full_index[48 - 1]
-    + "-"
-    + full_index[41 - 1]: {"A_ij": 5.494e-07, "freq": 1365.6277152},
-    full_index[48 - 1]
-    + "-"
-    + full_index[43 - 1]: {"A_ij": 8.619e-08, "freq": 1191.2995345},
-    full_index[48 - 1]
-    + "-"
-    + full_index[44 - 1]: {"A_ij": 1.311e-07, "freq": 719.7517951},
-    full_index[48 - 1]
-    + "-"
-    + full_index[45 - 1]: {"A_ij": 4.300e-03, "freq": 687.4576940},
-    full_index[48 - 1]
-    + "-"
-    + full_index[46 - 1]: {"A_ij": 1.116e-05, "freq": 546.0445933},
-    full_index[49 - 1]
-    + "-"
-    + full_index[41 - 1]: {"A_ij": 1.869e-07, "freq": 1507.7877617},
-    full_index[49 - 1]
-    + "-"
-    + full_index[44 - 1]: {"A_ij": 2.619e-05, "freq": 861.9118416},
-    full_index[49 - 1]
-    + "-"
-    + full_index[46 - 1]: {"A_ij": 4.317e-03, "freq": 688.2046300},
-    full_index[49 - 1]
-    + "-"
-    + full_index[47 - 1]: {"A_ij": 2.058e-08, "freq": 173.1761453},
-    full_index[49 - 1]
-    + "-"
-    + full_index[48 - 1]: {"A_ij": 1.135e-08, "freq": 142.1600465},
-    full_index[50 - 1]
-    + "-"
-    + full_index[47 - 1]: {"A_ij": 5.217e-03, "freq": 731.5964800},
-    full_index[51 - 1]
-    + "-"
-    + full_index[41 - 1]: {"A_ij": 5.833e-06, "freq": 2096.1285099},
-    full_index[51 - 1]
-    + "-"
-    + full_index[44 - 1]: {"A_ij": 5.836e-07, "freq": 1450.2525899},
-    full_index[51 - 1]
-    + "-"
-    + full_index[46 - 1]: {"A_ij": 9.433e-08, "freq": 1276.5453881},
-    full_index[51 - 1]
-    + "-"
-    + full_index[47 - 1]: {"A_ij": 1.226e-07, "freq": 761.5168935},
-    full_index[51 - 1]
-    + "-"
-    + full_index[48 - 1]: {"A_ij": 5.171e-03, "freq": 730.5007947},
-    full_index[51 - 1]
-    + "-"
-    + full_index[49 - 1]: {"A_ij": 1.220e-05, "freq": 588.3407482},
-    full_index[52 - 1]
-    + "-"
-    + full_index[44 - 1]: {"A_ij": 1.952e-07, "freq": 1593.0531532},
-    full_index[52 - 1]
-    + "-"
-    + full_index[47 - 1]: {"A_ij": 2.723e-05, "freq": 904.3174568},
-    full_index[52 - 1]
-    + "-"
-    + full_index[49 - 1]: {"A_ij": 5.188e-03, "freq": 731.1413115},
-    full_index[52 - 1]
-    + "-"
-    + full_index[50 - 1]: {"A_ij": 2.044e-08, "freq": 172.7209769},
-    full_index[52 - 1]
-    + "-"
-    + full_index[51 - 1]: {"A_ij": 1.152e-08, "freq": 142.8005633},
-    full_index[53 - 1]
-    + "-"
-    + full_index[50 - 1]: {"A_ij": 6.199e-03, "freq": 774.4546775},
-    full_index[54 - 1]
-    + "-"
-    + full_index[47 - 1]: {"A_ij": 6.177e-07, "freq": 1535.0292195},
-    full_index[54 - 1]
-    + "-"
-    + full_index[49 - 1]: {"A_ij": 1.025e-07, "freq": 1361.8530742},
-    full_index[54 - 1]
-    + "-"
-    + full_index[50 - 1]: {"A_ij": 1.152e-07, "freq": 803.4327395},
-    full_index[54 - 1]
-    + "-"
-    + full_index[51 - 1]: {"A_ij": 6.152e-03, "freq": 773.5123260},
-    full_index[54 - 1]
-    + "-"
-    + full_index[52 - 1]: {"A_ij": 1.325e-05, "freq": 630.7117627},
-    full_index[55 - 1]
-    + "-"
-    + full_index[47 - 1]: {"A_ij": 2.036e-07, "freq": 1678.3815983},
-    full_index[55 - 1]
-    + "-"
-    + full_index[50 - 1]: {"A_ij": 2.829e-05, "freq": 946.7851183},
-    full_index[55 - 1]
-    + "-"
-    + full_index[52 - 1]: {"A_ij": 6.169e-03, "freq": 774.0641414},
-    full_index[55 - 1]
-    + "-"
-    + full_index[53 - 1]: {"A_ij": 2.033e-08, "freq": 172.3304408},
-    full_index[55 - 1]
-    + "-"
-    + full_index[54 - 1]: {"A_ij": 1.167e-08, "freq": 143.3523788},
-    full_index[56 - 1]
-    + "-"
-    + full_index[53 - 1]: {"A_ij": 7.297e-03, "freq": 817.3073600},
-    full_index[57 - 1]
-    + "-"
-    + full_index[47 - 1]: {"A_ij": 5.229e-06, "freq": 2351.5243857},
-    full_index[57 - 1]
-    + "-"
-    + full_index[50 - 1]: {"A_ij": 6.521e-07, "freq": 1619.9279057},
-    full_index[57 - 1]
-    + "-"
-    + full_index[52 - 1]: {"A_ij": 1.108e-07, "freq": 1447.2069289},
-    full_index[57 - 1]
-    + "-"
-    + full_index[53 - 1]: {"A_ij": 1.086e-07, "freq": 845.4732283},
-    full_index[57 - 1]
-    + "-"
-    + full_index[54 - 1]: {"A_ij": 7.249e-03, "freq": 816.4951840},
-    full_index[57 - 1]
-    + "-"
-    + full_index[55 - 1]: {"A_ij": 1.430e-05, "freq": 673.1427874},
-    full_index[58 - 1]
-    + "-"
-    + full_index[50 - 1]: {"A_ij": 2.120e-07, "freq": 1763.7574331},
-    full_index[58 - 1]
-    + "-"
-    + full_index[53 - 1]: {"A_ij": 2.933e-05, "freq": 989.3027556},
-    full_index[58 - 1]
-    + "-"
-    + full_index[55 - 1]: {"A_ij": 7.265e-03, "freq": 816.9723280},
-    full_index[58 - 1]
-    + "-"
-    + full_index[56 - 1]: {"A_ij": 2.023e-08, "freq": 171.9954092},
-    full_index[58 - 1]
-    + "-"
-    + full_index[57 - 1]: {"A_ij": 1.181e-08, "freq": 143.8295274},
-    full_index[59 - 1]
-    + "-"
-    + full_index[56 - 1]: {"A_ij": 8.515e-03, "freq": 860.1520215},
-    full_index[60 - 1]
-    + "-"
-    + full_index[50 - 1]: {"A_ij": 4.969e-06, "freq": 2479.3791851},
-    full_index[60 - 1]
-    + "-"
-    + full_index[53 - 1]: {"A_ij": 6.864e-07, "freq": 1704.9245077},
-    full_index[60 - 1]
-    + "-"
-    + full_index[56 - 1]: {"A_ij": 1.028e-07, "freq": 887.6171613},
-    full_index[60 - 1]
-    + "-"
-    + full_index[57 - 1]: {"A_ij": 8.467e-03, "freq": 859.4512794},
-    full_index[60 - 1]
-    + "-"
-    + full_index[58 - 1]: {"A_ij": 1.535e-05, "freq": 715.6217520},
-    full_index[61 - 1]
-    + "-"
-    + full_index[53 - 1]: {"A_ij": 2.204e-07, "freq": 1849.1677723},
-    full_index[61 - 1]
-    + "-"
-    + full_index[56 - 1]: {"A_ij": 3.039e-05, "freq": 1031.8604259},
-    full_index[61 - 1]
-    + "-"
-    + full_index[58 - 1]: {"A_ij": 8.485e-03, "freq": 859.8650167},
-    full_index[61 - 1]
-    + "-"
-    + full_index[59 - 1]: {"A_ij": 2.014e-08, "freq": 171.7084044},
-    full_index[61 - 1]
-    + "-"
-    + full_index[60 - 1]: {"A_ij": 1.192e-08, "freq": 144.2432647},
-    full_index[62 - 1]
-    + "-"
-    + full_index[59 - 1]: {"A_ij": 9.864e-03, "freq": 902.9865820},
-    full_index[63 - 1]
-    + "-"
-    + full_index[53 - 1]: {"A_ij": 4.733e-06, "freq": 2607.3064857},
-    full_index[63 - 1]
-    + "-"
-    + full_index[56 - 1]: {"A_ij": 7.206e-07, "freq": 1789.9991393},
-    full_index[63 - 1]
-    + "-"
-    + full_index[59 - 1]: {"A_ij": 9.748e-08, "freq": 929.8471178},
-    full_index[63 - 1]
-    + "-"
-    + full_index[60 - 1]: {"A_ij": 9.817e-03, "freq": 902.3819640},
-    full_index[63 - 1]
-    + "-"
-    + full_index[61 - 1]: {"A_ij": 1.640e-05, "freq": 758.1387134},
-    full_index[64 - 1]
-    + "-"
-    + full_index[56 - 1]: {"A_ij": 2.289e-07, "freq": 1934.6018580},
-    full_index[64 - 1]
-    + "-"
-    + full_index[59 - 1]: {"A_ij": 3.144e-05, "freq": 1074.4498364},
-    full_index[64 - 1]
-    + "-"
-    + full_index[61 - 1]: {"A_ij": 9.831e-03, "freq": 902.7414190},
-    full_index[64 - 1]
-    + "-"
-    + full_index[62 - 1]: {"A_ij": 2.007e-08, "freq": 171.4632440},
-    full_index[64 - 1]
-    + "-"
-    + full_index[63 - 1]: {"A_ij": 1.202e-08, "freq": 144.6027186},
-    full_index[66 - 1]
-    + "-"
-    + full_index[56 - 1]: {"A_ij": 4.518e-06, "freq": 2735.2872367},
-    full_index[66 - 1]
-    + "-"
-    + full_index[59 - 1]: {"A_ij": 7.550e-07, "freq": 1875.1352152},
-    full_index[66 - 1]
-    + "-"
-    + full_index[62 - 1]: {"A_ij": 9.271e-08, "freq": 972.1486228},
-    full_index[66 - 1]
-    + "-"
-    + full_index[63 - 1]: {"A_ij": 1.130e-02, "freq": 945.2880974},
-    full_index[66 - 1]
-    + "-"
-    + full_index[64 - 1]: {"A_ij": 1.746e-05, "freq": 800.6853788},
-    full_index[67 - 1]
-    + "-"
-    + full_index[62 - 1]: {"A_ij": 3.250e-05, "freq": 1117.0639897},
-    full_index[67 - 1]
-    + "-"
-    + full_index[64 - 1]: {"A_ij": 1.131e-02, "freq": 945.6007457},
-    full_index[67 - 1]
-    + "-"
-    + full_index[65 - 1]: {"A_ij": 2.001e-08, "freq": 171.2547735},
-    full_index[67 - 1]
-    + "-"
-    + full_index[66 - 1]: {"A_ij": 1.211e-08, "freq": 144.9153669},
-    full_index[68 - 1]
-    + "-"
-    + full_index[65 - 1]: {"A_ij": 1.297e-02, "freq": 988.6182539},
-    full_index[69 - 1]
-    + "-"
-    + full_index[59 - 1]: {"A_ij": 4.320e-06, "freq": 2863.3053327},
-    full_index[69 - 1]
-    + "-"
-    + full_index[62 - 1]: {"A_ij": 7.895e-07, "freq": 1960.3187402},
-    full_index[69 - 1]
-    + "-"
-    + full_index[66 - 1]: {"A_ij": 1.292e-02, "freq": 988.1701175},
-    full_index[69 - 1]
-    + "-"
-    + full_index[67 - 1]: {"A_ij": 1.852e-05, "freq": 843.2547505},
-    full_index[70 - 1]
-    + "-"
-    + full_index[65 - 1]: {"A_ij": 3.356e-05, "freq": 1159.6969159},
-    full_index[70 - 1]
-    + "-"
-    + full_index[67 - 1]: {"A_ij": 1.293e-02, "freq": 988.4421425},
-    full_index[70 - 1]
-    + "-"
-    + full_index[68 - 1]: {"A_ij": 1.996e-08, "freq": 171.0786621},
-    full_index[70 - 1]
-    + "-"
-    + full_index[69 - 1]: {"A_ij": 1.219e-08, "freq": 145.1873920},
-    full_index[71 - 1]
-    + "-"
-    + full_index[68 - 1]: {"A_ij": 1.474e-02, "freq": 1031.4122130},
-    full_index[72 - 1]
-    + "-"
-    + full_index[62 - 1]: {"A_ij": 4.139e-06, "freq": 2991.3469909},
-    full_index[72 - 1]
-    + "-"
-    + full_index[65 - 1]: {"A_ij": 8.239e-07, "freq": 2045.5377746},
-    full_index[72 - 1]
-    + "-"
-    + full_index[69 - 1]: {"A_ij": 1.469e-02, "freq": 1031.0282490},
-    full_index[72 - 1]
-    + "-"
-    + full_index[70 - 1]: {"A_ij": 1.958e-05, "freq": 885.8408550},
-    full_index[73 - 1]
-    + "-"
-    + full_index[68 - 1]: {"A_ij": 3.462e-05, "freq": 1202.3434690},
-    full_index[73 - 1]
-    + "-"
-    + full_index[70 - 1]: {"A_ij": 1.471e-02, "freq": 1031.2648040},
-    full_index[73 - 1]
-    + "-"
-    + full_index[71 - 1]: {"A_ij": 1.992e-08, "freq": 170.9312452},
-    full_index[73 - 1]
-    + "-"
-    + full_index[72 - 1]: {"A_ij": 1.226e-08, "freq": 145.4239482},
-    full_index[74 - 1]
-    + "-"
-    + full_index[71 - 1]: {"A_ij": 1.666e-02, "freq": 1074.1897671},
-    full_index[75 - 1]
-    + "-"
-    + full_index[65 - 1]: {"A_ij": 3.971e-06, "freq": 3119.4002799},
-    full_index[75 - 1]
-    + "-"
-    + full_index[68 - 1]: {"A_ij": 8.584e-07, "freq": 2130.7820260},
-    full_index[75 - 1]
-    + "-"
-    + full_index[72 - 1]: {"A_ij": 1.662e-02, "freq": 1073.8625052},
-    full_index[75 - 1]
-    + "-"
-    + full_index[73 - 1]: {"A_ij": 2.064e-05, "freq": 928.4385570},
-    full_index[76 - 1]
-    + "-"
-    + full_index[71 - 1]: {"A_ij": 3.568e-05, "freq": 1244.9991686},
-    full_index[76 - 1]
-    + "-"
-    + full_index[73 - 1]: {"A_ij": 1.663e-02, "freq": 1074.0679234},
-    full_index[76 - 1]
-    + "-"
-    + full_index[74 - 1]: {"A_ij": 1.989e-08, "freq": 170.8094016},
-    full_index[77 - 1]
-    + "-"
-    + full_index[74 - 1]: {"A_ij": 1.875e-02, "freq": 1116.9496215},
-    full_index[78 - 1]
-    + "-"
-    + full_index[68 - 1]: {"A_ij": 3.815e-06, "freq": 3247.4547576},
-    full_index[78 - 1]
-    + "-"
-    + full_index[71 - 1]: {"A_ij": 8.929e-07, "freq": 2216.0425339},
-    full_index[78 - 1]
-    + "-"
-    + full_index[75 - 1]: {"A_ij": 1.870e-02, "freq": 1116.6727316},
-    full_index[78 - 1]
-    + "-"
-    + full_index[76 - 1]: {"A_ij": 2.170e-05, "freq": 971.0433652},
-    full_index[79 - 1]
-    + "-"
-    + full_index[74 - 1]: {"A_ij": 3.674e-05, "freq": 1287.6600780},
-    full_index[79 - 1]
-    + "-"
-    + full_index[76 - 1]: {"A_ij": 1.872e-02, "freq": 1116.8506765},
-    full_index[79 - 1]
-    + "-"
-    + full_index[77 - 1]: {"A_ij": 1.986e-08, "freq": 170.7104566},
-    full_index[80 - 1]
-    + "-"
-    + full_index[77 - 1]: {"A_ij": 2.100e-02, "freq": 1159.6906013},
-    full_index[81 - 1]
-    + "-"
-    + full_index[71 - 1]: {"A_ij": 3.671e-06, "freq": 3375.5011913},
-    full_index[81 - 1]
-    + "-"
-    + full_index[74 - 1]: {"A_ij": 9.275e-07, "freq": 2301.3114243},
-    full_index[81 - 1]
-    + "-"
-    + full_index[78 - 1]: {"A_ij": 2.095e-02, "freq": 1159.4586575},
-    full_index[81 - 1]
-    + "-"
-    + full_index[79 - 1]: {"A_ij": 2.277e-05, "freq": 1013.6513462},
-    full_index[82 - 1]
-    + "-"
-    + full_index[77 - 1]: {"A_ij": 3.780e-05, "freq": 1330.3227067},
-    full_index[82 - 1]
-    + "-"
-    + full_index[79 - 1]: {"A_ij": 2.096e-02, "freq": 1159.6122502},
-    full_index[83 - 1]
-    + "-"
-    + full_index[80 - 1]: {"A_ij": 2.342e-02, "freq": 1202.4115823},
-    full_index[84 - 1]
-    + "-"
-    + full_index[74 - 1]: {"A_ij": 3.537e-06, "freq": 3503.5313377},
-    full_index[84 - 1]
-    + "-"
-    + full_index[77 - 1]: {"A_ij": 9.620e-07, "freq": 2386.5817162},
-    full_index[84 - 1]
-    + "-"
-    + full_index[81 - 1]: {"A_ij": 2.338e-02, "freq": 1202.2199134},
-    full_index[84 - 1]
-    + "-"
-    + full_index[82 - 1]: {"A_ij": 2.383e-05, "freq": 1056.2590095},
-    full_index[85 - 1]
-    + "-"
-    + full_index[80 - 1]: {"A_ij": 3.887e-05, "freq": 1372.9839340},
-    full_index[85 - 1]
-    + "-"
-    + full_index[82 - 1]: {"A_ij": 2.339e-02, "freq": 1202.3518286},
-    full_index[86 - 1]
-    + "-"
-    + full_index[83 - 1]: {"A_ij": 2.602e-02, "freq": 1245.1111280},
-    full_index[87 - 1]
-    + "-"
-    + full_index[84 - 1]: {"A_ij": 2.598e-02, "freq": 1244.9555080},
-    full_index[87 - 1]
-    + "-"
-    + full_index[85 - 1]: {"A_ij": 2.489e-05, "freq": 1098.8632340},
-    full_index[88 - 1]
-    + "-"
-    + full_index[83 - 1]: {"A_ij": 3.993e-05, "freq": 1415.6409473},
-    full_index[88 - 1]
-    + "-"
-    + full_index[85 - 1]: {"A_ij": 2.599e-02, "freq": 1245.0678590},
-    full_index[89 - 1]
-    + "-"
-    + full_index[86 - 1]: {"A_ij": 2.881e-02, "freq": 1287.7892740},
-    full_index[90 - 1]
-    + "-"
-    + full_index[80 - 1]: {"A_ij": 3.295e-06, "freq": 3759.5137368},
-    full_index[90 - 1]
-    + "-"
-    + full_index[87 - 1]: {"A_ij": 2.876e-02, "freq": 1287.6670620},
-    full_index[90 - 1]
-    + "-"
-    + full_index[88 - 1]: {"A_ij": 2.596e-05, "freq": 1141.4612072},
-    full_index[91 - 1]
-    + "-"
-    + full_index[86 - 1]: {"A_ij": 4.098e-05, "freq": 1458.2911923},
-    full_index[91 - 1]
-    + "-"
-    + full_index[88 - 1]: {"A_ij": 2.877e-02, "freq": 1287.7617510},
+#!TRANS + UP + LOW + EINSTEINA(s^-1) + FREQ(GHz)
+SO_line_table = [
+    (2, 1, 2.361e-07, 30.0015800),
+    (3, 2, 2.646e-06, 62.9318000),
+    (4, 3, 1.125e-05, 99.2998700),
+    (5, 1, 8.468e-08, 316.3416930),
+    (5, 2, 1.403e-05, 286.3401520),
+    (6, 1, 1.423e-05, 329.3854770),
+    (6, 2, 1.203e-07, 299.3839573),
+    (6, 3, 1.417e-06, 236.4522934),
+    (6, 5, 2.911e-08, 13.0438070),
+    (7, 4, 3.165e-05, 138.1786000),
+    (8, 2, 8.575e-08, 372.4341073),
+    (8, 3, 1.419e-05, 309.5024440),
+    (8, 4, 2.843e-08, 210.2025571),
+    (8, 5, 5.250e-06, 86.0939500),
+    (9, 2, 1.583e-05, 408.6361383),
+    (9, 3, 1.390e-07, 345.7044744),
+    (9, 4, 1.007e-06, 246.4045881),
+    (9, 6, 1.080e-05, 109.2522200),
+    (9, 8, 1.942e-07, 36.2020220),
+    (10, 7, 7.021e-05, 178.6054030),
+    (11, 3, 8.999e-08, 438.6413448),
+    (11, 4, 1.455e-05, 339.3414590),
+    (11, 7, 2.751e-08, 201.1628047),
+    (11, 8, 2.250e-05, 129.1389230),
+    (12, 3, 1.595e-05, 504.6762856),
+    (12, 4, 1.629e-07, 405.3763993),
+    (12, 7, 7.117e-07, 267.1977455),
+    (12, 9, 4.233e-05, 158.9718112),
+    (12, 11, 5.509e-07, 66.0349400),
+    (13, 4, 9.537e-08, 511.5228619),
+    (13, 7, 1.508e-05, 373.3442081),
+    (13, 10, 2.632e-08, 194.7388438),
+    (13, 11, 5.833e-05, 172.1814034),
+    (14, 10, 1.335e-04, 219.9494420),
+    (15, 4, 1.507e-05, 611.5524120),
+    (15, 7, 1.903e-07, 473.3737582),
+    (15, 10, 5.326e-07, 294.7683939),
+    (15, 12, 1.010e-04, 206.1760050),
+    (15, 13, 1.083e-06, 100.0296400),
+    (16, 7, 1.015e-07, 588.5648577),
+    (16, 10, 1.575e-05, 409.9594934),
+    (16, 13, 1.193e-04, 215.2206530),
+    (16, 14, 2.524e-08, 190.0101048),
+    (17, 14, 2.282e-04, 261.8437210),
+    (18, 7, 1.384e-05, 725.1995176),
+    (18, 10, 2.197e-07, 546.5941534),
+    (18, 14, 4.200e-07, 326.6447648),
+    (18, 15, 1.925e-04, 251.8257700),
+    (18, 16, 1.749e-06, 136.6347990),
+    (19, 10, 1.081e-07, 668.2153193),
+    (19, 14, 1.651e-05, 448.2659307),
+    (19, 16, 2.120e-04, 258.2558259),
+    (19, 17, 2.433e-0, 186.4222261),
+    (19, 18, 6.473e-09, 121.6211660),
+    (20, 17, 3.609e-04, 304.0778440),
+    (21, 10, 1.259e-05, 843.1442060),
+    (21, 14, 2.505e-07, 623.1948174),
+    (21, 17, 3.450e-07, 361.3511128),
+    (21, 18, 3.229e-04, 296.5500640),
+    (21, 19, 2.514e-06, 174.9288600),
+    (22, 14, 1.152e-07, 749.5520491),
+    (22, 17, 1.735e-05, 487.7083445),
+    (22, 19, 3.429e-04, 301.2861240),
+    (22, 20, 2.359e-08, 183.6304862),
+    (22, 21, 7.465e-09, 126.3572317),
+    (23, 20, 5.382e-04, 346.5284810),
+    (24, 14, 1.143e-05, 963.9091039),
+    (24, 17, 2.823e-07, 702.0653993),
+    (24, 19, 2.521e-08, 515.6431731),
+    (24, 20, 2.921e-07, 397.9875410),
+    (24, 21, 4.985e-04, 340.7141550),
+    (24, 22, 3.351e-06, 214.3570390),
+    (25, 17, 1.226e-07, 832.0190575),
+    (25, 20, 1.823e-05, 527.9411992),
+    (25, 22, 5.186e-04, 344.3106120),
+    (25, 23, 2.297e-08, 181.4126712),
+    (25, 24, 8.274e-09, 129.9536582),
+    (26, 23, 7.665e-04, 389.1209320),
+    (27, 17, 1.042e-05, 1086.5926858),
+    (27, 20, 3.146e-07, 782.5148275),
+    (27, 22, 3.211e-08, 598.8843413),
+    (27, 23, 2.532e-07, 435.9862996),
+    (27, 24, 7.255e-04, 384.5272866),
+    (27, 25, 4.239e-06, 254.5736284),
+    (28, 20, 1.302e-07, 915.2699946),
+    (28, 23, 1.916e-05, 568.7414667),
+    (28, 25, 7.456e-04, 387.3287950),
+    (28, 26, 2.246e-08, 179.6204980),
+    (28, 27, 8.935e-09, 132.7551671),
+    (29, 26, 1.053e-03, 431.8081960),
+    (30, 20, 9.541e-06, 1210.6255742),
+    (30, 23, 3.475e-07, 864.0970463),
+    (30, 25, 3.934e-08, 682.6843751),
+    (30, 26, 2.234e-07, 474.9760777),
+    (30, 27, 1.011e-03, 428.1107467),
+    (30, 28, 5.167e-06, 295.3556960),
+    (31, 23, 1.380e-07, 999.0810184),
+    (31, 26, 2.012e-05, 609.9600498),
+    (31, 28, 1.030e-03, 430.3395440),
+    (31, 29, 2.204e-08, 178.1518554),
+    (31, 30, 9.482e-09, 134.9839721),
+    (32, 29, 1.403e-03, 474.5596050),
+    (33, 23, 8.777e-06, 1335.6348296),
+    (33, 26, 3.806e-07, 946.5138609),
+    (33, 28, 4.679e-08, 766.8933629),
+    (33, 29, 1.999e-07, 514.7056665),
+    (33, 30, 1.360e-03, 471.5378180),
+    (33, 31, 6.125e-06, 336.5538112),
+    (34, 26, 1.460e-07, 1083.3022174),
+    (34, 29, 2.110e-05, 651.4940230),
+    (34, 31, 1.379e-03, 473.3421677),
+    (34, 32, 2.169e-08, 176.9344298),
+    (34, 33, 9.935e-09, 136.7883565),
+    (35, 32, 1.824e-03, 517.3545316),
+    (36, 26, 8.114e-06, 1461.3676149),
+    (36, 29, 4.140e-07, 1029.5594205),
+    (36, 31, 5.444e-08, 851.4075651),
+    (36, 32, 1.809e-07, 554.9998273),
+    (36, 33, 1.780e-03, 514.8537539),
+    (36, 34, 7.104e-06, 378.0653974),
+    (37, 29, 1.540e-07, 1167.8298519),
+    (37, 32, 2.209e-05, 693.2702588),
+    (37, 34, 1.799e-03, 516.3358289),
+    (37, 35, 2.139e-08, 175.9157271),
+    (37, 36, 1.031e-08, 138.2704315),
+    (38, 35, 2.323e-03, 560.1786500),
+    (39, 29, 7.536e-06, 1587.6470627),
+    (39, 32, 4.477e-07, 1113.0874695),
+    (39, 34, 6.222e-08, 936.1530397),
+    (39, 35, 1.651e-07, 595.7329379),
+    (39, 36, 2.278e-03, 558.0876422),
+    (39, 37, 8.102e-06, 419.8172108),
+    (40, 32, 1.621e-07, 1252.5899799),
+    (40, 35, 2.311e-05, 735.2354483),
+    (40, 37, 2.297e-03, 559.3197212),
+    (40, 38, 2.113e-08, 175.0567983),
+    (40, 39, 1.064e-08, 139.5025104),
+    (41, 38, 2.905e-03, 603.0216500),
+    (42, 32, 7.030e-06, 1714.3459223),
+    (42, 35, 4.815e-07, 1196.9913907),
+    (42, 37, 7.012e-08, 1021.0756636),
+    (42, 38, 1.520e-07, 636.8127407),
+    (42, 39, 2.859e-03, 601.2584520),
+    (42, 40, 9.113e-06, 461.7559424),
+    (43, 35, 1.703e-07, 1337.5284784),
+    (43, 38, 2.413e-05, 777.3498284),
+    (43, 40, 2.878e-03, 602.2930210),
+    (43, 41, 2.092e-08, 174.3281807),
+    (43, 42, 1.091e-08, 140.5370877),
+    (44, 41, 3.577e-03, 645.8759240),
+    (45, 35, 6.583e-06, 1841.3703074),
+    (45, 38, 5.154e-07, 1281.1916573),
+    (45, 40, 7.811e-08, 1106.1348591),
+    (45, 41, 1.407e-07, 678.1700097),
+    (45, 42, 3.532e-03, 644.3789180),
+    (45, 43, 1.013e-05, 503.8418290),
+    (46, 38, 1.786e-07, 1422.6047695),
+    (46, 41, 2.516e-05, 819.5831218),
+    (46, 43, 3.550e-03, 645.2549330),
+    (46, 44, 2.074e-08, 173.7072018),
+    (46, 45, 1.115e-08, 141.4131122),
+    (47, 44, 4.346e-03, 688.7357000),
+    (48, 38, 6.186e-06, 1968.6493628),
+    (48, 41, 5.494e-07, 1365.6277152),
+    (48, 43, 8.619e-08, 1191.2995345),
+    (48, 44, 1.311e-07, 719.7517951),
+    (48, 45, 4.300e-03, 687.4576940),
+    (48, 46, 1.116e-05, 546.0445933),
+    (49, 41, 1.869e-07, 1507.7877617),
+    (49, 44, 2.619e-05, 861.9118416),
+    (49, 46, 4.317e-03, 688.2046300),
+    (49, 47, 2.058e-08, 173.1761453),
+    (49, 48, 1.135e-08, 142.1600465),
+    (50, 47, 5.217e-03, 731.5964800),
+    (51, 41, 5.833e-06, 2096.1285099),
+    (51, 44, 5.836e-07, 1450.2525899),
+    (51, 46, 9.433e-08, 1276.5453881),
+    (51, 47, 1.226e-07, 761.5168935),
+    (51, 48, 5.171e-03, 730.5007947),
+    (51, 49, 1.220e-05, 588.3407482),
+    (52, 44, 1.952e-07, 1593.0531532),
+    (52, 47, 2.723e-05, 904.3174568),
+    (52, 49, 5.188e-03, 731.1413115),
+    (52, 50, 2.044e-08, 172.7209769),
+    (52, 51, 1.152e-08, 142.8005633),
+    (53, 50, 6.199e-03, 774.4546775),
+    (54, 47, 6.177e-07, 1535.0292195),
+    (54, 49, 1.025e-07, 1361.8530742),
+    (54, 50, 1.152e-07, 803.4327395),
+    (54, 51, 6.152e-03, 773.5123260),
+    (54, 52, 1.325e-05, 630.7117627),
+    (55, 47, 2.036e-07, 1678.3815983),
+    (55, 50, 2.829e-05, 946.7851183),
+    (55, 52, 6.169e-03, 774.0641414),
+    (55, 53, 2.033e-08, 172.3304408),
+    (55, 54, 1.167e-08, 143.3523788),
+    (56, 53, 7.297e-03, 817.3073600),
+    (57, 47, 5.229e-06, 2351.5243857),
+    (57, 50, 6.521e-07, 1619.9279057),
+    (57, 52, 1.108e-07, 1447.2069289),
+    (57, 53, 1.086e-07, 845.4732283),
+    (57, 54, 7.249e-03, 816.4951840),
+    (57, 55, 1.430e-05, 673.1427874),
+    (58, 50, 2.120e-07, 1763.7574331),
+    (58, 53, 2.933e-05, 989.3027556),
+    (58, 55, 7.265e-03, 816.9723280),
+    (58, 56, 2.023e-08, 171.9954092),
+    (58, 57, 1.181e-08, 143.8295274),
+    (59, 56, 8.515e-03, 860.1520215),
+    (60, 50, 4.969e-06, 2479.3791851),
+    (60, 53, 6.864e-07, 1704.9245077),
+    (60, 56, 1.028e-07, 887.6171613),
+    (60, 57, 8.467e-03, 859.4512794),
+    (60, 58, 1.535e-05, 715.6217520),
+    (61, 53, 2.204e-07, 1849.1677723),
+    (61, 56, 3.039e-05, 1031.8604259),
+    (61, 58, 8.485e-03, 859.8650167),
+    (61, 59, 2.014e-08, 171.7084044),
+    (61, 60, 1.192e-08, 144.2432647),
+    (62, 59, 9.864e-03, 902.9865820),
+    (63, 53, 4.733e-06, 2607.3064857),
+    (63, 56, 7.206e-07, 1789.9991393),
+    (63, 59, 9.748e-08, 929.8471178),
+    (63, 60, 9.817e-03, 902.3819640),
+    (63, 61, 1.640e-05, 758.1387134),
+    (64, 56, 2.289e-07, 1934.6018580),
+    (64, 59, 3.144e-05, 1074.4498364),
+    (64, 61, 9.831e-03, 902.7414190),
+    (64, 62, 2.007e-08, 171.4632440),
+    (64, 63, 1.202e-08, 144.6027186),
+    (66, 56, 4.518e-06, 2735.2872367),
+    (66, 59, 7.550e-07, 1875.1352152),
+    (66, 62, 9.271e-08, 972.1486228),
+    (66, 63, 1.130e-02, 945.2880974),
+    (66, 64, 1.746e-05, 800.6853788),
+    (67, 62, 3.250e-05, 1117.0639897),
+    (67, 64, 1.131e-02, 945.6007457),
+    (67, 65, 2.001e-08, 171.2547735),
+    (67, 66, 1.211e-08, 144.9153669),
+    (68, 65, 1.297e-02, 988.6182539),
+    (69, 59, 4.320e-06, 2863.3053327),
+    (69, 62, 7.895e-07, 1960.3187402),
+    (69, 66, 1.292e-02, 988.1701175),
+    (69, 67, 1.852e-05, 843.2547505),
+    (70, 65, 3.356e-05, 1159.6969159),
+    (70, 67, 1.293e-02, 988.4421425),
+    (70, 68, 1.996e-08, 171.0786621),
+    (70, 69, 1.219e-08, 145.1873920),
+    (71, 68, 1.474e-02, 1031.4122130),
+    (72, 62, 4.139e-06, 2991.3469909),
+    (72, 65, 8.239e-07, 2045.5377746),
+    (72, 69, 1.469e-02, 1031.0282490),
+    (72, 70, 1.958e-05, 885.8408550),
+    (73, 68, 3.462e-05, 1202.3434690),
+    (73, 70, 1.471e-02, 1031.2648040),
+    (73, 71, 1.992e-08, 170.9312452),
+    (73, 72, 1.226e-08, 145.4239482),
+    (74, 71, 1.666e-02, 1074.1897671),
+    (75, 65, 3.971e-06, 3119.4002799),
+    (75, 68, 8.584e-07, 2130.7820260),
+    (75, 72, 1.662e-02, 1073.8625052),
+    (75, 73, 2.064e-05, 928.4385570),
+    (76, 71, 3.568e-05, 1244.9991686),
+    (76, 73, 1.663e-02, 1074.0679234),
+    (76, 74, 1.989e-08, 170.8094016),
+    (77, 74, 1.875e-02, 1116.9496215),
+    (78, 68, 3.815e-06, 3247.4547576),
+    (78, 71, 8.929e-07, 2216.0425339),
+    (78, 75, 1.870e-02, 1116.6727316),
+    (78, 76, 2.170e-05, 971.0433652),
+    (79, 74, 3.674e-05, 1287.6600780),
+    (79, 76, 1.872e-02, 1116.8506765),
+    (79, 77, 1.986e-08, 170.7104566),
+    (80, 77, 2.100e-02, 1159.6906013),
+    (81, 71, 3.671e-06, 3375.5011913),
+    (81, 74, 9.275e-07, 2301.3114243),
+    (81, 78, 2.095e-02, 1159.4586575),
+    (81, 79, 2.277e-05, 1013.6513462),
+    (82, 77, 3.780e-05, 1330.3227067),
+    (82, 79, 2.096e-02, 1159.6122502),
+    (83, 80, 2.342e-02, 1202.4115823),
+    (84, 74, 3.537e-06, 3503.5313377),
+    (84, 77, 9.620e-07, 2386.5817162),
+    (84, 81, 2.338e-02, 1202.2199134),
+    (84, 82, 2.383e-05, 1056.2590095),
+    (85, 80, 3.887e-05, 1372.9839340),
+    (85, 82, 2.339e-02, 1202.3518286),
+    (86, 83, 2.602e-02, 1245.1111280),
+    (87, 84, 2.598e-02, 1244.9555080),
+    (87, 85, 2.489e-05, 1098.8632340),
+    (88, 83, 3.993e-05, 1415.6409473),
+    (88, 85, 2.599e-02, 1245.0678590),
+    (89, 86, 2.881e-02, 1287.7892740),
+    (90, 80, 3.295e-06, 3759.5137368),
+    (90, 87, 2.876e-02, 1287.6670620),
+    (90, 88, 2.596e-05, 1141.4612072),
+    (91, 86, 4.098e-05, 1458.2911923),
+    (91, 88, 2.877e-02, 1287.7617510),
+]
+line_dtype = np.dtype(
+    [("up", np.intp), ("low", np.intp), ("A_ul", np.float64), ("freq", np.float64)]
+)
+# transition table, with the upper and lower levels given as integer codes
+lines = np.array(
+    [(up - 1, low - 1, A_ul, freq) for up, low, A_ul, freq in SO_line_table],
+    dtype=line_dtype,
+)
+line_code = {
+    level_keys[up] + "-" + level_keys[low]: i
+    for i, (up, low) in enumerate(zip(lines["up"], lines["low"]))
 }
-line_index = [key for key in line_list]
+
+# string-key lookup layer (SO_levels and line_list are built on first access)
+full_index = level_keys.tolist()
+line_index = list(line_code)
+SO = Species(
+    "SO",
+    gu_list,
+    E_u_list,
+    freq=lines["freq"],
+    A_ul=lines["A_ul"],
+    upper=lines["up"],
+    keys=line_index,
+    lower=lines["low"],
+)
+Q_SO_table = SO.Q_table
+
+
+def __getattr__(name: str):
+    """
+    Builds the SO_levels and line_list dictionaries when first requested,
+    so that importing the module does not create them.
+    """
+    if name == "SO_levels":
+        value = {
+            key: {"Eup": E_u_list[i] * u.K, "g_u": int(gu_list[i])}  # type: ignore
+            for i, key in enumerate(full_index)
+        }
+    elif name == "line_list":
+        value = {
+            key: {"A_ij": lines["A_ul"][i], "freq": lines["freq"][i]}
+            for key, i in line_code.items()
+        }
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def level_codes(
+    index: str | int | list[str] | NDArray[np.int_],
+) -> int | NDArray[np.intp]:
+    """
+    Converts N_J level keys (e.g., '2_1') into the integer codes used to index
+    the level arrays. Integer codes are returned unchanged.
+
+    Parameters
+    ----------
+    index : str | int | list[str] | NDArray[np.int_]
+        The N_J key(s) or integer code(s) of the level(s).
+    Returns
+    -------
+    int | NDArray[np.intp]
+        The integer code(s) of the level(s).
+    """
+    if isinstance(index, str):
+        return level_code[index]
+    index = np.asarray(index)
+    if index.dtype.kind in "US":
+        return np.array([level_code[key] for key in index.ravel()]).reshape(index.shape)
+    return index
 
 
 def Q_SO_i(
-    index: str | list[str],
+    index: str | int | list[str] | NDArray[np.int_],
     Tex: u.K = 5 * u.K,  # type: ignore
 ) -> float | NDArray:
     """
@@ -1015,27 +497,40 @@ def Q_SO_i(
 
     Parameters
     ----------
-    index : int
-        The index of the energy level.
+    index : str | int | list[str] | NDArray[np.int_]
+        The N_J key(s) or integer code(s) of the energy level(s).
     Tex : u.K
         The excitation temperature.
     Returns
     -------
-    float
-        The occupancy of the level.
+    float | NDArray
+        The occupancy of the level(s).
     """
-    if type(index) == str:
-        return (SO_levels[index]["g_u"] * np.exp(-SO_levels[index]["Eup"] / Tex)).value
-    else:
-        Q_SO_index = np.zeros_like(index, dtype=float)
-        for i, index_i in enumerate(index):
-            Q_SO_index[i] = Q_SO_i(index_i, Tex=Tex)
-        return Q_SO_index
+    code = level_codes(index)
+    return gu_list[code] * np.exp(-E_u_list[code] / u.Quantity(Tex, u.K).value)
 
 
 @u.quantity_input
-def check_Tex(Tex: u.K) -> bool:  # type: ignore
-    if np.isnan(Tex) or (Tex <= 0.0 * u.K):  # type: ignore
+def check_Tex(Tex: u.K) -> bool | NDArray[np.bool_]:  # type: ignore
+    """
+    Checks for invalid excitation temperatures (NaN or Tex <= 0 K).
+    For a single temperature a warning message is printed, while for an
+    array (e.g., a Tex map) the mask of invalid values is returned silently.
+
+    Parameters
+    ----------
+    Tex : u.K
+        The excitation temperature(s).
+
+    Returns
+    -------
+    bool | NDArray[np.bool_]
+        True where the excitation temperature is invalid.
+    """
+    bad = np.isnan(Tex) | (Tex <= 0.0 * u.K)  # type: ignore
+    if np.ndim(bad) > 0:
+        return bad
+    if bad:
         print("The excitation temperature is lower than the CMB temperature of 2.73 K")
         print("or the excitation temperature is lower than 0 K")
         return True
@@ -1044,7 +539,7 @@ def check_Tex(Tex: u.K) -> bool:  # type: ignore
 
 
 @u.quantity_input
-def Q_SO(Tex: u.K = 5 * u.K) -> float:  # type: ignore
+def Q_SO(Tex: u.K = 5 * u.K, tabulated: bool = False) -> float:  # type: ignore
     """
     It returns the particion function for SO with an excitation
     temperature.
@@ -1056,25 +551,19 @@ def Q_SO(Tex: u.K = 5 * u.K) -> float:  # type: ignore
     ----------
     Tex : u.K
         The excitation temperature.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_SO_table
+        instead of summing over all levels.
     Returns
     -------
     float
         The partition function.
     """
-    if Tex.size == 1:
-        if check_Tex(Tex):
-            return np.nan
-        else:
-            return np.sum(Q_SO_i(full_index, Tex=Tex))
-    else:
-        Q_SO_all = np.zeros_like(Tex.value)
-        # for i in range(Tex.size):
-        for i, Trot_i in np.ndenumerate(Tex):
-            if np.isnan(Tex[i]):
-                Q_SO_all[i] = np.nan
-            else:
-                Q_SO_all[i] = np.sum(Q_SO_i(full_index, Tex=Tex[i]))
-        return Q_SO_all
+    if (Tex.ndim == 0) and check_Tex(Tex):
+        return np.nan
+    if tabulated:
+        return Q_SO_table(Tex.to_value(u.K))  # type: ignore
+    return level_sum(gu_list, E_u_list, Tex.to_value(u.K))  # type: ignore
 
 
 @u.quantity_input
@@ -1110,11 +599,12 @@ def SO_thin_Nu_Rot(
         The column density/(level degeneracy) of the upper energy level, and the upper energy level if requested.
     """
     N_J = N_J_up + "-" + N_J_low
-    if N_J in line_index:
-        freq = line_list[N_J]["freq"] * u.GHz  # type: ignore
-        A_ul = line_list[N_J]["A_ij"] / u.s  # type: ignore
-        E_up = SO_levels[N_J_up]["Eup"] * u.K  # type: ignore
-        g_up = SO_levels[N_J_up]["g_u"]
+    if N_J in line_code:
+        line = lines[line_code[N_J]]
+        freq = line["freq"] * u.GHz  # type: ignore
+        A_ul = line["A_ul"] / u.s  # type: ignore
+        E_up = E_u_list[line["up"]] * u.K  # type: ignore
+        g_up = gu_list[line["up"]]
     else:
         print("Transition {0} is not available".format(N_J))
         return np.nan * u.cm**-2  # type: ignore
@@ -1158,9 +648,10 @@ def SO_thin(
         The total column density in units of cm^-2.
     """
     N_J = N_J_up + "-" + N_J_low
-    if N_J in line_index:
-        freq = line_list[N_J]["freq"] * u.GHz  # type: ignore
-        A_ul = line_list[N_J]["A_ij"] / u.s  # type: ignore
+    if N_J in line_code:
+        line = lines[line_code[N_J]]
+        freq = line["freq"] * u.GHz  # type: ignore
+        A_ul = line["A_ul"] / u.s  # type: ignore
     else:
         print("Transition {0} is not available".format(N_J))
         return np.nan * u.cm**-2  # type: ignore
@@ -1171,9 +662,226 @@ def SO_thin(
         (8 * np.pi * freq**3 / c**3)
         * Q_SO(Tex=Tex)
         / A_ul
-        / Q_SO_i(N_J_up, Tex=Tex)
+        / Q_SO_i(line["up"], Tex=Tex)
         / (np.exp((h * freq / k_B / Tex).decompose().value) - 1)
         * TdV
         / (Jex - Jbg)
     )
     return Ncol
+
+
+def SO_thin_np(
+    N_J_up: str | ArrayLike = "2_1",
+    N_J_low: str | ArrayLike = "1_1",
+    Tex: ArrayLike = 5.0,
+    TdV: ArrayLike = 1.0,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free version of SO_thin, for float arrays in fixed units.
+    Gives the same values as SO_thin, without the overhead of astropy
+    units. Unavailable transitions return NaN.
+    Tex, TdV and T_bg can be maps (arrays) of any broadcastable shapes
+    (map mode): pixels where Tex is NaN, Tex <= 0 or Tex <= T_bg return
+    NaN, without printing.
+
+    Parameters
+    ----------
+    N_J_up : str | ArrayLike
+        The upper level of the transition, or an array of upper levels to
+        evaluate several transitions at once.
+    N_J_low : str | ArrayLike
+        The lower level of the transition (or levels).
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    TdV : ArrayLike
+        The integrated intensity of the transition, in K km/s. For several
+        transitions, the stack of TdV maps with the transitions along the
+        first axis.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_SO_table.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    N_J = np.char.add(np.char.add(N_J_up, "-"), N_J_low)
+    return SO.thin(N_J, Tex, TdV, T_bg, tabulated=tabulated)
+
+
+def SO_thick_np(
+    N_J_up: str | ArrayLike = "2_1",
+    N_J_low: str | ArrayLike = "1_1",
+    Tex: ArrayLike = 5.0,
+    tau: ArrayLike = 1.0,
+    sigma_v: ArrayLike | None = None,
+    TdV: ArrayLike | None = None,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free column density from the optically thick SO N_J_up - N_J_low transition, in map mode.
+    Takes either (tau, sigma_v) or (TdV, tau), see lte.Species.thick.
+    Tex, tau, sigma_v, TdV and T_bg can be maps (arrays) of broadcastable
+    shapes, and pixels with an invalid Tex return NaN. Unavailable transitions return NaN.
+
+    Parameters
+    ----------
+    N_J_up : str | ArrayLike
+        The upper level of the transition, or an array of upper levels to
+        evaluate several transitions at once.
+    N_J_low : str | ArrayLike
+        The lower level of the transition (or levels).
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    tau : ArrayLike
+        The optical depth at the line peak.
+    sigma_v : ArrayLike, optional
+        The velocity dispersion of the line, in km/s.
+    TdV : ArrayLike, optional
+        The integrated intensity of the transition, in K km/s.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_SO_table.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    N_J = np.char.add(np.char.add(N_J_up, "-"), N_J_low)
+    return SO.thick(N_J, Tex, tau, sigma_v, TdV, T_bg, tabulated=tabulated)
+
+
+def SO_transitions(
+    N_J_up: str | ArrayLike, N_J_low: str | ArrayLike
+) -> int | NDArray[np.intp]:
+    """
+    Returns the index (in lines) of the SO N_J_up - N_J_low transition(s).
+
+    Raises
+    ------
+    ValueError
+        If any of the transitions is not available.
+    """
+    N_J = np.char.add(np.char.add(N_J_up, "-"), N_J_low)
+    index = SO.transitions(N_J)
+    if np.any(index < 0):
+        missing = ", ".join(np.atleast_1d(N_J)[np.atleast_1d(index) < 0])
+        raise ValueError("Transitions {0} are not available".format(missing))
+    return index
+
+
+def SO_thin_Nu_Rot_np(
+    N_J_up: str | ArrayLike, N_J_low: str | ArrayLike, TdV: ArrayLike
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """
+    Unit-free version of SO_thin_Nu_Rot for several transitions and maps:
+    the N_u/g_u values (in cm^-2) of K transitions from a stack of K TdV
+    maps (in K km/s), computed in a single pass, and the E_up (in K) of
+    each transition.
+
+    Parameters
+    ----------
+    N_J_up : str | ArrayLike
+        The upper levels of the K transitions.
+    N_J_low : str | ArrayLike
+        The lower levels of the K transitions.
+    TdV : ArrayLike
+        The integrated intensities, in K km/s, with shape (K, ...).
+
+    Returns
+    -------
+    tuple[NDArray[np.float64], NDArray[np.float64]]
+        N_u/g_u with the shape of TdV, and E_up with shape (K,).
+    """
+    index = SO_transitions(N_J_up, N_J_low)
+    return upper_columns(SO, index, TdV), SO.E_up[index]
+
+
+def SO_rotation_diagram(
+    N_J_up: ArrayLike,
+    N_J_low: ArrayLike,
+    TdV: ArrayLike,
+    TdV_err: ArrayLike | None = None,
+    tabulated: bool = False,
+) -> tuple[NDArray[np.float64], ...]:
+    """
+    Rotation diagram of K SO transitions, fitted for every pixel of a stack
+    of TdV maps at once (see rotation_diagram.rotation_diagram).
+
+    Parameters
+    ----------
+    N_J_up : ArrayLike
+        The upper levels of the K transitions, e.g., ['2_3', '3_4'].
+    N_J_low : ArrayLike
+        The lower levels of the K transitions, e.g., ['1_2', '2_3'].
+    TdV : ArrayLike
+        The integrated intensities, in K km/s, with shape (K, ...).
+    TdV_err : ArrayLike, optional
+        The uncertainties of TdV, in K km/s. If not given, the uncertainties
+        of the results are estimated from the scatter of the fit.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_SO_table.
+
+    Returns
+    -------
+    tuple[NDArray[np.float64], ...]
+        The maps of T_rot (K), N_tot (cm^-2), and their uncertainties.
+    """
+    index = SO_transitions(N_J_up, N_J_low)
+    return rotation_diagram(SO, index, TdV, TdV_err, tabulated=tabulated)
+
+
+def SO_population_diagram(
+    N_J_up: ArrayLike,
+    N_J_low: ArrayLike,
+    TdV: ArrayLike,
+    sigma_v: ArrayLike,
+    TdV_err: ArrayLike | None = None,
+    rtol: float = 1e-4,
+    max_iter: int = 50,
+    tabulated: bool = False,
+) -> tuple[NDArray[np.float64], ...]:
+    """
+    Opacity-corrected population diagram of K SO transitions, iterated for
+    every pixel of a stack of TdV maps at once
+    (see rotation_diagram.population_diagram).
+
+    Parameters
+    ----------
+    N_J_up : ArrayLike
+        The upper levels of the K transitions, e.g., ['2_3', '3_4'].
+    N_J_low : ArrayLike
+        The lower levels of the K transitions, e.g., ['1_2', '2_3'].
+    TdV : ArrayLike
+        The integrated intensities, in K km/s, with shape (K, ...).
+    sigma_v : ArrayLike
+        The velocity dispersion of the lines, in km/s, broadcastable with TdV.
+    TdV_err : ArrayLike, optional
+        The uncertainties of TdV, in K km/s.
+    rtol : float
+        The relative change of T_rot and N_tot below which a pixel has
+        converged.
+    max_iter : int
+        The maximum number of iterations.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_SO_table.
+
+    Returns
+    -------
+    tuple[NDArray[np.float64], ...]
+        The maps of T_rot (K), N_tot (cm^-2), and their uncertainties, the
+        opacities of the K lines, and the map of converged pixels.
+    """
+    index = SO_transitions(N_J_up, N_J_low)
+    return population_diagram(
+        SO, index, TdV, sigma_v, TdV_err, rtol, max_iter, tabulated
+    )
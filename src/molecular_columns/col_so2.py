@@ -1,66 +1,43 @@
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
 import astropy.units as u
 from astropy.constants import c, k_B, h  # type: ignore
+from .catalog import load_catalog, read_lamda
 from .common_functions import J_nu
-
-from importlib.resources import files
+from .lte import Species, match_errors
+from .partition_function import level_sum
 
 
 # g_u, E_u, and A_ul values obtained from LAMBDA database
 def extract_from_lambda(filename):
-    # Read the content from the file
-    file_mol = files("molecular_columns").joinpath(filename)
-    f = open(str(file_mol), "r")
-    # Read the content line by line
-    lines = f.readlines()
-    f.close()
-
-    # Make an empty dictionary for J_Kp_Ko, E_u (cm-1), and g_u values
-    level_dict = {"E_u": [], "g_u": []}
-    # Make an empty dictionary for frequency (GHz), A_ul, and E_u (K) values
-    trans_dict = {"freq": [], "A_ul": [], "E_u": [], "upper_level_no": []}
-
-    # Extract WEIGHT values
-    i = 0
-    n_levels = 0
-    n_lines_skip = 5  # number of lines to skip at the beginning
-    for line in lines:
-        if i == n_lines_skip:
-            n_levels = int(line.split()[0])  # number of energy levels
-        if line == "!NUMBER OF COLL PARTNERS":
-            break
-        parts = line.split()
-        if line[0] == "!":
-            pass
-        else:
-            if len(parts) == 4:  # LEVEL + ENERGIES(cm^-1) + WEIGHT + J_Ka_Kc
-                try:
-                    energy = float(parts[1])
-                    level_dict["E_u"].append(energy)
-                    weight = float(parts[2])
-                    level_dict["g_u"].append(weight)
-                except ValueError:
-                    pass  # Skip lines that don't contain valid numbers
-            if i > n_lines_skip:
-                if i > n_levels + n_lines_skip:
-                    if (
-                        len(parts) == 8
-                    ):  # TRANS + UP + LOW + EINSTEINA(s^-1) + FREQ(GHz) + E_u(K) +?+?
-                        try:
-                            upper_level_no = int(parts[1])
-                            trans_dict["upper_level_no"].append(upper_level_no)
-                            einsteinA = float(parts[3])
-                            trans_dict["A_ul"].append(einsteinA)
-                            freq = float(parts[4])
-                            trans_dict["freq"].append(freq)
-                            upper_level_energy = float(parts[5])
-                            trans_dict["E_u"].append(upper_level_energy)
-
-                        except ValueError:
-                            pass
-        i += 1
+    """
+    Returns the energy levels and radiative transitions of a LAMDA file.
+    The file is parsed once, and later calls use the binary catalog cache.
 
+    Parameters
+    ----------
+    filename : str
+        The name of the LAMDA file.
+    Returns
+    -------
+    level_dict : dict
+        The 'J_Kp_Ko' labels, 'E_u' (cm^-1) and 'g_u' of the energy levels.
+    trans_dict : dict
+        The 'freq' (GHz), 'A_ul' (s^-1), 'E_u' (K) and 'upper_level_no' of
+        the radiative transitions.
+    """
+    catalog = load_catalog(filename, read_lamda)
+    level_dict = {
+        "J_Kp_Ko": catalog["level_label"],
+        "E_u": catalog["level_E_u"],
+        "g_u": catalog["level_g_u"],
+    }
+    trans_dict = {
+        "freq": catalog["line_freq"],
+        "A_ul": catalog["line_A_ul"],
+        "E_u": catalog["line_E_u"],
+        "upper_level_no": catalog["line_upper"],
+    }
     return level_dict, trans_dict
 
 
@@ -70,6 +47,16 @@ E_u_list = (np.array(level_dict["E_u"]) * (h * c / k_B) / u.cm).to(u.K)  # type:
 
 
 full_index = np.arange(np.size(E_u_list))
+SO2 = Species(
+    "SO2",
+    gu_list,
+    E_u_list.to_value(u.K),  # type: ignore
+    freq=trans_dict["freq"],
+    A_ul=trans_dict["A_ul"],
+    upper=trans_dict["upper_level_no"] - 1,
+    keys=trans_dict["freq"],
+)
+Q_SO2_table = SO2.Q_table
 
 
 @u.quantity_input
@@ -99,6 +86,7 @@ def Q_SO2_i(
 @u.quantity_input
 def Q_SO2(
     Tex: u.K = 5 * u.K,  # type: ignore
+    tabulated: bool = False,
 ) -> float | NDArray[np.float64]:
     """
     It returns the partition function for para-CO with an excitation
@@ -108,18 +96,19 @@ def Q_SO2(
     ----------
     Tex : u.K
         The excitation temperature.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_SO2_table
+        instead of summing over all levels.
     Returns
     -------
     Q_CO_all : float
         The partition function.
     """
-    if Tex.size == 1:
-        return np.sum(Q_SO2_i(full_index, Tex=Tex))
+    if tabulated:
+        Q = Q_SO2_table(Tex.to_value(u.K))  # type: ignore
     else:
-        Q_SO2_all = np.zeros_like(Tex.value)
-        for i in range(Tex.size):
-            Q_SO2_all[i] = np.sum(Q_SO2_i(full_index, Tex=Tex[i]))
-        return Q_SO2_all
+        Q = level_sum(gu_list, E_u_list.to_value(u.K), Tex.to_value(u.K))  # type: ignore
+    return Q * u.dimensionless_unscaled
 
 
 @u.quantity_input
@@ -149,10 +138,10 @@ def SO2_thin(
     Ncol : u.cm**-2
         The column density.
     """
-    trans_index = np.where(np.round(trans_dict["freq"], 3) == np.round(freq.value, 3))[
-        0
-    ][0]
-
+    trans_index = SO2.find(freq.to_value(u.GHz))  # type: ignore
+    if trans_index < 0:
+        print("The frequency {0} {1}".format(freq, match_errors[trans_index]))
+        return np.nan * u.cm**-2  # type: ignore
     A_ul = trans_dict["A_ul"][trans_index] / u.s  # type: ignore
     upper_level_no = trans_dict["upper_level_no"][trans_index]  # new
     upper_level_index = upper_level_no - 1  # new
@@ -168,3 +157,101 @@ def SO2_thin(
         / (Jex - Jbg)
     )
     return Ncol
+
+
+def SO2_thin_np(
+    freq: float | ArrayLike = 219.1426745,
+    Tex: ArrayLike = 5.0,
+    TdV: ArrayLike = 1.0,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+    tol_MHz: float = 0.5,
+    tol_kms: float | None = None,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free version of SO2_thin, for float arrays in fixed units.
+    Gives the same values as SO2_thin, without the overhead of astropy
+    units. The transitions are matched by frequency within tol_MHz (or
+    tol_kms), and frequencies without a unique match return NaN.
+    Tex, TdV and T_bg can be maps (arrays) of any broadcastable shapes
+    (map mode): pixels where Tex is NaN, Tex <= 0 or Tex <= T_bg return
+    NaN, without printing.
+
+    Parameters
+    ----------
+    freq : float | ArrayLike
+        The frequency of the transition, in GHz, or an array of frequencies
+        to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    TdV : ArrayLike
+        The integrated intensity of the transition, in K km/s. For several
+        transitions, the stack of TdV maps with the transitions along the
+        first axis.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_SO2_table.
+    tol_MHz : float
+        The tolerance of the frequency match, in MHz.
+    tol_kms : float, optional
+        The tolerance of the frequency match, in km/s, used instead of tol_MHz.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    index = SO2.find(freq, tol_MHz=tol_MHz, tol_kms=tol_kms)
+    return SO2.thin_index(index, Tex, TdV, T_bg, tabulated=tabulated)
+
+
+def SO2_thick_np(
+    freq: float | ArrayLike = 219.1426745,
+    Tex: ArrayLike = 5.0,
+    tau: ArrayLike = 1.0,
+    sigma_v: ArrayLike | None = None,
+    TdV: ArrayLike | None = None,
+    T_bg: ArrayLike = 2.73,
+    tabulated: bool = False,
+    tol_MHz: float = 0.5,
+    tol_kms: float | None = None,
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free column density from the optically thick SO2 transition, in map mode.
+    Takes either (tau, sigma_v) or (TdV, tau), see lte.Species.thick.
+    Tex, tau, sigma_v, TdV and T_bg can be maps (arrays) of broadcastable
+    shapes, and pixels with an invalid Tex return NaN. Frequencies without a unique transition (see
+    lte.Species.find) return NaN.
+
+    Parameters
+    ----------
+    freq : float | ArrayLike
+        The frequency of the transition, in GHz, or an array of frequencies
+        to evaluate several transitions at once.
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    tau : ArrayLike
+        The optical depth at the line peak.
+    sigma_v : ArrayLike, optional
+        The velocity dispersion of the line, in km/s.
+    TdV : ArrayLike, optional
+        The integrated intensity of the transition, in K km/s.
+    T_bg : ArrayLike
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_SO2_table.
+    tol_MHz : float
+        The tolerance of the frequency match, in MHz.
+    tol_kms : float, optional
+        The tolerance of the frequency match, in km/s, used instead of tol_MHz.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs
+        (with the transitions along the first axis, for several transitions).
+    """
+    index = SO2.find(freq, tol_MHz=tol_MHz, tol_kms=tol_kms)
+    return SO2.thick_index(index, Tex, tau, sigma_v, TdV, T_bg, tabulated=tabulated)
@@ -3,6 +3,8 @@ import astropy.units as u
 from astropy.constants import k_B, h  # type: ignore
 from numpy.typing import NDArray
 
+from . import lte
+
 
 @u.quantity_input
 def J_nu(Tex: u.K = 5 * u.K, freq: u.GHz = 100 * u.GHz) -> u.K:  # type: ignore
@@ -37,18 +39,11 @@ def c_tau(tau: float | Sequence[float]) -> float | NDArray[np.float64]:
     c : float | list[float]
         The correction factor for the optical depth.
     """
-    # tau = np.asarray(tau)
     tau_array = np.asarray(tau, dtype=np.float64)  # Ensure tau is a float array
-
-    if tau_array.ndim == 0:
-        tau_array = tau_array[np.newaxis]  # Makes x 1D
-        scalar_input = True
-    else:
-        scalar_input = False
-    c = tau_array / (1 - np.exp(-tau_array))
-    bad = (tau_array <= 0) | (np.isnan(tau_array))
-    c[bad] = np.nan
-    return float(np.squeeze(c)) if scalar_input else c
+    # NaN and tau <= 0 fail the comparison and give NaN
+    with np.errstate(divide="ignore", invalid="ignore"):
+        c = np.where(tau_array > 0, tau_array / -np.expm1(-tau_array), np.nan)
+    return float(c) if c.ndim == 0 else c
 
 
 @u.quantity_input
@@ -60,6 +55,9 @@ def tau_nu(
 ) -> float | NDArray[np.float64]:
     """
     Calculate the optical depth of a line given the peak temperature of the line.
+    Tex, Tbg, freq and Tp can be arrays (e.g., maps) of broadcastable shapes,
+    and invalid pixels (Tex <= Tbg, NaN, or a saturated line) return NaN.
+    For a single Tex lower than Tbg a ValueError is raised.
     Parameters
     ----------
     Tex : u.K
@@ -72,11 +70,49 @@ def tau_nu(
         The peak temperature of the line.
     Returns
     -------
-    tau : float
+    tau : float | NDArray[np.float64]
         The optical depth of the line.
     """
-    if (Tex.value == 0) | np.isnan(Tex):
-        return np.nan
-    if Tex < Tbg:
-        raise ValueError("Tex must be larger than Tbg")
-    return -np.log(1 - Tp / (J_nu(Tex=Tex, freq=freq) - J_nu(Tex=Tbg, freq=freq)))
+    if (np.ndim(Tex) == 0) and (np.ndim(Tbg) == 0) and (Tex.value != 0):
+        if Tex < Tbg:
+            raise ValueError("Tex must be larger than Tbg")
+    return lte.tau_nu(
+        Tex.to_value(u.K),  # type: ignore
+        Tp.to_value(u.K),  # type: ignore
+        freq.to_value(u.GHz),  # type: ignore
+        Tbg.to_value(u.K),  # type: ignore
+    )
+
+
+@u.quantity_input
+def Tex_from_peak(
+    Tp=1 * u.K,  # type: ignore
+    freq=100 * u.GHz,  # type: ignore
+    Tbg=2.73 * u.K,  # type: ignore
+) -> u.K:  # type: ignore
+    """
+    Calculate the excitation temperature of an optically thick line from its
+    peak temperature, Tp = J_nu(Tex) - J_nu(Tbg), by inverting J_nu.
+    Tp, freq and Tbg can be arrays (e.g., maps) of broadcastable shapes, and
+    non-physical pixels (Tp + J_nu(Tbg) <= 0, or NaN) return NaN.
+    Parameters
+    ----------
+    Tp : u.K
+        The peak temperature of the line.
+    freq : u.GHz
+        The frequency of the line.
+    Tbg : u.K
+        The background temperature.
+    Returns
+    -------
+    Tex : u.K
+        The excitation temperature of the line.
+    """
+    return (
+        lte.Tex_from_peak(
+            Tp.to_value(u.K),  # type: ignore
+            freq.to_value(u.GHz),  # type: ignore
+            Tbg.to_value(u.K),  # type: ignore
+        )
+        * u.K  # type: ignore
+    )
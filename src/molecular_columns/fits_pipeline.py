@@ -0,0 +1,198 @@
+import os
+from collections.abc import Callable
+from contextlib import ExitStack
+
+import numpy as np
+from astropy.io import fits
+from numpy.typing import ArrayLike, NDArray
+
+from .monte_carlo import propagate
+
+# maximum number of pixels read, processed and written at once
+chunk_elements = 2**20
+# header cards of the inputs that do not apply to the float64 outputs
+scaling_cards = ("BSCALE", "BZERO", "BLANK", "BUNIT", "CHECKSUM", "DATASUM")
+
+
+def _image_hdu(hdul: fits.HDUList, ext: int | str | None = None) -> fits.ImageHDU:
+    """
+    Returns the HDU ext of a FITS file, or its first HDU with image data.
+    """
+    if ext is not None:
+        return hdul[ext]
+    for hdu in hdul:
+        if hdu.is_image and hdu.header.get("NAXIS", 0) > 0:
+            return hdu
+    raise ValueError(f"{hdul.filename()} does not contain any image")
+
+
+def _read_rows(hdu: fits.ImageHDU, rows: tuple[slice, ...]) -> NDArray[np.float64]:
+    """
+    Reads a chunk of rows (see process_fits) of a memory-mapped image opened
+    with do_not_scale_image_data, and applies BSCALE, BZERO and BLANK to
+    this chunk only.
+    """
+    raw = hdu.data[rows]
+    chunk = raw.astype(np.float64)
+    header = hdu.header
+    if "BLANK" in header and raw.dtype.kind in "iu":
+        chunk[raw == header["BLANK"]] = np.nan
+    bscale, bzero = header.get("BSCALE", 1.0), header.get("BZERO", 0.0)
+    if bscale != 1.0:
+        chunk *= bscale
+    if bzero != 0.0:
+        chunk += bzero
+    return chunk
+
+
+def output_header(header: fits.Header, bunit: str = "cm-2") -> fits.Header:
+    """
+    Header of a float64 primary image with the same shape and WCS as the
+    image described by header (from a primary or an extension HDU).
+
+    Parameters
+    ----------
+    header : fits.Header
+        The header of the input image.
+    bunit : str
+        The unit of the output image.
+
+    Returns
+    -------
+    fits.Header
+        The output header.
+    """
+    header = header.copy()
+    for card in scaling_cards + ("XTENSION", "PCOUNT", "GCOUNT", "EXTNAME"):
+        header.remove(card, ignore_missing=True, remove_all=True)
+    if "SIMPLE" not in header:
+        header.insert(0, ("SIMPLE", True))
+    header["BITPIX"] = -64
+    header["BUNIT"] = bunit
+    return header
+
+
+def process_fits(
+    function: Callable,
+    inputs: dict[str, str | os.PathLike | ArrayLike],
+    output: str | os.PathLike,
+    errors: dict[str, str | os.PathLike | ArrayLike] | None = None,
+    error_output: str | os.PathLike | None = None,
+    ext: int | str | None = None,
+    overwrite: bool = False,
+    n_samples: int = 200,
+    seed: int | None = 0,
+    **kwargs,
+) -> None:
+    """
+    Streams FITS images through a unit-free column density function (e.g.,
+    col_c18o.C18O_thin_np or col_so.SO_thin_np) and writes the column
+    density image to a FITS file, with the header (and WCS) of the first
+    input image.
+
+    The input images are memory-mapped and processed in chunks of rows
+    (along the slowest FITS axis longer than 1, so that degenerate axes
+    such as NAXIS4 = 1 are skipped) of at most ``chunk_elements`` pixels,
+    and each chunk of the result is appended to the output file as soon as
+    it is computed, so that the memory used is bounded by the chunk size
+    rather than the image size. Inputs with BSCALE/BZERO/BLANK are scaled
+    per chunk.
+
+    Optionally, the uncertainties of some inputs (e.g., TdV) are propagated
+    by Monte Carlo (see monte_carlo.propagate) and the standard deviation
+    of the column density is written to a second FITS file.
+
+    Parameters
+    ----------
+    function : Callable
+        The function, called with the chunks of the inputs as keyword
+        arguments, e.g., TdV and Tex.
+    inputs : dict[str, str | os.PathLike | ArrayLike]
+        The inputs of function: FITS file names (images in the units
+        expected by function, e.g., K km/s and K), or values (e.g., a
+        constant T_bg) that broadcast with the images.
+    output : str | os.PathLike
+        The FITS file of the column density (in cm^-2).
+    errors : dict[str, str | os.PathLike | ArrayLike], optional
+        The standard deviations of some inputs, as FITS file names or values.
+    error_output : str | os.PathLike, optional
+        The FITS file of the standard deviation of the column density,
+        required if errors are given.
+    ext : int | str, optional
+        The HDU of the input files, by default their first image HDU.
+    overwrite : bool
+        If True, existing output files are overwritten.
+    n_samples : int
+        The number of Monte Carlo draws per pixel for the errors.
+    seed : int, optional
+        The seed of the random generator of the errors.
+    **kwargs
+        The other (scalar) arguments of function, e.g., J_up=2.
+    """
+    errors = {} if errors is None else errors
+    unknown = set(errors) - set(inputs)
+    if unknown:
+        raise ValueError(f"The inputs {unknown} have errors but no values")
+    if errors and error_output is None:
+        raise ValueError("error_output is needed to write the errors")
+    outputs = [output] + ([error_output] if errors else [])
+    for file_name in outputs:
+        if os.path.exists(file_name) and not overwrite:
+            raise OSError(f"File {file_name} already exists")
+
+    with ExitStack() as stack:
+        images, values = {}, {}
+        for group, items in (("values", inputs), ("errors", errors)):
+            for key, value in items.items():
+                if isinstance(value, (str, os.PathLike)):
+                    hdul = stack.enter_context(
+                        fits.open(value, memmap=True, do_not_scale_image_data=True)
+                    )
+                    images[group, key] = _image_hdu(hdul, ext)
+                else:
+                    values[group, key] = np.asarray(value, dtype=np.float64)
+        if not images:
+            raise ValueError("At least one input must be a FITS file")
+        reference = next(iter(images.values()))
+        shape = reference.data.shape
+        for (_, key), hdu in images.items():
+            if hdu.data.shape != shape:
+                raise ValueError(f"The image of {key} does not have the shape {shape}")
+
+        header = output_header(reference.header)
+        name = getattr(function, "__name__", repr(function))
+        header.add_history(f"molecular_columns: {name}")
+        # the previous outputs are only removed once the inputs are valid
+        for file_name in outputs:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+        streams = [fits.StreamingHDU(file_name, header) for file_name in outputs]
+        for stream in streams:
+            stack.callback(stream.close)
+
+        # the chunks are contiguous in the file, along the first axis longer
+        # than 1 (the leading axes of length 1 are kept whole)
+        axis = next((i for i, n in enumerate(shape) if n > 1), len(shape) - 1)
+        n_rows = max(1, chunk_elements // max(1, int(np.prod(shape[axis + 1 :]))))
+        for start in range(0, shape[axis], n_rows):
+            rows = (slice(None),) * axis + (slice(start, start + n_rows),)
+            chunk = {"values": {}, "errors": {}}
+            for (group, key), hdu in images.items():
+                chunk[group][key] = _read_rows(hdu, rows)
+            for (group, key), value in values.items():
+                # maps with the shape of the images are sliced like them
+                chunk[group][key] = value[rows] if value.shape == shape else value
+            n_chunk = min(n_rows, shape[axis] - start)
+            chunk_shape = shape[:axis] + (n_chunk,) + shape[axis + 1 :]
+            Ncol = function(**chunk["values"], **kwargs)
+            streams[0].write(np.broadcast_to(Ncol, chunk_shape).astype(np.float64))
+            if errors:
+                result = propagate(
+                    function,
+                    chunk["values"],
+                    chunk["errors"],
+                    n_samples=n_samples,
+                    seed=None if seed is None else seed + start,
+                    **kwargs,
+                )
+                streams[1].write(result["std"])
@@ -0,0 +1,88 @@
+from collections.abc import Callable
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+
+def is_dask(*values) -> bool:
+    """
+    True if any of the values is a dask array. dask is an optional
+    dependency, and is not imported here.
+    """
+    return any(type(value).__module__.startswith("dask.array") for value in values)
+
+
+def _evaluate_block(
+    *blocks: NDArray,
+    function: Callable,
+    keys: list[str],
+    constants: dict,
+) -> NDArray[np.float64]:
+    """
+    Evaluates function on a block of each of the map inputs, and returns a
+    block with their broadcast shape.
+    """
+    result = np.asarray(function(**dict(zip(keys, blocks)), **constants))
+    shape = np.broadcast_shapes(*[block.shape for block in blocks])
+    if result.shape != shape:
+        result = np.array(np.broadcast_to(result, shape))
+    return result
+
+
+def map_blocks(
+    function: Callable,
+    inputs: dict[str, ArrayLike],
+    dtype: type = np.float64,
+    **kwargs,
+):
+    """
+    Lazy, block-wise evaluation of a unit-free map function (e.g.,
+    col_dcn.DCN_thin_np, or Species.thin_index for a transition) on dask
+    arrays, with dask.array.map_blocks. Nothing is computed until the
+    result is computed, and each block is evaluated independently, so
+    maps larger than the memory can be processed out-of-core by any dask
+    scheduler.
+
+    The registered species (see registry) are pickled by name, so that
+    the worker processes of a dask cluster load each catalog once, from
+    their own import of the species module, instead of receiving it with
+    every task.
+
+    Parameters
+    ----------
+    function : Callable
+        The function, called with blocks of the map inputs as keyword
+        arguments.
+    inputs : dict[str, ArrayLike]
+        The map inputs (dask or NumPy arrays, with broadcastable shapes and
+        compatible chunks), and the scalar inputs, e.g., {'Tex': Tex,
+        'TdV': TdV, 'T_bg': 2.73}.
+    dtype : type
+        The data type of the result.
+    **kwargs
+        The other arguments of function, e.g., J_up=2.
+
+    Returns
+    -------
+    dask.array.Array
+        The lazy result, with the broadcast shape of the map inputs.
+    """
+    import dask.array as da
+
+    keys = [key for key, value in inputs.items() if np.ndim(value) > 0]
+    if not keys:
+        raise ValueError("At least one of the inputs must be an array")
+    arrays = [da.asarray(inputs[key]) for key in keys]
+    constants = {key: value for key, value in inputs.items() if key not in keys}
+    # lazy broadcast, so that all the arrays have the same blocks
+    arrays = da.broadcast_arrays(*arrays)
+    ndim = arrays[0].ndim
+    return da.map_blocks(
+        _evaluate_block,
+        *arrays,
+        dtype=dtype,
+        meta=np.empty((0,) * ndim, dtype=dtype),
+        function=function,
+        keys=keys,
+        constants={**constants, **kwargs},
+    )
@@ -0,0 +1,197 @@
+from functools import lru_cache
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from .lte import Species, thin_column
+
+# log-spaced excitation temperatures of the ratio tables, in K
+table_T_max = 2000.0
+table_size = 4096
+
+
+class RatioTable:
+    """
+    LTE ratio of the integrated intensities TdV_a/TdV_b of two optically
+    thin transitions of a species, as a function of Tex, tabulated on a
+    log-spaced grid from just above max(T_bg, 1 K) to T_max. The column
+    density and the partition function cancel in the ratio.
+
+    The ratio is inverted by linear interpolation of ln(Tex) against
+    ln(ratio) over the longest monotonic part of the table, so that every
+    ratio between ratio_min and ratio_max has a single Tex.
+
+    Parameters
+    ----------
+    species : Species
+        The species.
+    index_a, index_b : int
+        The indices of the two transitions (see Species.find or
+        Species.transitions).
+    T_bg : float
+        The background temperature, in K.
+    T_max : float
+        The highest excitation temperature of the table, in K.
+    size : int
+        The number of temperatures of the table.
+
+    Attributes
+    ----------
+    Tex : NDArray[np.float64]
+        The monotonic part of the table, sorted by increasing ratio.
+    log_ratio : NDArray[np.float64]
+        ln(TdV_a/TdV_b) at Tex, increasing.
+    ratio_min, ratio_max : float
+        The range of ratios that can be inverted.
+    """
+
+    def __init__(
+        self,
+        species: Species,
+        index_a: int,
+        index_b: int,
+        T_bg: float = 2.73,
+        T_max: float = table_T_max,
+        size: int = table_size,
+    ) -> None:
+        if min(index_a, index_b) < 0 or index_a == index_b:
+            raise ValueError("Two different transitions of the species are needed")
+        T_min = max(T_bg, 1.0) * (1 + 1e-3)
+        if T_max <= T_min:
+            raise ValueError(f"T_max must be larger than {T_min} K")
+        self.species = species
+        self.index_a, self.index_b, self.T_bg = index_a, index_b, T_bg
+        Tex = np.geomspace(T_min, T_max, size)
+        log_ratio = self.ratio(Tex, log=True)
+
+        # longest run of nodes with a constant sign of the slope
+        sign = np.sign(np.diff(log_ratio))
+        breaks = np.flatnonzero(sign[1:] != sign[:-1]) + 1
+        starts = np.concatenate([[0], breaks])
+        ends = np.concatenate([breaks, [sign.size]])
+        longest = np.argmax(ends - starts)
+        run = slice(starts[longest], ends[longest] + 1)
+        Tex, log_ratio = Tex[run], log_ratio[run]
+        if log_ratio[-1] < log_ratio[0]:
+            Tex, log_ratio = Tex[::-1], log_ratio[::-1]
+        self.Tex, self.log_ratio = Tex, log_ratio
+        self.ratio_min = float(np.exp(log_ratio[0]))
+        self.ratio_max = float(np.exp(log_ratio[-1]))
+
+    def __repr__(self) -> str:
+        return (
+            f"<RatioTable {self.species.name} {self.species.freq[self.index_a]} GHz/"
+            f"{self.species.freq[self.index_b]} GHz: {self.ratio_min:.4g}"
+            f"-{self.ratio_max:.4g}>"
+        )
+
+    def ratio(self, Tex: ArrayLike, log: bool = False) -> float | NDArray[np.float64]:
+        """
+        Returns the exact LTE ratio TdV_a/TdV_b at Tex (in K), or its
+        logarithm. Invalid temperatures return NaN.
+        """
+        species = self.species
+        index = np.array([self.index_a, self.index_b])
+        # column density for Q = 1 and TdV = 1, proportional to 1/TdV
+        Tex = np.asarray(Tex, dtype=np.float64)
+        shape = (2,) + (1,) * Tex.ndim
+        N_a, N_b = thin_column(
+            species.prefactor[index].reshape(shape),
+            species.T_nu[index].reshape(shape),
+            species.E_up[index].reshape(shape),
+            1.0,
+            Tex,
+            1.0,
+            self.T_bg,
+        )
+        if log:
+            return np.log(N_b) - np.log(N_a)
+        return N_b / N_a
+
+    def invert(
+        self, ratio: ArrayLike
+    ) -> tuple[float | NDArray[np.float64], bool | NDArray[np.bool_]]:
+        """
+        Returns the excitation temperature for maps of ratios TdV_a/TdV_b.
+
+        Parameters
+        ----------
+        ratio : ArrayLike
+            The observed ratios.
+
+        Returns
+        -------
+        tuple[float | NDArray[np.float64], bool | NDArray[np.bool_]]
+            The excitation temperature (in K), and a flag which is True for
+            the ratios outside [ratio_min, ratio_max] (including ratios
+            <= 0), where Tex is NaN. NaN ratios give NaN without a flag.
+        """
+        ratio = np.asarray(ratio, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_ratio = np.log(ratio)
+        inside = (log_ratio >= self.log_ratio[0]) & (log_ratio <= self.log_ratio[-1])
+        out_of_range = ~inside & ~np.isnan(ratio)
+        Tex = np.exp(
+            np.interp(log_ratio, self.log_ratio, np.log(self.Tex), np.nan, np.nan)
+        )
+        Tex = np.where(inside, Tex, np.nan)
+        if Tex.ndim == 0:
+            return float(Tex), bool(out_of_range)
+        return Tex, out_of_range
+
+
+@lru_cache(maxsize=64)
+def ratio_table(
+    species: Species, index_a: int, index_b: int, T_bg: float = 2.73
+) -> RatioTable:
+    """
+    Returns the RatioTable of a pair of transitions, computed on the first
+    call and cached for each species, pair and T_bg.
+    """
+    return RatioTable(species, index_a, index_b, T_bg)
+
+
+def two_line(
+    species: Species,
+    index_a: int,
+    index_b: int,
+    TdV_a: ArrayLike,
+    TdV_b: ArrayLike,
+    T_bg: float = 2.73,
+    tabulated: bool = False,
+) -> dict[str, float | NDArray[np.float64] | NDArray[np.bool_]]:
+    """
+    Excitation temperature and column density in LTE from the ratio of two
+    optically thin transitions, for maps of any shape. The ratio is
+    inverted per pixel with the cached table of the pair (see ratio_table),
+    and the column density is computed from the first transition (both give
+    the same column density at the solved Tex).
+
+    Parameters
+    ----------
+    species : Species
+        The species.
+    index_a, index_b : int
+        The indices of the two transitions.
+    TdV_a, TdV_b : ArrayLike
+        The integrated intensities of the two transitions, in K km/s, with
+        broadcastable shapes.
+    T_bg : float
+        The background temperature, in K.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_table.
+
+    Returns
+    -------
+    dict[str, float | NDArray[np.float64] | NDArray[np.bool_]]
+        The maps of 'Tex' (K) and 'Ncol' (cm^-2), and 'out_of_range', which
+        is True where the ratio cannot be produced by any Tex of the table
+        (see RatioTable.invert). Tex and Ncol are NaN there.
+    """
+    table = ratio_table(species, int(index_a), int(index_b), float(T_bg))
+    TdV_a = np.asarray(TdV_a, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = TdV_a / np.asarray(TdV_b, dtype=np.float64)
+    Tex, out_of_range = table.invert(ratio)
+    Ncol = species.thin_index(table.index_a, Tex, TdV_a, T_bg, tabulated=tabulated)
+    return {"Tex": Tex, "Ncol": Ncol, "out_of_range": out_of_range}
@@ -0,0 +1,1023 @@
+import sys
+from functools import partial
+
+import numpy as np
+import astropy.units as u
+from astropy.constants import c, k_B, h  # type: ignore
+from numpy.typing import ArrayLike, NDArray
+
+from .lazy import is_dask, map_blocks
+from .partition_function import level_moments, level_sum, PartitionTable
+
+# constants for the unit-free API: frequencies in GHz, temperatures in K,
+# integrated intensities in K km/s and column densities in cm^-2
+h_over_k = (h / k_B).to_value(u.K / u.GHz)  # type: ignore
+# 8 pi nu^3 / c^3 for nu = 1 GHz, and 1 km/s, in cgs units
+nu3_c3 = 8 * np.pi * ((1 * u.GHz / c) ** 3).to_value(u.cm**-3)  # type: ignore
+km_s = (1 * u.km / u.s).to_value(u.cm / u.s)  # type: ignore
+c_km_s = c.to_value(u.km / u.s)  # type: ignore
+
+# results of Species.find for frequencies without a unique transition
+no_match = -1
+ambiguous = -2
+match_errors = {
+    no_match: "does not match any transition",
+    ambiguous: "matches several transitions",
+}
+
+
+def J_nu(Tex: ArrayLike, freq: ArrayLike) -> float | NDArray[np.float64]:
+    """
+    Unit-free version of common_functions.J_nu: the Planck function (in K)
+    at a frequency freq (in GHz) and excitation temperature Tex (in K).
+
+    Parameters
+    ----------
+    Tex : ArrayLike
+        The excitation temperature(s), in K.
+    freq : ArrayLike
+        The frequency, in GHz.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The Planck function, in K.
+    """
+    T_nu = h_over_k * np.asarray(freq, dtype=np.float64)
+    return T_nu / np.expm1(T_nu / np.asarray(Tex, dtype=np.float64))
+
+
+def J_nu_inverse(J: ArrayLike, freq: ArrayLike) -> float | NDArray[np.float64]:
+    """
+    Closed-form inverse of J_nu: the excitation temperature (in K) for which
+    the Planck function at freq (in GHz) is J (in K),
+
+        Tex = h nu/k / ln(1 + h nu/k J).
+
+    J and freq can be arrays of any broadcastable shapes. Non-physical
+    inputs (J <= 0, freq <= 0, NaN or inf) return NaN.
+
+    Parameters
+    ----------
+    J : ArrayLike
+        The Planck function, in K.
+    freq : ArrayLike
+        The frequency, in GHz.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The excitation temperature, in K.
+    """
+    J = np.asarray(J, dtype=np.float64)
+    T_nu = h_over_k * np.asarray(freq, dtype=np.float64)
+    shape = np.broadcast_shapes(J.shape, T_nu.shape)
+    bad = ~((J > 0) & (J < np.inf) & (T_nu > 0) & (T_nu < np.inf))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Tex = np.divide(T_nu, J, out=np.empty(shape))
+        np.log1p(Tex, out=Tex)
+        np.divide(T_nu, Tex, out=Tex)
+    Tex[np.broadcast_to(bad, shape)] = np.nan
+    if Tex.ndim == 0:
+        return float(Tex)
+    return Tex
+
+
+def Tex_from_peak(
+    Tp: ArrayLike, freq: ArrayLike, T_bg: ArrayLike = 2.73
+) -> float | NDArray[np.float64]:
+    """
+    Excitation temperature (in K) of an optically thick line that fills the
+    beam, from its peak temperature Tp = J(Tex) - J(T_bg), e.g., the 12CO
+    peak used to compute the column density of C18O (see J_nu_inverse).
+    Tp, freq and T_bg can be maps of any broadcastable shapes, and pixels
+    with non-physical inputs (Tp + J(T_bg) <= 0, NaN or inf) return NaN.
+
+    Parameters
+    ----------
+    Tp : ArrayLike
+        The peak temperature of the line, in K.
+    freq : ArrayLike
+        The frequency of the line, in GHz.
+    T_bg : ArrayLike
+        The background temperature, in K.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The excitation temperature, in K.
+    """
+    with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+        J = np.add(Tp, J_nu(T_bg, freq))
+    return J_nu_inverse(J, freq)
+
+
+def dJ_nu_dT(Tex: ArrayLike, freq: ArrayLike) -> float | NDArray[np.float64]:
+    """
+    Derivative of the Planck function J_nu (in K) with respect to Tex,
+
+        dJ/dTex = (x/(2 sinh(x/2)))^2, with x = h nu/k Tex,
+
+    which goes to 1 in the Rayleigh-Jeans limit and to 0 for Tex = 0.
+
+    Parameters
+    ----------
+    Tex : ArrayLike
+        The excitation temperature(s), in K.
+    freq : ArrayLike
+        The frequency, in GHz.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The derivative of the Planck function (unitless).
+    """
+    T_nu = h_over_k * np.asarray(freq, dtype=np.float64)
+    with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+        slope = _planck_slope(T_nu / np.asarray(Tex, dtype=np.float64))
+    if np.ndim(slope) == 0:
+        return float(slope)
+    return slope
+
+
+def _planck_slope(x: ArrayLike) -> NDArray[np.float64]:
+    """
+    (x/(2 sinh(x/2)))^2, the derivative of the Planck function with
+    respect to Tex for x = h nu/k Tex, without overflow for large x.
+    """
+    ratio = x * np.exp(-0.5 * x) / -np.expm1(-x)
+    return np.where(x == np.inf, 0.0, ratio * ratio)
+
+
+def valid_Tex(Tex: ArrayLike, T_bg: ArrayLike = 2.73) -> bool | NDArray[np.bool_]:
+    """
+    Mask of the valid excitation temperatures of a map: Tex must be finite
+    and larger than T_bg (and therefore than 0 K).
+
+    Parameters
+    ----------
+    Tex : ArrayLike
+        The excitation temperature(s), in K.
+    T_bg : ArrayLike
+        The background temperature, in K.
+
+    Returns
+    -------
+    bool | NDArray[np.bool_]
+        True where Tex is valid, with the broadcast shape of Tex and T_bg.
+    """
+    Tex = np.asarray(Tex, dtype=np.float64)
+    return np.isfinite(Tex) & (Tex > np.maximum(T_bg, 0.0))
+
+
+def tau_c_tau(
+    Tex: ArrayLike, Tp: ArrayLike, freq: ArrayLike, T_bg: ArrayLike = 2.73
+) -> tuple[float | NDArray[np.float64], float | NDArray[np.float64]]:
+    """
+    Optical depth of a line from its peak temperature, and the optical
+    depth correction factor c_tau = tau/(1 - exp(-tau)), in a single pass.
+    With x = Tp/(J(Tex) - J(T_bg)) the optical depth is tau = -ln(1 - x),
+    and the correction is simply c_tau = tau/x, so no exp(-tau) is needed.
+    The inputs can be maps of any broadcastable shapes. Pixels with an
+    invalid Tex (see valid_Tex) or a saturated line (x >= 1) return NaN,
+    and c_tau is NaN where tau <= 0, as in common_functions.c_tau.
+
+    Parameters
+    ----------
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    Tp : ArrayLike
+        The peak temperature of the line, in K.
+    freq : ArrayLike
+        The frequency of the line, in GHz.
+    T_bg : ArrayLike
+        The background temperature, in K.
+
+    Returns
+    -------
+    tuple[float | NDArray[np.float64], float | NDArray[np.float64]]
+        The optical depth and its correction factor.
+    """
+    Tex = np.asarray(Tex, dtype=np.float64)
+    T_nu = h_over_k * np.asarray(freq, dtype=np.float64)
+    shape = np.broadcast_shapes(Tex.shape, np.shape(Tp), T_nu.shape, np.shape(T_bg))
+    with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+        x = np.divide(T_nu, Tex, out=np.empty(shape))
+        np.expm1(x, out=x)
+        np.divide(T_nu, x, out=x)
+        x -= T_nu / np.expm1(T_nu / np.asarray(T_bg, dtype=np.float64))
+        np.divide(Tp, x, out=x)
+        x[~(valid_Tex(Tex, T_bg) & (x < 1.0))] = np.nan
+        tau = np.negative(x, out=np.empty(shape))
+        np.log1p(tau, out=tau)
+        np.negative(tau, out=tau)
+        c = np.divide(tau, x, out=x)
+    c[~(tau > 0)] = np.nan
+    if tau.ndim == 0:
+        return float(tau), float(c)
+    return tau, c
+
+
+def tau_nu(
+    Tex: ArrayLike, Tp: ArrayLike, freq: ArrayLike, T_bg: ArrayLike = 2.73
+) -> float | NDArray[np.float64]:
+    """
+    Unit-free version of common_functions.tau_nu: the optical depth of a
+    line from its peak temperature (see tau_c_tau), for maps of any
+    broadcastable shapes. Invalid pixels return NaN.
+
+    Parameters
+    ----------
+    Tex : ArrayLike
+        The excitation temperature, in K.
+    Tp : ArrayLike
+        The peak temperature of the line, in K.
+    freq : ArrayLike
+        The frequency of the line, in GHz.
+    T_bg : ArrayLike
+        The background temperature, in K.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The optical depth.
+    """
+    return tau_c_tau(Tex, Tp, freq, T_bg)[0]
+
+
+def thin_column(
+    prefactor: ArrayLike,
+    T_nu: ArrayLike,
+    E_up: ArrayLike,
+    Q: ArrayLike,
+    Tex: ArrayLike,
+    TdV: ArrayLike,
+    T_bg: ArrayLike = 2.73,
+) -> float | NDArray[np.float64]:
+    """
+    Total column density (in cm^-2) of an optically thin transition in LTE,
+    without units. This is the expression used by all the *_thin functions:
+
+        N = 8 pi nu^3/c^3 Q/A_ul / (g_u exp(-E_u/Tex))
+            / (exp(h nu/k Tex) - 1) TdV / (J(Tex) - J(T_bg))
+
+    The transition constants are precomputed by Species (see
+    Species.prefactor, Species.T_nu and Species.E_up), so that only the
+    Tex-dependent terms are evaluated here.
+    Pixels with invalid Tex (see valid_Tex) return NaN.
+
+    Parameters
+    ----------
+    prefactor : ArrayLike
+        8 pi nu^3/(c^3 A_ul g_u), in cm^-2 (K km/s)^-1.
+    T_nu : ArrayLike
+        h nu/k, in K.
+    E_up : ArrayLike
+        The energy of the upper level, in K.
+    Q : ArrayLike
+        The partition function at Tex.
+    Tex : ArrayLike
+        The excitation temperature(s), in K.
+    TdV : ArrayLike
+        The integrated intensity, in K km/s.
+    T_bg : ArrayLike
+        The background temperature, in K.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The column density, in cm^-2, with the broadcast shape of the inputs.
+    """
+    Tex = np.asarray(Tex, dtype=np.float64)
+    # the Tex-dependent factor is evaluated first and in place, so that a
+    # map of TdV with a single Tex is scaled in a single pass, and a map of
+    # Tex only needs two temporary arrays
+    shape = np.broadcast_shapes(
+        Tex.shape, np.shape(Q), np.shape(T_bg), np.shape(prefactor), np.shape(E_up)
+    )
+    with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+        J_bg = T_nu / np.expm1(T_nu / np.asarray(T_bg, dtype=np.float64))
+        scale = np.divide(1.0, Tex, out=np.empty(shape))
+        expm1_ex = np.multiply(scale, T_nu, out=np.empty(shape))
+        np.expm1(expm1_ex, out=expm1_ex)
+        np.multiply(scale, E_up, out=scale)
+        np.exp(scale, out=scale)
+        scale *= prefactor
+        scale *= Q
+        scale /= expm1_ex
+        J_ex = np.divide(T_nu, expm1_ex, out=expm1_ex)
+        J_ex -= J_bg
+        scale /= J_ex
+    scale[np.broadcast_to(~valid_Tex(Tex, T_bg), shape)] = np.nan
+    Ncol = scale * np.asarray(TdV, dtype=np.float64)
+    if np.ndim(Ncol) == 0:
+        return float(Ncol)
+    return Ncol
+
+
+def thin_column_grad(
+    prefactor: ArrayLike,
+    T_nu: ArrayLike,
+    E_up: ArrayLike,
+    Q: ArrayLike,
+    dlnQ_dT: ArrayLike,
+    Tex: ArrayLike,
+    TdV: ArrayLike,
+    T_bg: ArrayLike = 2.73,
+) -> tuple[float | NDArray[np.float64], dict[str, float | NDArray[np.float64]]]:
+    """
+    Column density of an optically thin transition (see thin_column), and
+    its analytic partial derivatives with respect to TdV, Tex and T_bg,
+    evaluated in the same pass. With x = h nu/k Tex,
+
+        d ln(N)/d TdV = 1/TdV,
+        d ln(N)/d Tex = d ln(Q)/d Tex + (x e^x/(e^x - 1) - E_u/Tex)/Tex
+                        - J'(Tex)/(J(Tex) - J(T_bg)),
+        d ln(N)/d T_bg = J'(T_bg)/(J(Tex) - J(T_bg)),
+
+    where J' is the derivative of the Planck function (see dJ_nu_dT).
+    Pixels with invalid Tex (see valid_Tex) return NaN.
+
+    Parameters
+    ----------
+    prefactor : ArrayLike
+        8 pi nu^3/(c^3 A_ul g_u), in cm^-2 (K km/s)^-1.
+    T_nu : ArrayLike
+        h nu/k, in K.
+    E_up : ArrayLike
+        The energy of the upper level, in K.
+    Q : ArrayLike
+        The partition function at Tex.
+    dlnQ_dT : ArrayLike
+        The derivative d ln(Q)/d Tex at Tex, in K^-1.
+    Tex : ArrayLike
+        The excitation temperature(s), in K.
+    TdV : ArrayLike
+        The integrated intensity, in K km/s.
+    T_bg : ArrayLike
+        The background temperature, in K.
+
+    Returns
+    -------
+    tuple[float | NDArray[np.float64], dict[str, float | NDArray[np.float64]]]
+        The column density (in cm^-2), and its derivatives with respect to
+        'TdV', 'Tex' and 'T_bg', all with the broadcast shape of the inputs.
+    """
+    Tex = np.asarray(Tex, dtype=np.float64)
+    T_bg = np.asarray(T_bg, dtype=np.float64)
+    TdV = np.asarray(TdV, dtype=np.float64)
+    shape = np.broadcast_shapes(
+        Tex.shape,
+        TdV.shape,
+        np.shape(Q),
+        T_bg.shape,
+        np.shape(prefactor),
+        np.shape(E_up),
+    )
+    with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+        x = np.broadcast_to(T_nu / Tex, shape)
+        expm1_ex = np.expm1(x)
+        x_bg = T_nu / T_bg
+        delta_J = T_nu / expm1_ex - T_nu / np.expm1(x_bg)
+        scale = prefactor * Q * np.exp(E_up / Tex) / expm1_ex / delta_J
+        scale = np.where(valid_Tex(Tex, T_bg), scale, np.nan)
+        Ncol = scale * TdV
+        dlnN_dT = dlnQ_dT + (x + x / expm1_ex - E_up / Tex) / Tex
+        dlnN_dT -= _planck_slope(x) / delta_J
+        gradients = {
+            "TdV": scale,
+            "Tex": Ncol * dlnN_dT,
+            "T_bg": Ncol * _planck_slope(x_bg) / delta_J,
+        }
+    if Ncol.ndim == 0:
+        return float(Ncol), {key: float(value) for key, value in gradients.items()}
+    return Ncol, gradients
+
+
+def propagate_errors(
+    gradients: dict[str, ArrayLike], errors: dict[str, ArrayLike]
+) -> float | NDArray[np.float64]:
+    """
+    First-order (linear) propagation of independent uncertainties:
+
+        sigma_N = sqrt(sum_i (dN/dx_i sigma_i)^2),
+
+    e.g., with the gradients of Species.thin_grad or Species.thick_grad.
+    This is much cheaper than monte_carlo.propagate, and accurate as long
+    as the column density is close to linear over the uncertainties.
+
+    Parameters
+    ----------
+    gradients : dict[str, ArrayLike]
+        The partial derivatives of the column density, e.g., {'TdV': ...,
+        'Tex': ...}.
+    errors : dict[str, ArrayLike]
+        The standard deviations of the uncertain inputs, e.g.,
+        {'TdV': TdV_err, 'Tex': Tex_err}. The other inputs are exact.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The standard deviation of the column density, with the broadcast
+        shape of the gradients and errors.
+    """
+    unknown = set(errors) - set(gradients)
+    if unknown:
+        raise ValueError(f"The inputs {unknown} have errors but no gradients")
+    variance = sum(
+        (np.asarray(gradients[key], dtype=np.float64) * errors[key]) ** 2
+        for key in errors
+    )
+    sigma = np.sqrt(variance)
+    if np.ndim(sigma) == 0:
+        return float(sigma)
+    return sigma
+
+
+def _registered_species(name: str) -> "Species":
+    """
+    Returns the registered species name (see Species.__reduce__).
+    """
+    from .registry import species
+
+    return species[name]
+
+
+class Species:
+    """
+    Energy levels and radiative transitions of a molecular species, stored as
+    contiguous arrays in fixed units (K, GHz, s^-1).
+
+    Parameters
+    ----------
+    name : str
+        The name of the species, e.g., 'SO' or 'p-H2CO'.
+    g_u : ArrayLike
+        The degeneracy of each energy level.
+    E_u : ArrayLike
+        The energy of each level, in K.
+    freq : ArrayLike
+        The frequency of each transition, in GHz.
+    A_ul : ArrayLike
+        The Einstein coefficient of each transition, in s^-1.
+    upper : ArrayLike
+        The index (in g_u and E_u) of the upper level of each transition.
+    keys : ArrayLike, optional
+        The key used by the species module to select each transition
+        (e.g., J_up, the frequency, or the 'N_J-N_J' label).
+        Defaults to the transition index.
+    lower : ArrayLike, optional
+        The index of the lower level of each transition, or -1 if unknown.
+
+    Attributes
+    ----------
+    g_up, E_up : NDArray[np.float64]
+        The degeneracy and energy (K) of the upper level of each transition.
+    T_nu : NDArray[np.float64]
+        h nu/k of each transition, in K.
+    prefactor : NDArray[np.float64]
+        8 pi nu^3/(c^3 A_ul g_up) of each transition, in cm^-2 (K km/s)^-1.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        g_u: ArrayLike,
+        E_u: ArrayLike,
+        freq: ArrayLike,
+        A_ul: ArrayLike,
+        upper: ArrayLike,
+        keys: ArrayLike | None = None,
+        lower: ArrayLike | None = None,
+    ) -> None:
+        self.name = name
+        self.g_u = np.asarray(g_u, dtype=np.float64)
+        self.E_u = np.asarray(E_u, dtype=np.float64)
+        self.freq = np.asarray(freq, dtype=np.float64)
+        self.A_ul = np.asarray(A_ul, dtype=np.float64)
+        self.upper = np.asarray(upper, dtype=np.intp)
+        n_lines = self.freq.size
+        self.keys = np.arange(n_lines) if keys is None else np.asarray(keys)
+        self.lower = (
+            np.full(n_lines, -1, dtype=np.intp)
+            if lower is None
+            else np.asarray(lower, dtype=np.intp)
+        )
+        sizes = {self.A_ul.size, self.upper.size, self.keys.size, self.lower.size}
+        if sizes != {n_lines}:
+            raise ValueError("All the transition arrays must have the same size")
+        if self.g_u.size != self.E_u.size:
+            raise ValueError("g_u and E_u must have the same size")
+        # per-transition constants of the column density (see thin_column)
+        self.g_up = self.g_u[self.upper]
+        self.E_up = self.E_u[self.upper]
+        self.T_nu = h_over_k * self.freq
+        self.prefactor = nu3_c3 * self.freq**3 * km_s / self.A_ul / self.g_up
+        self.Q_table = PartitionTable(self.g_u, self.E_u)
+        self._key_index = None
+        self._freq_order = None
+
+    def __repr__(self) -> str:
+        return f"<Species {self.name}: {self.E_u.size} levels, {self.freq.size} transitions>"
+
+    def __reduce__(self):
+        # the species of the registry are pickled by name, so that worker
+        # processes (e.g., of a dask cluster) use their own copy of the
+        # catalog, loaded once when the species module is imported
+        from .registry import species_modules
+
+        if self.name in species_modules:
+            module_name, attribute = species_modules[self.name]
+            module = sys.modules.get(f"{__package__}.{module_name}")
+            if getattr(module, attribute, None) is self:
+                return (_registered_species, (self.name,))
+        return super().__reduce__()
+
+    def _map_blocks(self, method, index, inputs: dict, **kwargs):
+        """
+        Lazy evaluation of method for a single transition on dask arrays
+        (see lazy.map_blocks).
+        """
+        if np.ndim(index) != 0:
+            raise ValueError("dask arrays are supported for a single transition")
+        inputs = {key: value for key, value in inputs.items() if value is not None}
+        return map_blocks(partial(method, int(index)), inputs, **kwargs)
+
+    def Q(self, Tex: ArrayLike, tabulated: bool = False) -> float | NDArray[np.float64]:
+        """
+        Returns the partition function for the excitation temperature(s) Tex.
+
+        Parameters
+        ----------
+        Tex : ArrayLike
+            The excitation temperature(s), in K.
+        tabulated : bool
+            If True, the partition function is interpolated from Q_table
+            instead of summing over all levels.
+
+        Returns
+        -------
+        float | NDArray[np.float64]
+            The partition function, with the same shape as Tex.
+        """
+        if is_dask(Tex):
+            return map_blocks(self.Q, {"Tex": Tex}, tabulated=tabulated)
+        if tabulated:
+            return self.Q_table(Tex)
+        return level_sum(self.g_u, self.E_u, Tex)
+
+    def Q_and_derivative(
+        self, Tex: ArrayLike, tabulated: bool = False
+    ) -> tuple[float | NDArray[np.float64], float | NDArray[np.float64]]:
+        """
+        Returns the partition function and its derivative d ln(Q)/d Tex
+        (in K^-1), evaluated in the same pass.
+
+        Parameters
+        ----------
+        Tex : ArrayLike
+            The excitation temperature(s), in K.
+        tabulated : bool
+            If True, both are interpolated from Q_table (the derivative is
+            the slope of the interpolant) instead of summing over all levels.
+
+        Returns
+        -------
+        tuple[float | NDArray[np.float64], float | NDArray[np.float64]]
+            Q and d ln(Q)/d Tex, with the same shape as Tex.
+        """
+        if tabulated:
+            return self.Q_table(Tex), self.Q_table.log_slope(Tex) / Tex
+        return level_moments(self.g_u, self.E_u, Tex)
+
+    def transition(self, key) -> int:
+        """
+        Returns the index of the transition selected by key (see keys),
+        or -1 if the species has no such transition.
+        """
+        if self._key_index is None:
+            self._key_index = {k: i for i, k in enumerate(self.keys.tolist())}
+        return self._key_index.get(key, -1)
+
+    def transitions(self, keys: ArrayLike) -> NDArray[np.intp]:
+        """
+        Returns the indices of the transitions selected by an array of keys,
+        with -1 for the keys of unknown transitions.
+        """
+        keys = np.asarray(keys)
+        index = [self.transition(key) for key in keys.ravel().tolist()]
+        return np.array(index, dtype=np.intp).reshape(keys.shape)
+
+    def find(
+        self, freq: ArrayLike, tol_MHz: float = 0.5, tol_kms: float | None = None
+    ) -> int | NDArray[np.intp]:
+        """
+        Returns the index of the transition at each frequency, by binary
+        search on the sorted frequencies of the species (sorted once, on the
+        first call). The nearest transition matches if its frequency is
+        within the tolerance, given in MHz or, if tol_kms is given, in km/s,
+        even if other transitions are within the tolerance too.
+
+        Parameters
+        ----------
+        freq : ArrayLike
+            The frequency (or frequencies), in GHz.
+        tol_MHz : float
+            The tolerance of the match, in MHz.
+        tol_kms : float, optional
+            The tolerance of the match as a velocity, in km/s. If given, it is
+            used instead of tol_MHz.
+
+        Returns
+        -------
+        int | NDArray[np.intp]
+            The index of the transition, or no_match (-1) if no transition is
+            within the tolerance, or ambiguous (-2) if the two nearest ones
+            are equally close (e.g., duplicate catalog entries).
+        """
+        if self._freq_order is None:
+            # _freq_order is set last, for concurrent threads
+            order = np.argsort(self.freq, kind="stable")
+            self._freq_sorted = self.freq[order]
+            self._freq_order = order
+        freq = np.asarray(freq, dtype=np.float64)
+        if tol_kms is None:
+            tolerance = 1e-3 * tol_MHz
+        else:
+            tolerance = freq * (tol_kms / c_km_s)
+        # the nearest transitions below and above each frequency
+        sorted_freq = self._freq_sorted
+        n_lines = sorted_freq.size
+        above = np.searchsorted(sorted_freq, freq, side="left")
+        below = np.maximum(above - 1, 0)
+        above_index = np.minimum(above, n_lines - 1)
+        d_below = np.where(above > 0, freq - sorted_freq[below], np.inf)
+        d_above = np.where(above < n_lines, sorted_freq[above_index] - freq, np.inf)
+        nearest = np.where(d_above < d_below, above_index, below)
+        distance = np.minimum(d_below, d_above)
+        # equally close: on both sides, or duplicate frequencies
+        value = sorted_freq[nearest]
+        first = np.searchsorted(sorted_freq, value, side="left")
+        last = np.searchsorted(sorted_freq, value, side="right")
+        tie = (d_below == d_above) | (last - first > 1)
+        index = np.where(
+            distance <= tolerance,
+            np.where(tie, ambiguous, self._freq_order[nearest]),
+            no_match,
+        )
+        if index.ndim == 0:
+            return int(index)
+        return index
+
+    def thin(
+        self,
+        key,
+        Tex: ArrayLike,
+        TdV: ArrayLike,
+        T_bg: ArrayLike = 2.73,
+        tabulated: bool = False,
+    ) -> float | NDArray[np.float64]:
+        """
+        Total column density (in cm^-2) from optically thin transitions,
+        without units (see thin_column).
+        Unknown transitions return NaN.
+
+        Several transitions are evaluated in one call by passing an array of
+        keys and a stack of TdV maps, with the transitions along the leading
+        axes, e.g., keys of shape (n,) and TdV of shape (n, ny, nx) for a Tex
+        map of shape (ny, nx). The partition function is computed only once
+        and shared by all the transitions.
+
+        Parameters
+        ----------
+        key
+            The key of the transition (see keys), or an array of keys.
+        Tex : ArrayLike
+            The excitation temperature(s), in K.
+        TdV : ArrayLike
+            The integrated intensity, in K km/s. For an array of keys, the
+            leading axes of TdV follow the keys.
+        T_bg : ArrayLike
+            The background temperature, in K.
+        tabulated : bool
+            If True, the partition function is interpolated from Q_table.
+
+        Returns
+        -------
+        float | NDArray[np.float64]
+            The column density, in cm^-2, with the broadcast shape of the inputs
+            (the shape of the keys followed by the map shape, for an array of
+            keys).
+        """
+        return self.thin_index(self._index(key), Tex, TdV, T_bg, tabulated=tabulated)
+
+    def _index(self, key) -> int | NDArray[np.intp]:
+        """
+        Returns the index of the transition(s) selected by a key or an
+        array of keys (see transition and transitions).
+        """
+        keys = np.asarray(key)
+        if keys.ndim == 0:
+            return self.transition(keys.item())
+        return self.transitions(keys)
+
+    def thin_index(
+        self,
+        index: int | ArrayLike,
+        Tex: ArrayLike,
+        TdV: ArrayLike,
+        T_bg: ArrayLike = 2.73,
+        tabulated: bool = False,
+    ) -> float | NDArray[np.float64]:
+        """
+        Same as thin, for transitions given by their index (e.g., from find
+        or transitions) instead of their key. Negative indices return NaN.
+        """
+        if is_dask(Tex, TdV, T_bg):
+            inputs = {"Tex": Tex, "TdV": TdV, "T_bg": T_bg}
+            return self._map_blocks(self.thin_index, index, inputs, tabulated=tabulated)
+        index = np.asarray(index, dtype=np.intp)
+        if index.ndim == 0:
+            i = int(index)
+            if i < 0:
+                shape = np.broadcast_shapes(
+                    np.shape(Tex), np.shape(TdV), np.shape(T_bg)
+                )
+                return np.nan if shape == () else np.full(shape, np.nan)
+            return thin_column(
+                self.prefactor[i],
+                self.T_nu[i],
+                self.E_up[i],
+                self.Q(Tex, tabulated=tabulated),
+                Tex,
+                TdV,
+                T_bg,
+            )
+
+        found = index >= 0
+        # transitions along the leading axes, followed by the map axes
+        n_map = max(np.ndim(Tex), np.ndim(T_bg), np.ndim(TdV) - index.ndim, 0)
+        shape = index.shape + (1,) * n_map
+        return thin_column(
+            np.where(found, self.prefactor[index], np.nan).reshape(shape),
+            self.T_nu[index].reshape(shape),
+            self.E_up[index].reshape(shape),
+            self.Q(Tex, tabulated=tabulated),
+            Tex,
+            TdV,
+            T_bg,
+        )
+
+    def thick(
+        self,
+        key,
+        Tex: ArrayLike,
+        tau: ArrayLike,
+        sigma_v: ArrayLike | None = None,
+        TdV: ArrayLike | None = None,
+        T_bg: ArrayLike = 2.73,
+        tabulated: bool = False,
+    ) -> float | NDArray[np.float64]:
+        """
+        Total column density (in cm^-2) from optically thick transitions,
+        without units, from either the optical depth and the velocity
+        dispersion of a Gaussian line (tau, sigma_v), or the integrated
+        intensity and the optical depth (TdV, tau):
+
+            (tau, sigma_v): the integral of tau over the line,
+                sqrt(2 pi) tau sigma_v, replaces TdV/(J(Tex) - J(T_bg)),
+            (TdV, tau): the optically thin column density is multiplied
+                by c_tau = tau/(1 - exp(-tau)).
+
+        Several transitions and maps are evaluated as in thin, with a single
+        evaluation of the partition function.
+
+        Parameters
+        ----------
+        key
+            The key of the transition (see keys), or an array of keys.
+        Tex : ArrayLike
+            The excitation temperature(s), in K.
+        tau : ArrayLike
+            The optical depth (at the line peak).
+        sigma_v : ArrayLike, optional
+            The velocity dispersion of the line, in km/s.
+        TdV : ArrayLike, optional
+            The integrated intensity, in K km/s.
+        T_bg : ArrayLike
+            The background temperature, in K.
+        tabulated : bool
+            If True, the partition function is interpolated from Q_table.
+
+        Returns
+        -------
+        float | NDArray[np.float64]
+            The column density, in cm^-2, with the broadcast shape of the inputs.
+        """
+        return self.thick_index(
+            self._index(key), Tex, tau, sigma_v, TdV, T_bg, tabulated=tabulated
+        )
+
+    def thick_index(
+        self,
+        index: int | ArrayLike,
+        Tex: ArrayLike,
+        tau: ArrayLike,
+        sigma_v: ArrayLike | None = None,
+        TdV: ArrayLike | None = None,
+        T_bg: ArrayLike = 2.73,
+        tabulated: bool = False,
+    ) -> float | NDArray[np.float64]:
+        """
+        Same as thick, for transitions given by their index (e.g., from find
+        or transitions) instead of their key. Negative indices return NaN.
+        """
+        if (sigma_v is None) == (TdV is None):
+            raise ValueError("Either sigma_v or TdV must be given")
+        if is_dask(Tex, tau, sigma_v, TdV, T_bg):
+            inputs = {
+                "Tex": Tex,
+                "tau": tau,
+                "sigma_v": sigma_v,
+                "TdV": TdV,
+                "T_bg": T_bg,
+            }
+            return self._map_blocks(
+                self.thick_index, index, inputs, tabulated=tabulated
+            )
+        tau = np.asarray(tau, dtype=np.float64)
+        if TdV is not None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                c = np.where(tau > 0, tau / -np.expm1(-tau), np.nan)
+            return self.thin_index(index, Tex, c * TdV, T_bg, tabulated=tabulated)
+
+        # TdV of a line with the same integrated opacity in the thin limit
+        index = np.asarray(index, dtype=np.intp)
+        n_map = max(np.ndim(Tex), np.ndim(T_bg), tau.ndim - index.ndim, 0)
+        T_nu = self.T_nu[index].reshape(index.shape + (1,) * n_map)
+        with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+            J_ex = T_nu / np.expm1(T_nu / np.asarray(Tex, dtype=np.float64))
+            J_bg = T_nu / np.expm1(T_nu / np.asarray(T_bg, dtype=np.float64))
+            TdV = np.sqrt(2 * np.pi) * tau * sigma_v * (J_ex - J_bg)
+        return self.thin_index(index, Tex, TdV, T_bg, tabulated=tabulated)
+
+    def thin_grad(
+        self,
+        key,
+        Tex: ArrayLike,
+        TdV: ArrayLike,
+        T_bg: ArrayLike = 2.73,
+        tabulated: bool = False,
+    ) -> tuple[float | NDArray[np.float64], dict[str, float | NDArray[np.float64]]]:
+        """
+        Same as thin, together with the analytic partial derivatives of the
+        column density with respect to 'TdV', 'Tex' (including the
+        derivative of the partition function) and 'T_bg', see
+        thin_column_grad. The derivatives are evaluated in the same pass as
+        the column density, and can be combined with the uncertainties of
+        the inputs by propagate_errors, or used as the Jacobian of a fit.
+
+        Parameters
+        ----------
+        key
+            The key of the transition (see keys), or an array of keys.
+        Tex : ArrayLike
+            The excitation temperature(s), in K.
+        TdV : ArrayLike
+            The integrated intensity, in K km/s.
+        T_bg : ArrayLike
+            The background temperature, in K.
+        tabulated : bool
+            If True, the partition function and its derivative are
+            interpolated from Q_table.
+
+        Returns
+        -------
+        tuple[float | NDArray[np.float64], dict[str, float | NDArray[np.float64]]]
+            The column density (in cm^-2) and the dictionary of its
+            derivatives, all with the shape of the result of thin.
+        """
+        return self.thin_grad_index(
+            self._index(key), Tex, TdV, T_bg, tabulated=tabulated
+        )
+
+    def thin_grad_index(
+        self,
+        index: int | ArrayLike,
+        Tex: ArrayLike,
+        TdV: ArrayLike,
+        T_bg: ArrayLike = 2.73,
+        tabulated: bool = False,
+    ) -> tuple[float | NDArray[np.float64], dict[str, float | NDArray[np.float64]]]:
+        """
+        Same as thin_grad, for transitions given by their index instead of
+        their key. Negative indices return NaN.
+        """
+        index = np.asarray(index, dtype=np.intp)
+        n_map = max(np.ndim(Tex), np.ndim(T_bg), np.ndim(TdV) - index.ndim, 0)
+        shape = index.shape + (1,) * n_map
+        Q, dlnQ_dT = self.Q_and_derivative(Tex, tabulated=tabulated)
+        return thin_column_grad(
+            np.where(index >= 0, self.prefactor[index], np.nan).reshape(shape),
+            self.T_nu[index].reshape(shape),
+            self.E_up[index].reshape(shape),
+            Q,
+            dlnQ_dT,
+            Tex,
+            TdV,
+            T_bg,
+        )
+
+    def thick_grad(
+        self,
+        key,
+        Tex: ArrayLike,
+        tau: ArrayLike,
+        sigma_v: ArrayLike | None = None,
+        TdV: ArrayLike | None = None,
+        T_bg: ArrayLike = 2.73,
+        tabulated: bool = False,
+    ) -> tuple[float | NDArray[np.float64], dict[str, float | NDArray[np.float64]]]:
+        """
+        Same as thick, together with the analytic partial derivatives of
+        the column density with respect to 'Tex', 'T_bg', 'tau', and either
+        'sigma_v' or 'TdV' (see thin_grad). With (TdV, tau), the derivative
+        of c_tau is d ln(c_tau)/d tau = 1/tau - 1/(exp(tau) - 1). With
+        (tau, sigma_v), the column density does not depend on T_bg.
+
+        Parameters
+        ----------
+        key
+            The key of the transition (see keys), or an array of keys.
+        Tex : ArrayLike
+            The excitation temperature(s), in K.
+        tau : ArrayLike
+            The optical depth (at the line peak).
+        sigma_v : ArrayLike, optional
+            The velocity dispersion of the line, in km/s.
+        TdV : ArrayLike, optional
+            The integrated intensity, in K km/s.
+        T_bg : ArrayLike
+            The background temperature, in K.
+        tabulated : bool
+            If True, the partition function and its derivative are
+            interpolated from Q_table.
+
+        Returns
+        -------
+        tuple[float | NDArray[np.float64], dict[str, float | NDArray[np.float64]]]
+            The column density (in cm^-2) and the dictionary of its
+            derivatives, all with the shape of the result of thick.
+        """
+        return self.thick_grad_index(
+            self._index(key), Tex, tau, sigma_v, TdV, T_bg, tabulated=tabulated
+        )
+
+    def thick_grad_index(
+        self,
+        index: int | ArrayLike,
+        Tex: ArrayLike,
+        tau: ArrayLike,
+        sigma_v: ArrayLike | None = None,
+        TdV: ArrayLike | None = None,
+        T_bg: ArrayLike = 2.73,
+        tabulated: bool = False,
+    ) -> tuple[float | NDArray[np.float64], dict[str, float | NDArray[np.float64]]]:
+        """
+        Same as thick_grad, for transitions given by their index instead of
+        their key. Negative indices return NaN.
+        """
+        if (sigma_v is None) == (TdV is None):
+            raise ValueError("Either sigma_v or TdV must be given")
+        tau = np.asarray(tau, dtype=np.float64)
+        if TdV is not None:
+            with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+                c = np.where(tau > 0, tau / -np.expm1(-tau), np.nan)
+                dc_dtau = c * (1 / tau - 1 / np.expm1(tau))
+            Ncol, gradients = self.thin_grad_index(
+                index, Tex, c * TdV, T_bg, tabulated=tabulated
+            )
+            dN_dTdV = gradients["TdV"]
+            gradients["TdV"] = dN_dTdV * c
+            gradients["tau"] = dN_dTdV * TdV * dc_dtau
+            return Ncol, gradients
+
+        # chain rule through the thin TdV = sqrt(2 pi) tau sigma_v (J(Tex) - J(T_bg))
+        index = np.asarray(index, dtype=np.intp)
+        n_map = max(np.ndim(Tex), np.ndim(T_bg), tau.ndim - index.ndim, 0)
+        T_nu = self.T_nu[index].reshape(index.shape + (1,) * n_map)
+        Tex = np.asarray(Tex, dtype=np.float64)
+        T_bg = np.asarray(T_bg, dtype=np.float64)
+        with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+            delta_J = T_nu / np.expm1(T_nu / Tex) - T_nu / np.expm1(T_nu / T_bg)
+            width = np.sqrt(2 * np.pi) * sigma_v
+            Ncol, gradients = self.thin_grad_index(
+                index, Tex, width * tau * delta_J, T_bg, tabulated=tabulated
+            )
+            dN_dTdV = gradients.pop("TdV")
+            gradients["Tex"] += dN_dTdV * width * tau * _planck_slope(T_nu / Tex)
+            # N does not depend on T_bg, the J(T_bg) terms cancel exactly
+            gradients["T_bg"] = Ncol * 0.0
+            gradients["tau"] = dN_dTdV * width * delta_J
+            gradients["sigma_v"] = dN_dTdV * np.sqrt(2 * np.pi) * tau * delta_J
+        return Ncol, gradients
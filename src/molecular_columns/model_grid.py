@@ -0,0 +1,431 @@
+import json
+import os
+import zlib
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from .catalog import cache_dir, read_cache, write_cache
+from .non_lte import StatisticalEquilibrium
+
+# bump when the stored grids change, so that old grid files are not used
+grid_version = 1
+# parameters of StatisticalEquilibrium.solve that can be axes of a grid
+grid_parameters = ("n_H2", "T_kin", "N", "delta_v")
+# number of pixels interpolated or inverted at once
+chunk_pixels = 2**16
+
+
+class ModelGrid:
+    """
+    Line intensities and opacities of a non-LTE model sampled on a regular
+    grid of physical parameters, with multilinear interpolation for fast
+    queries on maps.
+
+    Parameters
+    ----------
+    name : str
+        The name of the species.
+    axes : dict[str, ArrayLike]
+        The increasing nodes of each axis of the grid (e.g., 'n_H2',
+        'T_kin' and 'N'), in the order of the grid dimensions.
+    freq : ArrayLike
+        The frequencies (GHz) of the n_lines lines of the grid.
+    TdV : ArrayLike
+        The integrated intensities (K km/s), with shape (n_lines,) + grid.
+    tau : ArrayLike
+        The line centre opacities, with shape (n_lines,) + grid.
+    log_axes : tuple[str, ...]
+        The axes interpolated in log10 (e.g., densities and columns).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        axes: dict[str, ArrayLike],
+        freq: ArrayLike,
+        TdV: ArrayLike,
+        tau: ArrayLike,
+        log_axes: tuple[str, ...] = ("n_H2", "N"),
+    ) -> None:
+        self.name = name
+        self.axes = {
+            key: np.asarray(value, dtype=np.float64) for key, value in axes.items()
+        }
+        self.freq = np.asarray(freq, dtype=np.float64).ravel()
+        self.TdV = np.asarray(TdV)
+        self.tau = np.asarray(tau)
+        self.log_axes = tuple(key for key in log_axes if key in self.axes)
+        shape = (self.freq.size,) + tuple(value.size for value in self.axes.values())
+        if self.TdV.shape != shape or self.tau.shape != shape:
+            raise ValueError(f"TdV and tau must have the shape {shape}")
+        for key, value in self.axes.items():
+            if value.ndim != 1 or np.any(np.diff(value) <= 0):
+                raise ValueError(f"The nodes of {key} must be increasing")
+        # the nodes in the interpolation coordinates
+        self._nodes = {
+            key: np.log10(value) if key in self.log_axes else value
+            for key, value in self.axes.items()
+        }
+
+    def __repr__(self) -> str:
+        axes = ", ".join(f"{key}: {value.size}" for key, value in self.axes.items())
+        return f"<ModelGrid {self.name}: {self.freq.size} lines, {axes}>"
+
+    @classmethod
+    def compute(
+        cls,
+        solver: StatisticalEquilibrium,
+        axes: dict[str, ArrayLike],
+        freq: ArrayLike,
+        log_axes: tuple[str, ...] = ("n_H2", "N"),
+        **fixed,
+    ) -> "ModelGrid":
+        """
+        Runs the non-LTE model over all the points of a grid at once.
+
+        Parameters
+        ----------
+        solver : StatisticalEquilibrium
+            The non-LTE model of the species.
+        axes : dict[str, ArrayLike]
+            The nodes of each axis, among 'n_H2', 'T_kin', 'N' and 'delta_v'.
+        freq : ArrayLike
+            The frequencies (GHz) of the lines to be stored.
+        log_axes : tuple[str, ...]
+            The axes interpolated in log10.
+        **fixed
+            The values of the other parameters of StatisticalEquilibrium.solve
+            (e.g., delta_v=1.0, T_bg=2.73 or geometry='lvg').
+
+        Returns
+        -------
+        ModelGrid
+            The grid of the model.
+        """
+        unknown = set(axes) - set(grid_parameters)
+        if unknown:
+            raise ValueError(f"Unknown grid axes {unknown}, use {grid_parameters}")
+        missing = set(grid_parameters) - set(axes) - set(fixed)
+        if missing:
+            raise ValueError(f"The parameters {missing} must be given")
+        index = solver.species.find(np.asarray(freq, dtype=np.float64))
+        if np.any(index < 0):
+            raise ValueError(f"The frequencies {freq} do not match unique lines")
+        nodes = [np.asarray(value, dtype=np.float64) for value in axes.values()]
+        grid = dict(zip(axes, np.meshgrid(*nodes, indexing="ij")))
+        result = solver.solve(**grid, **fixed)
+        return cls(
+            solver.species.name,
+            axes,
+            solver.species.freq[index],
+            result["TdV"][index],
+            result["tau"][index],
+            log_axes,
+        )
+
+    def save(self, file_name: str | os.PathLike) -> None:
+        """
+        Writes the grid to a binary file (see catalog.write_cache), which
+        can be memory-mapped by load.
+        """
+        data = {
+            "name": np.array(self.name),
+            "axes": np.array(list(self.axes)),
+            "log_axes": np.array(self.log_axes, dtype=str),
+            "freq": self.freq,
+            "TdV": self.TdV,
+            "tau": self.tau,
+        }
+        data.update({f"axis_{key}": value for key, value in self.axes.items()})
+        write_cache(file_name, data)
+
+    @classmethod
+    def load(cls, file_name: str | os.PathLike, mmap: bool = True) -> "ModelGrid":
+        """
+        Reads a grid written by save. With mmap (the default), the
+        intensities and opacities are memory-mapped instead of read.
+        """
+        data = read_cache(file_name, mmap=mmap)
+        axes = {str(key): data[f"axis_{key}"] for key in data["axes"]}
+        return cls(
+            str(data["name"]),
+            axes,
+            data["freq"],
+            data["TdV"],
+            data["tau"],
+            tuple(str(key) for key in data["log_axes"]),
+        )
+
+    def line(self, freq: float, tol_MHz: float = 0.5) -> int:
+        """
+        Returns the index (in freq) of the line at the frequency freq (GHz).
+        """
+        match = np.flatnonzero(np.abs(self.freq - freq) <= tol_MHz * 1e-3)
+        if match.size != 1:
+            raise ValueError(f"The frequency {freq} is not a unique line of the grid")
+        return int(match[0])
+
+    def _locate(
+        self, key: str, value: NDArray[np.float64]
+    ) -> tuple[NDArray[np.intp], NDArray[np.float64]]:
+        """
+        Returns the lower node and the fractional position of value in the
+        cell of the axis key. Values outside the axis have a NaN position.
+        """
+        nodes = self._nodes[key]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = np.log10(value) if key in self.log_axes else value
+        if nodes.size == 1:
+            i = np.zeros(x.shape, dtype=np.intp)
+            return i, np.where(x == nodes[0], 0.0, np.nan)
+        i = np.clip(np.searchsorted(nodes, x) - 1, 0, nodes.size - 2)
+        t = (x - nodes[i]) / (nodes[i + 1] - nodes[i])
+        return i, np.where((t >= 0) & (t <= 1), t, np.nan)
+
+    def interpolate(
+        self, values: ArrayLike, **coords: ArrayLike
+    ) -> NDArray[np.float64]:
+        """
+        Multilinear interpolation of a quantity sampled on the grid (in the
+        log10 of the log_axes), at points given by maps of any broadcastable
+        shapes. Points outside the grid return NaN.
+
+        Parameters
+        ----------
+        values : ArrayLike
+            The quantity on the grid nodes, with the shape of the grid.
+        **coords : ArrayLike
+            The coordinates of the points along every axis of the grid.
+
+        Returns
+        -------
+        NDArray[np.float64]
+            The interpolated values, with the broadcast shape of coords.
+        """
+        if set(coords) != set(self.axes):
+            raise ValueError(f"The coordinates must be {list(self.axes)}")
+        keys = list(self.axes)
+        arrays = np.broadcast_arrays(
+            *[np.asarray(coords[key], dtype=np.float64) for key in keys]
+        )
+        shape = arrays[0].shape
+        flat = [array.ravel() for array in arrays]
+        result = np.empty(flat[0].size)
+        for start in range(0, result.size, chunk_pixels):
+            block = slice(start, start + chunk_pixels)
+            result[block] = self._multilinear(
+                np.asarray(values), keys, [array[block] for array in flat]
+            )
+        return result.reshape(shape)
+
+    def _multilinear(
+        self,
+        values: NDArray[np.float64],
+        keys: list[str],
+        coords: list[NDArray[np.float64]],
+    ) -> NDArray[np.float64]:
+        """
+        Multilinear interpolation along the axes keys (the trailing axes of
+        values) at the n points coords (1-D arrays). Returns an array with the
+        leading shape of values followed by n.
+        """
+        cells = [self._locate(key, value) for key, value in zip(keys, coords)]
+        sizes = values.shape[values.ndim - len(keys) :]
+        total = np.zeros(values.shape[: values.ndim - len(keys)] + coords[0].shape)
+        for corner in product((0, 1), repeat=len(cells)):
+            weight = np.ones(coords[0].shape)
+            index = []
+            for (i, t), upper, size in zip(cells, corner, sizes):
+                weight = weight * (t if upper else 1 - t)
+                index.append(np.minimum(i + upper, size - 1))
+            # skip the corners with zero weight (e.g., on a node)
+            total += np.where(weight != 0, weight * values[(...,) + tuple(index)], 0.0)
+        # a point outside the grid has NaN weights at all the corners
+        total[..., np.isnan(weight)] = np.nan
+        return total
+
+    def intensity(self, freq: float, **coords: ArrayLike) -> NDArray[np.float64]:
+        """
+        Interpolated integrated intensity (K km/s) of the line at freq (GHz).
+        """
+        return self.interpolate(self.TdV[self.line(freq)], **coords)
+
+    def ratio_grid(self, freq_a: float, freq_b: float) -> NDArray[np.float64]:
+        """
+        Intensity ratio TdV(freq_a)/TdV(freq_b) of two lines on the grid nodes.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.TdV[self.line(freq_a)] / self.TdV[self.line(freq_b)]
+
+    def ratio(
+        self, freq_a: float, freq_b: float, **coords: ArrayLike
+    ) -> NDArray[np.float64]:
+        """
+        Interpolated intensity ratio TdV(freq_a)/TdV(freq_b) of two lines.
+        """
+        return self.interpolate(self.ratio_grid(freq_a, freq_b), **coords)
+
+    def invert(
+        self,
+        ratio: ArrayLike,
+        freq_a: float,
+        freq_b: float,
+        axis: str = "T_kin",
+        **coords: ArrayLike,
+    ) -> NDArray[np.float64]:
+        """
+        Inverts a map of intensity ratios TdV(freq_a)/TdV(freq_b) for the
+        parameter axis (e.g., T_kin for H2CO thermometry), given the values
+        of the other parameters (scalars or maps). For every pixel, the ratio
+        is interpolated on the nodes of axis, and the first crossing of the
+        observed ratio is interpolated linearly. Pixels whose ratio is outside
+        the range of the model return NaN.
+
+        Parameters
+        ----------
+        ratio : ArrayLike
+            The observed intensity ratios.
+        freq_a, freq_b : float
+            The frequencies (GHz) of the numerator and denominator lines.
+        axis : str
+            The parameter to be derived.
+        **coords : ArrayLike
+            The values of the other parameters, broadcastable with ratio.
+
+        Returns
+        -------
+        NDArray[np.float64]
+            The parameter, with the broadcast shape of ratio and coords.
+        """
+        if set(coords) != set(self.axes) - {axis}:
+            raise ValueError(f"The coordinates must be {set(self.axes) - {axis}}")
+        keys = [key for key in self.axes if key != axis]
+        # the ratio grid with axis first, followed by the other axes
+        ratio_grid = np.moveaxis(
+            self.ratio_grid(freq_a, freq_b), list(self.axes).index(axis), 0
+        )
+        nodes = self._nodes[axis]
+        ratio = np.asarray(ratio, dtype=np.float64)
+        others = [np.asarray(coords[key], dtype=np.float64) for key in keys]
+        shared = np.broadcast_shapes(*[other.shape for other in others]) == ()
+        if shared:
+            # same parameters for all the pixels: a single model curve
+            curves = self._multilinear(ratio_grid, keys, [o.ravel() for o in others])
+        ratio, *others = np.broadcast_arrays(ratio, *others)
+        shape = ratio.shape
+        ratio = ratio.ravel()
+        others = [other.ravel() for other in others]
+        result = np.full(ratio.size, np.nan)
+        for start in range(0, ratio.size, chunk_pixels):
+            block = slice(start, start + chunk_pixels)
+            if not shared:
+                # model ratio of every pixel on the nodes of axis, (n_nodes, n)
+                curves = self._multilinear(
+                    ratio_grid, keys, [other[block] for other in others]
+                )
+            delta = curves - ratio[block]
+            with np.errstate(invalid="ignore"):
+                crossing = delta[:-1] * delta[1:] <= 0
+            found = crossing.any(axis=0)
+            i = np.argmax(crossing, axis=0)
+            pixels = np.arange(i.size)
+            d0, d1 = delta[i, pixels], delta[i + 1, pixels]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t = np.where(d0 == d1, 0.0, d0 / (d0 - d1))
+            x = nodes[i] + t * (nodes[i + 1] - nodes[i])
+            result[block] = np.where(found, x, np.nan)
+        if axis in self.log_axes:
+            result = 10**result
+        return result.reshape(shape)
+
+
+def _solver_checksum(solver: StatisticalEquilibrium) -> str:
+    """
+    CRC-32 checksum of the molecular data of a solver: its levels, lines
+    and collision rates.
+    """
+    species = solver.species
+    arrays = [
+        species.g_u,
+        species.E_u,
+        species.freq,
+        species.A_ul,
+        species.upper,
+        species.lower,
+    ]
+    for k in range(len(solver.partners)):
+        arrays += [
+            solver.temperatures[k],
+            solver.upper[k],
+            solver.lower[k],
+            solver.rates[k],
+        ]
+    checksum = zlib.crc32(" ".join(solver.partners).encode())
+    for array in arrays:
+        checksum = zlib.crc32(np.ascontiguousarray(array).tobytes(), checksum)
+    return f"{checksum:08x}"
+
+
+def model_grid(
+    solver: StatisticalEquilibrium,
+    axes: dict[str, ArrayLike],
+    freq: ArrayLike,
+    file_name: str | os.PathLike | None = None,
+    log_axes: tuple[str, ...] = ("n_H2", "N"),
+    **fixed,
+) -> ModelGrid:
+    """
+    Returns the grid of a non-LTE model (see ModelGrid.compute), computed
+    once and then read (memory-mapped) from a file. By default the file is
+    stored in the cache directory (see catalog.cache_dir), with a name keyed
+    by the species and a checksum of the grid parameters and of the
+    molecular data of the solver, so that a grid with different parameters
+    or an updated catalog is computed again.
+
+    Parameters
+    ----------
+    solver : StatisticalEquilibrium
+        The non-LTE model of the species.
+    axes : dict[str, ArrayLike]
+        The nodes of each axis, among 'n_H2', 'T_kin', 'N' and 'delta_v'.
+    freq : ArrayLike
+        The frequencies (GHz) of the lines to be stored.
+    file_name : str | os.PathLike, optional
+        The grid file.
+    log_axes : tuple[str, ...]
+        The axes interpolated in log10.
+    **fixed
+        The values of the other parameters of StatisticalEquilibrium.solve.
+
+    Returns
+    -------
+    ModelGrid
+        The grid of the model.
+    """
+    if file_name is None:
+        parameters = {key: np.asarray(value).tolist() for key, value in axes.items()}
+        parameters.update(
+            freq=np.asarray(freq).tolist(),
+            log_axes=list(log_axes),
+            fixed={key: np.asarray(value).tolist() for key, value in fixed.items()},
+            version=grid_version,
+            data=_solver_checksum(solver),
+        )
+        digest = zlib.crc32(json.dumps(parameters, sort_keys=True).encode())
+        file_name = cache_dir() / f"{solver.species.name}.grid.{digest:08x}.cache"
+    path = Path(file_name)
+    try:
+        return ModelGrid.load(path)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    grid = ModelGrid.compute(solver, axes, freq, log_axes, **fixed)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        grid.save(path)
+    except OSError:
+        pass
+    return grid
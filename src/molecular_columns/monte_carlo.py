@@ -0,0 +1,194 @@
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+# maximum number of (sample, pixel) values drawn at once for each input
+chunk_elements = 2**20
+
+
+def sample_percentiles(
+    samples: NDArray[np.float64], q: ArrayLike
+) -> NDArray[np.float64]:
+    """
+    Percentiles of samples along the first axis, ignoring NaN, with the
+    linear interpolation of np.percentile. Unlike np.nanpercentile, the
+    computation is vectorized over the other axes.
+
+    Parameters
+    ----------
+    samples : NDArray[np.float64]
+        The samples, with shape (n_samples, ...).
+    q : ArrayLike
+        The percentiles, between 0 and 100.
+
+    Returns
+    -------
+    NDArray[np.float64]
+        The percentiles, with shape q.shape + samples.shape[1:]. Pixels
+        without valid samples return NaN.
+    """
+    q = np.asarray(q, dtype=np.float64)
+    ordered = np.sort(samples, axis=0)  # NaN are sorted last
+    n_valid = np.sum(~np.isnan(samples), axis=0)
+    position = q.reshape(q.shape + (1,) * n_valid.ndim) / 100 * (n_valid - 1)
+    position = np.maximum(position, 0.0)
+    lower = np.floor(position).astype(np.intp)
+    upper = np.minimum(lower + 1, np.maximum(n_valid - 1, 0))
+    weight = position - lower
+    flat = (q.size,) + n_valid.shape
+    below = np.take_along_axis(ordered, lower.reshape(flat), axis=0)
+    above = np.take_along_axis(ordered, upper.reshape(flat), axis=0)
+    result = below + weight.reshape(flat) * (above - below)
+    result[:, n_valid == 0] = np.nan
+    return result.reshape(q.shape + n_valid.shape)
+
+
+def _chunk_statistics(
+    function: Callable,
+    values: dict[str, NDArray[np.float64]],
+    errors: dict[str, NDArray[np.float64]],
+    kwargs: dict,
+    n_samples: int,
+    seed: np.random.SeedSequence,
+    percentiles: tuple[float, ...],
+) -> tuple[NDArray[np.float64], ...]:
+    """
+    Draws n_samples normal samples of the inputs of a chunk of pixels,
+    evaluates function on the (samples, pixels) batch, and returns the
+    mean, standard deviation, percentiles and fraction of valid samples.
+    """
+    rng = np.random.default_rng(seed)
+    n_pixels = next(iter(values.values())).size
+    samples = {}
+    for key, value in values.items():
+        if key in errors:
+            draws = rng.standard_normal((n_samples, n_pixels))
+            draws *= errors[key]
+            draws += value
+            samples[key] = draws
+        else:
+            samples[key] = value
+    result = np.broadcast_to(
+        np.asarray(function(**samples, **kwargs), dtype=np.float64),
+        (n_samples, n_pixels),
+    )
+    valid = ~np.isnan(result)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        n_valid = valid.sum(axis=0)
+        mean = np.where(valid, result, 0.0).sum(axis=0) / n_valid
+        variance = np.where(valid, (result - mean) ** 2, 0.0).sum(axis=0) / n_valid
+    return (
+        mean,
+        np.sqrt(variance),
+        sample_percentiles(result, percentiles),
+        n_valid / n_samples,
+    )
+
+
+def propagate(
+    function: Callable,
+    values: dict[str, ArrayLike],
+    errors: dict[str, ArrayLike],
+    n_samples: int = 1000,
+    seed: int | None = 0,
+    percentiles: tuple[float, ...] = (16.0, 50.0, 84.0),
+    n_workers: int | None = 1,
+    processes: bool = False,
+    **kwargs,
+) -> dict[str, NDArray[np.float64]]:
+    """
+    Monte Carlo propagation of the uncertainties of the inputs of a
+    unit-free column density function (e.g., col_c18o.C18O_thin_np or
+    col_so.SO_thin_np). Every input with an uncertainty is drawn from a
+    normal distribution, n_samples times for each pixel, and the function
+    is evaluated on the (samples, pixels) batch at once, over chunks of
+    pixels holding at most ``chunk_elements`` samples. Draws that give an
+    invalid result (NaN, e.g., for Tex below T_bg) are ignored.
+
+    The draws of each chunk come from its own random generator, spawned
+    from seed, so the results only depend on seed, n_samples and the map
+    (not on n_workers). Functions with a tabulated option are much faster
+    with tabulated=True, as every draw of Tex needs its partition function.
+
+    Parameters
+    ----------
+    function : Callable
+        The function, called with keyword arguments that broadcast against
+        each other, e.g., Tex and TdV maps with a leading sample axis.
+    values : dict[str, ArrayLike]
+        The values of the map inputs of function, e.g., {'Tex': Tex,
+        'TdV': TdV}.
+    errors : dict[str, ArrayLike]
+        The standard deviations of the uncertain inputs, e.g.,
+        {'TdV': TdV_err}, broadcastable with the values.
+    n_samples : int
+        The number of draws per pixel.
+    seed : int, optional
+        The seed of the random generator.
+    percentiles : tuple[float, ...]
+        The percentiles of the results to be computed.
+    n_workers : int, optional
+        The number of chunks evaluated in parallel, or None to use all the
+        CPU cores.
+    processes : bool
+        If True, the chunks are evaluated in worker processes (function and
+        kwargs must be picklable), otherwise in threads.
+    **kwargs
+        The other (scalar) arguments of function, e.g., J_up=2.
+
+    Returns
+    -------
+    dict[str, NDArray[np.float64]]
+        The maps of the 'mean' and standard deviation ('std') of the
+        results, their 'percentiles' (with shape (len(percentiles),) + map),
+        and the fraction of valid draws ('valid_fraction').
+    """
+    unknown = set(errors) - set(values)
+    if unknown:
+        raise ValueError(f"The inputs {unknown} have errors but no values")
+    keys = list(values)
+    arrays = np.broadcast_arrays(
+        *[np.asarray(values[key], dtype=np.float64) for key in keys],
+        *[np.asarray(errors[key], dtype=np.float64) for key in errors],
+    )
+    shape = arrays[0].shape
+    flat_values = dict(zip(keys, [array.ravel() for array in arrays[: len(keys)]]))
+    flat_errors = dict(zip(errors, [array.ravel() for array in arrays[len(keys) :]]))
+    n_pixels = int(np.prod(shape))
+    n_chunk = max(1, chunk_elements // n_samples)
+    starts = range(0, n_pixels, n_chunk)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    tasks = [
+        (
+            function,
+            {key: value[start : start + n_chunk] for key, value in flat_values.items()},
+            {key: value[start : start + n_chunk] for key, value in flat_errors.items()},
+            kwargs,
+            n_samples,
+            chunk_seed,
+            tuple(percentiles),
+        )
+        for start, chunk_seed in zip(starts, seeds)
+    ]
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if n_workers > 1 and len(tasks) > 1:
+        executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        with executor_class(max_workers=n_workers) as executor:
+            chunks = list(executor.map(_chunk_statistics, *zip(*tasks)))
+    else:
+        chunks = [_chunk_statistics(*task) for task in tasks]
+
+    mean, std, q, valid_fraction = [
+        np.concatenate([chunk[i] for chunk in chunks], axis=-1) for i in range(4)
+    ]
+    return {
+        "mean": mean.reshape(shape),
+        "std": std.reshape(shape),
+        "percentiles": q.reshape((len(percentiles),) + shape),
+        "valid_fraction": valid_fraction.reshape(shape),
+    }
@@ -0,0 +1,383 @@
+import os
+
+import numpy as np
+import astropy.units as u
+from astropy.constants import c, k_B, h  # type: ignore
+from numpy.typing import ArrayLike, NDArray
+
+from .catalog import load_catalog, read_lamda
+from .lte import J_nu, Species, km_s, nu3_c3
+
+# h c/k, to convert the LAMDA level energies from cm^-1 to K
+hc_over_k = (h * c / k_B).to_value(u.K * u.cm)  # type: ignore
+# ratio of the integral of a Gaussian line to its peak times its FWHM
+fgaus = np.sqrt(np.pi / (4 * np.log(2)))
+# maximum number of (grid point, level, level) rate matrix elements held
+# at once by StatisticalEquilibrium.solve
+chunk_elements = 2**20
+# levels less populated than this are ignored by the convergence test
+min_population = 1e-8
+# initial weight of the new populations in each iteration (as in RADEX),
+# halved for the grid points whose populations oscillate
+relaxation = 0.7
+
+geometries = ("sphere", "lvg", "slab")
+
+
+def escape_probability(tau: ArrayLike, geometry: str = "sphere") -> NDArray[np.float64]:
+    """
+    Photon escape probability beta(tau) of a homogeneous medium, as in RADEX
+    (van der Tak et al. 2007). Negative opacities (masing lines) are treated
+    as optically thin.
+
+    Parameters
+    ----------
+    tau : ArrayLike
+        The line centre optical depth(s).
+    geometry : str
+        'sphere' for a uniform sphere, 'lvg' for an expanding sphere (large
+        velocity gradient), or 'slab' for a plane-parallel slab.
+
+    Returns
+    -------
+    NDArray[np.float64]
+        The escape probability, with the shape of tau.
+    """
+    if geometry not in geometries:
+        raise ValueError(f"geometry must be one of {geometries}")
+    tau = np.maximum(np.asarray(tau, dtype=np.float64), 0.0)
+    if geometry == "slab":
+        tau = 3 * tau
+    small = tau < 1e-2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if geometry == "sphere":
+            beta = 1.5 / tau * (1 - 2 / tau**2 + (2 / tau + 2 / tau**2) * np.exp(-tau))
+            series = 1 - tau * (0.375 - tau * (0.1 - tau / 48))
+        else:
+            beta = -np.expm1(-tau) / tau
+            series = 1 - tau * (0.5 - tau * (1 / 6 - tau / 24))
+    return np.where(small, series, beta)
+
+
+def ortho_para_H2(T_kin: ArrayLike) -> NDArray[np.float64]:
+    """
+    Thermal ortho-to-para ratio of H2 at the kinetic temperature T_kin (in K),
+    as used by RADEX: min(3, 9 exp(-170.6 K/T_kin)).
+    """
+    return np.minimum(3.0, 9.0 * np.exp(-170.6 / np.asarray(T_kin, dtype=np.float64)))
+
+
+class StatisticalEquilibrium:
+    """
+    Non-LTE level populations of a species from the balance of collisional
+    and radiative rates, with the escape probability approximation of RADEX
+    (van der Tak et al. 2007). The rate equations of a whole grid of
+    (n_H2, T_kin, N, delta_v) are solved at once, as batched linear systems.
+
+    Parameters
+    ----------
+    species : Species
+        The energy levels and radiative transitions, with the lower level
+        of every transition.
+    partners : list[str]
+        The LAMDA code and name of each collision partner, e.g., '2 p-H2'.
+    temperatures : list[NDArray[np.float64]]
+        The temperatures (K) of the collision rate table of each partner.
+    upper, lower : list[NDArray[np.intp]]
+        The (0-based) levels of the collisional transitions of each partner.
+    rates : list[NDArray[np.float64]]
+        The downward collision rates (cm^3 s^-1) of each partner, with one
+        row per collisional transition and one column per temperature.
+    """
+
+    def __init__(
+        self,
+        species: Species,
+        partners: list[str],
+        temperatures: list[NDArray[np.float64]],
+        upper: list[NDArray[np.intp]],
+        lower: list[NDArray[np.intp]],
+        rates: list[NDArray[np.float64]],
+    ) -> None:
+        if np.any(species.lower < 0):
+            raise ValueError("The lower level of every transition is needed")
+        self.species = species
+        self.partners = [str(partner) for partner in partners]
+        self.codes = [int(partner.split()[0]) for partner in self.partners]
+        self.temperatures = [np.asarray(T, dtype=np.float64) for T in temperatures]
+        self.upper = [np.asarray(i, dtype=np.intp) for i in upper]
+        self.lower = [np.asarray(i, dtype=np.intp) for i in lower]
+        self.rates = [np.asarray(rate, dtype=np.float64) for rate in rates]
+        # radiative constants of each line: g_u/g_l, and
+        # tau = tau_factor N (x_l g_u/g_l - x_u)/delta_v
+        g_u = species.g_u
+        self.g_ratio = g_u[species.upper] / g_u[species.lower]
+        self.tau_factor = species.A_ul / (nu3_c3 * species.freq**3 * fgaus * km_s)
+
+    @classmethod
+    def from_lamda(
+        cls, file_name: str | os.PathLike, name: str | None = None
+    ) -> "StatisticalEquilibrium":
+        """
+        Reads the levels, lines and collision rates of a LAMDA file.
+
+        Parameters
+        ----------
+        file_name : str | os.PathLike
+            The name of the LAMDA file, or a path to it.
+        name : str, optional
+            The name of the species, defaults to the name of the file.
+
+        Returns
+        -------
+        StatisticalEquilibrium
+            The solver for the species.
+        """
+        catalog = load_catalog(file_name, read_lamda)
+        species = Species(
+            str(file_name) if name is None else name,
+            catalog["level_g_u"],
+            catalog["level_E_u"] * hc_over_k,
+            freq=catalog["line_freq"],
+            A_ul=catalog["line_A_ul"],
+            upper=catalog["line_upper"] - 1,
+            lower=catalog["line_lower"] - 1,
+        )
+        partners = range(int(catalog["n_partners"]))
+        return cls(
+            species,
+            [str(catalog[f"coll{k}_partner"]) for k in partners],
+            [catalog[f"coll{k}_temperatures"] for k in partners],
+            [catalog[f"coll{k}_upper"] - 1 for k in partners],
+            [catalog[f"coll{k}_lower"] - 1 for k in partners],
+            [catalog[f"coll{k}_rates"] for k in partners],
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"<StatisticalEquilibrium {self.species.name}:"
+            f" {self.species.E_u.size} levels, {len(self.partners)} partners>"
+        )
+
+    def partner_densities(
+        self, n_H2: ArrayLike, T_kin: ArrayLike, ortho_para: ArrayLike | None = None
+    ) -> list[NDArray[np.float64]]:
+        """
+        Densities (in cm^-3) of the collision partners for a total H2 density
+        n_H2. The H2 density is split into para- and ortho-H2 (LAMDA codes 2
+        and 3) with the ortho-to-para ratio, and partners other than H2 have
+        zero density.
+
+        Parameters
+        ----------
+        n_H2 : ArrayLike
+            The H2 density, in cm^-3.
+        T_kin : ArrayLike
+            The kinetic temperature, in K.
+        ortho_para : ArrayLike, optional
+            The ortho-to-para ratio of H2, thermal (ortho_para_H2) by default.
+
+        Returns
+        -------
+        list[NDArray[np.float64]]
+            The density of each collision partner.
+        """
+        n_H2 = np.asarray(n_H2, dtype=np.float64)
+        if ortho_para is None:
+            ortho_para = ortho_para_H2(T_kin)
+        fraction_ortho = np.asarray(ortho_para) / (1.0 + np.asarray(ortho_para))
+        fractions = {1: 1.0, 2: 1.0 - fraction_ortho, 3: fraction_ortho}
+        return [n_H2 * fractions.get(code, 0.0) for code in self.codes]
+
+    def collision_matrix(
+        self, n_partners: list[NDArray[np.float64]], T_kin: NDArray[np.float64]
+    ) -> NDArray[np.float64]:
+        """
+        Collisional rates C[g, i, j] (in s^-1) from level i to level j, for
+        the grid points g. The rate coefficients are interpolated linearly
+        in temperature, and clipped to the range of each table; the upward
+        rates follow from detailed balance at T_kin.
+
+        Parameters
+        ----------
+        n_partners : list[NDArray[np.float64]]
+            The density (cm^-3) of each collision partner, with the shape of
+            T_kin.
+        T_kin : NDArray[np.float64]
+            The kinetic temperatures (K) of the G grid points, 1-D.
+
+        Returns
+        -------
+        NDArray[np.float64]
+            The collisional rates, with shape (G, L, L) for L levels.
+        """
+        g_u, E_u = self.species.g_u, self.species.E_u
+        C = np.zeros((T_kin.size, E_u.size, E_u.size))
+        for density, temperatures, upper, lower, rates in zip(
+            n_partners, self.temperatures, self.upper, self.lower, self.rates
+        ):
+            T = np.clip(T_kin, temperatures[0], temperatures[-1])
+            i = np.clip(np.searchsorted(temperatures, T) - 1, 0, temperatures.size - 2)
+            weight = (T - temperatures[i]) / (temperatures[i + 1] - temperatures[i])
+            K = rates[:, i] * (1 - weight) + rates[:, i + 1] * weight
+            down = np.broadcast_to(density, T_kin.shape)[:, np.newaxis] * K.T
+            C[:, upper, lower] += down
+            balance = np.exp(-(E_u[upper] - E_u[lower]) / T_kin[:, np.newaxis])
+            C[:, lower, upper] += down * (g_u[upper] / g_u[lower]) * balance
+        return C
+
+    def _populations(
+        self,
+        C: NDArray[np.float64],
+        beta: NDArray[np.float64],
+        n_bg: NDArray[np.float64],
+    ) -> NDArray[np.float64]:
+        """
+        Solves the rate equations of G grid points with collisional rates C
+        (G, L, L), and escape probabilities beta and background photon
+        occupation numbers n_bg of the lines (G, n_lines). Returns the
+        fractional populations (G, L).
+        """
+        species = self.species
+        R = C.copy()
+        A_beta = species.A_ul * beta
+        R[:, species.upper, species.lower] += A_beta * (1 + n_bg)
+        R[:, species.lower, species.upper] += A_beta * self.g_ratio * n_bg
+        # d x_i/dt = sum_j x_j R_ji - x_i sum_j R_ij = 0, with sum_i x_i = 1
+        M = np.swapaxes(R, 1, 2)
+        diagonal = np.arange(R.shape[1])
+        M[:, diagonal, diagonal] -= R.sum(axis=2)
+        M[:, 0, :] = 1.0
+        rhs = np.zeros(M.shape[:2] + (1,))
+        rhs[:, 0] = 1.0
+        return np.maximum(np.linalg.solve(M, rhs)[..., 0], 0.0)
+
+    def solve(
+        self,
+        n_H2: ArrayLike,
+        T_kin: ArrayLike,
+        N: ArrayLike,
+        delta_v: ArrayLike,
+        T_bg: ArrayLike = 2.73,
+        geometry: str = "sphere",
+        ortho_para: ArrayLike | None = None,
+        rtol: float = 1e-6,
+        max_iter: int = 300,
+    ) -> dict[str, NDArray]:
+        """
+        Solves the level populations and the line intensities for a grid of
+        physical conditions. The inputs are broadcast together to the grid
+        shape S. As in RADEX, the populations start from the optically thin
+        solution, and are iterated (with an under-relaxation that is
+        strengthened for the points that oscillate) through the opacities and escape probabilities of the lines until the relative
+        change of every populated level is below rtol. Each iteration only
+        solves the grid points that have not converged yet.
+
+        Parameters
+        ----------
+        n_H2 : ArrayLike
+            The H2 density, in cm^-3.
+        T_kin : ArrayLike
+            The kinetic temperature, in K.
+        N : ArrayLike
+            The column density of the species, in cm^-2.
+        delta_v : ArrayLike
+            The FWHM of the lines, in km/s.
+        T_bg : ArrayLike
+            The temperature of the background radiation, in K.
+        geometry : str
+            The geometry of the escape probability (see escape_probability).
+        ortho_para : ArrayLike, optional
+            The ortho-to-para ratio of H2, thermal by default.
+        rtol : float
+            The relative change of the populations below which a grid point
+            has converged.
+        max_iter : int
+            The maximum number of iterations.
+
+        Returns
+        -------
+        dict[str, NDArray]
+            'populations', the fractional level populations with shape (L,) + S;
+            'tau', 'Tex' (K), 'T_R' (the peak radiation temperature above the
+            background, K) and 'TdV' (the integrated intensity, K km/s) of
+            every line, with shape (n_lines,) + S; and 'converged', with
+            shape S. Invalid grid points (e.g., T_kin <= 0) return NaN.
+        """
+        if geometry not in geometries:
+            raise ValueError(f"geometry must be one of {geometries}")
+        if ortho_para is None:
+            ortho_para = ortho_para_H2(T_kin)
+        arrays = np.broadcast_arrays(
+            *[
+                np.asarray(value, dtype=np.float64)
+                for value in (n_H2, T_kin, N, delta_v, T_bg, ortho_para)
+            ]
+        )
+        shape = arrays[0].shape
+        n_H2, T_kin, N, delta_v, T_bg, ortho_para = [a.ravel() for a in arrays]
+        species = self.species
+        n_levels, n_lines = species.E_u.size, species.freq.size
+
+        populations = np.full((n_H2.size, n_levels), np.nan)
+        converged = np.zeros(n_H2.size, dtype=bool)
+        valid = (n_H2 >= 0) & (T_kin > 0) & (N >= 0) & (delta_v > 0) & (T_bg >= 0)
+        valid &= np.isfinite(n_H2 + T_kin + N + delta_v + T_bg + ortho_para)
+        good = np.flatnonzero(valid)
+        n_chunk = max(1, chunk_elements // n_levels**2)
+        for start in range(0, good.size, n_chunk):
+            index = good[start : start + n_chunk]
+            densities = self.partner_densities(
+                n_H2[index], T_kin[index], ortho_para[index]
+            )
+            C = self.collision_matrix(densities, T_kin[index])
+            with np.errstate(over="ignore"):
+                n_bg = 1 / np.expm1(species.T_nu / T_bg[index, np.newaxis])
+            x = self._populations(C, np.ones((index.size, n_lines)), n_bg)
+            column = (N[index] / delta_v[index])[:, np.newaxis] * self.tau_factor
+            active = np.arange(index.size)
+            weight = np.full(index.size, relaxation)
+            last_change = np.full(index.size, np.inf)
+            for _ in range(max_iter):
+                tau = column[active] * (
+                    x[active][:, species.lower] * self.g_ratio
+                    - x[active][:, species.upper]
+                )
+                beta = escape_probability(tau, geometry)
+                x_new = self._populations(C[active], beta, n_bg[active])
+                x_old = x[active]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    change = np.where(
+                        x_new > min_population, np.abs(x_new - x_old) / x_new, 0.0
+                    ).max(axis=1)
+                # damp the points that oscillate instead of converging
+                weight[active] = np.where(
+                    change > last_change[active], weight[active] / 2, weight[active]
+                )
+                last_change[active] = change
+                x[active] = x_old + weight[active, np.newaxis] * (x_new - x_old)
+                done = change <= rtol
+                converged[index[active[done]]] = True
+                active = active[~done]
+                if active.size == 0:
+                    break
+            populations[index] = x
+
+        x_l = populations[:, species.lower]
+        x_u = populations[:, species.upper]
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            tau = (N / delta_v)[:, np.newaxis] * self.tau_factor
+            tau = tau * (x_l * self.g_ratio - x_u)
+            Tex = species.T_nu / np.log(x_l * self.g_ratio / x_u)
+            T_R = (
+                J_nu(Tex, species.freq) - J_nu(T_bg[:, np.newaxis], species.freq)
+            ) * (-np.expm1(-tau))
+        TdV = fgaus * delta_v[:, np.newaxis] * T_R
+        return {
+            "populations": populations.T.reshape((n_levels,) + shape),
+            "tau": tau.T.reshape((n_lines,) + shape),
+            "Tex": Tex.T.reshape((n_lines,) + shape),
+            "T_R": T_R.T.reshape((n_lines,) + shape),
+            "TdV": TdV.T.reshape((n_lines,) + shape),
+            "converged": converged.reshape(shape),
+        }
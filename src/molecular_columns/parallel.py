@@ -0,0 +1,281 @@
+import mmap
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from importlib import import_module
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+# maximum number of pixels of a tile, when the tile shape is not given,
+# for worker processes and for threads (smaller tiles, that share the
+# work of medium-size maps between threads and stay in the CPU cache)
+chunk_elements = 2**20
+thread_chunk_elements = 2**16
+
+# state of a worker process, set once by _init_worker
+_worker = {}
+
+
+def tiles(
+    shape: tuple[int, ...],
+    tile_shape: tuple[int, ...] | None = None,
+    max_elements: int | None = None,
+) -> list[tuple[slice, ...]]:
+    """
+    Splits an array shape into tiles, in C order.
+
+    Parameters
+    ----------
+    shape : tuple[int, ...]
+        The shape of the map.
+    tile_shape : tuple[int, ...], optional
+        The shape of the tiles along the leading axes (the tiles span the
+        other axes). Defaults to whole rows along the first axis, with at
+        most max_elements pixels per tile.
+    max_elements : int, optional
+        The maximum number of pixels of the default tiles, by default
+        ``chunk_elements``.
+
+    Returns
+    -------
+    list[tuple[slice, ...]]
+        The index of every tile.
+    """
+    if len(shape) == 0:
+        return [()]
+    if tile_shape is None:
+        if max_elements is None:
+            max_elements = chunk_elements
+        n_row = int(np.prod(shape[1:]))
+        tile_shape = (max(1, max_elements // max(1, n_row)),)
+    tile_shape = tuple(tile_shape) + shape[len(tile_shape) :]
+    if len(tile_shape) != len(shape) or min(tile_shape) < 1:
+        raise ValueError(f"Invalid tile shape {tile_shape} for a map of shape {shape}")
+    counts = [-(-n // size) for n, size in zip(shape, tile_shape)]
+    return [
+        tuple(slice(i * size, (i + 1) * size) for i, size in zip(index, tile_shape))
+        for index in np.ndindex(*counts)
+    ]
+
+
+def _share(value: NDArray) -> tuple[tuple, SharedMemory | None]:
+    """
+    Returns the specification used by the workers to attach an input array
+    without pickling it: the file of a memory-mapped array, or a copy of
+    the array in a new shared memory block (also returned, to be released).
+    """
+    if isinstance(value, np.memmap) and isinstance(value.base, mmap.mmap):
+        spec = ("memmap", value.filename, value.dtype.str, value.shape, value.offset)
+        if value.flags.c_contiguous:
+            return spec, None
+    shared = SharedMemory(create=True, size=max(1, value.nbytes))
+    array = np.ndarray(value.shape, value.dtype, buffer=shared.buf)
+    array[...] = value
+    return ("shared", shared.name, value.dtype.str, value.shape), shared
+
+
+def _attach(spec: tuple, mode: str = "r") -> tuple[NDArray, SharedMemory | None]:
+    """
+    Attaches the array described by a specification of _share.
+    """
+    kind, name, dtype, shape = spec[:4]
+    if kind == "memmap":
+        array = np.memmap(name, dtype, mode=mode, offset=spec[4], shape=shape)
+        return array, None
+    shared = SharedMemory(name=name)
+    return np.ndarray(shape, dtype, buffer=shared.buf), shared
+
+
+def _init_worker(
+    function: Callable,
+    specs: dict[str, tuple],
+    values: dict[str, NDArray],
+    output_spec: tuple,
+    kwargs: dict,
+) -> None:
+    """
+    Attaches the shared inputs and output of a worker process, once.
+    """
+    # imports the species module (and its catalog) once per worker, when
+    # it is not inherited from the parent process
+    import_module(function.__module__)
+    handles = []
+    inputs = dict(values)
+    for key, spec in specs.items():
+        inputs[key], handle = _attach(spec)
+        handles.append(handle)
+    output, handle = _attach(output_spec, mode="r+")
+    handles.append(handle)
+    _worker.update(
+        function=function,
+        inputs=inputs,
+        output=output,
+        kwargs=kwargs,
+        handles=handles,
+    )
+
+
+def _evaluate_tile(
+    function: Callable,
+    inputs: dict[str, NDArray],
+    output: NDArray[np.float64],
+    kwargs: dict,
+    tile: tuple[slice, ...],
+) -> None:
+    """
+    Evaluates function on a tile of the inputs (views, without copies), and
+    writes the result into the same tile of output.
+    """
+    shape = output.shape
+    values = {
+        key: np.broadcast_to(value, shape)[tile] if np.ndim(value) else value
+        for key, value in inputs.items()
+    }
+    output[tile] = np.broadcast_to(function(**values, **kwargs), output[tile].shape)
+
+
+def _run_tile(tile: tuple[slice, ...]) -> None:
+    """
+    Evaluates the function of the worker process on a tile of the map.
+    """
+    _evaluate_tile(
+        _worker["function"],
+        _worker["inputs"],
+        _worker["output"],
+        _worker["kwargs"],
+        tile,
+    )
+
+
+def map_tiles(
+    function: Callable,
+    inputs: dict[str, ArrayLike],
+    tile_shape: tuple[int, ...] | None = None,
+    n_workers: int | None = None,
+    out: NDArray[np.float64] | None = None,
+    threads: bool = False,
+    start_method: str | None = None,
+    **kwargs,
+) -> NDArray[np.float64]:
+    """
+    Evaluates a unit-free column density function (e.g., col_c18o.C18O_thin_np
+    or col_so.SO_thin_np) on large maps with a pool of worker processes,
+    or of threads. The maps are split into tiles (see tiles), and each
+    worker evaluates the function on its tiles and writes the results into
+    a shared output array, so the results do not depend on the order in
+    which the tiles are evaluated.
+
+    With threads=True, the tiles are views of the inputs and of the output,
+    without any copy or start-up cost, which suits medium-size maps
+    (1e5-1e6 pixels). The speedup comes from the NumPy operations of the
+    kernels (exp, expm1, the level sums of the partition function), which
+    release the GIL, so it depends on the fraction of time spent in them.
+
+    The input arrays are not pickled: memory-mapped arrays (np.memmap) are
+    re-opened by the workers, and the other arrays are copied once into
+    shared memory (multiprocessing.shared_memory), so any start method
+    works. With 'spawn' or 'forkserver', each worker imports the module of
+    function once at start-up, and the catalogs are read from the binary
+    cache of catalog.load_catalog rather than parsed again.
+
+    Parameters
+    ----------
+    function : Callable
+        The function, called with tiles of the inputs as keyword arguments.
+        It must be picklable (e.g., defined at the top level of a module),
+        and return a tile with the map shape.
+    inputs : dict[str, ArrayLike]
+        The map inputs of function, e.g., {'Tex': Tex, 'TdV': TdV}, with
+        broadcastable shapes.
+    tile_shape : tuple[int, ...], optional
+        The shape of the tiles along the leading axes of the map.
+    n_workers : int, optional
+        The number of worker processes, or None to use all the CPU cores.
+        With n_workers=1, the tiles are evaluated in this process.
+    out : NDArray[np.float64], optional
+        A float64 array with the map shape for the results, e.g., a writable
+        np.memmap shared with the workers through its file.
+    threads : bool
+        If True, the tiles are evaluated by a pool of threads instead of
+        worker processes, with smaller default tiles (at most
+        ``thread_chunk_elements`` pixels).
+    start_method : str, optional
+        The multiprocessing start method of the worker processes, by
+        default that of the platform (not 'fork' on recent Python versions,
+        as forking a process with threads can deadlock).
+    **kwargs
+        The other (scalar) arguments of function, e.g., J_up=2.
+
+    Returns
+    -------
+    NDArray[np.float64]
+        The results, with the broadcast shape of the inputs (out, if given).
+    """
+    # memory-mapped arrays are kept as such, to be re-opened by the workers
+    arrays = {
+        key: value if isinstance(value, np.memmap) else np.asarray(value)
+        for key, value in inputs.items()
+    }
+    shape = np.broadcast_shapes(*[value.shape for value in arrays.values()])
+    if out is not None and (out.shape != shape or out.dtype != np.float64):
+        raise ValueError(f"out must be a float64 array of shape {shape}")
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    tile_list = tiles(
+        shape, tile_shape, thread_chunk_elements if threads else chunk_elements
+    )
+    if threads or n_workers == 1 or len(tile_list) == 1:
+        result = np.empty(shape) if out is None else out
+        evaluate = partial(_evaluate_tile, function, arrays, result, kwargs)
+        if n_workers > 1 and len(tile_list) > 1:
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                list(executor.map(evaluate, tile_list))
+        else:
+            for tile in tile_list:
+                evaluate(tile)
+        return result
+
+    shared_blocks = []
+    try:
+        specs = {}
+        for key, value in arrays.items():
+            if value.ndim:
+                specs[key], shared = _share(value)
+                shared_blocks.append(shared)
+        in_place = (
+            isinstance(out, np.memmap)
+            and isinstance(out.base, mmap.mmap)
+            and out.flags.c_contiguous
+        )
+        if in_place:
+            output_spec, _ = _share(out)
+        else:
+            output_spec, output_block = _share(np.empty(shape))
+            shared_blocks.append(output_block)
+        values = {key: value for key, value in arrays.items() if not value.ndim}
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(function, specs, values, output_spec, kwargs),
+        ) as executor:
+            list(executor.map(_run_tile, tile_list))
+        if in_place:
+            out.flush()
+            return out
+        output = np.ndarray(shape, np.float64, buffer=output_block.buf)
+        if out is None:
+            out = output.copy()
+        else:
+            out[...] = output
+        del output
+        return out
+    finally:
+        for shared in shared_blocks:
+            if shared is not None:
+                shared.close()
+                shared.unlink()
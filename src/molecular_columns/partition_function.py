@@ -0,0 +1,320 @@
+import threading
+import warnings
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+# maximum number of (Tex, level) terms evaluated at once by level_sum
+chunk_elements = 2**20
+# number of temperatures interpolated at once by PartitionTable, small
+# enough for the temporaries to stay in the CPU cache
+table_chunk = 2**15
+# serializes the lazy builds of the tables, so that threads evaluating the
+# same table wait for it to be complete instead of using a partial grid
+_build_lock = threading.Lock()
+
+
+def level_sum(
+    g_u: ArrayLike,
+    E_u: ArrayLike,
+    Tex: ArrayLike,
+) -> float | NDArray[np.float64]:
+    """
+    Evaluates the partition function sum_i g_i exp(-E_i/Tex) for an
+    excitation temperature of any shape.
+    The sum over levels is done as a matrix-vector product over chunks of
+    the flattened Tex array, so that the memory used is bounded by
+    ``chunk_elements`` regardless of the size of Tex.
+    Invalid temperatures (NaN, inf, or Tex <= 0) return NaN.
+
+    Parameters
+    ----------
+    g_u : ArrayLike
+        The degeneracy of each energy level.
+    E_u : ArrayLike
+        The energy of each level, in K.
+    Tex : ArrayLike
+        The excitation temperature(s), in K.
+
+    Returns
+    -------
+    float | NDArray[np.float64]
+        The partition function, with the same shape as Tex.
+    """
+    g_u = np.asarray(g_u, dtype=np.float64).ravel()
+    E_u = np.asarray(E_u, dtype=np.float64).ravel()
+    Tex = np.asarray(Tex, dtype=np.float64)
+
+    Tex_flat = Tex.ravel()
+    Q = np.full(Tex_flat.shape, np.nan)
+    good = np.flatnonzero(np.isfinite(Tex_flat) & (Tex_flat > 0))
+    n_chunk = max(1, chunk_elements // max(1, E_u.size))
+    for start in range(0, good.size, n_chunk):
+        index = good[start : start + n_chunk]
+        Q[index] = np.exp(-E_u / Tex_flat[index, np.newaxis]) @ g_u
+    if Tex.ndim == 0:
+        return float(Q[0])
+    return Q.reshape(Tex.shape)
+
+
+def level_moments(
+    g_u: ArrayLike,
+    E_u: ArrayLike,
+    Tex: ArrayLike,
+) -> tuple[float | NDArray[np.float64], float | NDArray[np.float64]]:
+    """
+    Evaluates the partition function Q = sum_i g_i exp(-E_i/Tex) and its
+    derivative d ln(Q)/d Tex = <E>/Tex^2 in the same pass over the levels
+    (see level_sum), where <E> is the population-weighted mean level energy.
+
+    Parameters
+    ----------
+    g_u : ArrayLike
+        The degeneracy of each energy level.
+    E_u : ArrayLike
+        The energy of each level, in K.
+    Tex : ArrayLike
+        The excitation temperature(s), in K.
+
+    Returns
+    -------
+    tuple[float | NDArray[np.float64], float | NDArray[np.float64]]
+        Q and d ln(Q)/d Tex (in K^-1), with the same shape as Tex.
+    """
+    g_u = np.asarray(g_u, dtype=np.float64).ravel()
+    E_u = np.asarray(E_u, dtype=np.float64).ravel()
+    Tex = np.asarray(Tex, dtype=np.float64)
+
+    Tex_flat = Tex.ravel()
+    sums = np.full((Tex_flat.size, 2), np.nan)
+    weights = np.stack([g_u, g_u * E_u], axis=1)
+    good = np.flatnonzero(np.isfinite(Tex_flat) & (Tex_flat > 0))
+    n_chunk = max(1, chunk_elements // max(1, E_u.size))
+    for start in range(0, good.size, n_chunk):
+        index = good[start : start + n_chunk]
+        sums[index] = np.exp(-E_u / Tex_flat[index, np.newaxis]) @ weights
+    Q = sums[:, 0]
+    dlnQ_dT = sums[:, 1] / Q / Tex_flat**2
+    if Tex.ndim == 0:
+        return float(Q[0]), float(dlnQ_dT[0])
+    return Q.reshape(Tex.shape), dlnQ_dT.reshape(Tex.shape)
+
+
+def _log_Q_and_slope(
+    g_u: NDArray[np.float64], E_u: NDArray[np.float64], Tex: NDArray[np.float64]
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """
+    Returns ln(Q) and its exact derivative d ln(Q)/d ln(Tex) = <E>/Tex,
+    where <E> is the population-weighted mean level energy.
+    """
+    boltzmann = g_u * np.exp(-E_u / Tex[:, np.newaxis])
+    Q = boltzmann.sum(axis=1)
+    return np.log(Q), (boltzmann @ E_u) / Q / Tex
+
+
+class PartitionTable:
+    """
+    Tabulated partition function for a set of energy levels.
+
+    The table samples ln(Q) and its exact slope d ln(Q)/d ln(T) on a
+    log-spaced temperature grid between T_min and T_max, and answers
+    queries by cubic Hermite interpolation in (ln T, ln Q).
+    The table is built lazily on the first call. The grid is refined by
+    doubling the number of nodes until the relative error against the
+    exact level sum, measured at three interior points of every interval,
+    is below rtol. The measured error is stored in ``max_rel_error``, and
+    is the documented bound of the table inside [T_min, T_max].
+
+    Parameters
+    ----------
+    g_u : ArrayLike
+        The degeneracy of each energy level.
+    E_u : ArrayLike
+        The energy of each level, in K.
+    T_min : float
+        The lowest temperature of the table, in K.
+    T_max : float
+        The highest temperature of the table, in K.
+    rtol : float
+        The maximum relative error allowed for the interpolated values.
+    """
+
+    def __init__(
+        self,
+        g_u: ArrayLike,
+        E_u: ArrayLike,
+        T_min: float = 1.0,
+        T_max: float = 1000.0,
+        rtol: float = 1e-6,
+    ) -> None:
+        if not 0 < T_min < T_max:
+            raise ValueError("The table range must satisfy 0 < T_min < T_max")
+        self.g_u = np.asarray(g_u, dtype=np.float64).ravel()
+        self.E_u = np.asarray(E_u, dtype=np.float64).ravel()
+        self.T_min = float(T_min)
+        self.T_max = float(T_max)
+        self.rtol = float(rtol)
+        self.max_rel_error = np.nan
+        self._log_T = None
+        self._complete = False
+
+    @property
+    def size(self) -> int:
+        """Number of temperature nodes in the table (0 if not built yet)."""
+        return 0 if self._log_T is None else self._log_T.size
+
+    def build(self, n_nodes: int = 64, max_nodes: int = 2**16) -> None:
+        """
+        Builds the table, refining the grid until the error is below rtol.
+
+        Parameters
+        ----------
+        n_nodes : int
+            The initial number of temperature nodes.
+        max_nodes : int
+            The maximum number of temperature nodes. If the error is still
+            above rtol with max_nodes nodes, a RuntimeWarning is emitted,
+            and max_rel_error gives the actual error of the table.
+        """
+        self._complete = False
+        x_min, x_max = np.log(self.T_min), np.log(self.T_max)
+        while True:
+            self._set_nodes(np.linspace(x_min, x_max, n_nodes))
+            # check at 1/4, 1/2 and 3/4 of every interval
+            x_check = (
+                self._log_T[:-1, np.newaxis] + self._dx * np.array([0.25, 0.5, 0.75])
+            ).ravel()
+            log_Q_exact, _ = _log_Q_and_slope(self.g_u, self.E_u, np.exp(x_check))
+            error = np.abs(np.expm1(self._interpolate(x_check) - log_Q_exact))
+            self.max_rel_error = float(np.max(error))
+            if (self.max_rel_error <= self.rtol) or (2 * n_nodes > max_nodes):
+                break
+            n_nodes *= 2
+        if self.max_rel_error > self.rtol:
+            warnings.warn(
+                f"The partition function table has a relative error of"
+                f" {self.max_rel_error:.3g} with {n_nodes} nodes, above rtol ="
+                f" {self.rtol:.3g}",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+        self._complete = True
+
+    def _ensure_built(self) -> None:
+        """
+        Builds the table on first use, once, even with concurrent threads.
+        """
+        if not self._complete:
+            with _build_lock:
+                if not self._complete:
+                    self.build()
+
+    def _interpolate(self, x: NDArray[np.float64]) -> NDArray[np.float64]:
+        """
+        Cubic Hermite interpolation of ln(Q) at x = ln(T), for x inside the table.
+        """
+        position = (x - self._log_T[0]) * (1.0 / self._dx)
+        i = np.minimum(position.astype(np.intp), self._log_T.size - 2)
+        t = position - i
+        c = self._coefficients
+        return ((c[3, i] * t + c[2, i]) * t + c[1, i]) * t + c[0, i]
+
+    def _interpolate_slope(self, x: NDArray[np.float64]) -> NDArray[np.float64]:
+        """
+        Derivative d ln(Q)/d ln(T) of the Hermite interpolant at x = ln(T).
+        """
+        position = (x - self._log_T[0]) * (1.0 / self._dx)
+        i = np.minimum(position.astype(np.intp), self._log_T.size - 2)
+        t = position - i
+        c = self._coefficients
+        return ((3 * c[3, i] * t + 2 * c[2, i]) * t + c[1, i]) * (1.0 / self._dx)
+
+    def _set_nodes(self, log_T: NDArray[np.float64]) -> None:
+        """
+        Stores the nodes and the Hermite polynomial coefficients (in powers
+        of the fractional position within each interval).
+        """
+        log_Q, slope = _log_Q_and_slope(self.g_u, self.E_u, np.exp(log_T))
+        dx = log_T[1] - log_T[0]
+        y0, y1 = log_Q[:-1], log_Q[1:]
+        m0, m1 = dx * slope[:-1], dx * slope[1:]
+        self._log_T, self._dx = log_T, dx
+        self._coefficients = np.array(
+            [y0, m0, 3 * (y1 - y0) - 2 * m0 - m1, 2 * (y0 - y1) + m0 + m1]
+        )
+
+    def __call__(
+        self, Tex: ArrayLike, exact_outside: bool = True
+    ) -> float | NDArray[np.float64]:
+        """
+        Returns the interpolated partition function for Tex (in K).
+
+        Parameters
+        ----------
+        Tex : ArrayLike
+            The excitation temperature(s), in K.
+        exact_outside : bool
+            If True, temperatures outside [T_min, T_max] are evaluated with
+            the exact level sum, otherwise they return NaN.
+
+        Returns
+        -------
+        float | NDArray[np.float64]
+            The partition function, with the same shape as Tex.
+        """
+        self._ensure_built()
+        Tex = np.asarray(Tex, dtype=np.float64)
+        Tex_flat = Tex.ravel()
+        inside = (Tex_flat >= self.T_min) & (Tex_flat <= self.T_max)
+        Q = np.full(Tex_flat.shape, np.nan)
+        for start in range(0, Tex_flat.size, table_chunk):
+            block = slice(start, start + table_chunk)
+            if np.all(inside[block]):
+                Q[block] = np.exp(self._interpolate(np.log(Tex_flat[block])))
+            else:
+                index = np.flatnonzero(inside[block]) + start
+                Q[index] = np.exp(self._interpolate(np.log(Tex_flat[index])))
+        if exact_outside:
+            outside = ~inside & np.isfinite(Tex_flat)
+            if np.any(outside):
+                Q[outside] = level_sum(self.g_u, self.E_u, Tex_flat[outside])
+        if Tex.ndim == 0:
+            return float(Q[0])
+        return Q.reshape(Tex.shape)
+
+    def log_slope(
+        self, Tex: ArrayLike, exact_outside: bool = True
+    ) -> float | NDArray[np.float64]:
+        """
+        Returns the interpolated logarithmic derivative d ln(Q)/d ln(Tex),
+        the derivative of the interpolant used by __call__.
+
+        Parameters
+        ----------
+        Tex : ArrayLike
+            The excitation temperature(s), in K.
+        exact_outside : bool
+            If True, temperatures outside [T_min, T_max] are evaluated with
+            the exact level sums, otherwise they return NaN.
+
+        Returns
+        -------
+        float | NDArray[np.float64]
+            d ln(Q)/d ln(Tex), with the same shape as Tex.
+        """
+        self._ensure_built()
+        Tex = np.asarray(Tex, dtype=np.float64)
+        Tex_flat = Tex.ravel()
+        inside = (Tex_flat >= self.T_min) & (Tex_flat <= self.T_max)
+        slope = np.full(Tex_flat.shape, np.nan)
+        for start in range(0, Tex_flat.size, table_chunk):
+            index = np.flatnonzero(inside[start : start + table_chunk]) + start
+            slope[index] = self._interpolate_slope(np.log(Tex_flat[index]))
+        if exact_outside:
+            outside = ~inside & np.isfinite(Tex_flat)
+            if np.any(outside):
+                _, dlnQ_dT = level_moments(self.g_u, self.E_u, Tex_flat[outside])
+                slope[outside] = dlnQ_dT * Tex_flat[outside]
+        if Tex.ndim == 0:
+            return float(slope[0])
+        return slope.reshape(Tex.shape)
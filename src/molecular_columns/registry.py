@@ -0,0 +1,43 @@
+from collections.abc import Iterator, Mapping
+from importlib import import_module
+
+# species name -> (module, name of the Species object in the module)
+species_modules = {
+    "C18O": ("col_c18o", "C18O"),
+    "DCN": ("col_dcn", "DCN"),
+    "DCO+": ("col_dcop", "DCOp"),
+    "H13CO+": ("col_h13cop", "H13COp"),
+    "p-H2CO": ("col_h2co", "p_H2CO"),
+    "o-H2CO": ("col_h2co", "o_H2CO"),
+    "p-C3H2": ("col_cc3h2", "p_C3H2"),
+    "o-C3H2": ("col_cc3h2", "o_C3H2"),
+    "p-NH2D": ("col_nh2d", "p_NH2D"),
+    "o-NH2D": ("col_nh2d", "o_NH2D"),
+    "SO": ("col_so", "SO"),
+    "SO2": ("col_so2", "SO2"),
+}
+
+
+class SpeciesRegistry(Mapping):
+    """
+    Read-only mapping from species name to its lte.Species catalog.
+    The species module (and its data files) is only imported the first time
+    one of its species is accessed, e.g., ``species["SO"]``.
+    """
+
+    def __getitem__(self, name: str):
+        module_name, attribute = species_modules[name]
+        module = import_module(f"{__package__}.{module_name}")
+        return getattr(module, attribute)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(species_modules)
+
+    def __len__(self) -> int:
+        return len(species_modules)
+
+    def __repr__(self) -> str:
+        return f"<SpeciesRegistry: {', '.join(species_modules)}>"
+
+
+species = SpeciesRegistry()
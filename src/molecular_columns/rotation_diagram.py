@@ -0,0 +1,285 @@
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from .lte import Species
+
+
+def linear_fit(
+    x: ArrayLike, y: ArrayLike, weights: ArrayLike
+) -> tuple[NDArray[np.float64], ...]:
+    """
+    Weighted linear least-squares fit y = a + b x along the first axis,
+    solved in closed form for all the other axes (e.g., pixels) at once.
+    Points with zero weight are ignored, and fits with less than two
+    points (or a single x value) return NaN.
+
+    Parameters
+    ----------
+    x : ArrayLike
+        The abscissae, with the points along the first axis.
+    y : ArrayLike
+        The ordinates, broadcastable with x.
+    weights : ArrayLike
+        The weights (1/sigma_y^2) of the points, broadcastable with y.
+
+    Returns
+    -------
+    tuple[NDArray[np.float64], ...]
+        The intercept a, the slope b, their variances var_a and var_b,
+        their covariance cov_ab, and the number of points used.
+    """
+    x, y, weights = np.broadcast_arrays(
+        np.asarray(x, dtype=np.float64),
+        np.asarray(y, dtype=np.float64),
+        np.asarray(weights, dtype=np.float64),
+    )
+    good = (weights > 0) & np.isfinite(y) & np.isfinite(x)
+    w = np.where(good, weights, 0.0)
+    x = np.where(good, x, 0.0)
+    y = np.where(good, y, 0.0)
+    S = w.sum(axis=0)
+    Sx = (w * x).sum(axis=0)
+    Sy = (w * y).sum(axis=0)
+    Sxx = (w * x * x).sum(axis=0)
+    Sxy = (w * x * y).sum(axis=0)
+    n_points = good.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = S * Sxx - Sx**2
+        delta = np.where((n_points >= 2) & (delta > 0), delta, np.nan)
+        a = (Sxx * Sy - Sx * Sxy) / delta
+        b = (S * Sxy - Sx * Sy) / delta
+        return a, b, Sxx / delta, S / delta, -Sx / delta, n_points
+
+
+def upper_columns(
+    species: Species, index: ArrayLike, TdV: ArrayLike
+) -> NDArray[np.float64]:
+    """
+    Column density of the upper level divided by its degeneracy, N_u/g_u
+    (in cm^-2), of optically thin transitions, as in SO_thin_Nu_Rot:
+
+        N_u/g_u = 8 pi k nu^2/(h c^3 A_ul g_u) TdV
+
+    Parameters
+    ----------
+    species : Species
+        The species.
+    index : ArrayLike
+        The indices of the K transitions.
+    TdV : ArrayLike
+        The integrated intensities, in K km/s, with the K transitions along
+        the first axis (e.g., a stack of K maps).
+
+    Returns
+    -------
+    NDArray[np.float64]
+        N_u/g_u, in cm^-2, with the shape of TdV.
+    """
+    index = np.asarray(index, dtype=np.intp)
+    TdV = np.asarray(TdV, dtype=np.float64)
+    scale = species.prefactor[index] / species.T_nu[index]
+    return scale.reshape(index.shape + (1,) * (TdV.ndim - index.ndim)) * TdV
+
+
+def rotation_diagram(
+    species: Species,
+    index: ArrayLike,
+    TdV: ArrayLike,
+    TdV_err: ArrayLike | None = None,
+    tabulated: bool = False,
+) -> tuple[NDArray[np.float64], ...]:
+    """
+    Rotation diagram fit of K optically thin transitions, for every pixel
+    of a stack of TdV maps at once:
+
+        ln(N_u/g_u) = ln(N_tot/Q(T_rot)) - E_u/T_rot
+
+    The weighted linear least-squares problem is solved in closed form (see
+    linear_fit), with weights from the relative uncertainties of TdV. If
+    TdV_err is not given, all points have the same weight and the
+    uncertainties are scaled by the scatter of the residuals (this needs
+    at least three lines). Lines with TdV <= 0 or NaN are ignored in each
+    pixel, and pixels with less than two lines return NaN.
+
+    Parameters
+    ----------
+    species : Species
+        The species.
+    index : ArrayLike
+        The indices of the K transitions (e.g., from Species.transitions).
+    TdV : ArrayLike
+        The integrated intensities, in K km/s, with shape (K, ...).
+    TdV_err : ArrayLike, optional
+        The uncertainties of TdV, in K km/s, broadcastable with TdV.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_table.
+
+    Returns
+    -------
+    tuple[NDArray[np.float64], ...]
+        The maps of T_rot (K), N_tot (cm^-2), and their uncertainties.
+    """
+    E_up, y, weights = _diagram_points(species, index, TdV, TdV_err)
+    return _fit_diagram(species, E_up, y, weights, TdV_err is None, tabulated)
+
+
+def _diagram_points(
+    species: Species, index: ArrayLike, TdV: ArrayLike, TdV_err: ArrayLike | None
+) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+    """
+    Returns E_up (broadcastable with TdV), ln(N_u/g_u) (NaN where TdV <= 0)
+    and the weights of the points of a rotation diagram.
+    """
+    index = np.asarray(index, dtype=np.intp)
+    TdV = np.asarray(TdV, dtype=np.float64)
+    Nu_gu = upper_columns(species, index, TdV)
+    E_up = species.E_up[index].reshape(index.shape + (1,) * (TdV.ndim - index.ndim))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y = np.log(np.where(TdV > 0, Nu_gu, np.nan))
+        if TdV_err is None:
+            weights = np.ones_like(y)
+        else:
+            weights = (TdV / np.asarray(TdV_err, dtype=np.float64)) ** 2
+            weights[~np.isfinite(weights)] = 0.0
+    return E_up, y, np.broadcast_to(weights, y.shape)
+
+
+def _fit_diagram(
+    species: Species,
+    E_up: NDArray[np.float64],
+    y: NDArray[np.float64],
+    weights: NDArray[np.float64],
+    scale_errors: bool,
+    tabulated: bool,
+) -> tuple[NDArray[np.float64], ...]:
+    """
+    Fits the points of a rotation diagram (see rotation_diagram), and returns
+    T_rot, N_tot and their uncertainties. If scale_errors is True, the
+    uncertainties are scaled by the reduced chi^2 of the fit.
+    """
+    a, b, var_a, var_b, cov_ab, n_points = linear_fit(E_up, y, weights)
+    if scale_errors:
+        # scale the covariance by the reduced chi^2 of the fit
+        with np.errstate(divide="ignore", invalid="ignore"):
+            residuals = np.where(np.isfinite(y), y - a - b * E_up, 0.0)
+            chi2 = (residuals**2).sum(axis=0) / np.where(n_points > 2, n_points - 2, 0)
+        var_a, var_b, cov_ab = var_a * chi2, var_b * chi2, cov_ab * chi2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        T_rot = -1.0 / b
+        T_rot_err = np.sqrt(var_b) / b**2
+        # Q and d ln(Q)/d T_rot, from the table if tabulated, and d T_rot = d b/b^2
+        Q, dlnQ_dT = species.Q_and_derivative(T_rot, tabulated=tabulated)
+        N_tot = Q * np.exp(a)
+        slope = dlnQ_dT / b**2
+        var_ln_N = var_a + slope**2 * var_b + 2 * slope * cov_ab
+        N_tot_err = N_tot * np.sqrt(np.maximum(var_ln_N, 0.0))
+    return T_rot, N_tot, T_rot_err, N_tot_err
+
+
+def population_diagram(
+    species: Species,
+    index: ArrayLike,
+    TdV: ArrayLike,
+    sigma_v: ArrayLike,
+    TdV_err: ArrayLike | None = None,
+    rtol: float = 1e-4,
+    max_iter: int = 50,
+    tabulated: bool = False,
+) -> tuple[NDArray[np.float64], ...]:
+    """
+    Population diagram of K transitions that are not optically thin, for
+    every pixel of a stack of TdV maps at once. Starting from the rotation
+    diagram, the line centre opacity of each transition is computed from the
+    current T_rot and N_tot (for a Gaussian line of dispersion sigma_v):
+
+        tau = N_u/g_u (exp(h nu/k T_rot) - 1) / (prefactor sqrt(2 pi) sigma_v)
+
+    and the N_u/g_u of every line is corrected by c_tau = tau/(1 - exp(-tau))
+    before refitting, until T_rot and N_tot change by less than rtol.
+    Only the pixels that have not converged yet are refitted, so each
+    iteration costs in proportion to the number of unconverged pixels.
+    The weights of the lines are those of the rotation diagram (the
+    uncertainty of the correction is neglected). Saturated lines
+    (tau >> 1) constrain N_tot weakly, and the convergence slows down when
+    the opacities are much larger than a few.
+
+    Parameters
+    ----------
+    species : Species
+        The species.
+    index : ArrayLike
+        The indices of the K transitions (e.g., from Species.transitions).
+    TdV : ArrayLike
+        The integrated intensities, in K km/s, with shape (K, ...).
+    sigma_v : ArrayLike
+        The velocity dispersion of the lines, in km/s, broadcastable with TdV.
+    TdV_err : ArrayLike, optional
+        The uncertainties of TdV, in K km/s, broadcastable with TdV.
+    rtol : float
+        The relative change of T_rot and N_tot below which a pixel has
+        converged.
+    max_iter : int
+        The maximum number of iterations.
+    tabulated : bool
+        If True, the partition function is interpolated from Q_table.
+
+    Returns
+    -------
+    tuple[NDArray[np.float64], ...]
+        The maps of T_rot (K), N_tot (cm^-2), and their uncertainties, the
+        opacities of the K lines with shape (K, ...), and the boolean map
+        of the pixels that converged within max_iter iterations.
+    """
+    index = np.asarray(index, dtype=np.intp).ravel()
+    TdV = np.asarray(TdV, dtype=np.float64)
+    map_shape = TdV.shape[1:]
+    K = index.size
+    if TdV_err is not None:
+        TdV_err = np.broadcast_to(TdV_err, TdV.shape).reshape(K, -1)
+    E_up, y_thin, weights = _diagram_points(species, index, TdV.reshape(K, -1), TdV_err)
+    sigma_v = np.broadcast_to(np.asarray(sigma_v, dtype=np.float64), TdV.shape)
+    sigma_v = sigma_v.reshape(K, -1)
+    T_nu = species.T_nu[index][:, np.newaxis]
+    # tau = N_u/g_u expm1(T_nu/T_rot) * tau_scale/sigma_v
+    tau_scale = 1.0 / (species.prefactor[index][:, np.newaxis] * np.sqrt(2 * np.pi))
+
+    results = _fit_diagram(species, E_up, y_thin, weights, TdV_err is None, tabulated)
+    T_rot, N_tot, T_rot_err, N_tot_err = results
+    tau = np.full(y_thin.shape, np.nan)
+    converged = np.zeros(T_rot.shape, dtype=bool)
+    active = np.flatnonzero(np.isfinite(T_rot) & (T_rot > 0) & np.isfinite(N_tot))
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        T, N = T_rot[active], N_tot[active]
+        with np.errstate(over="ignore", invalid="ignore"):
+            Nu_gu = N / species.Q(T, tabulated=tabulated) * np.exp(-E_up / T)
+            tau_active = Nu_gu * np.expm1(T_nu / T) * tau_scale / sigma_v[:, active]
+            c = np.where(tau_active > 0, tau_active / -np.expm1(-tau_active), 1.0)
+        tau[:, active] = tau_active
+        fit = _fit_diagram(
+            species,
+            E_up,
+            y_thin[:, active] + np.log(c),
+            weights[:, active],
+            TdV_err is None,
+            tabulated,
+        )
+        for result, value in zip(results, fit):
+            result[active] = value
+        T_new, N_new = fit[0], fit[1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            done = (np.abs(T_new - T) <= rtol * T) & (np.abs(np.log(N_new / N)) <= rtol)
+            valid = np.isfinite(T_new) & (T_new > 0) & np.isfinite(N_new)
+        converged[active[done & valid]] = True
+        active = active[~done & valid]
+
+    return (
+        T_rot.reshape(map_shape),
+        N_tot.reshape(map_shape),
+        T_rot_err.reshape(map_shape),
+        N_tot_err.reshape(map_shape),
+        tau.reshape(TdV.shape),
+        converged.reshape(map_shape),
+    )
@@ -0,0 +1,247 @@
+import astropy.units as u
+import numpy as np
+from astropy.table import Column
+from numpy.typing import NDArray
+
+from .lte import no_match, propagate_errors
+from .registry import species as registered_species
+
+# units of the inputs of the unit-free kernels, and of the results
+input_units = {
+    "TdV": u.K * u.km / u.s,
+    "Tex": u.K,
+    "T_bg": u.K,
+    "tau": u.dimensionless_unscaled,
+    "freq": u.GHz,
+}
+column_unit = u.cm**-2
+
+
+def is_pandas(table) -> bool:
+    """
+    True if table is a pandas DataFrame. pandas is an optional dependency,
+    and is not imported here.
+    """
+    return type(table).__module__.startswith("pandas")
+
+
+def column_units(table) -> dict[str, u.UnitBase]:
+    """
+    Returns the units of the columns of an astropy Table (or QTable) or of
+    a pandas DataFrame. pandas does not have column units, so they are
+    stored in the mapping ``df.attrs['units']`` from column name to unit
+    (string), which is written to and read from Parquet files by pandas,
+    and which is the units argument of astropy.table.Table.from_pandas.
+
+    Parameters
+    ----------
+    table : astropy.table.Table | pandas.DataFrame
+        The table.
+
+    Returns
+    -------
+    dict[str, u.UnitBase]
+        The unit of each column which has one.
+    """
+    if is_pandas(table):
+        units = table.attrs.get("units", {})
+        return {name: u.Unit(unit) for name, unit in units.items() if name in table}
+    return {
+        name: table[name].unit
+        for name in table.colnames
+        if getattr(table[name], "unit", None) is not None
+    }
+
+
+def _values(table, name: str, unit: u.UnitBase) -> NDArray[np.float64]:
+    """
+    Returns a column of table as a float64 array in unit, with NaN for the
+    masked or missing values. Columns without a unit are taken to be in
+    unit already.
+    """
+    column = table[name]
+    if is_pandas(table):
+        values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        data = column.value if isinstance(column, u.Quantity) else column
+        values = np.ma.filled(np.ma.asarray(data, dtype=np.float64), np.nan)
+    current = column_units(table).get(name) if is_pandas(table) else column.unit
+    if current is not None and current != unit:
+        values = values * current.to(unit)
+    return values
+
+
+def _labels(table, name: str) -> NDArray:
+    """
+    Returns a column of labels (species names or transition keys) as an
+    array that can be sorted, with strings for columns of mixed types.
+    """
+    column = table[name]
+    values = column.to_numpy() if is_pandas(table) else np.ma.getdata(column)
+    values = np.asarray(values)
+    if values.dtype.kind == "O":
+        values = values.astype(str)
+    return values
+
+
+def _transition(species, label) -> int:
+    """
+    Returns the index of the transition of species with the key label,
+    where numeric keys may be given as strings (e.g., in a column of keys
+    for several species).
+    """
+    if isinstance(label, str) and species.keys.dtype.kind in "iuf":
+        try:
+            label = float(label)
+        except ValueError:
+            return no_match
+    return species.transition(label)
+
+
+def _set_column(table, name: str, values: NDArray[np.float64]) -> None:
+    """
+    Adds (or replaces) a column of column densities, with its unit.
+    """
+    if is_pandas(table):
+        table[name] = values
+        table.attrs.setdefault("units", {})[name] = column_unit.to_string()
+    else:
+        table[name] = Column(values, name=name, unit=column_unit)
+
+
+def column_densities(
+    table,
+    species: str = "species",
+    transition: str = "transition",
+    TdV: str = "TdV",
+    Tex: str = "Tex",
+    tau: str | None = None,
+    T_bg: float | str = 2.73,
+    errors: dict[str, str] | None = None,
+    by_freq: bool = False,
+    tol_MHz: float = 0.5,
+    tabulated: bool = False,
+    name: str = "Ncol",
+    error_name: str | None = None,
+):
+    """
+    Column densities in LTE for a table of line-fit results, with one row
+    per line (e.g., per source, species and transition). The rows are
+    grouped by species and transition, and each group is evaluated with one
+    call of the vectorized kernel of the species (Species.thin_index, or
+    Species.thick_index if tau is given), without any loop over the rows.
+    The column densities (and their uncertainties) are added to the table
+    in place, as columns in cm^-2.
+
+    The table can be an astropy Table or QTable, or a pandas DataFrame.
+    The inputs are converted from the units of their columns (see
+    column_units) to the units of the unit-free API, and columns without
+    units are taken to be in K km/s, K and GHz. The output columns have
+    units, so that the table keeps them through ECSV (astropy) or Parquet
+    (astropy or pandas) files.
+
+    Parameters
+    ----------
+    table : astropy.table.Table | pandas.DataFrame
+        The table of line-fit results.
+    species : str
+        The column of the species names (see registry.species). The rows of
+        unknown species get NaN.
+    transition : str
+        The column of the transition keys of each species (see
+        Species.keys, e.g., J_up for C18O or 'N_J-N_J' for SO), or of their
+        frequencies if by_freq is True. The rows of unknown transitions get
+        NaN.
+    TdV : str
+        The column of the integrated intensities.
+    Tex : str
+        The column of the excitation temperatures.
+    tau : str, optional
+        The column of the optical depths. If given, the column densities are
+        corrected for the optical depth (see Species.thick).
+    T_bg : float | str
+        The background temperature in K, or the name of its column.
+    errors : dict[str, str], optional
+        The columns of the standard deviations of some inputs, e.g.,
+        {'TdV': 'TdV_err', 'Tex': 'Tex_err'}, in the units of the inputs.
+        The uncertainty of the column density is propagated to first order
+        (see lte.propagate_errors).
+    by_freq : bool
+        If True, the transitions are matched by frequency (see Species.find).
+    tol_MHz : float
+        The tolerance of the frequency match, in MHz.
+    tabulated : bool
+        If True, the partition functions are interpolated from Q_table.
+    name : str
+        The name of the column density column.
+    error_name : str, optional
+        The name of the column of its standard deviation, by default
+        name + '_err'.
+
+    Returns
+    -------
+    astropy.table.Table | pandas.DataFrame
+        The table, with the new columns.
+    """
+    errors = {} if errors is None else errors
+    inputs = {"TdV": TdV, "Tex": Tex}
+    if tau is not None:
+        inputs["tau"] = tau
+    if isinstance(T_bg, str):
+        inputs["T_bg"] = T_bg
+    unknown = set(errors) - set(inputs) - {"T_bg"}
+    if unknown:
+        raise ValueError(f"The inputs {unknown} have errors but no columns")
+    values = {
+        key: _values(table, column, input_units[key]) for key, column in inputs.items()
+    }
+    if not isinstance(T_bg, str):
+        values["T_bg"] = np.float64(T_bg)
+    sigmas = {
+        key: _values(table, column, input_units[key]) for key, column in errors.items()
+    }
+
+    names = _labels(table, species)
+    if by_freq:
+        keys = _values(table, transition, input_units["freq"])
+    else:
+        keys = _labels(table, transition)
+    n_rows = names.size
+    Ncol = np.full(n_rows, np.nan)
+    Ncol_err = np.full(n_rows, np.nan)
+    species_names, species_code = np.unique(names, return_inverse=True)
+    for i, species_name in enumerate(species_names.tolist()):
+        if species_name not in registered_species:
+            continue
+        molecule = registered_species[species_name]
+        rows = np.flatnonzero(species_code == i)
+        if by_freq:
+            index = np.asarray(molecule.find(keys[rows], tol_MHz=tol_MHz))
+        else:
+            labels, inverse = np.unique(keys[rows], return_inverse=True)
+            codes = [_transition(molecule, label) for label in labels.tolist()]
+            index = np.array(codes, dtype=np.intp)[inverse.ravel()]
+        for line in np.unique(index[index >= 0]).tolist():
+            group = rows[index == line]
+            kwargs = {
+                key: value[group] if np.ndim(value) else value
+                for key, value in values.items()
+            }
+            if tau is None:
+                method = molecule.thin_grad_index if errors else molecule.thin_index
+            else:
+                method = molecule.thick_grad_index if errors else molecule.thick_index
+            result = method(line, tabulated=tabulated, **kwargs)
+            if errors:
+                Ncol[group], gradients = result
+                group_errors = {key: value[group] for key, value in sigmas.items()}
+                Ncol_err[group] = propagate_errors(gradients, group_errors)
+            else:
+                Ncol[group] = result
+
+    _set_column(table, name, Ncol)
+    if errors:
+        _set_column(
+            table, f"{name}_err" if error_name is None else error_name, Ncol_err
+        )
+    return table
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import molecular_columns.catalog as catalog
+
+
+def test_read_splatalogue() -> None:
+    data = catalog.read_splatalogue("c18o.dat")
+    assert data["freq"].size == data["E_u"].size == data["g_u"].size
+    assert data["label"][0] == "J=1-0"
+    assert pytest.approx(data["freq"][0]) == 109782.17340
+    assert pytest.approx(data["log_A_ul"][0]) == -7.20302
+
+
+def test_read_lamda() -> None:
+    data = catalog.read_lamda("p-c3h2.dat")
+    assert data["level_E_u"].size == 48
+    assert data["line_freq"].size == 154
+    assert data["level_label"][1] == "1_1_1"
+    assert int(data["n_partners"]) == 1
+    assert data["coll0_rates"].shape == (1128, 4)
+    np.testing.assert_equal(data["coll0_temperatures"], [30.0, 60.0, 90.0, 120.0])
+
+    data = catalog.read_lamda("ph2co-h2.dat")
+    assert data["level_label"][3] == "3_0_3"
+    assert int(data["n_partners"]) == 2
+    assert str(data["coll1_partner"]).startswith("3 p-H2CO")
+
+
+def test_load_catalog(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("MOLECULAR_COLUMNS_CACHE", str(tmp_path / "cache"))
+    data_file = tmp_path / "test.dat"
+    data_file.write_text(catalog.data_file("dcn.dat").read_text())
+
+    data = catalog.load_catalog(data_file, catalog.read_splatalogue)
+    cache_files = list((tmp_path / "cache").glob("test.dat.*"))
+    assert len(cache_files) == 1
+    cached = catalog.load_catalog(data_file, catalog.read_splatalogue)
+    mapped = catalog.load_catalog(data_file, catalog.read_splatalogue, mmap=True)
+    for key in data:
+        np.testing.assert_equal(cached[key], data[key])
+        np.testing.assert_equal(mapped[key], data[key])
+        assert cached[key].dtype == data[key].dtype
+
+    # the cache is rebuilt (and the old one removed) when the file changes
+    data_file.write_text("\n".join(data_file.read_text().splitlines()[:3]))
+    data = catalog.load_catalog(data_file, catalog.read_splatalogue)
+    assert data["freq"].size == 2
+    assert len(list((tmp_path / "cache").glob("test.dat.*"))) == 1
+    assert list((tmp_path / "cache").glob("test.dat.*")) != cache_files
+
+
+def test_load_catalog_no_cache(tmp_path, monkeypatch) -> None:
+    # a file in place of the cache directory makes the cache unwritable
+    (tmp_path / "cache").write_text("")
+    monkeypatch.setenv("MOLECULAR_COLUMNS_CACHE", str(tmp_path / "cache"))
+    data = catalog.load_catalog("c18o.dat", catalog.read_splatalogue)
+    np.testing.assert_equal(data["g_u"], catalog.read_splatalogue("c18o.dat")["g_u"])
+    data = catalog.load_catalog("c18o.dat", catalog.read_splatalogue, use_cache=False)
+    assert data["g_u"].size > 0
+
+    with pytest.raises(ValueError):
+        catalog.read_cache(tmp_path / "cache")
@@ -16,6 +16,9 @@ def test_col_c18o_Q_C18O():
     value = col_c18o.Q_C18O(Tex=[5.0, 5.0, 5.0] * u.K)  # type: ignore
     np.testing.assert_almost_equal(value, [1.27059, 1.27059, 1.27059], decimal=4)
 
+    value = col_c18o.Q_C18O(Tex=[5.0, 5.0, 5.0] * u.K, tabulated=True)  # type: ignore
+    np.testing.assert_almost_equal(value, [1.27059, 1.27059, 1.27059], decimal=4)
+
 
 def test_col_c18o_invalid_units():
     with pytest.raises(UnitsError):
@@ -43,3 +46,61 @@ def test_col_c18o_Ncol_C18O_3_2_Curtis2010():
         TdV=1.0 * u.K * u.km / u.s, Tex=31.6 * u.K  # type: ignore
     )
     assert pytest.approx(result.to(u.cm**-2).value) == 4.29488529e14  # type: ignore
+
+
+def test_col_c18o_C18O_thin_np():
+    Tex = np.array([4.0, 10.0, 30.0])
+    TdV = np.array([0.5, 1.0, 2.0])
+    expected = col_c18o.C18O_thin(
+        J_up=3, Tex=Tex * u.K, TdV=TdV * u.K * u.km / u.s  # type: ignore
+    )
+    result = col_c18o.C18O_thin_np(3, Tex, TdV)
+    np.testing.assert_allclose(result, expected.to_value(u.cm**-2), rtol=1e-13)  # type: ignore
+    assert isinstance(col_c18o.C18O_thin_np(3, 10.0, 1.0), float)
+    assert np.isnan(col_c18o.C18O_thin_np(60, 10.0, 1.0))
+
+
+def test_col_c18o_thin_np_batched():
+    Tex = np.array([5.0, 10.0, 20.0, 40.0])
+    TdV = np.ones((3, 4))
+    result = col_c18o.C18O_thin_np([1, 2, 3], Tex, TdV)
+    assert result.shape == (3, 4)
+    for i, J_up in enumerate([1, 2, 3]):
+        np.testing.assert_allclose(
+            result[i], col_c18o.C18O_thin_np(J_up, Tex, TdV[i]), rtol=1e-14
+        )
+    assert col_c18o.C18O_thin_np([1, 2], 10.0, 1.0).shape == (2,)
+
+
+def test_col_c18o_two_line_np():
+    Tex = np.array([[5.0, 12.0], [30.0, 3.0]])
+    TdV_2 = np.array([[1.0, 2.0], [3.0, 4.0]])
+    Ncol = col_c18o.C18O_thin_np(2, Tex, TdV_2)
+    TdV_3 = Ncol / col_c18o.C18O_thin_np(3, Tex, 1.0)
+    result = col_c18o.C18O_two_line_np(3, 2, TdV_3, TdV_2, tabulated=True)
+    np.testing.assert_allclose(result["Tex"], Tex, rtol=1e-6)
+    np.testing.assert_allclose(result["Ncol"], Ncol, rtol=1e-5)
+    assert not np.any(result["out_of_range"])
+    result = col_c18o.C18O_two_line_np(3, 2, 10.0, 1.0)
+    assert result["out_of_range"] and np.isnan(result["Tex"])
+    with pytest.raises(ValueError):
+        col_c18o.C18O_two_line_np(3, 60, 1.0, 1.0)
+
+
+def test_col_c18o_thin_from_peak_np(monkeypatch):
+    Tex = np.array([[4.0, 10.0, 30.0], [1.0, 50.0, np.nan]])
+    Tp = col_c18o.J_nu(Tex * u.K, 230.538 * u.GHz) - col_c18o.J_nu(  # type: ignore
+        2.73 * u.K, 230.538 * u.GHz  # type: ignore
+    )
+    TdV = np.array([1.0, 2.0, 3.0])
+    monkeypatch.setattr(col_c18o, "chunk_pixels", 4)
+    result = col_c18o.C18O_thin_from_peak_np(2, Tp.to_value(u.K), TdV)  # type: ignore
+    np.testing.assert_allclose(result["Tex"][0], Tex[0], rtol=1e-12)
+    np.testing.assert_allclose(
+        result["Ncol"], col_c18o.C18O_thin_np(2, Tex, TdV), rtol=1e-10
+    )
+    assert np.isnan(result["Ncol"][1, 0]) and np.isnan(result["Tex"][1, 2])
+    result = col_c18o.C18O_thin_from_peak_np(3, 10.0, 1.0, freq_peak=345.7959899)
+    assert result == col_c18o.C18O_thin_from_peak_np(3, 10.0, 1.0)
+    with pytest.raises(ValueError):
+        col_c18o.C18O_thin_from_peak_np(5, 10.0, 1.0)
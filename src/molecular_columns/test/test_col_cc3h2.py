@@ -28,3 +28,15 @@ def test_col_cc3h2_invalid_units():
         col_cc3h2.Q_o_C3H2(Tex=5 * u.m)  # type: ignore
     with pytest.raises(UnitsError):
         col_cc3h2.Q_p_C3H2(Tex=5 * u.m)  # type: ignore
+
+
+def test_col_cc3h2_thin_np(capsys):
+    Tex = np.array([4.0, 10.0, 30.0])
+    TdV = np.array([0.5, 1.0, 2.0])
+    for species in ["p_C3H2", "o_C3H2"]:
+        freq = getattr(col_cc3h2, species).freq[2]
+        expected = getattr(col_cc3h2, f"{species}_thin")(
+            freq=freq * u.GHz, Tex=Tex * u.K, TdV=TdV * u.K * u.km / u.s  # type: ignore
+        )
+        result = getattr(col_cc3h2, f"{species}_thin_np")(freq, Tex, TdV)
+        np.testing.assert_allclose(result, expected.to_value(u.cm**-2), rtol=1e-13)  # type: ignore
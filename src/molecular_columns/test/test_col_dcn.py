@@ -28,3 +28,25 @@ def test_col_dcn_thin():
     assert np.isnan(result.value)
     result = col_dcn.DCN_thin(J_up=1, Tex=5 * u.K, TdV=1.0 * u.K * u.km / u.s)  # type: ignore
     assert pytest.approx(result.to(u.cm**-2).value, rel=0.001) == 4.56431689e12  # type: ignore
+
+
+def test_col_dcn_DCN_thin_np():
+    Tex = np.array([4.0, 10.0, 30.0])
+    TdV = np.array([0.5, 1.0, 2.0])
+    expected = col_dcn.DCN_thin(
+        J_up=3, Tex=Tex * u.K, TdV=TdV * u.K * u.km / u.s  # type: ignore
+    )
+    result = col_dcn.DCN_thin_np(3, Tex, TdV)
+    np.testing.assert_allclose(result, expected.to_value(u.cm**-2), rtol=1e-13)  # type: ignore
+    assert isinstance(col_dcn.DCN_thin_np(3, 10.0, 1.0), float)
+    assert np.isnan(col_dcn.DCN_thin_np(1000, 10.0, 1.0))
+
+
+def test_col_dcn_DCN_two_line_np():
+    Tex = np.array([6.0, 15.0, 50.0])
+    TdV_1 = np.array([1.0, 2.0, 3.0])
+    Ncol = col_dcn.DCN_thin_np(1, Tex, TdV_1)
+    TdV_3 = Ncol / col_dcn.DCN_thin_np(3, Tex, 1.0)
+    result = col_dcn.DCN_two_line_np(1, 3, TdV_1, TdV_3)
+    np.testing.assert_allclose(result["Tex"], Tex, rtol=1e-6)
+    np.testing.assert_allclose(result["Ncol"], Ncol, rtol=1e-5)
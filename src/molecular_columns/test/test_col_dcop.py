@@ -8,6 +8,7 @@ except ImportError:  # pragma: no cover
     from astropy.units.core import UnitsError
 
 import molecular_columns.col_dcop as col_dcop
+import molecular_columns.common_functions as common_functions
 
 
 def test_col_dcop_Q_DCOp():
@@ -32,3 +33,34 @@ def test_col_dcop_thin():
         J_up=1, Tex=5 * u.K, TdV=1.0 * u.K * u.km / u.s  # type: ignore
     )
     assert pytest.approx(result.to(u.cm**-2).value, rel=0.001) == 1.6109e12  # type: ignore
+
+
+def test_col_dcop_DCOp_thin_np():
+    Tex = np.array([4.0, 10.0, 30.0])
+    TdV = np.array([0.5, 1.0, 2.0])
+    expected = col_dcop.DCOp_thin(
+        J_up=2, Tex=Tex * u.K, TdV=TdV * u.K * u.km / u.s  # type: ignore
+    )
+    result = col_dcop.DCOp_thin_np(2, Tex, TdV)
+    np.testing.assert_allclose(result, expected.to_value(u.cm**-2), rtol=1e-13)  # type: ignore
+    assert isinstance(col_dcop.DCOp_thin_np(2, 10.0, 1.0), float)
+    assert np.isnan(col_dcop.DCOp_thin_np(60, 10.0, 1.0))
+
+
+def test_col_dcop_thick():
+    # the Quantity and unit-free functions agree for (tau, sigma_v)
+    Tex = np.array([5.0, 10.0, 20.0])
+    for J_up in [1, 2]:
+        result = col_dcop.DCOp_thick(
+            J_up=J_up, Tex=Tex * u.K, sigma_v=0.2 * u.km / u.s, tau=2.0  # type: ignore
+        )
+        expected = col_dcop.DCOp_thick_np(J_up, Tex, 2.0, sigma_v=0.2)
+        np.testing.assert_allclose(result.to_value(u.cm**-2), expected, rtol=1e-13)  # type: ignore
+    assert np.isnan(col_dcop.DCOp_thick(J_up=60).value)
+
+    Tex = np.array([5.0, 10.0, 20.0])
+    tau = np.array([0.5, 2.0, 0.0])
+    result = col_dcop.DCOp_thick_np(2, Tex, tau, TdV=1.0)
+    thin = col_dcop.DCOp_thin_np(2, Tex, 1.0)
+    np.testing.assert_allclose(result[:2], thin[:2] * common_functions.c_tau(tau[:2]))
+    assert np.isnan(result[2])
@@ -37,4 +37,22 @@ def test_col_h13cop_thick():
     result = col_h13cop.H13COp_thick(
         J_up=1, Tex=5 * u.K, sigma_v=0.2 * u.km / u.s, tau=2.0  # type: ignore
     )  # type: ignore
-    assert pytest.approx(result.to(u.cm**-2).value, rel=0.001) == 1.2634e12  # type: ignore
+    assert pytest.approx(result.to(u.cm**-2).value, rel=0.001) == 2.58487e12  # type: ignore
+    Tex = np.array([5.0, 10.0, 20.0])
+    result = col_h13cop.H13COp_thick(
+        J_up=2, Tex=Tex * u.K, sigma_v=0.2 * u.km / u.s, tau=2.0  # type: ignore
+    )
+    expected = col_h13cop.H13COp_thick_np(2, Tex, 2.0, sigma_v=0.2)
+    np.testing.assert_allclose(result.to_value(u.cm**-2), expected, rtol=1e-13)  # type: ignore
+
+
+def test_col_h13cop_H13COp_thin_np():
+    Tex = np.array([4.0, 10.0, 30.0])
+    TdV = np.array([0.5, 1.0, 2.0])
+    expected = col_h13cop.H13COp_thin(
+        J_up=2, Tex=Tex * u.K, TdV=TdV * u.K * u.km / u.s  # type: ignore
+    )
+    result = col_h13cop.H13COp_thin_np(2, Tex, TdV)
+    np.testing.assert_allclose(result, expected.to_value(u.cm**-2), rtol=1e-13)  # type: ignore
+    assert isinstance(col_h13cop.H13COp_thin_np(2, 10.0, 1.0), float)
+    assert np.isnan(col_h13cop.H13COp_thin_np(60, 10.0, 1.0))
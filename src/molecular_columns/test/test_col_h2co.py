@@ -28,3 +28,40 @@ def test_col_h2co_invalid_units():
         col_h2co.Q_p_H2CO(Tex=5 * u.m)  # type: ignore
     with pytest.raises(UnitsError):
         col_h2co.Q_o_H2CO(Tex=5 * u.m)  # type: ignore
+
+
+def test_col_h2co_thin_np(capsys):
+    Tex = np.array([4.0, 10.0, 30.0])
+    TdV = np.array([0.5, 1.0, 2.0])
+    for species in ["p_H2CO", "o_H2CO"]:
+        freq = getattr(col_h2co, species).freq[2]
+        expected = getattr(col_h2co, f"{species}_thin")(
+            freq=freq * u.GHz, Tex=Tex * u.K, TdV=TdV * u.K * u.km / u.s  # type: ignore
+        )
+        result = getattr(col_h2co, f"{species}_thin_np")(freq, Tex, TdV)
+        np.testing.assert_allclose(result, expected.to_value(u.cm**-2), rtol=1e-13)  # type: ignore
+    assert np.isnan(col_h2co.p_H2CO_thin_np(1.0, 10.0, 1.0))
+
+
+def test_col_h2co_find(capsys):
+    freq = col_h2co.p_H2CO.freq[2]
+    Tex = np.array([10.0, 20.0])
+    expected = col_h2co.p_H2CO_thin_np(freq, Tex, 1.0)
+    # 1 kHz mismatch and a batch of frequencies
+    np.testing.assert_array_equal(
+        col_h2co.p_H2CO_thin_np(freq + 1e-6, Tex, 1.0), expected
+    )
+    result = col_h2co.p_H2CO_thin_np([freq, 364.103249, 1.0], Tex, np.ones((3, 2)))
+    np.testing.assert_allclose(result[0], expected, rtol=1e-14)
+    assert np.all(np.isnan(result[1:]))
+
+    result = col_h2co.p_H2CO_thin(
+        freq=364.103249 * u.GHz, Tex=10 * u.K, TdV=1.0 * u.K * u.km / u.s  # type: ignore
+    )
+    assert np.isnan(result.value)
+    assert "matches several transitions" in capsys.readouterr().out
+    result = col_h2co.o_H2CO_thin(
+        freq=1.0 * u.GHz, Tex=10 * u.K, TdV=1.0 * u.K * u.km / u.s  # type: ignore
+    )
+    assert np.isnan(result.value)
+    assert "does not match any transition" in capsys.readouterr().out
@@ -38,3 +38,15 @@ def test_col_nh2d_values() -> None:
 
     result = col_nh2d.p_NH2D_thick(Tex=5 * u.K, sigma_v=0.2 * u.km / u.s, tau=2.0)  # type: ignore
     assert pytest.approx(result.to(u.cm**-2).value) == 1.12581955e14  # type: ignore
+
+
+def test_col_nh2d_thick_np() -> None:
+    Tex = np.array([[5.0, 10.0], [np.nan, 2.0]])
+    for species in ["p_NH2D", "o_NH2D"]:
+        expected = getattr(col_nh2d, f"{species}_thick")(
+            Tex=5 * u.K, sigma_v=0.2 * u.km / u.s, tau=2.0  # type: ignore
+        )
+        result = getattr(col_nh2d, f"{species}_thick_np")(Tex, tau=2.0, sigma_v=0.2)
+        assert result.shape == (2, 2)
+        assert pytest.approx(result[0, 0], rel=1e-13) == expected.to_value(u.cm**-2)  # type: ignore
+        assert np.isnan(result[1, 0]) & np.isnan(result[1, 1])
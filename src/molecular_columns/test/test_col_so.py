@@ -54,3 +54,121 @@ def test_SO_thin_Nu_Rot():
     np.testing.assert_almost_equal(
         [result.value * 1e-12, result2.value], [3.78660734, 15.80798543], decimal=4
     )
+
+
+def test_col_so_Q_SO_map():
+    Tex = np.full((3, 4), 5.0)
+    Tex[1, 2] = np.nan
+    value = col_so.Q_SO(Tex=Tex * u.K)  # type: ignore
+    assert value.shape == (3, 4)
+    assert np.isnan(value[1, 2])
+    np.testing.assert_almost_equal(value[0, 0], 14.97061, decimal=4)
+
+    value_table = col_so.Q_SO(Tex=Tex * u.K, tabulated=True)  # type: ignore
+    np.testing.assert_allclose(value_table, value, rtol=col_so.Q_SO_table.rtol)
+
+
+def test_col_so_tables():
+    assert col_so.lines.size == len(col_so.line_list)
+    assert col_so.gu_list.size == col_so.E_u_list.size == len(col_so.SO_levels)
+    i = col_so.line_code["2_1-1_1"]
+    assert col_so.level_keys[col_so.lines["up"][i]] == "2_1"
+    assert col_so.level_keys[col_so.lines["low"][i]] == "1_1"
+    assert col_so.lines["freq"][i] == col_so.line_list["2_1-1_1"]["freq"]
+
+    codes = col_so.level_codes(["1_0", "2_1"])
+    np.testing.assert_equal(codes, [0, 5])
+    np.testing.assert_allclose(
+        col_so.Q_SO_i(["1_0", "2_1"], Tex=5 * u.K),  # type: ignore
+        [col_so.Q_SO_i("1_0", Tex=5 * u.K), col_so.Q_SO_i(5, Tex=5 * u.K)],  # type: ignore
+    )
+
+
+def test_col_so_thin_np():
+    Tex = np.array([[4.0, 10.0], [30.0, 60.0]])
+    TdV = np.array([[0.5, 1.0], [2.0, 0.1]])
+    expected = col_so.SO_thin(
+        "2_3", "1_2", Tex=Tex * u.K, TdV=TdV * u.K * u.km / u.s  # type: ignore
+    )
+    result = col_so.SO_thin_np("2_3", "1_2", Tex, TdV)
+    assert result.shape == (2, 2)
+    np.testing.assert_allclose(result, expected.to_value(u.cm**-2), rtol=1e-13)  # type: ignore
+    result = col_so.SO_thin_np("2_3", "1_2", Tex, TdV, tabulated=True)
+    np.testing.assert_allclose(result, expected.to_value(u.cm**-2), rtol=1e-5)  # type: ignore
+    assert np.all(np.isnan(col_so.SO_thin_np("9_9", "1_1", Tex, TdV)))
+
+
+def test_col_so_map(capsys):
+    Tex = np.array([[np.nan, -1.0, 0.0], [2.0, 2.73, 10.0]])
+    TdV = np.array([1.0, np.nan, 2.0])
+    result = col_so.SO_thin_np("2_3", "1_2", Tex, TdV)
+    assert result.shape == (2, 3)
+    assert np.all(np.isnan(result[0])) & np.all(np.isnan(result[1, :2]))
+    assert pytest.approx(result[1, 2], rel=1e-14) == col_so.SO_thin_np(
+        "2_3", "1_2", 10.0, 2.0
+    )
+    np.testing.assert_array_equal(
+        col_so.check_Tex(Tex * u.K), [[True, True, True], [False, False, False]]  # type: ignore
+    )
+    assert capsys.readouterr().out == ""
+    assert col_so.check_Tex(np.nan * u.K)  # type: ignore
+    assert capsys.readouterr().out != ""
+
+
+def test_col_so_thin_np_batched():
+    Tex = np.array([[4.0, 10.0], [30.0, np.nan]])
+    TdV = np.arange(1.0, 13.0).reshape(3, 2, 2)
+    N_J_up, N_J_low = ["2_3", "3_2", "9_9"], ["1_2", "2_1", "1_1"]
+    result = col_so.SO_thin_np(N_J_up, N_J_low, Tex, TdV)
+    assert result.shape == (3, 2, 2)
+    for i in range(2):
+        np.testing.assert_allclose(
+            result[i], col_so.SO_thin_np(N_J_up[i], N_J_low[i], Tex, TdV[i]), rtol=1e-14
+        )
+    assert np.all(np.isnan(result[2]))
+
+
+def test_col_so_thick_np():
+    Tex = np.array([[5.0, 10.0], [20.0, np.nan]])
+    tau = np.array([[0.5, 1.0], [2.0, 1.0]])
+    thin = col_so.SO_thin_np("2_3", "1_2", Tex, 1.0)
+    result = col_so.SO_thick_np("2_3", "1_2", Tex, tau, TdV=1.0)
+    np.testing.assert_allclose(result, thin * tau / (1 - np.exp(-tau)), rtol=1e-13)
+    result = col_so.SO_thick_np(["2_3", "3_2"], ["1_2", "2_1"], Tex, tau, sigma_v=0.3)
+    assert result.shape == (2, 2, 2)
+    assert np.isnan(result[0, 1, 1])
+
+
+def test_col_so_rotation_diagram():
+    N_J_up, N_J_low = ["2_3", "3_4", "4_5", "5_6"], ["1_2", "2_3", "3_4", "4_5"]
+    TdV = np.array([1.0, 2.0, 1.5, 0.7])
+    Nu_gu, E_up = col_so.SO_thin_Nu_Rot_np(N_J_up, N_J_low, TdV)
+    for i in range(4):
+        expected = col_so.SO_thin_Nu_Rot(
+            N_J_up[i], N_J_low[i], TdV=TdV[i] * u.K * u.km / u.s, give_Eup=True  # type: ignore
+        )
+        assert pytest.approx(Nu_gu[i], rel=1e-13) == expected[0].value
+        assert pytest.approx(E_up[i], rel=1e-13) == expected[1].value
+
+    T_rot, N_tot, T_rot_err, N_tot_err = col_so.SO_rotation_diagram(
+        N_J_up, N_J_low, TdV[:, None, None] * np.ones((4, 3, 2)), TdV_err=0.1
+    )
+    assert T_rot.shape == N_tot.shape == T_rot_err.shape == N_tot_err.shape == (3, 2)
+    assert np.all(T_rot > 0) & np.all(N_tot > 0)
+    with pytest.raises(ValueError):
+        col_so.SO_rotation_diagram(["2_3", "9_9"], ["1_2", "1_1"], TdV[:2])
+
+
+def test_col_so_population_diagram():
+    N_J_up, N_J_low = ["2_3", "3_4", "4_5", "5_6"], ["1_2", "2_3", "3_4", "4_5"]
+    TdV = np.array([1.0, 2.0, 1.5, 0.7])[:, None] * np.ones((4, 3))
+    T_rot, N_tot, *_ = col_so.SO_rotation_diagram(N_J_up, N_J_low, TdV, TdV_err=0.1)
+    result = col_so.SO_population_diagram(
+        N_J_up, N_J_low, TdV, np.array([0.2, 0.5, 1e3]), TdV_err=0.1
+    )
+    assert result[4].shape == (4, 3)
+    assert np.all(result[5])
+    # the correction increases the column density, and vanishes for thin lines
+    assert np.all(result[1] >= N_tot)
+    assert result[1][0] > result[1][1] > result[1][2]
+    assert pytest.approx(result[1][2], rel=1e-3) == N_tot[2]
@@ -19,3 +19,13 @@ def test_col_so2_Q_SO2():
 def test_col_so2_invalid_units():
     with pytest.raises(UnitsError):
         col_so2.Q_SO2(Tex=5 * u.m)  # type: ignore
+
+
+def test_col_so2_thin_np():
+    Tex = np.array([4.0, 10.0, 30.0])
+    TdV = np.array([0.5, 1.0, 2.0])
+    expected = col_so2.SO2_thin(
+        freq=219.1426745 * u.GHz, Tex=Tex * u.K, TdV=TdV * u.K * u.km / u.s  # type: ignore
+    )
+    result = col_so2.SO2_thin_np(219.1426745, Tex, TdV)
+    np.testing.assert_allclose(result, expected.to_value(u.cm**-2), rtol=1e-13)  # type: ignore
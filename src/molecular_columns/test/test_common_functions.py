@@ -48,3 +48,26 @@ def test_tau_nu() -> None:
         )
         == 0.15927105888724097
     )
+
+
+def test_tau_nu_map() -> None:
+    Tex = np.array([[10.0, 2.0, np.nan], [0.0, 10.0, 20.0]]) * u.K  # type: ignore
+    Tp = np.array([1.0, 50.0, 1.0]) * u.K  # type: ignore
+    tau = common_functions.tau_nu(Tex=Tex, Tbg=2.73 * u.K, freq=100 * u.GHz, Tp=Tp)  # type: ignore
+    assert tau.shape == (2, 3)
+    np.testing.assert_array_equal(
+        np.isnan(tau), [[False, True, True], [True, True, False]]
+    )
+    assert pytest.approx(tau[0, 0]) == 0.15927105888724097
+
+
+def test_Tex_from_peak() -> None:
+    Tex = np.array([5.0, 20.0, 80.0]) * u.K  # type: ignore
+    Tp = common_functions.J_nu(Tex, 230.538 * u.GHz) - common_functions.J_nu(  # type: ignore
+        2.73 * u.K, 230.538 * u.GHz  # type: ignore
+    )
+    result = common_functions.Tex_from_peak(Tp, 230.538 * u.GHz)  # type: ignore
+    np.testing.assert_allclose(result.to_value(u.K), Tex.value, rtol=1e-13)  # type: ignore
+    assert np.isnan(common_functions.Tex_from_peak(-5 * u.K, 230.538 * u.GHz))  # type: ignore
+    with pytest.raises(UnitsError):
+        common_functions.Tex_from_peak(1 * u.K, 230.538 * u.K)  # type: ignore
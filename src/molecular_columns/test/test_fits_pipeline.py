@@ -0,0 +1,163 @@
+import tracemalloc
+from functools import partial
+
+import numpy as np
+import pytest
+from astropy.io import fits
+
+from molecular_columns import col_c18o, fits_pipeline
+
+
+def write_image(file_name, data, **cards) -> None:
+    header = fits.Header()
+    header["CTYPE1"], header["CTYPE2"] = "RA---SIN", "DEC--SIN"
+    header["CRVAL1"], header["CRVAL2"] = 83.8, -5.4
+    header["CDELT1"], header["CDELT2"] = -1e-4, 1e-4
+    header["BUNIT"] = "K"
+    hdu = fits.PrimaryHDU(data, header)
+    for key, value in cards.items():
+        hdu.header[key] = value
+    hdu.writeto(file_name)
+
+
+def test_output_header() -> None:
+    header = fits.ImageHDU(np.zeros((2, 3), dtype=np.int16), name="TDV").header
+    header["BSCALE"], header["CRVAL1"] = 0.1, 10.0
+    result = fits_pipeline.output_header(header)
+    assert list(result)[:2] == ["SIMPLE", "BITPIX"]
+    assert result["BITPIX"] == -64 and result["BUNIT"] == "cm-2"
+    assert result["NAXIS2"] == 2 and result["CRVAL1"] == 10.0
+    assert "XTENSION" not in result and "BSCALE" not in result
+
+
+def test_process_fits(tmp_path, monkeypatch) -> None:
+    rng = np.random.default_rng(0)
+    TdV = rng.uniform(0.1, 5.0, (7, 5))
+    Tex = rng.uniform(5.0, 30.0, (7, 5))
+    write_image(tmp_path / "tdv.fits", TdV)
+    # a scaled integer image, read with its BSCALE and BLANK
+    Tex_int = np.round(Tex * 100).astype(np.int16)
+    Tex_int[0, 0] = -1
+    Tex_int[3, 2] = -1
+    write_image(tmp_path / "tex.fits", Tex_int, BSCALE=0.01, BLANK=-1)
+    Tex = np.where(Tex_int == -1, np.nan, Tex_int * 0.01)
+
+    monkeypatch.setattr(fits_pipeline, "chunk_elements", 10)  # 2 rows
+    inputs = {"TdV": tmp_path / "tdv.fits", "Tex": tmp_path / "tex.fits"}
+    output = tmp_path / "ncol.fits"
+    fits_pipeline.process_fits(
+        col_c18o.C18O_thin_np, inputs, output, J_up=2, tabulated=True
+    )
+    with fits.open(output) as hdul:
+        expected = col_c18o.C18O_thin_np(2, Tex, TdV, tabulated=True)
+        np.testing.assert_allclose(hdul[0].data, expected, rtol=1e-14)
+        assert np.isnan(hdul[0].data[3, 2])
+        assert hdul[0].header["CTYPE1"] == "RA---SIN"
+        assert hdul[0].header["CRVAL2"] == -5.4
+        assert hdul[0].header["BUNIT"] == "cm-2"
+
+    with pytest.raises(OSError):
+        fits_pipeline.process_fits(col_c18o.C18O_thin_np, inputs, output, J_up=2)
+    with pytest.raises(ValueError):
+        fits_pipeline.process_fits(
+            col_c18o.C18O_thin_np, inputs, output, {"TdV": 0.1}, overwrite=True
+        )
+    with pytest.raises(ValueError):
+        fits_pipeline.process_fits(
+            col_c18o.C18O_thin_np, {"TdV": 1.0, "Tex": 10.0}, output, overwrite=True
+        )
+
+    # a constant T_bg, and a constant error on TdV propagated by Monte Carlo
+    fits_pipeline.process_fits(
+        col_c18o.C18O_thin_np,
+        {**inputs, "T_bg": 2.73},
+        output,
+        errors={"TdV": 0.1},
+        error_output=tmp_path / "ncol_err.fits",
+        overwrite=True,
+        n_samples=2000,
+        J_up=2,
+        tabulated=True,
+    )
+    error = fits.getdata(tmp_path / "ncol_err.fits")
+    np.testing.assert_allclose(error, 0.1 * expected / TdV, rtol=0.1)
+    assert fits.getheader(tmp_path / "ncol_err.fits")["CDELT1"] == -1e-4
+
+
+def test_process_fits_degenerate_axes(tmp_path, monkeypatch) -> None:
+    # a radio cube with NAXIS = 4 and degenerate frequency and Stokes axes
+    rng = np.random.default_rng(1)
+    TdV = rng.uniform(0.1, 5.0, (1, 1, 9, 4))
+    write_image(tmp_path / "tdv.fits", TdV)
+    sizes = []
+
+    def C18O_thin(**kwargs):
+        sizes.append(kwargs["TdV"].size)
+        return col_c18o.C18O_thin_np(**kwargs)
+
+    monkeypatch.setattr(fits_pipeline, "chunk_elements", 8)  # 2 rows
+    output = tmp_path / "ncol.fits"
+    fits_pipeline.process_fits(
+        C18O_thin, {"TdV": tmp_path / "tdv.fits", "Tex": 10.0}, output, J_up=2
+    )
+    assert sizes == [8, 8, 8, 8, 4]
+    with fits.open(output) as hdul:
+        assert hdul[0].data.shape == TdV.shape
+        expected = col_c18o.C18O_thin_np(2, 10.0, TdV)
+        np.testing.assert_allclose(hdul[0].data, expected, rtol=1e-14)
+
+
+def test_process_fits_partial(tmp_path) -> None:
+    # functions without a __name__, e.g., partial objects
+    TdV = np.full((3, 2), 2.0)
+    write_image(tmp_path / "tdv.fits", TdV)
+    index = col_c18o.C18O.transition(2)
+    output = tmp_path / "ncol.fits"
+    fits_pipeline.process_fits(
+        partial(col_c18o.C18O.thin_index, index),
+        {"TdV": tmp_path / "tdv.fits", "Tex": 10.0},
+        output,
+    )
+    with fits.open(output) as hdul:
+        expected = col_c18o.C18O_thin_np(2, 10.0, TdV)
+        np.testing.assert_allclose(hdul[0].data, expected, rtol=1e-14)
+        assert "partial" in str(hdul[0].header["HISTORY"])
+
+
+def test_process_fits_overwrite(tmp_path) -> None:
+    # invalid inputs do not destroy the previous results
+    write_image(tmp_path / "tdv.fits", np.full((3, 2), 2.0))
+    write_image(tmp_path / "tex.fits", np.full((2, 2), 10.0))
+    output = tmp_path / "ncol.fits"
+    inputs = {"TdV": tmp_path / "tdv.fits", "Tex": 10.0}
+    fits_pipeline.process_fits(col_c18o.C18O_thin_np, inputs, output, J_up=2)
+    previous = output.read_bytes()
+    for bad_inputs in [
+        {**inputs, "Tex": tmp_path / "missing.fits"},
+        {**inputs, "Tex": tmp_path / "tex.fits"},
+    ]:
+        with pytest.raises((OSError, ValueError)):
+            fits_pipeline.process_fits(
+                col_c18o.C18O_thin_np, bad_inputs, output, overwrite=True, J_up=2
+            )
+        assert output.read_bytes() == previous
+
+
+def test_process_fits_memory(tmp_path, monkeypatch) -> None:
+    shape = (1000, 1000)
+    write_image(tmp_path / "tdv.fits", np.ones(shape))
+    monkeypatch.setattr(fits_pipeline, "chunk_elements", 2**14)
+    tracemalloc.start()
+    fits_pipeline.process_fits(
+        col_c18o.C18O_thin_np,
+        {"TdV": tmp_path / "tdv.fits"},
+        tmp_path / "ncol.fits",
+        Tex=10.0,
+        J_up=2,
+    )
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # much less than the 8 MB of the image
+    assert peak < 2e6
+    data = fits.getdata(tmp_path / "ncol.fits")
+    np.testing.assert_allclose(data, col_c18o.C18O_thin_np(2, 10.0, 1.0), rtol=1e-14)
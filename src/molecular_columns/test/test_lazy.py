@@ -0,0 +1,58 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from molecular_columns import col_c18o, col_dcn, col_so, lazy
+from molecular_columns.lte import Species
+
+rng = np.random.default_rng(0)
+Tex = rng.uniform(5.0, 30.0, (60, 50))
+TdV = rng.uniform(0.1, 5.0, (60, 50))
+
+
+def test_is_dask() -> None:
+    assert not lazy.is_dask(Tex, 1.0, None, [1.0])
+
+
+def test_Species_pickle() -> None:
+    # registered species are pickled by name
+    assert pickle.loads(pickle.dumps(col_dcn.DCN)) is col_dcn.DCN
+    assert len(pickle.dumps(col_so.SO)) < 200
+    species = Species("DCN", [1.0, 3.0], [0.0, 5.0], [100.0], [1e-5], [1])
+    copy = pickle.loads(pickle.dumps(species))
+    assert copy is not col_dcn.DCN
+    np.testing.assert_array_equal(copy.E_u, species.E_u)
+
+
+def test_map_blocks() -> None:
+    da = pytest.importorskip("dask.array")
+    lazy_Tex = da.from_array(Tex, chunks=(16, 25))
+    lazy_TdV = da.from_array(TdV, chunks=(16, 25))
+    result = col_dcn.DCN_thin_np(2, lazy_Tex, lazy_TdV)
+    assert lazy.is_dask(result) and result.chunks == lazy_TdV.chunks
+    np.testing.assert_allclose(
+        result.compute(), col_dcn.DCN_thin_np(2, Tex, TdV), rtol=1e-14
+    )
+    # broadcast inputs, NumPy and scalar inputs
+    result = col_c18o.C18O_thin_np(2, lazy_Tex[:, :1], TdV, 3.0, tabulated=True)
+    assert result.shape == TdV.shape
+    np.testing.assert_allclose(
+        result.compute(),
+        col_c18o.C18O_thin_np(2, Tex[:, :1], TdV, 3.0, tabulated=True),
+        rtol=1e-14,
+    )
+    np.testing.assert_allclose(
+        col_c18o.C18O.Q(lazy_Tex).compute(), col_c18o.C18O.Q(Tex), rtol=1e-14
+    )
+    # worker processes get the species by name
+    result = col_so.SO_thick_np("2_3", "1_2", lazy_Tex, 0.5, sigma_v=lazy_TdV)
+    np.testing.assert_allclose(
+        result.compute(scheduler="processes"),
+        col_so.SO_thick_np("2_3", "1_2", Tex, 0.5, sigma_v=TdV),
+        rtol=1e-14,
+    )
+    with pytest.raises(ValueError):
+        col_c18o.C18O_thin_np([1, 2], lazy_Tex, 1.0)
+    with pytest.raises(ValueError):
+        lazy.map_blocks(col_c18o.C18O_thin_np, {"Tex": 10.0, "TdV": 1.0})
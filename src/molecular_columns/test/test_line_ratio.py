@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from molecular_columns import line_ratio
+from molecular_columns.lte import Species
+
+g_u = np.array([1.0, 3.0, 5.0, 7.0])
+E_u = np.array([0.0, 5.3, 15.8, 31.6])
+species = Species("X", g_u, E_u, [110.0, 220.0, 330.0], [1e-5, 1e-4, 3e-4], [1, 2, 3])
+
+
+def test_RatioTable() -> None:
+    with pytest.raises(ValueError):
+        line_ratio.RatioTable(species, 1, 1)
+    with pytest.raises(ValueError):
+        line_ratio.RatioTable(species, 1, -1)
+    with pytest.raises(ValueError):
+        line_ratio.RatioTable(species, 1, 0, T_bg=10.0, T_max=5.0)
+    table = line_ratio.RatioTable(species, 1, 0)
+    assert np.all(np.diff(table.log_ratio) > 0)
+    assert table.ratio_min < table.ratio(10.0) < table.ratio_max
+    Tex = np.array([[3.0, 8.0], [40.0, 400.0]])
+    result, out_of_range = table.invert(table.ratio(Tex))
+    np.testing.assert_allclose(result, Tex, rtol=1e-6)
+    assert not np.any(out_of_range)
+    # the ratio of the lower to the upper line decreases with Tex
+    reverse = line_ratio.RatioTable(species, 0, 1)
+    np.testing.assert_allclose(reverse.invert(1 / table.ratio(Tex))[0], Tex, rtol=1e-6)
+    # out of range and invalid ratios
+    result, out_of_range = table.invert([2 * table.ratio_max, -1.0, 0.0, np.nan])
+    assert np.all(np.isnan(result))
+    assert out_of_range.tolist() == [True, True, True, False]
+    assert isinstance(table.invert(table.ratio(10.0))[0], float)
+
+
+def test_two_line() -> None:
+    Tex = np.array([4.0, 10.0, 25.0, 80.0])
+    Ncol = 1e14
+    TdV_a = Ncol / species.thin_index(2, Tex, 1.0)
+    TdV_b = Ncol / species.thin_index(0, Tex, 1.0)
+    result = line_ratio.two_line(species, 2, 0, TdV_a, TdV_b)
+    np.testing.assert_allclose(result["Tex"], Tex, rtol=1e-6)
+    np.testing.assert_allclose(result["Ncol"], Ncol, rtol=1e-5)
+    result = line_ratio.two_line(species, 2, 0, [[TdV_a[0]], [1e9]], TdV_b[0])
+    assert result["Tex"].shape == (2, 1)
+    assert result["out_of_range"].tolist() == [[False], [True]]
+    assert np.isnan(result["Ncol"][1, 0])
+    # the table of each pair is computed once
+    assert line_ratio.ratio_table(species, 2, 0) is line_ratio.ratio_table(
+        species, 2, 0
+    )
+    assert line_ratio.ratio_table(species, 2, 0, 5.0).T_bg == 5.0
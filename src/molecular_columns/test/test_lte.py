@@ -0,0 +1,254 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from molecular_columns import common_functions, lte, registry
+from molecular_columns.lte import Species
+
+g_u = np.array([1.0, 3.0, 5.0, 7.0])
+E_u = np.array([0.0, 5.3, 15.8, 31.6])
+
+
+def test_Species() -> None:
+    species = Species("X", g_u, E_u, [110.0, 220.0], [1e-5, 1e-4], [1, 2])
+    assert species.keys.tolist() == [0, 1]
+    assert species.lower.tolist() == [-1, -1]
+    assert pytest.approx(species.Q(10.0)) == np.sum(g_u * np.exp(-E_u / 10.0))
+    assert pytest.approx(species.Q(10.0, tabulated=True), rel=1e-6) == species.Q(10.0)
+    with pytest.raises(ValueError):
+        Species("X", g_u, E_u, [110.0, 220.0], [1e-5], [1, 2])
+    with pytest.raises(ValueError):
+        Species("X", g_u, E_u[:-1], [110.0], [1e-5], [1])
+
+
+def test_J_nu() -> None:
+    assert pytest.approx(lte.J_nu(10.0, 100.0)) == 7.79159  # K
+    assert lte.J_nu([5.0, 10.0], 100.0).shape == (2,)
+
+
+def test_Species_thin() -> None:
+    species = Species("X", g_u, E_u, [110.0, 220.0], [1e-5, 1e-4], [1, 2])
+    assert species.transition(1) == 1
+    assert species.transition(5) == -1
+    Ncol = species.thin(1, np.array([[5.0], [10.0]]), np.array([1.0, 2.0, 3.0]))
+    assert Ncol.shape == (2, 3)
+    np.testing.assert_allclose(Ncol[:, 2], 3 * Ncol[:, 0])
+    assert np.isnan(species.thin(5, 10.0, 1.0))
+    assert species.thin(5, 10.0, np.ones(4)).shape == (4,)
+
+
+def test_Species_constants() -> None:
+    species = Species("X", g_u, E_u, [110.0, 220.0], [1e-5, 1e-4], [1, 2])
+    np.testing.assert_array_equal(species.g_up, [3.0, 5.0])
+    np.testing.assert_array_equal(species.E_up, [5.3, 15.8])
+    np.testing.assert_allclose(species.T_nu, [5.2792, 10.5584], rtol=1e-4)
+    # 8 pi nu^3 / (c^3 A_ul g_u) * 1 km/s, in cgs units
+    nu, c = 110e9, 2.99792458e10
+    prefactor = 8 * np.pi * nu**3 / c**3 / 1e-5 / 3.0 * 1e5
+    assert pytest.approx(species.prefactor[0], rel=1e-12) == prefactor
+
+
+def test_thin_map() -> None:
+    np.testing.assert_array_equal(
+        lte.valid_Tex([np.nan, -1.0, 0.0, 2.0, 3.0, np.inf], 2.73),
+        [False, False, False, False, True, False],
+    )
+    species = Species("X", g_u, E_u, [110.0, 220.0], [1e-5, 1e-4], [1, 2])
+    Tex = np.array([[np.nan, 0.0, 5.0], [10.0, 20.0, 5.0]])
+    T_bg = np.array([[2.73], [10.0]])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        Ncol = species.thin(1, Tex, 1.0, T_bg=T_bg)
+    np.testing.assert_array_equal(
+        np.isnan(Ncol), [[True, True, False], [True, False, True]]
+    )
+    assert pytest.approx(Ncol[1, 1], rel=1e-14) == species.thin(1, 20.0, 1.0, T_bg=10.0)
+
+
+def test_Species_thin_batched(monkeypatch) -> None:
+    species = Species("X", g_u, E_u, [110.0, 220.0], [1e-5, 1e-4], [1, 2])
+    np.testing.assert_array_equal(
+        species.transitions([[1, 7], [0, 1]]), [[1, -1], [0, 1]]
+    )
+    Tex = np.array([[5.0, 10.0, 20.0]])
+    TdV = np.ones((3, 2, 3))
+    calls = []
+    Q = species.Q
+    monkeypatch.setattr(
+        species, "Q", lambda *args, **kw: calls.append(1) or Q(*args, **kw)
+    )
+    Ncol = species.thin([1, 0, 9], Tex, TdV)
+    assert len(calls) == 1
+    assert Ncol.shape == (3, 2, 3)
+    np.testing.assert_allclose(Ncol[0, 1], species.thin(1, Tex[0], 1.0), rtol=1e-14)
+    assert np.all(np.isnan(Ncol[2]))
+
+
+def test_Species_find() -> None:
+    species = Species(
+        "X", g_u, E_u, [220.0, 110.0, 110.0003], [1e-4, 1e-5, 1e-5], [2, 1, 1]
+    )
+    assert species.find(220.0) == 0
+    assert species.find(220.0004) == 0
+    assert species.find(220.001) == lte.no_match
+    # the nearest transition within the tolerance
+    assert species.find(110.0) == 1
+    assert species.find(110.0002) == 2
+    assert species.find(110.0, tol_MHz=0.1) == 1
+    # 1 km/s at 220 GHz is 0.73 MHz
+    assert species.find(220.0007, tol_kms=1.0) == 0
+    assert species.find(220.0008, tol_kms=1.0) == lte.no_match
+    np.testing.assert_array_equal(
+        species.find([[110.0003, 50.0], [220.0, 110.0]], tol_MHz=0.1),
+        [[2, lte.no_match], [0, 1]],
+    )
+    # equally close transitions, on both sides or duplicated
+    species = Species(
+        "X", g_u, E_u, [100.0, 100.0009765625, 50.0, 50.0], [1e-4] * 4, [2, 1, 1, 2]
+    )
+    assert species.find(100.00048828125) == lte.ambiguous
+    assert species.find(100.0002) == 0
+    assert species.find(50.0) == lte.ambiguous
+    assert species.find(50.0003) == lte.ambiguous
+
+
+def test_Species_find_catalogs() -> None:
+    # every catalog frequency finds its own transition, except the
+    # duplicated ones
+    for name in registry.species:
+        try:
+            species = registry.species[name]
+        except FileNotFoundError:  # catalog file not available (SO2)
+            continue
+        index = species.find(species.freq)
+        unique, counts = np.unique(species.freq, return_counts=True)
+        duplicated = np.isin(species.freq, unique[counts > 1])
+        np.testing.assert_array_equal(
+            index[~duplicated], np.arange(species.freq.size)[~duplicated]
+        )
+        assert np.all(index[duplicated] == lte.ambiguous)
+
+
+def test_tau_c_tau() -> None:
+    Tex = np.array([[10.0], [20.0]])
+    Tp = np.array([1.0, 0.0, -1.0, 5.0, 30.0])
+    tau, c = lte.tau_c_tau(Tex, Tp, 100.0)
+    assert tau.shape == c.shape == (2, 5)
+    np.testing.assert_allclose(tau, lte.tau_nu(Tex, Tp, 100.0), rtol=1e-15)
+    assert pytest.approx(tau[0, 0], rel=1e-12) == 0.15927105888724097
+    np.testing.assert_allclose(c, common_functions.c_tau(tau), rtol=1e-12)
+    assert tau[0, 1] == 0.0
+    assert np.isnan(c[0, 1]) & np.isnan(c[0, 2]) & np.isnan(tau[0, 4])
+    assert isinstance(lte.tau_c_tau(10.0, 1.0, 100.0)[1], float)
+
+
+def test_Species_thick() -> None:
+    species = Species("X", g_u, E_u, [110.0, 220.0], [1e-5, 1e-4], [1, 2])
+    with pytest.raises(ValueError):
+        species.thick(1, 10.0, 1.0)
+    with pytest.raises(ValueError):
+        species.thick(1, 10.0, 1.0, sigma_v=0.2, TdV=1.0)
+    Tex = np.array([[5.0, 10.0, 20.0]])
+    tau = np.array([[0.1], [1.0], [3.0]])
+    # TdV of a Gaussian line with optical depth tau and dispersion sigma_v
+    J = lte.J_nu(Tex, 220.0) - lte.J_nu(2.73, 220.0)
+    TdV = J * np.sqrt(2 * np.pi) * 0.2 * (1 - np.exp(-tau))
+    from_sigma = species.thick(1, Tex, tau, sigma_v=0.2)
+    from_TdV = species.thick(1, Tex, tau, TdV=TdV)
+    assert from_sigma.shape == (3, 3)
+    np.testing.assert_allclose(from_sigma, from_TdV, rtol=1e-13)
+    # several transitions, with the optical depth of each one
+    Ncol = species.thick([0, 1, 9], Tex[0], np.ones((3, 3)), sigma_v=0.2)
+    np.testing.assert_allclose(Ncol[1], from_sigma[1], rtol=1e-14)
+    assert np.all(np.isnan(Ncol[2]))
+
+
+def test_dJ_nu_dT() -> None:
+    Tex = np.array([2.0, 10.0, 200.0])
+    h = 1e-6
+    finite_difference = (
+        lte.J_nu(Tex * (1 + h), 100.0) - lte.J_nu(Tex * (1 - h), 100.0)
+    ) / (2 * h * Tex)
+    np.testing.assert_allclose(lte.dJ_nu_dT(Tex, 100.0), finite_difference, rtol=1e-7)
+    assert lte.dJ_nu_dT(0.0, 100.0) == 0.0
+    assert isinstance(lte.dJ_nu_dT(10.0, 100.0), float)
+
+
+def test_Species_thin_grad() -> None:
+    species = Species("X", g_u, E_u, [110.0, 220.0], [1e-5, 1e-4], [1, 2])
+    Tex = np.array([[4.0, 10.0, 30.0, 300.0]])
+    TdV = np.array([[1.0], [2.0]])
+    for tabulated in [False, True]:
+        Ncol, gradients = species.thin_grad(1, Tex, TdV, T_bg=3.0, tabulated=tabulated)
+        assert Ncol.shape == (2, 4) and set(gradients) == {"TdV", "Tex", "T_bg"}
+        np.testing.assert_allclose(
+            Ncol, species.thin(1, Tex, TdV, T_bg=3.0, tabulated=tabulated), rtol=1e-14
+        )
+        np.testing.assert_allclose(gradients["TdV"] * TdV, Ncol, rtol=1e-14)
+        h = 1e-6
+        for name, value in [("Tex", Tex), ("T_bg", 3.0)]:
+            inputs = {"Tex": Tex, "TdV": TdV, "T_bg": 3.0, "tabulated": tabulated}
+            up = species.thin(1, **{**inputs, name: value * (1 + h)})
+            down = species.thin(1, **{**inputs, name: value * (1 - h)})
+            finite_difference = (up - down) / (2 * h * value)
+            np.testing.assert_allclose(gradients[name], finite_difference, rtol=1e-6)
+    # invalid pixels and transitions, several transitions
+    Ncol, gradients = species.thin_grad([1, 5], [2.0, 10.0], 1.0)
+    assert np.isnan(Ncol[0, 0]) and np.all(np.isnan(Ncol[1]))
+    assert np.isnan(gradients["Tex"][0, 0]) and np.isfinite(gradients["Tex"][0, 1])
+    Ncol, gradients = species.thin_grad(1, 10.0, 1.0)
+    assert isinstance(Ncol, float) and isinstance(gradients["Tex"], float)
+
+
+def test_Species_thick_grad() -> None:
+    species = Species("X", g_u, E_u, [110.0, 220.0], [1e-5, 1e-4], [1, 2])
+    Tex = np.array([5.0, 10.0, 20.0])
+    tau = np.array([[0.1], [1.0], [10.0]])
+    h = 1e-6
+    for inputs in [{"sigma_v": 0.3}, {"TdV": np.array([1.0, 2.0, 3.0])}]:
+        Ncol, gradients = species.thick_grad(1, Tex, tau, **inputs)
+        keys = {"Tex", "T_bg", "tau"} | set(inputs)
+        assert set(gradients) == keys
+        np.testing.assert_allclose(
+            Ncol, species.thick(1, Tex, tau, **inputs), rtol=1e-14
+        )
+        values = {"Tex": Tex, "tau": tau, "T_bg": 2.73, **inputs}
+        for name in keys - {"T_bg"} if "sigma_v" in inputs else keys:
+            up = species.thick(1, **{**values, name: values[name] * (1 + h)})
+            down = species.thick(1, **{**values, name: values[name] * (1 - h)})
+            finite_difference = (up - down) / (2 * h * values[name])
+            np.testing.assert_allclose(gradients[name], finite_difference, rtol=1e-6)
+    assert np.all(gradients["T_bg"] != 0)
+    _, gradients = species.thick_grad(1, Tex, tau, sigma_v=0.3)
+    np.testing.assert_array_equal(gradients["T_bg"], 0.0)
+
+
+def test_propagate_errors() -> None:
+    species = Species("X", g_u, E_u, [110.0, 220.0], [1e-5, 1e-4], [1, 2])
+    Ncol, gradients = species.thin_grad(1, np.array([10.0, 20.0]), 2.0)
+    sigma = lte.propagate_errors(gradients, {"TdV": 0.2})
+    np.testing.assert_allclose(sigma, 0.1 * Ncol, rtol=1e-14)
+    sigma = lte.propagate_errors(gradients, {"TdV": 0.2, "Tex": np.array([1.0, 2.0])})
+    np.testing.assert_allclose(
+        sigma, np.hypot(0.1 * Ncol, gradients["Tex"] * [1.0, 2.0]), rtol=1e-14
+    )
+    assert isinstance(lte.propagate_errors({"TdV": 2.0}, {"TdV": 0.1}), float)
+    with pytest.raises(ValueError):
+        lte.propagate_errors(gradients, {"tau": 0.1})
+
+
+def test_Tex_from_peak() -> None:
+    Tex = np.array([[3.0, 10.0, 100.0]])
+    freq = np.array([[115.27], [345.8]])
+    result = lte.J_nu_inverse(lte.J_nu(Tex, freq), freq)
+    np.testing.assert_allclose(result, np.broadcast_to(Tex, (2, 3)), rtol=1e-13)
+    Tp = lte.J_nu(Tex, freq) - lte.J_nu(5.0, freq)
+    result = lte.Tex_from_peak(Tp, freq, T_bg=5.0)
+    assert result.shape == (2, 3)
+    np.testing.assert_allclose(result, np.broadcast_to(Tex, (2, 3)), rtol=1e-13)
+    assert pytest.approx(lte.Tex_from_peak(0.0, 230.538)) == 2.73
+    result = lte.Tex_from_peak([np.nan, -10.0, np.inf, 1.0], 230.538)
+    assert np.all(np.isnan(result[:3])) and np.isfinite(result[3])
+    assert np.isnan(lte.J_nu_inverse(1.0, -100.0))
+    assert isinstance(lte.Tex_from_peak(10.0, 230.538, T_bg=0.0), float)
@@ -0,0 +1,87 @@
+import copy
+
+import numpy as np
+import pytest
+
+from molecular_columns import col_h2co, model_grid
+from molecular_columns.model_grid import ModelGrid
+
+axes = {"n_H2": [1e4, 1e5, 1e6], "T_kin": [10.0, 20.0, 40.0, 80.0]}
+n, T = np.meshgrid(np.log10(axes["n_H2"]), axes["T_kin"], indexing="ij")
+# a ratio that is linear in log10(n_H2) and T_kin, and decreases with T_kin
+TdV = np.array([np.full(n.shape, 100.0), 100.0 / (2.0 + 0.1 * n - 0.01 * T)])
+grid = ModelGrid("X", axes, [100.0, 200.0], TdV, np.zeros(TdV.shape))
+
+
+def test_ModelGrid() -> None:
+    assert grid.line(200.0001) == 1
+    with pytest.raises(ValueError):
+        grid.line(150.0)
+    with pytest.raises(ValueError):
+        ModelGrid("X", axes, [100.0], TdV, TdV)
+    ratio_grid = grid.ratio_grid(100.0, 200.0)
+    np.testing.assert_allclose(ratio_grid, 2.0 + 0.1 * n - 0.01 * T)
+    # multilinear interpolation is exact for a (bi)linear function
+    n_H2 = np.array([[2e4, 3e5], [1e6, 5e3]])
+    T_kin = np.array([15.0, 80.0])
+    ratio = grid.ratio(100.0, 200.0, n_H2=n_H2, T_kin=T_kin)
+    expected = 2.0 + 0.1 * np.log10(n_H2) - 0.01 * T_kin
+    np.testing.assert_allclose(ratio[:, 0], expected[:, 0], rtol=1e-12)
+    assert pytest.approx(ratio[0, 1], rel=1e-12) == expected[0, 1]
+    assert np.isnan(ratio[1, 1])
+    assert grid.intensity(100.0, n_H2=1e5, T_kin=33.0) == 100.0
+
+
+def test_ModelGrid_invert() -> None:
+    T_kin = np.array([[12.0, 35.0], [79.0, 20.0]])
+    ratio = 2.0 + 0.1 * 5.0 - 0.01 * T_kin
+    result = grid.invert(ratio, 100.0, 200.0, n_H2=1e5)
+    np.testing.assert_allclose(result, T_kin, rtol=1e-12)
+    n_H2 = np.array([3e4, 2e5])
+    ratio = 2.0 + 0.1 * np.log10(n_H2) - 0.01 * T_kin
+    result = grid.invert(ratio, 100.0, 200.0, n_H2=n_H2)
+    np.testing.assert_allclose(result, T_kin, rtol=1e-12)
+    # out of the range of the grid
+    assert np.isnan(grid.invert(3.0, 100.0, 200.0, n_H2=1e5))
+    assert np.isnan(grid.invert(2.2, 100.0, 200.0, n_H2=1e7))
+    # inversion for the density
+    result = grid.invert(2.2, 100.0, 200.0, "n_H2", T_kin=30.0)
+    assert pytest.approx(result, rel=1e-12) == 1e5
+    with pytest.raises(ValueError):
+        grid.invert(2.2, 100.0, 200.0, n_H2=1e5, T_kin=30.0)
+
+
+def test_model_grid(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("MOLECULAR_COLUMNS_CACHE", str(tmp_path))
+    solver = col_h2co.p_H2CO_non_lte
+    axes = {"n_H2": [1e4, 1e6], "T_kin": [20.0, 50.0, 100.0], "N": [1e12, 1e13]}
+    lines = col_h2co.p_H2CO_thermometer
+    grid = model_grid.model_grid(solver, axes, lines, delta_v=1.0)
+    assert grid.TdV.shape == grid.tau.shape == (2, 2, 3, 2)
+    result = solver.solve(1e6, 50.0, 1e12, 1.0)
+    index = solver.species.find(np.array(lines))
+    np.testing.assert_allclose(grid.TdV[:, 1, 1, 0], result["TdV"][index])
+    assert len(list(tmp_path.glob("p-H2CO.grid.*"))) == 1
+
+    # the second call reads the memory-mapped file
+    def no_compute(*args, **kwargs):
+        raise AssertionError("the grid should be read from the cache")
+
+    monkeypatch.setattr(ModelGrid, "compute", no_compute)
+    cached = model_grid.model_grid(solver, axes, lines, delta_v=1.0)
+    np.testing.assert_array_equal(cached.TdV, grid.TdV)
+    assert cached.axes.keys() == grid.axes.keys()
+    assert cached.log_axes == ("n_H2", "N")
+    with pytest.raises(AssertionError):
+        model_grid.model_grid(solver, axes, lines, delta_v=2.0)
+    # a grid of other molecular data (e.g., an updated catalog) is not reused
+    changed = copy.copy(solver)
+    changed.rates = [1.1 * rate for rate in solver.rates]
+    with pytest.raises(AssertionError):
+        model_grid.model_grid(changed, axes, lines, delta_v=1.0)
+
+    # H2CO thermometry
+    T_kin = np.array([25.0, 40.0, 90.0])
+    ratio = grid.ratio(*lines, n_H2=1e5, T_kin=T_kin, N=3e12)
+    T_inv = col_h2co.p_H2CO_T_kin_np(ratio, n_H2=1e5, N=3e12, grid=grid)
+    np.testing.assert_allclose(T_inv, T_kin, rtol=1e-10)
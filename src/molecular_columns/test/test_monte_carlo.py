@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from molecular_columns import col_c18o, monte_carlo
+
+
+def test_sample_percentiles() -> None:
+    samples = np.random.default_rng(1).normal(size=(101, 5))
+    samples[:30, 2] = np.nan
+    samples[:, 3] = np.nan
+    q = [5.0, 50.0, 99.5]
+    result = monte_carlo.sample_percentiles(samples, q)
+    assert result.shape == (3, 5)
+    good = [0, 1, 2, 4]
+    expected = np.nanpercentile(samples[:, good], q, axis=0)
+    np.testing.assert_allclose(result[:, good], expected, rtol=1e-14)
+    assert np.all(np.isnan(result[:, 3]))
+
+
+def test_propagate(monkeypatch) -> None:
+    def linear(x, y):
+        return np.where(x > 0, 2 * x + y, np.nan)
+
+    values = {"x": np.array([1.0, 2.0, 3.0]), "y": 1.0}
+    errors = {"x": np.array([0.1, 0.2, 0.3])}
+    result = monte_carlo.propagate(linear, values, errors, n_samples=20000)
+    assert result["mean"].shape == result["std"].shape == (3,)
+    assert result["percentiles"].shape == (3, 3)
+    np.testing.assert_allclose(result["mean"], [3.0, 5.0, 7.0], rtol=3e-3)
+    np.testing.assert_allclose(result["std"], [0.2, 0.4, 0.6], rtol=3e-2)
+    np.testing.assert_allclose(result["percentiles"][1], result["mean"], rtol=3e-3)
+    np.testing.assert_array_equal(result["valid_fraction"], 1.0)
+
+    # reproducible, and independent of the number of workers
+    monkeypatch.setattr(monte_carlo, "chunk_elements", 1000)
+    first = monte_carlo.propagate(linear, values, errors, n_samples=400, seed=3)
+    again = monte_carlo.propagate(
+        linear, values, errors, n_samples=400, seed=3, n_workers=3
+    )
+    other = monte_carlo.propagate(linear, values, errors, n_samples=400, seed=4)
+    for key in first:
+        np.testing.assert_array_equal(first[key], again[key])
+    assert np.all(first["mean"] != other["mean"])
+
+    # invalid draws are ignored
+    result = monte_carlo.propagate(linear, {"x": 0.0, "y": 0.0}, {"x": 1.0})
+    assert pytest.approx(result["valid_fraction"], abs=0.1) == 0.5
+    assert result["mean"] > 0
+    with pytest.raises(ValueError):
+        monte_carlo.propagate(linear, values, {"z": 1.0})
+
+
+def test_propagate_C18O(monkeypatch) -> None:
+    monkeypatch.setattr(monte_carlo, "chunk_elements", 10000)
+    Tex = np.array([[10.0, 20.0], [30.0, 2.0]])
+    TdV = np.array([[1.0, 2.0], [3.0, 4.0]])
+    result = monte_carlo.propagate(
+        col_c18o.C18O_thin_np,
+        {"Tex": Tex, "TdV": TdV},
+        {"TdV": 0.1 * TdV},
+        n_samples=5000,
+        J_up=2,
+        tabulated=True,
+    )
+    Ncol = col_c18o.C18O_thin_np(2, Tex, TdV)
+    np.testing.assert_allclose(result["mean"][Tex > 2.73], Ncol[Tex > 2.73], rtol=1e-2)
+    np.testing.assert_allclose(
+        result["std"][Tex > 2.73], 0.1 * Ncol[Tex > 2.73], rtol=5e-2
+    )
+    assert np.isnan(result["mean"][1, 1]) and result["valid_fraction"][1, 1] == 0
+    # worker processes give the same results
+    parallel = monte_carlo.propagate(
+        col_c18o.C18O_thin_np,
+        {"Tex": Tex, "TdV": TdV},
+        {"TdV": 0.1 * TdV},
+        n_samples=5000,
+        n_workers=2,
+        processes=True,
+        J_up=2,
+        tabulated=True,
+    )
+    np.testing.assert_array_equal(parallel["mean"], result["mean"])
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from molecular_columns import col_h2co, non_lte
+
+solver = col_h2co.p_H2CO_non_lte
+species = solver.species
+
+
+def test_escape_probability() -> None:
+    tau = np.array([0.0, 1e-3, 0.01 - 1e-12, 0.01, 1.0, 1e3])
+    for geometry in non_lte.geometries:
+        beta = non_lte.escape_probability(tau, geometry)
+        assert beta[0] == 1.0
+        assert np.all(np.diff(beta[[0, 1, 3, 4, 5]]) < 0)
+        assert pytest.approx(beta[2], rel=1e-8) == beta[3]
+    assert pytest.approx(non_lte.escape_probability(1e3, "sphere"), rel=1e-5) == 1.5e-3
+    assert pytest.approx(non_lte.escape_probability(2.0, "lvg")) == (1 - np.exp(-2)) / 2
+    assert non_lte.escape_probability(-1.0) == 1.0
+    with pytest.raises(ValueError):
+        non_lte.escape_probability(1.0, "cube")
+
+
+def test_StatisticalEquilibrium() -> None:
+    assert species.E_u.size == 41
+    assert solver.codes == [2, 3]
+    assert np.all(species.lower >= 0)
+    np.testing.assert_allclose(species.E_u, col_h2co.p_H2CO.E_u, rtol=1e-12)
+    densities = solver.partner_densities(1e4, 300.0)
+    assert pytest.approx(densities[1] / densities[0]) == 3.0
+    # the rate coefficients are clipped to the temperatures of the tables
+    C = solver.collision_matrix(densities, np.array([300.0, 1e3]))
+    upper, lower = solver.upper[0], solver.lower[0]
+    np.testing.assert_allclose(C[0, upper, lower], C[1, upper, lower])
+    assert np.all(C[0, lower, upper] <= C[1, lower, upper])
+
+
+def test_StatisticalEquilibrium_limits() -> None:
+    # LTE at high density
+    result = solver.solve(1e12, 30.0, 1e10, 1.0)
+    boltzmann = species.g_u * np.exp(-species.E_u / 30.0) / species.Q(30.0)
+    populated = boltzmann > 1e-6
+    assert result["converged"]
+    np.testing.assert_allclose(
+        result["populations"][populated], boltzmann[populated], rtol=1e-3
+    )
+    # optically thin LTE lines give back the column density
+    line = species.find(218.222192)
+    Ncol = species.thin_index(line, 30.0, result["TdV"][line])
+    assert pytest.approx(Ncol, rel=1e-3) == 1e10
+    # radiative equilibrium with the background at low density
+    result = solver.solve(1e-2, 30.0, 1e10, 1.0, T_bg=5.0)
+    assert pytest.approx(result["Tex"][line], rel=1e-4) == 5.0
+    assert abs(result["TdV"][line]) < 1e-8
+
+
+def test_StatisticalEquilibrium_grid() -> None:
+    n_H2 = np.logspace(3, 7, 4)[:, np.newaxis]
+    N = np.array([1e12, 1e14, 1e15])
+    result = solver.solve(n_H2, 40.0, N, 2.0, geometry="lvg")
+    assert result["populations"].shape == (41, 4, 3)
+    assert result["TdV"].shape == (species.freq.size, 4, 3)
+    assert np.all(result["converged"])
+    np.testing.assert_allclose(result["populations"].sum(axis=0), 1.0, rtol=1e-12)
+    point = solver.solve(n_H2[1, 0], 40.0, N[2], 2.0, geometry="lvg")
+    assert point["TdV"].shape == (species.freq.size,)
+    np.testing.assert_allclose(point["TdV"], result["TdV"][:, 1, 2], rtol=1e-5)
+    # the lines saturate at high column density
+    assert np.nanmax(result["tau"][:, :, 2]) > 1
+    # invalid grid points
+    result = solver.solve([1e4, 1e4], [-10.0, np.nan], 1e13, 1.0)
+    assert np.all(np.isnan(result["TdV"])) and not np.any(result["converged"])
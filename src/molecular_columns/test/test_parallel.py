@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+from molecular_columns import col_c18o, col_so, parallel
+
+rng = np.random.default_rng(0)
+Tex = rng.uniform(5.0, 30.0, (37, 23))
+TdV = rng.uniform(0.1, 5.0, (37, 23))
+
+
+def test_tiles(monkeypatch) -> None:
+    result = parallel.tiles((5, 4), (2, 3))
+    assert len(result) == 6
+    assert result[1] == (slice(0, 2), slice(3, 6))
+    covered = np.zeros((5, 4), dtype=int)
+    for tile in result:
+        covered[tile] += 1
+    assert np.all(covered == 1)
+    monkeypatch.setattr(parallel, "chunk_elements", 10)
+    assert parallel.tiles((5, 4))[0] == (slice(0, 2), slice(0, 4))
+    assert parallel.tiles(()) == [()]
+    with pytest.raises(ValueError):
+        parallel.tiles((5, 4), (0,))
+
+
+def test_map_tiles() -> None:
+    expected = col_c18o.C18O_thin_np(2, Tex, TdV, tabulated=True)
+    for n_workers in [1, 2]:
+        result = parallel.map_tiles(
+            col_c18o.C18O_thin_np,
+            {"Tex": Tex, "TdV": TdV},
+            tile_shape=(8, 10),
+            n_workers=n_workers,
+            J_up=2,
+            tabulated=True,
+        )
+        np.testing.assert_array_equal(result, expected)
+    # broadcast and scalar inputs, another species
+    result = parallel.map_tiles(
+        col_so.SO_thin_np,
+        {"Tex": Tex[:, :1], "TdV": TdV, "T_bg": 2.73},
+        tile_shape=(5,),
+        n_workers=2,
+        N_J_up="2_3",
+        N_J_low="1_2",
+    )
+    np.testing.assert_allclose(
+        result, col_so.SO_thin_np("2_3", "1_2", Tex[:, :1], TdV), rtol=1e-14
+    )
+    with pytest.raises(ValueError):
+        parallel.map_tiles(col_c18o.C18O_thin_np, {"TdV": TdV}, out=np.empty(3))
+
+
+def test_map_tiles_spawn() -> None:
+    # the workers import the species module, and attach the shared inputs
+    result = parallel.map_tiles(
+        col_c18o.C18O_thin_np,
+        {"Tex": Tex, "TdV": TdV},
+        tile_shape=(8,),
+        n_workers=2,
+        start_method="spawn",
+        J_up=2,
+    )
+    np.testing.assert_array_equal(result, col_c18o.C18O_thin_np(2, Tex, TdV))
+
+
+def test_map_tiles_memmap(tmp_path) -> None:
+    TdV_file = np.memmap(tmp_path / "tdv.dat", np.float64, mode="w+", shape=TdV.shape)
+    TdV_file[...] = TdV
+    TdV_file.flush()
+    out = np.memmap(tmp_path / "ncol.dat", np.float64, mode="w+", shape=TdV.shape)
+    result = parallel.map_tiles(
+        col_c18o.C18O_thin_np,
+        {
+            "Tex": Tex,
+            "TdV": np.memmap(
+                tmp_path / "tdv.dat", np.float64, mode="r", shape=(37, 23)
+            ),
+        },
+        tile_shape=(10,),
+        n_workers=2,
+        out=out,
+        J_up=2,
+    )
+    np.testing.assert_allclose(result, col_c18o.C18O_thin_np(2, Tex, TdV), rtol=1e-14)
+    np.testing.assert_array_equal(
+        np.fromfile(tmp_path / "ncol.dat").reshape(TdV.shape), result
+    )
+
+
+def test_map_tiles_threads(monkeypatch) -> None:
+    # a new species, so that its partition function table is built lazily
+    # by the first of the concurrent threads
+    species = col_c18o.Species(
+        "C18O", col_c18o.C18O.g_u, col_c18o.C18O.E_u, [219.56], [6e-7], [2]
+    )
+
+    def thin(Tex, TdV):
+        return species.thin_index(0, Tex, TdV, tabulated=True)
+
+    monkeypatch.setattr(parallel, "thread_chunk_elements", 50)
+    assert len(parallel.tiles(Tex.shape, max_elements=50)) == 19
+    result = parallel.map_tiles(
+        thin, {"Tex": Tex, "TdV": TdV}, n_workers=4, threads=True
+    )
+    np.testing.assert_allclose(result, thin(Tex, TdV), rtol=1e-14)
+    out = np.full(Tex.shape, np.nan)
+    assert (
+        parallel.map_tiles(
+            col_c18o.C18O_thin_np,
+            {"Tex": Tex, "TdV": TdV},
+            n_workers=3,
+            out=out,
+            threads=True,
+            J_up=2,
+        )
+        is out
+    )
+    np.testing.assert_allclose(out, col_c18o.C18O_thin_np(2, Tex, TdV), rtol=1e-14)
@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+import molecular_columns.partition_function as partition_function
+
+g_u = np.array([1.0, 3.0, 5.0, 7.0])
+E_u = np.array([0.0, 5.3, 15.8, 31.6])
+
+
+def test_level_sum() -> None:
+    value = partition_function.level_sum(g_u, E_u, 10.0)
+    assert isinstance(value, float)
+    assert pytest.approx(value) == np.sum(g_u * np.exp(-E_u / 10.0))
+
+    Tex = np.array([[5.0, 10.0, np.nan], [-1.0, 0.0, 20.0]])
+    value = partition_function.level_sum(g_u, E_u, Tex)
+    assert value.shape == Tex.shape
+    assert np.isnan(value[0, 2]) & np.isnan(value[1, 0]) & np.isnan(value[1, 1])
+    np.testing.assert_allclose(
+        value[0, :2], [np.sum(g_u * np.exp(-E_u / T)) for T in [5.0, 10.0]]
+    )
+
+
+def test_level_sum_chunks(monkeypatch) -> None:
+    Tex = np.linspace(3.0, 50.0, 101).reshape(1, 101)
+    expected = partition_function.level_sum(g_u, E_u, Tex)
+    # force many small chunks
+    monkeypatch.setattr(partition_function, "chunk_elements", 10)
+    np.testing.assert_allclose(
+        partition_function.level_sum(g_u, E_u, Tex), expected, rtol=1e-14
+    )
+
+
+def test_PartitionTable() -> None:
+    with pytest.raises(ValueError):
+        partition_function.PartitionTable(g_u, E_u, T_min=10.0, T_max=5.0)
+
+    table = partition_function.PartitionTable(g_u, E_u, T_min=2.0, T_max=200.0)
+    assert table.size == 0
+    Tex = np.geomspace(2.0, 200.0, 1001)
+    exact = partition_function.level_sum(g_u, E_u, Tex)
+    value = table(Tex)
+    assert table.size > 0
+    assert table.max_rel_error <= table.rtol
+    np.testing.assert_allclose(value, exact, rtol=table.rtol)
+    assert isinstance(table(10.0), float)
+
+
+def test_PartitionTable_max_nodes() -> None:
+    # too few nodes for rtol: the table warns and keeps its actual error
+    table = partition_function.PartitionTable(g_u, E_u, T_min=1.0, T_max=200.0)
+    with pytest.warns(RuntimeWarning, match="rtol"):
+        table.build(n_nodes=4, max_nodes=8)
+    assert table.size == 8 and table.max_rel_error > table.rtol
+    Tex = np.geomspace(1.0, 200.0, 101)
+    exact = partition_function.level_sum(g_u, E_u, Tex)
+    np.testing.assert_allclose(table(Tex), exact, rtol=table.max_rel_error)
+
+
+def test_PartitionTable_outside() -> None:
+    table = partition_function.PartitionTable(g_u, E_u, T_min=2.0, T_max=200.0)
+    Tex = np.array([[1.0, np.nan], [300.0, 50.0]])
+    value = table(Tex)
+    assert value.shape == Tex.shape
+    assert np.isnan(value[0, 1])
+    np.testing.assert_allclose(
+        value[[0, 1], [0, 0]],
+        partition_function.level_sum(g_u, E_u, [1.0, 300.0]),
+        rtol=1e-14,
+    )
+    value = table(Tex, exact_outside=False)
+    assert np.isnan(value[0, 0]) & np.isnan(value[1, 0]) & np.isfinite(value[1, 1])
+
+
+def test_PartitionTable_chunks(monkeypatch) -> None:
+    table = partition_function.PartitionTable(g_u, E_u, T_min=2.0, T_max=200.0)
+    Tex = np.linspace(1.0, 250.0, 1001)
+    Tex[::7] = np.nan
+    expected = table(Tex)
+    monkeypatch.setattr(partition_function, "table_chunk", 10)
+    np.testing.assert_array_equal(table(Tex), expected)
+
+
+def test_level_moments(monkeypatch) -> None:
+    Tex = np.array([[5.0, 10.0, np.nan], [-1.0, 0.0, 20.0]])
+    Q, dlnQ_dT = partition_function.level_moments(g_u, E_u, Tex)
+    np.testing.assert_allclose(
+        Q, partition_function.level_sum(g_u, E_u, Tex), rtol=1e-14
+    )
+    assert np.all(np.isnan(dlnQ_dT[[0, 1, 1], [2, 0, 1]]))
+    h = 1e-6
+    finite_difference = (
+        np.log(partition_function.level_sum(g_u, E_u, Tex * (1 + h)))
+        - np.log(partition_function.level_sum(g_u, E_u, Tex * (1 - h)))
+    ) / (2 * h * Tex)
+    good = np.isfinite(dlnQ_dT)
+    np.testing.assert_allclose(dlnQ_dT[good], finite_difference[good], rtol=1e-7)
+    assert isinstance(partition_function.level_moments(g_u, E_u, 10.0)[1], float)
+    monkeypatch.setattr(partition_function, "chunk_elements", 10)
+    np.testing.assert_allclose(
+        partition_function.level_moments(g_u, E_u, Tex)[1], dlnQ_dT, rtol=1e-14
+    )
+
+
+def test_PartitionTable_log_slope() -> None:
+    table = partition_function.PartitionTable(g_u, E_u, T_min=2.0, T_max=200.0)
+    Tex = np.array([[1.0, np.nan], [300.0, 50.0]])
+    slope = table.log_slope(Tex)
+    _, exact = partition_function.level_moments(g_u, E_u, Tex)
+    assert np.isnan(slope[0, 1])
+    np.testing.assert_allclose(
+        slope[[0, 1], [0, 0]], exact[[0, 1], [0, 0]] * [1.0, 300.0]
+    )
+    # the slope of the interpolant is close to the exact one inside the table
+    Tex = np.geomspace(2.0, 200.0, 1001)
+    _, exact = partition_function.level_moments(g_u, E_u, Tex)
+    np.testing.assert_allclose(table.log_slope(Tex), exact * Tex, rtol=1e-4, atol=1e-6)
+    assert np.isnan(table.log_slope(300.0, exact_outside=False))
+
+
+def test_PartitionTable_threads() -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    Tex = np.geomspace(2.0, 200.0, 1001)
+    expected = partition_function.PartitionTable(g_u, E_u, rtol=1e-9)(Tex)
+    table = partition_function.PartitionTable(g_u, E_u, rtol=1e-9)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(table, [Tex] * 16))
+    for result in results:
+        np.testing.assert_array_equal(result, expected)
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import molecular_columns
+from molecular_columns import registry
+
+
+def test_species() -> None:
+    assert len(molecular_columns.species) == len(registry.species_modules)
+    assert "SO" in molecular_columns.species
+    assert list(molecular_columns.species)[0] == "C18O"
+    SO = molecular_columns.species["SO"]
+    assert SO.name == "SO"
+    assert SO is molecular_columns.col_so.SO
+    with pytest.raises(KeyError):
+        molecular_columns.species["CO"]
+    with pytest.raises(AttributeError):
+        molecular_columns.col_co
+
+
+def test_lazy_import() -> None:
+    code = (
+        "import sys, molecular_columns;"
+        " print(sorted(m for m in sys.modules"
+        " if m.startswith(('astropy', 'molecular_columns.col_'))))"
+    )
+    env = dict(os.environ, PYTHONPATH=str(Path(molecular_columns.__file__).parents[1]))
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    assert output.stdout.strip() == "[]"
+
+
+def test_lazy_non_lte() -> None:
+    # the LTE species do not build their non-LTE solvers
+    code = (
+        "import sys, molecular_columns as m;"
+        " m.species['p-H2CO'], m.species['o-C3H2'];"
+        " print(sorted(k for k in sys.modules if k.endswith(('non_lte', 'model_grid'))),"
+        " 'p_H2CO_non_lte' in vars(m.col_h2co))"
+    )
+    env = dict(os.environ, PYTHONPATH=str(Path(molecular_columns.__file__).parents[1]))
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    assert output.stdout.strip() == "[] False"
+    from molecular_columns import col_cc3h2
+
+    assert col_cc3h2.p_C3H2_non_lte is col_cc3h2.p_C3H2_non_lte
+    with pytest.raises(AttributeError):
+        col_cc3h2.m_C3H2_non_lte
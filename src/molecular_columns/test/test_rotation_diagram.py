@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from molecular_columns import lte, rotation_diagram
+from molecular_columns.lte import Species
+
+g_u = np.array([1.0, 3.0, 5.0, 7.0, 9.0])
+E_u = np.array([0.0, 5.3, 15.8, 31.6, 52.7])
+species = Species(
+    "X", g_u, E_u, [110.0, 220.0, 330.0, 440.0], [1e-5, 1e-4, 3e-4, 7e-4], [1, 2, 3, 4]
+)
+
+
+def test_linear_fit() -> None:
+    rng = np.random.default_rng(0)
+    x = np.array([1.0, 2.0, 3.0, 5.0, 8.0])
+    y = 2.0 - 0.5 * x[:, np.newaxis] + 0.1 * rng.standard_normal((5, 3))
+    sigma = np.array([0.1, 0.2, 0.1, 0.3, 0.1])
+    a, b, var_a, var_b, cov_ab, n_points = rotation_diagram.linear_fit(
+        x[:, np.newaxis], y, 1 / sigma[:, np.newaxis] ** 2
+    )
+    for i in range(3):
+        p, cov = np.polyfit(x, y[:, i], 1, w=1 / sigma, cov="unscaled")
+        assert pytest.approx([b[i], a[i]], rel=1e-10) == p
+        assert pytest.approx([var_b[i], cov_ab[i], var_a[i]], rel=1e-10) == [
+            cov[0, 0],
+            cov[0, 1],
+            cov[1, 1],
+        ]
+    np.testing.assert_array_equal(n_points, 5)
+    # a single valid point
+    y[1:, 0] = np.nan
+    a, b, *_ = rotation_diagram.linear_fit(x[:, np.newaxis], y, 1.0)
+    assert np.isnan(a[0]) & np.isnan(b[0]) & np.isfinite(b[1])
+
+
+def test_rotation_diagram() -> None:
+    index = np.arange(4)
+    T_rot = np.array([[8.0, 15.0], [30.0, np.nan]])
+    N_tot = 1e14
+    # integrated intensities of optically thin lines in LTE
+    Nu_gu = N_tot / species.Q(T_rot) * np.exp(-E_u[1:, None, None] / T_rot)
+    TdV = Nu_gu / rotation_diagram.upper_columns(species, index, np.ones((4, 1, 1)))
+    result = rotation_diagram.rotation_diagram(species, index, TdV, TdV_err=0.1 * TdV)
+    np.testing.assert_allclose(result[0], T_rot, rtol=1e-10)
+    np.testing.assert_allclose(result[1][[0, 0, 1], [0, 1, 0]], N_tot, rtol=1e-10)
+    assert np.all(result[2][[0, 0, 1], [0, 1, 0]] > 0)
+    assert np.all(result[3][[0, 0, 1], [0, 1, 0]] > 0)
+    assert np.all(np.isnan([r[1, 1] for r in result]))
+    # without uncertainties, a perfect fit has no scatter
+    result = rotation_diagram.rotation_diagram(species, index, TdV)
+    assert np.all(result[2][0] < 1e-8)
+    # two lines left in a pixel
+    TdV[:2, 0, 0] = [-1.0, np.nan]
+    result = rotation_diagram.rotation_diagram(species, index, TdV, TdV_err=0.1 * TdV)
+    assert pytest.approx(result[0][0, 0], rel=1e-10) == 8.0
+
+
+def test_rotation_diagram_tabulated(monkeypatch) -> None:
+    index = np.arange(4)
+    T_rot = np.array([8.0, 15.0, 30.0])
+    Nu_gu = 1e14 / species.Q(T_rot) * np.exp(-E_u[1:, None] / T_rot)
+    TdV = Nu_gu / rotation_diagram.upper_columns(species, index, np.ones((4, 1)))
+    exact = rotation_diagram.rotation_diagram(species, index, TdV, TdV_err=0.1 * TdV)
+
+    # Q and its derivative come from the table, without any level sum
+    def no_level_sum(*args, **kwargs):
+        raise AssertionError("the tabulated fit should not sum over the levels")
+
+    monkeypatch.setattr(lte, "level_moments", no_level_sum)
+    monkeypatch.setattr(lte, "level_sum", no_level_sum)
+    result = rotation_diagram.rotation_diagram(
+        species, index, TdV, TdV_err=0.1 * TdV, tabulated=True
+    )
+    for value, expected in zip(result, exact):
+        np.testing.assert_allclose(value, expected, rtol=1e-5)
+
+
+def test_population_diagram() -> None:
+    index = np.arange(4)
+    T_rot = np.array([[8.0, 15.0, 30.0], [20.0, 12.0, np.nan]])
+    N_tot = np.array([[1e13, 1e14, 3e14], [1e12, 5e13, 1e15]])
+    sigma_v = 0.5
+    # integrated intensities of optically thick lines in LTE
+    Nu_gu = N_tot / species.Q(T_rot) * np.exp(-E_u[1:, None, None] / T_rot)
+    scale = rotation_diagram.upper_columns(species, index, np.ones((4, 1, 1)))
+    tau = Nu_gu * np.expm1(species.T_nu[:, None, None] / T_rot)
+    tau /= scale * species.T_nu[:, None, None] * np.sqrt(2 * np.pi) * sigma_v
+    TdV = Nu_gu / scale * (1 - np.exp(-tau)) / tau
+    result = rotation_diagram.population_diagram(
+        species, index, TdV, sigma_v, TdV_err=0.1 * TdV, rtol=1e-10
+    )
+    good = np.isfinite(T_rot)
+    assert np.all(result[5] == good)
+    np.testing.assert_allclose(result[0][good], T_rot[good], rtol=1e-8)
+    np.testing.assert_allclose(result[1][good], N_tot[good], rtol=1e-8)
+    np.testing.assert_allclose(result[4][:, good], tau[:, good], rtol=1e-6)
+    assert np.all(np.isnan([r[1, 2] for r in result[:4]]))
+    assert np.nanmax(tau) > 1
+    # the rotation diagram of the thick lines is biased
+    thin = rotation_diagram.rotation_diagram(species, index, TdV, TdV_err=0.1 * TdV)
+    assert np.abs(thin[1][0, 2] / N_tot[0, 2] - 1) > 0.1
+    # iteration cap
+    result = rotation_diagram.population_diagram(
+        species, index, TdV, sigma_v, rtol=1e-10, max_iter=1
+    )
+    assert not np.any(result[5])
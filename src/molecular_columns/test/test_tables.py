@@ -0,0 +1,115 @@
+import astropy.units as u
+import numpy as np
+import pytest
+from astropy.table import QTable, Table
+
+from molecular_columns import col_c18o, col_dcn, col_so, lte, tables
+
+
+def line_table() -> Table:
+    TdV = np.array([1.0, 2.0, 4.0, 3.0, 0.5, 1.0, 1.0])
+    return Table(
+        {
+            "source": ["a", "a", "b", "b", "c", "c", "d"],
+            "species": ["C18O", "SO", "C18O", "DCN", "C18O", "CS", "SO"],
+            "transition": ["2", "2_3-1_2", "1", "3", "2", "2", "9_9-9_9"],
+            "TdV": 1e3 * TdV * u.mK * u.km / u.s,
+            "TdV_err": 1e2 * TdV * u.mK * u.km / u.s,
+            "Tex": [10.0, 20.0, 15.0, 30.0, 12.0, 10.0, 10.0] * u.K,
+            "Tex_err": [1.0, 2.0, 1.0, 3.0, 1.0, 1.0, 1.0] * u.K,
+        }
+    )
+
+
+def expected() -> tuple[np.ndarray, np.ndarray]:
+    rows = [
+        (col_c18o.C18O, 2, 10.0, 1.0, 1.0),
+        (col_so.SO, "2_3-1_2", 20.0, 2.0, 2.0),
+        (col_c18o.C18O, 1, 15.0, 4.0, 1.0),
+        (col_dcn.DCN, 3, 30.0, 3.0, 3.0),
+        (col_c18o.C18O, 2, 12.0, 0.5, 1.0),
+    ]
+    Ncol, Ncol_err = [], []
+    for species, key, Tex, TdV, Tex_err in rows:
+        N, gradients = species.thin_grad(key, Tex, TdV)
+        Ncol.append(N)
+        errors = {"TdV": 0.1 * TdV, "Tex": Tex_err}
+        Ncol_err.append(lte.propagate_errors(gradients, errors))
+    # unknown species and transition
+    return np.array(Ncol + [np.nan] * 2), np.array(Ncol_err + [np.nan] * 2)
+
+
+def test_column_densities() -> None:
+    table = line_table()
+    result = tables.column_densities(table, errors={"TdV": "TdV_err", "Tex": "Tex_err"})
+    assert result is table
+    assert table["Ncol"].unit == u.cm**-2 and table["Ncol_err"].unit == u.cm**-2
+    Ncol, Ncol_err = expected()
+    np.testing.assert_allclose(table["Ncol"], Ncol, rtol=1e-13)
+    np.testing.assert_allclose(table["Ncol_err"], Ncol_err, rtol=1e-13)
+
+    # transitions matched by frequency, optically thick lines
+    table = line_table()[:4]
+    table["freq"] = [
+        col_c18o.C18O.freq[1],
+        col_so.SO.freq[col_so.SO.transition("2_3-1_2")],
+        col_c18o.C18O.freq[0] + 1e-4,
+        col_dcn.DCN.freq[2],
+    ] * u.GHz
+    table["freq"] = table["freq"].to(u.MHz)
+    table["tau"] = [0.5, 1.0, 2.0, 0.1]
+    tables.column_densities(table, transition="freq", by_freq=True, tau="tau")
+    Ncol = [
+        col_c18o.C18O.thick(2, 10.0, 0.5, TdV=1.0),
+        col_so.SO.thick("2_3-1_2", 20.0, 1.0, TdV=2.0),
+        col_c18o.C18O.thick(1, 15.0, 2.0, TdV=4.0),
+        col_dcn.DCN.thick(3, 30.0, 0.1, TdV=3.0),
+    ]
+    np.testing.assert_allclose(table["Ncol"], Ncol, rtol=1e-13)
+    assert "Ncol_err" not in table.colnames
+
+    # QTable, with a T_bg column and masked values
+    table = QTable(line_table()[:2], masked=True)
+    table["T_bg"] = [2.73, 5.0] * u.K
+    table["TdV"].mask[1] = True
+    tables.column_densities(table, T_bg="T_bg", name="N")
+    assert table["N"].unit == u.cm**-2
+    Ncol = np.ma.filled(np.ma.asarray(table["N"].value), np.nan)
+    np.testing.assert_allclose(Ncol, [expected()[0][0], np.nan], rtol=1e-13)
+    with pytest.raises(ValueError):
+        tables.column_densities(line_table(), errors={"tau": "Tex_err"})
+
+
+def test_column_densities_ecsv(tmp_path) -> None:
+    table = line_table()
+    tables.column_densities(table, errors={"TdV": "TdV_err", "Tex": "Tex_err"})
+    table.write(tmp_path / "lines.ecsv")
+    copy = Table.read(tmp_path / "lines.ecsv")
+    assert tables.column_units(copy) == tables.column_units(table)
+    np.testing.assert_array_equal(copy["Ncol"], table["Ncol"])
+
+
+def test_column_densities_pandas(tmp_path) -> None:
+    pd = pytest.importorskip("pandas")
+    table = line_table()
+    df = table.to_pandas()
+    df.attrs["units"] = {
+        name: unit.to_string() for name, unit in tables.column_units(table).items()
+    }
+    tables.column_densities(df, errors={"TdV": "TdV_err", "Tex": "Tex_err"})
+    Ncol, Ncol_err = expected()
+    np.testing.assert_allclose(df["Ncol"], Ncol, rtol=1e-13)
+    np.testing.assert_allclose(df["Ncol_err"], Ncol_err, rtol=1e-13)
+    assert tables.column_units(df)["Ncol"] == u.cm**-2
+    # the units of the data frame are those of Table.from_pandas
+    copy = Table.from_pandas(df, units=tables.column_units(df))
+    assert copy["Ncol"].unit == u.cm**-2 and copy["TdV"].unit == table["TdV"].unit
+
+    pytest.importorskip("pyarrow")
+    df.to_parquet(tmp_path / "lines.parquet")
+    copy = pd.read_parquet(tmp_path / "lines.parquet")
+    assert tables.column_units(copy) == tables.column_units(df)
+    table.write(tmp_path / "table.parquet")
+    assert tables.column_units(Table.read(tmp_path / "table.parquet")) == (
+        tables.column_units(table)
+    )